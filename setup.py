@@ -82,6 +82,9 @@ setup(
     python_requires=">=3.11",
     install_requires=read_requirements(),
     extras_require={
+        "search": [
+            "rapidfuzz>=3.0.0",
+        ],
         "dev": [
             "pytest>=7.3.1",
             "pytest-asyncio>=0.21.0",
@@ -19,6 +19,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 import psutil
 
+from .cache_governor import LazyLoaderAdapter, get_cache_governor, register_cache
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -97,6 +98,8 @@ class LazyLoader:
         self._loaded_objects = {}
         self._load_functions = {}
         self._access_count = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
         
     def register_loader(self, key: str, loader_func: Callable) -> None:
         """
@@ -120,7 +123,10 @@ class LazyLoader:
         """
         self._access_count[key] += 1
         
-        if key not in self._loaded_objects:
+        if key in self._loaded_objects:
+            self.hits += 1
+        else:
+            self.misses += 1
             if key in self._load_functions:
                 self._loaded_objects[key] = self._load_functions[key]()
                 logger.debug(f"Objekt '{key}' lazy geladen")
@@ -289,6 +295,10 @@ class AdvancedMemoryManager:
         self.lazy_loader = LazyLoader()
         self.mapped_file_manager = MemoryMappedFileManager()
         
+        # Geladene Objekte teilen sich das globale Cache-Budget; der Druck steuert es
+        register_cache("lazy_loader", LazyLoaderAdapter(self.lazy_loader))
+        get_cache_governor().attach_memory_manager(self)
+        
         # Statistiken
         self.stats = MemoryStats()
         self._last_gc_time = 0.0
@@ -382,6 +392,9 @@ class AdvancedMemoryManager:
         # Speicherdruck prüfen
         pressure_level = self.check_memory_pressure()
         
+        # Alle Caches an das (ggf. verkleinerte) Budget anpassen
+        get_cache_governor().on_memory_pressure(pressure_level)
+        
         if pressure_level == 'critical':
             logger.warning("Kritischer Speicherdruck erkannt, führe erweiterte Bereinigung durch")
             
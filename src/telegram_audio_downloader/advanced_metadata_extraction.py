@@ -21,6 +21,7 @@ from mutagen.mp4 import MP4
 
 from .error_handling import handle_error
 from .file_error_handler import handle_file_error, with_file_error_handling
+from .metadata_lookup import LookupRequestError, LookupTransientError, MetadataLookupService, make_lookup_key
 from .utils import sanitize_filename
 
 logger = logging.getLogger(__name__)
@@ -38,18 +39,53 @@ API_KEYS = {
     "spotify": "YOUR_SPOTIFY_CLIENT_ID:YOUR_SPOTIFY_CLIENT_SECRET",  # Platzhalter
 }
 
+# Fehlercode von Last.fm für unbekannte Titel
+LASTFM_ERROR_NOT_FOUND = 6
+
+# Dateiname des persistenten Caches für externe Abfragen (im Download-Verzeichnis)
+LOOKUP_CACHE_FILENAME = ".metadata_lookups.db"
+
+
+def _raise_for_status(status: int, service: str) -> None:
+    """
+    Löst für jede Antwort außer HTTP 200 einen Fehler aus.
+    
+    Nur eine erfolgreiche Antwort ohne Treffer darf als "nicht gefunden"
+    gecacht werden; Fehler werden von der Abfrageschicht nicht gespeichert.
+    
+    Args:
+        status: HTTP-Statuscode
+        service: Name des Dienstes für die Meldung
+        
+    Raises:
+        LookupTransientError: Bei HTTP 429 oder 5xx
+        LookupRequestError: Bei allen anderen Statuscodes außer 200
+    """
+    if status == 200:
+        return
+    if status == 429 or status >= 500:
+        raise LookupTransientError(f"{service} antwortete mit HTTP {status}")
+    raise LookupRequestError(f"{service} lehnte die Anfrage mit HTTP {status} ab")
+
+
 class AdvancedMetadataExtractor:
     """Erweiterte Metadaten-Extraktion mit Unterstützung für verschiedene Quellen."""
     
-    def __init__(self, download_dir: Path):
+    def __init__(self, download_dir: Path, api_urls: Optional[Dict[str, str]] = None,
+                 lookup_service: Optional[MetadataLookupService] = None):
         """
         Initialisiert den erweiterten Metadaten-Extraktor.
         
         Args:
             download_dir: Verzeichnis für Downloads
+            api_urls: Abweichende Endpunkte je Dienst (z. B. für Tests)
+            lookup_service: Gemeinsame Abfrageschicht (Standard: Cache-Datei im Download-Verzeichnis)
         """
         self.download_dir = download_dir
         self.session: Optional[aiohttp.ClientSession] = None
+        self.api_urls = {**EXTERNAL_APIS, **(api_urls or {})}
+        self._owns_lookups = lookup_service is None
+        self.lookups = lookup_service or MetadataLookupService(Path(download_dir) / LOOKUP_CACHE_FILENAME)
         
     async def __aenter__(self):
         """Async-Kontextmanager-Eintritt."""
@@ -60,6 +96,8 @@ class AdvancedMetadataExtractor:
         """Async-Kontextmanager-Austritt."""
         if self.session:
             await self.session.close()
+        if self._owns_lookups:
+            self.lookups.close()
             
     @with_file_error_handling()
     def extract_local_metadata(self, file_path: Union[str, Path]) -> Dict[str, Any]:
@@ -349,6 +387,9 @@ class AdvancedMetadataExtractor:
         """
         Fragt MusicBrainz-API für erweiterte Metadaten ab.
         
+        Gleichzeitige identische Abfragen werden zusammengefasst, Ergebnisse
+        (auch "nicht gefunden") persistent gecacht.
+        
         Args:
             title: Titel des Tracks
             artist: Künstler (optional)
@@ -360,39 +401,54 @@ class AdvancedMetadataExtractor:
             logger.warning("Keine HTTP-Session verfügbar für MusicBrainz-Abfrage")
             return None
             
-        try:
-            # Erstelle die Suchanfrage
-            query_parts = [f'title:"{title}"']
-            if artist:
-                query_parts.append(f'artist:"{artist}"')
-                
-            query = " AND ".join(query_parts)
-            params = {
-                "query": query,
-                "fmt": "json",
-                "limit": 1,
-            }
+        return await self.lookups.lookup(
+            "musicbrainz", make_lookup_key(title, artist), lambda: self._fetch_musicbrainz(title, artist)
+        )
+        
+    async def _fetch_musicbrainz(self, title: str, artist: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Führt die MusicBrainz-Anfrage aus.
+        
+        Args:
+            title: Titel des Tracks
+            artist: Künstler (optional)
             
-            # Führe die Anfrage aus
-            async with self.session.get(
-                EXTERNAL_APIS["musicbrainz"], 
-                params=params,
-                headers={"User-Agent": "TelegramAudioDownloader/1.0.0 ( https://github.com/yourusername/telegram-audio-downloader )"}
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("recordings"):
-                        recording = data["recordings"][0]
-                        return {
-                            "mbid": recording.get("id"),
-                            "title": recording.get("title"),
-                            "artist_credit": [ac.get("name") for ac in recording.get("artist-credit", [])],
-                            "release_count": recording.get("release-count"),
-                            "first_release_date": recording.get("first-release-date"),
-                        }
-        except Exception as e:
-            logger.error(f"Fehler bei MusicBrainz-Abfrage für {title}: {e}")
+        Returns:
+            Dictionary mit MusicBrainz-Metadaten oder None, wenn nichts gefunden wurde
+            
+        Raises:
+            LookupTransientError: Bei Drosselung oder Serverfehlern
+            LookupRequestError: Bei einer abgelehnten Anfrage (z. B. HTTP 401)
+        """
+        # Erstelle die Suchanfrage
+        query_parts = [f'title:"{title}"']
+        if artist:
+            query_parts.append(f'artist:"{artist}"')
             
+        query = " AND ".join(query_parts)
+        params = {
+            "query": query,
+            "fmt": "json",
+            "limit": 1,
+        }
+        
+        # Führe die Anfrage aus
+        async with self.session.get(
+            self.api_urls["musicbrainz"], 
+            params=params,
+            headers={"User-Agent": "TelegramAudioDownloader/1.0.0 ( https://github.com/yourusername/telegram-audio-downloader )"}
+        ) as response:
+            _raise_for_status(response.status, "MusicBrainz")
+            data = await response.json()
+            if data.get("recordings"):
+                recording = data["recordings"][0]
+                return {
+                    "mbid": recording.get("id"),
+                    "title": recording.get("title"),
+                    "artist_credit": [ac.get("name") for ac in recording.get("artist-credit", [])],
+                    "release_count": recording.get("release-count"),
+                    "first_release_date": recording.get("first-release-date"),
+                }
         return None
         
     async def query_lastfm(self, title: str, artist: str) -> Optional[Dict[str, Any]]:
@@ -415,37 +471,56 @@ class AdvancedMetadataExtractor:
             logger.debug("Kein Last.fm API-Key konfiguriert")
             return None
             
-        try:
-            params = {
-                "method": "track.getInfo",
-                "api_key": api_key,
-                "artist": artist,
-                "track": title,
-                "format": "json",
-            }
+        return await self.lookups.lookup(
+            "lastfm", make_lookup_key(title, artist), lambda: self._fetch_lastfm(title, artist, api_key)
+        )
+        
+    async def _fetch_lastfm(self, title: str, artist: str, api_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Führt die Last.fm-Anfrage aus.
+        
+        Args:
+            title: Titel des Tracks
+            artist: Künstler
+            api_key: Last.fm API-Key
             
-            # Führe die Anfrage aus
-            async with self.session.get(
-                EXTERNAL_APIS["lastfm"], 
-                params=params
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if "track" in data:
-                        track = data["track"]
-                        return {
-                            "name": track.get("name"),
-                            "artist": track.get("artist", {}).get("name"),
-                            "album": track.get("album", {}).get("title"),
-                            "listeners": track.get("listeners"),
-                            "playcount": track.get("playcount"),
-                            "duration": track.get("duration"),
-                            "toptags": [tag.get("name") for tag in track.get("toptags", {}).get("tag", [])],
-                            "wiki": track.get("wiki", {}).get("summary") if track.get("wiki") else None,
-                        }
-        except Exception as e:
-            logger.error(f"Fehler bei Last.fm-Abfrage für {title} von {artist}: {e}")
+        Returns:
+            Dictionary mit Last.fm-Metadaten oder None, wenn nichts gefunden wurde
             
+        Raises:
+            LookupTransientError: Bei Drosselung oder Serverfehlern
+            LookupRequestError: Bei einer abgelehnten Anfrage (z. B. HTTP 401)
+        """
+        params = {
+            "method": "track.getInfo",
+            "api_key": api_key,
+            "artist": artist,
+            "track": title,
+            "format": "json",
+        }
+        
+        # Führe die Anfrage aus
+        async with self.session.get(
+            self.api_urls["lastfm"], 
+            params=params
+        ) as response:
+            _raise_for_status(response.status, "Last.fm")
+            data = await response.json()
+            # Last.fm meldet Fehler teils mit HTTP 200; nur Fehler 6 bedeutet "nicht gefunden"
+            if data.get("error") not in (None, LASTFM_ERROR_NOT_FOUND):
+                raise LookupRequestError(f"Last.fm meldete Fehler {data['error']}: {data.get('message')}")
+            if "track" in data:
+                track = data["track"]
+                return {
+                    "name": track.get("name"),
+                    "artist": track.get("artist", {}).get("name"),
+                    "album": track.get("album", {}).get("title"),
+                    "listeners": track.get("listeners"),
+                    "playcount": track.get("playcount"),
+                    "duration": track.get("duration"),
+                    "toptags": [tag.get("name") for tag in track.get("toptags", {}).get("tag", [])],
+                    "wiki": track.get("wiki", {}).get("summary") if track.get("wiki") else None,
+                }
         return None
         
     async def enrich_metadata(self, local_metadata: Dict[str, Any], telegram_metadata: Dict[str, Any]) -> Dict[str, Any]:
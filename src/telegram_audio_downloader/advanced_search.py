@@ -5,14 +5,25 @@ Erweiterte Suche für den Telegram Audio Downloader.
 from typing import List, Optional, Dict, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
+import copy
+import hashlib
 import re
-from fuzzywuzzy import fuzz, process
+import threading
+import time
+
+from peewee import JOIN, Case, fn
 
 from telethon.tl.types import Document, DocumentAttributeAudio, Message
 
-from .models import AudioFile, TelegramGroup
+from .models import AudioFile, TelegramGroup, db
+from .database_caching import get_generation_token
+from .database_replication import read_from_replica
+from .database_scaling import get_shard_databases
 from .logging_config import get_logger
+from .search_index import TrigramIndex
+from .utils.lru_cache import LRUCache
 from .i18n import _
 
 logger = get_logger(__name__)
@@ -70,10 +81,31 @@ class SearchResult:
 class AdvancedSearchEngine:
     """Klasse für die erweiterte Suche."""
     
-    def __init__(self):
-        """Initialisiert die AdvancedSearchEngine."""
+    def __init__(self, suggestion_index_path: Optional[Union[str, Path]] = None,
+                 suggestion_index_ttl: float = 300.0):
+        """
+        Initialisiert die AdvancedSearchEngine.
+        
+        Args:
+            suggestion_index_path: Optionaler Pfad zum Persistieren des Trigramm-Index
+            suggestion_index_ttl: Zeit in Sekunden, nach der der Index im Hintergrund neu aufgebaut wird
+        """
         self.logger = get_logger(__name__ + ".AdvancedSearchEngine")
         self.search_history = []
+        self.suggestion_index_path = Path(suggestion_index_path) if suggestion_index_path else None
+        self.suggestion_index_ttl = suggestion_index_ttl
+        self._suggestion_index: Optional[TrigramIndex] = None
+        self._suggestion_lock = threading.Lock()
+        self._suggestion_thread: Optional[threading.Thread] = None
+        # Erhöht bei jeder Invalidierung; ältere Neuaufbauten werden verworfen
+        self._suggestion_generation = 0
+        # Während eines Neuaufbaus ergänzte Begriffe (None = kein Neuaufbau)
+        self._pending_suggestion_terms: Optional[List[str]] = None
+        self._facet_cache: LRUCache[str, Dict[str, Any]] = LRUCache(maxsize=128)
+        # Normalisierte Abfrage -> (Generations-Token, Zeilen als Dictionaries)
+        self._result_cache: LRUCache[str, tuple] = LRUCache(maxsize=128)
+        # Pro Suchanfrage (und Thread) einmal ermittelter Generations-Token
+        self._request_state = threading.local()
     
     def search(self, query: SearchQuery) -> SearchResult:
         """
@@ -90,6 +122,8 @@ class AdvancedSearchEngine:
         
         results = []
         highlighted_terms = []
+        self._request_state.active = True
+        self._request_state.generation = None
         
         try:
             # Führe die Suche basierend auf dem Suchtyp durch
@@ -143,6 +177,25 @@ class AdvancedSearchEngine:
                 query_time=time.time() - start_time,
                 search_type=query.search_type
             )
+        finally:
+            self._request_state.active = False
+            self._request_state.generation = None
+    
+    def _get_generation_token(self) -> str:
+        """
+        Gibt den Generations-Token von ``audio_files`` zurück.
+        
+        Innerhalb einer Suchanfrage (``search``) wird er nur einmal ermittelt,
+        da jede Ermittlung ``PRAGMA data_version`` ausführt.
+        
+        Returns:
+            Generations-Token
+        """
+        if not getattr(self._request_state, "active", False):
+            return get_generation_token(("audio_files",))
+        if self._request_state.generation is None:
+            self._request_state.generation = get_generation_token(("audio_files",))
+        return self._request_state.generation
     
     def _search_audio_files(self, query: SearchQuery) -> List[Dict[str, Any]]:
         """
@@ -159,64 +212,119 @@ class AdvancedSearchEngine:
         self.logger.debug("Suche nach Audiodateien in Telegram-Gruppen")
         return []
     
-    def _search_downloaded_files(self, query: SearchQuery) -> List[AudioFile]:
+    def _apply_search_predicate(self, base_query, query: SearchQuery):
         """
-        Sucht in heruntergeladenen Dateien.
+        Wendet Suchbegriffe und Filter einer Suchanfrage auf eine AudioFile-Abfrage an.
+        
+        Wird von der Suche und der Facettierung gemeinsam genutzt, damit beide
+        exakt dieselbe Ergebnismenge beschreiben.
         
         Args:
+            base_query: AudioFile-Abfrage
             query: SearchQuery-Objekt
             
         Returns:
-            Liste von AudioFile-Objekten
+            Eingeschränkte AudioFile-Abfrage
         """
-        try:
-            # Erstelle die Basisabfrage
-            base_query = AudioFile.select()
-            
-            # Wende Textsuche an
-            if query.terms:
-                text_conditions = []
-                for term in query.terms:
-                    if query.fuzzy_search:
-                        # Bei Fuzzy-Suche verwenden wir eine einfachere Bedingung
+        # Wende Textsuche an
+        if query.terms:
+            text_conditions = []
+            for term in query.terms:
+                if query.fuzzy_search:
+                    # Bei Fuzzy-Suche ergänzen wir ähnliche Begriffe aus dem Trigramm-Index
+                    condition = (
+                        (AudioFile.title.contains(term)) |
+                        (AudioFile.performer.contains(term)) |
+                        (AudioFile.file_name.contains(term))
+                    )
+                    similar_terms = self._find_similar_terms(term, query.fuzzy_threshold)
+                    if similar_terms:
+                        condition |= (
+                            (AudioFile.title.in_(similar_terms)) |
+                            (AudioFile.performer.in_(similar_terms))
+                        )
+                    text_conditions.append(condition)
+                else:
+                    # Exakte Textsuche
+                    if query.case_sensitive:
                         text_conditions.append(
                             (AudioFile.title.contains(term)) |
                             (AudioFile.performer.contains(term)) |
                             (AudioFile.file_name.contains(term))
                         )
                     else:
-                        # Exakte Textsuche
-                        if query.case_sensitive:
-                            text_conditions.append(
-                                (AudioFile.title.contains(term)) |
-                                (AudioFile.performer.contains(term)) |
-                                (AudioFile.file_name.contains(term))
-                            )
-                        else:
-                            text_conditions.append(
-                                (AudioFile.title.contains(term)) |
-                                (AudioFile.performer.contains(term)) |
-                                (AudioFile.file_name.contains(term))
-                            )
-                
-                # Kombiniere die Textbedingungen
-                if text_conditions:
-                    combined_condition = text_conditions[0]
-                    for condition in text_conditions[1:]:
-                        if query.filters and any(f.operator == "or" for f in query.filters):
-                            combined_condition |= condition
-                        else:
-                            combined_condition &= condition
-                    base_query = base_query.where(combined_condition)
+                        text_conditions.append(
+                            (AudioFile.title.contains(term)) |
+                            (AudioFile.performer.contains(term)) |
+                            (AudioFile.file_name.contains(term))
+                        )
             
-            # Wende Filter an
-            for filter_obj in query.filters:
-                if filter_obj.search_type == SearchOperator.AND:
-                    base_query = self._apply_filter(base_query, filter_obj, AudioFile)
-                # OR-Filter würden separat behandelt werden
+            # Kombiniere die Textbedingungen
+            if text_conditions:
+                combined_condition = text_conditions[0]
+                for condition in text_conditions[1:]:
+                    if query.filters and any(f.operator == "or" for f in query.filters):
+                        combined_condition |= condition
+                    else:
+                        combined_condition &= condition
+                base_query = base_query.where(combined_condition)
+        
+        # Wende Filter an
+        for filter_obj in query.filters:
+            if filter_obj.search_type == SearchOperator.AND:
+                base_query = self._apply_filter(base_query, filter_obj, AudioFile)
+            # OR-Filter würden separat behandelt werden
+        
+        return base_query
+    
+    def _query_downloaded_files(self, query: SearchQuery) -> List[AudioFile]:
+        """
+        Führt die Abfrage für heruntergeladene Dateien aus.
+        
+        Die Zeilen werden unter dem erzeugten SQL (der normalisierten Abfrage)
+        bis zum nächsten Schreibzugriff auf ``audio_files`` zwischengespeichert.
+        Jeder Aufruf erhält daraus neue AudioFile-Objekte, sodass Änderungen
+        eines Aufrufers den Cache nicht verfälschen. Bei aktivem Sharding
+        werden zusätzlich alle Shards abgefragt.
+        
+        Args:
+            query: SearchQuery-Objekt
             
-            # Führe die Abfrage aus
-            results = list(base_query)
+        Returns:
+            Liste von AudioFile-Objekten
+        """
+        search_query = self._apply_search_predicate(AudioFile.select(), query)
+        cache_key = hashlib.sha256(repr(search_query.sql()).encode("utf-8")).hexdigest()
+        generation = self._get_generation_token()
+        
+        cached = self._result_cache.get(cache_key)
+        if cached is not None and cached[0] == generation:
+            rows = cached[1]
+        else:
+            # bind() verändert die Abfrage selbst: nur eine Kopie an die Replika binden,
+            # damit der Fallback auf den Master nicht an der Replika hängen bleibt
+            rows = tuple(read_from_replica(
+                lambda database: list(
+                    (search_query if database is db else search_query.clone().bind(database)).dicts()
+                )
+            ))
+            for shard_database in get_shard_databases():
+                rows += tuple(search_query.clone().bind(shard_database).dicts())
+            self._result_cache.put(cache_key, (generation, rows))
+        return [AudioFile(**row) for row in rows]
+    
+    def _search_downloaded_files(self, query: SearchQuery) -> List[AudioFile]:
+        """
+        Sucht in heruntergeladenen Dateien.
+        
+        Args:
+            query: SearchQuery-Objekt
+            
+        Returns:
+            Liste von AudioFile-Objekten
+        """
+        try:
+            results = self._query_downloaded_files(query)
             
             self.logger.debug(f"Suche in heruntergeladenen Dateien: {len(results)} Ergebnisse")
             return results
@@ -359,6 +467,148 @@ class AdvancedSearchEngine:
         
         return highlighted
     
+    def _build_suggestion_index(self) -> TrigramIndex:
+        """
+        Baut den Trigramm-Index aus der Datenbank auf.
+        
+        Returns:
+            Neu aufgebauter TrigramIndex
+        """
+        index = TrigramIndex()
+        for field_name in ("title", "performer", "file_name"):
+            field = getattr(AudioFile, field_name)
+            index.add_many(
+                getattr(af, field_name) for af in AudioFile.select(field).distinct()
+                if getattr(af, field_name)
+            )
+        self.logger.debug(f"Trigramm-Index aufgebaut: {len(index)} Begriffe")
+        return index
+    
+    def _rebuild_suggestion_index(self) -> TrigramIndex:
+        """
+        Baut den Trigramm-Index neu auf, persistiert ihn und übernimmt ihn.
+        
+        Returns:
+            Neu aufgebauter TrigramIndex
+        """
+        with self._suggestion_lock:
+            generation = self._suggestion_generation
+            self._pending_suggestion_terms = []
+        try:
+            index = self._build_suggestion_index()
+            if self.suggestion_index_path:
+                try:
+                    index.save(self.suggestion_index_path)
+                except OSError as e:
+                    self.logger.warning(f"Trigramm-Index konnte nicht gespeichert werden: {e}")
+        finally:
+            with self._suggestion_lock:
+                pending, self._pending_suggestion_terms = self._pending_suggestion_terms, None
+        
+        with self._suggestion_lock:
+            index.add_many(pending or ())
+            if generation == self._suggestion_generation:
+                self._suggestion_index = index
+        return index
+    
+    def _start_suggestion_rebuild(self) -> None:
+        """Startet den Neuaufbau in einem Hintergrund-Thread, falls keiner läuft."""
+        with self._suggestion_lock:
+            if self._suggestion_thread is not None and self._suggestion_thread.is_alive():
+                return
+            
+            def _worker() -> None:
+                try:
+                    self._rebuild_suggestion_index()
+                except Exception as e:
+                    self.logger.error(f"Fehler beim Neuaufbau des Trigramm-Index: {e}")
+                finally:
+                    # Verbindungen sind pro Thread; die des Hintergrund-Threads schließen
+                    if not db.is_closed():
+                        db.close()
+            
+            self._suggestion_thread = threading.Thread(
+                target=_worker, name="suggestion-index-rebuild", daemon=True
+            )
+            self._suggestion_thread.start()
+    
+    def wait_for_suggestion_rebuild(self, timeout: Optional[float] = None) -> None:
+        """
+        Wartet auf einen laufenden Neuaufbau des Trigramm-Index.
+        
+        Args:
+            timeout: Maximale Wartezeit in Sekunden
+        """
+        thread = self._suggestion_thread
+        if thread is not None:
+            thread.join(timeout)
+    
+    def _get_suggestion_index(self) -> TrigramIndex:
+        """
+        Gibt den Trigramm-Index zurück und baut ihn bei Bedarf (neu) auf.
+        
+        Nur der erste Aufbau läuft synchron. Ist der Index älter als die TTL,
+        wird er im Hintergrund neu aufgebaut und bis dahin weiter verwendet.
+        
+        Returns:
+            Aktueller TrigramIndex
+        """
+        index = self._suggestion_index
+        if index is None and self.suggestion_index_path:
+            index = TrigramIndex.load(self.suggestion_index_path)
+            if index is not None:
+                with self._suggestion_lock:
+                    self._suggestion_index = index
+        
+        if index is None:
+            return self._rebuild_suggestion_index()
+        
+        if time.time() - index.built_at > self.suggestion_index_ttl:
+            self._start_suggestion_rebuild()
+        return index
+    
+    def invalidate_suggestion_index(self) -> None:
+        """Verwirft den Trigramm-Index, damit er beim nächsten Zugriff neu aufgebaut wird."""
+        with self._suggestion_lock:
+            self._suggestion_generation += 1
+            self._suggestion_index = None
+        if self.suggestion_index_path and self.suggestion_index_path.exists():
+            self.suggestion_index_path.unlink()
+    
+    def add_suggestion_terms(self, *terms: Optional[str]) -> None:
+        """
+        Ergänzt einen bereits aufgebauten Trigramm-Index um neue Begriffe.
+        
+        Läuft gerade ein Neuaufbau, werden die Begriffe auch in den neuen Index übernommen.
+        
+        Args:
+            *terms: Neue Begriffe (z. B. Titel und Interpret einer Datei)
+        """
+        new_terms = [term for term in terms if term]
+        with self._suggestion_lock:
+            if self._suggestion_index is not None:
+                self._suggestion_index.add_many(new_terms)
+            if self._pending_suggestion_terms is not None:
+                self._pending_suggestion_terms.extend(new_terms)
+    
+    def _find_similar_terms(self, term: str, threshold: int, limit: int = 50) -> List[str]:
+        """
+        Sucht ähnliche Begriffe für die Fuzzy-Suche.
+        
+        Args:
+            term: Suchbegriff
+            threshold: Mindestpunktzahl (0-100)
+            limit: Maximale Anzahl ähnlicher Begriffe
+            
+        Returns:
+            Liste ähnlicher Begriffe
+        """
+        try:
+            return [match for match, _ in self._get_suggestion_index().search(term, limit, threshold)]
+        except Exception as e:
+            self.logger.warning(f"Fehler bei der Suche nach ähnlichen Begriffen: {e}")
+            return []
+    
     def get_search_suggestions(self, partial_query: str, max_suggestions: int = 10) -> List[str]:
         """
         Gibt Suchvorschläge basierend auf einer partiellen Anfrage zurück.
@@ -371,23 +621,15 @@ class AdvancedSearchEngine:
             Liste von Suchvorschlägen
         """
         try:
-            suggestions = []
-            
-            # Hole Titel und Künstler aus der Datenbank für Vorschläge
-            titles = [af.title for af in AudioFile.select(AudioFile.title).distinct() if af.title]
-            performers = [af.performer for af in AudioFile.select(AudioFile.performer).distinct() if af.performer]
-            filenames = [af.file_name for af in AudioFile.select(AudioFile.file_name).distinct() if af.file_name]
-            
-            # Kombiniere alle Begriffe
-            all_terms = titles + performers + filenames
+            index = self._get_suggestion_index()
             
             if partial_query:
-                # Verwende fuzzy matching für Vorschläge
-                matches = process.extract(partial_query, all_terms, limit=max_suggestions)
-                suggestions = [match[0] for match in matches if match[1] >= 60]  # Mindestübereinstimmung 60%
+                # Trigramm-Vorauswahl, danach fuzzy matching nur für die Kandidaten
+                matches = index.search(partial_query, limit=max_suggestions, min_score=60)  # Mindestübereinstimmung 60%
+                suggestions = [match[0] for match in matches]
             else:
-                # Gib die häufigsten Begriffe zurück
-                suggestions = list(set(all_terms))[:max_suggestions]
+                # Gib die ersten bekannten Begriffe zurück
+                suggestions = index.terms[:max_suggestions]
             
             self.logger.debug(f"Suchvorschläge generiert: {len(suggestions)} Vorschläge")
             return suggestions
@@ -416,10 +658,59 @@ class AdvancedSearchEngine:
         self.search_history.clear()
         self.logger.debug("Suchhistorie gelöscht")
     
+    def _count_facet(self, query: SearchQuery, bucket, database=None) -> Dict[Any, int]:
+        """
+        Zählt die Treffer einer Suchanfrage pro Bucket mit einer GROUP-BY-Abfrage.
+        
+        Args:
+            query: SearchQuery-Objekt
+            bucket: SQL-Ausdruck, nach dem gruppiert wird
+            database: Optionale Datenbank (z.B. eine Lese-Replika)
+            
+        Returns:
+            Dictionary mit Bucket und Anzahl
+        """
+        facet_query = self._apply_search_predicate(
+            AudioFile.select(bucket.alias("bucket"), fn.COUNT(AudioFile.id).alias("count")),
+            query
+        ).group_by(bucket).tuples()
+        if database is not None:
+            facet_query = facet_query.bind(database)
+        return {key: count for key, count in facet_query}
+    
+    def _count_group_facet(self, query: SearchQuery, database=None) -> Dict[str, int]:
+        """
+        Zählt die Treffer einer Suchanfrage pro Telegram-Gruppe.
+        
+        Args:
+            query: SearchQuery-Objekt
+            database: Optionale Datenbank (z.B. eine Lese-Replika)
+            
+        Returns:
+            Dictionary mit Gruppentitel und Anzahl
+        """
+        group_label = fn.COALESCE(TelegramGroup.title, AudioFile.group.cast("TEXT"), "Ohne Gruppe")
+        facet_query = self._apply_search_predicate(
+            AudioFile.select(group_label.alias("bucket"), fn.COUNT(AudioFile.id).alias("count"))
+            .join(TelegramGroup, JOIN.LEFT_OUTER, on=(AudioFile.group == TelegramGroup.id)),
+            query
+        ).group_by(AudioFile.group).tuples()
+        if database is not None:
+            facet_query = facet_query.bind(database)
+        
+        groups: Dict[str, int] = {}
+        for title, count in facet_query:
+            groups[title] = groups.get(title, 0) + count
+        return groups
+    
     def get_faceted_search_results(self, query: SearchQuery) -> Dict[str, Any]:
         """
         Gibt facettierte Suchergebnisse zurück.
         
+        Die Facetten werden per GROUP BY mit demselben Suchprädikat wie die Suche
+        berechnet, ohne AudioFile-Objekte zu laden. Ergebnisse werden pro Anfrage
+        zwischengespeichert und bei jedem Schreibzugriff auf die Datenbank verworfen.
+        
         Args:
             query: SearchQuery-Objekt
             
@@ -431,36 +722,72 @@ class AdvancedSearchEngine:
                 "categories": {},
                 "file_types": {},
                 "date_ranges": {},
-                "size_ranges": {}
+                "size_ranges": {},
+                "duration_ranges": {},
+                "status": {},
+                "groups": {}
             }
             
-            # Hole alle Ergebnisse für die Facettierung
-            all_results = self.search(SearchQuery(
-                terms=query.terms,
-                search_type=query.search_type,
-                fuzzy_search=query.fuzzy_search
-            ))
-            
-            # Erstelle Facetten
-            for item in all_results.items:
-                if isinstance(item, AudioFile):
-                    # Kategorien
-                    category = getattr(item, 'category', 'unclassified')
-                    facets["categories"][category] = facets["categories"].get(category, 0) + 1
-                    
-                    # Dateitypen
-                    file_type = getattr(item, 'mime_type', 'unknown')
-                    facets["file_types"][file_type] = facets["file_types"].get(file_type, 0) + 1
-                    
-                    # Größenbereiche (vereinfacht)
-                    size = getattr(item, 'file_size', 0)
-                    if size < 1024 * 1024:  # < 1MB
-                        size_range = "< 1MB"
-                    elif size < 10 * 1024 * 1024:  # < 10MB
-                        size_range = "1-10MB"
-                    else:
-                        size_range = "> 10MB"
-                    facets["size_ranges"][size_range] = facets["size_ranges"].get(size_range, 0) + 1
+            if query.search_type not in [SearchType.DOWNLOADED_FILES, SearchType.ALL]:
+                return facets
+            
+            # Zeitbezogene Buckets werden stundengenau berechnet und gehen in den Cache-Schlüssel ein;
+            # die Gruppen-Facette liest telegram_groups mit
+            now = datetime.now().replace(minute=0, second=0, microsecond=0)
+            sql, params = self._apply_search_predicate(AudioFile.select(AudioFile.id), query).sql()
+            generation = get_generation_token(("audio_files", "telegram_groups"))
+            cache_key = hashlib.sha256(
+                repr((sql, params, now.isoformat(), generation)).encode("utf-8")
+            ).hexdigest()
+            
+            cached = self._facet_cache.get(cache_key)
+            if cached is not None:
+                self.logger.debug("Facetten aus dem Cache geladen")
+                return copy.deepcopy(cached)
+            
+            def count_facets(database) -> Dict[str, Dict[Any, int]]:
+                counts = {}
+                # Kategorien (Genre) und Dateitypen
+                counts["categories"] = self._count_facet(
+                    query, fn.COALESCE(AudioFile.genre, "unclassified"), database
+                )
+                counts["file_types"] = self._count_facet(
+                    query, fn.COALESCE(AudioFile.mime_type, "unknown"), database
+                )
+                counts["status"] = self._count_facet(query, AudioFile.status, database)
+                counts["groups"] = self._count_group_facet(query, database)
+                
+                # Größenbereiche (vereinfacht)
+                counts["size_ranges"] = self._count_facet(query, Case(None, [
+                    (AudioFile.file_size < 1024 * 1024, "< 1MB"),
+                    (AudioFile.file_size < 10 * 1024 * 1024, "1-10MB"),
+                ], "> 10MB"), database)
+                
+                # Dauerbereiche
+                counts["duration_ranges"] = self._count_facet(query, Case(None, [
+                    (AudioFile.duration.is_null(), "unknown"),
+                    (AudioFile.duration < 3 * 60, "< 3min"),
+                    (AudioFile.duration < 10 * 60, "3-10min"),
+                ], "> 10min"), database)
+                
+                # Download-Zeiträume
+                counts["date_ranges"] = self._count_facet(query, Case(None, [
+                    (AudioFile.downloaded_at.is_null(), "never"),
+                    (AudioFile.downloaded_at >= now - timedelta(days=1), "last_24h"),
+                    (AudioFile.downloaded_at >= now - timedelta(days=7), "last_7d"),
+                    (AudioFile.downloaded_at >= now - timedelta(days=30), "last_30d"),
+                ], "older"), database)
+                return counts
+            
+            # Alle Facetten werden auf derselben (Replika-)Datenbank gezählt,
+            # bei aktivem Sharding kommen die Zählungen der Shards hinzu
+            facets.update(read_from_replica(count_facets))
+            for shard_database in get_shard_databases():
+                for name, counts in count_facets(shard_database).items():
+                    for bucket, count in counts.items():
+                        facets[name][bucket] = facets[name].get(bucket, 0) + count
+            
+            self._facet_cache.put(cache_key, copy.deepcopy(facets))
             
             self.logger.debug(f"Facettierte Suche abgeschlossen: {len(facets)} Facetten")
             return facets
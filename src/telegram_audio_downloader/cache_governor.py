@@ -0,0 +1,580 @@
+"""
+Prozessweiter Cache-Governor für den Telegram Audio Downloader.
+
+Features:
+- Ein gemeinsames Byte-Budget für alle registrierten In-Memory-Caches
+- Verteilung nach dem Grenznutzen (Treffer pro Byte) jedes Caches
+- Verkleinerung aller Caches bei Speicherdruck (AdvancedMemoryManager)
+
+Die Caches selbst bleiben unverändert nutzbar; Adapter übersetzen zwischen
+ihren Einträgen bzw. geladenen Objekten und Bytes. Registrierte Caches werden
+nur schwach referenziert und fallen beim Aufräumen automatisch heraus.
+"""
+
+import heapq
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from .logging_config import get_logger
+from .utils.tinylfu_cache import estimate_size
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_BUDGET_BYTES = 256 * 1024 * 1024
+DEFAULT_MIN_CACHE_BYTES = 64 * 1024
+DEFAULT_REBALANCE_INTERVAL = 30.0
+# Schätzung pro Eintrag, solange ein Cache leer ist
+DEFAULT_ENTRY_BYTES = 256
+# Verwaltungsaufwand eines Dictionary-/Set-Eintrags
+ENTRY_OVERHEAD_BYTES = 100
+ENTRY_SAMPLE_SIZE = 32
+
+# Anteil des Budgets, der bei einem Drucklevel zur Verfügung steht
+PRESSURE_FACTORS = {"normal": 1.0, "warning": 0.75, "critical": 0.5}
+
+
+@dataclass
+class CacheShare:
+    """Zuteilung und Nutzung eines registrierten Caches."""
+    name: str
+    used_bytes: int = 0
+    allocated_bytes: int = 0
+    ceiling_bytes: Optional[int] = None
+    hits_per_interval: float = 0.0
+    resizes: int = 0
+
+    @property
+    def hits_per_mb(self) -> float:
+        """Treffer pro Intervall und MB belegtem Speicher."""
+        return self.hits_per_interval / max(self.used_bytes / (1024 * 1024), 1e-6)
+
+
+class CacheAdapter(ABC):
+    """Anbindung eines einzelnen Caches an den Governor."""
+
+    def __init__(self, cache: Any, min_bytes: int = DEFAULT_MIN_CACHE_BYTES):
+        """
+        Initialisiert den Adapter.
+
+        Args:
+            cache: Angebundener Cache (wird schwach referenziert)
+            min_bytes: Mindestzuteilung, die auch unter Druck erhalten bleibt
+        """
+        self._cache_ref = weakref.ref(cache)
+        self.min_bytes = min_bytes
+
+    @property
+    def cache(self) -> Optional[Any]:
+        """Gibt den Cache zurück oder None, wenn er nicht mehr existiert."""
+        return self._cache_ref()
+
+    @abstractmethod
+    def used_bytes(self, cache: Any) -> int:
+        """Geschätzter belegter Speicher in Bytes."""
+
+    @abstractmethod
+    def ceiling_bytes(self, cache: Any, max_growth: float) -> Optional[int]:
+        """Obergrenze der Zuteilung in Bytes (None = unbegrenzt)."""
+
+    @abstractmethod
+    def hit_count(self, cache: Any) -> int:
+        """Bisherige Treffer insgesamt."""
+
+    @abstractmethod
+    def resize(self, cache: Any, max_bytes: int) -> None:
+        """Setzt die Kapazität des Caches auf max_bytes."""
+
+
+class EntryCacheAdapter(CacheAdapter):
+    """
+    Adapter für Caches, deren Kapazität in Einträgen angegeben ist.
+
+    Die Bytes pro Eintrag werden an einer Stichprobe der jüngsten Einträge
+    geschätzt; die beim Registrieren konfigurierte Größe gilt (mal max_growth)
+    als Obergrenze.
+    """
+
+    def __init__(self, cache: Any, min_bytes: int = DEFAULT_MIN_CACHE_BYTES):
+        super().__init__(cache, min_bytes)
+        self.configured_entries = self.max_entries(cache)
+        self.entry_bytes = DEFAULT_ENTRY_BYTES
+
+    @abstractmethod
+    def entry_count(self, cache: Any) -> int:
+        """Aktuelle Anzahl der Einträge."""
+
+    @abstractmethod
+    def max_entries(self, cache: Any) -> int:
+        """Aktuelle Kapazität in Einträgen."""
+
+    @abstractmethod
+    def set_max_entries(self, cache: Any, max_entries: int) -> None:
+        """Setzt die Kapazität in Einträgen und verdrängt bei Bedarf."""
+
+    @abstractmethod
+    def sample(self, cache: Any, count: int) -> Iterable[Tuple[Hashable, Any]]:
+        """Liefert bis zu count Schlüssel-Wert-Paare für die Größenschätzung."""
+
+    def _measure_entry_bytes(self, cache: Any) -> int:
+        """
+        Schätzt die durchschnittliche Größe eines Eintrags.
+
+        Returns:
+            Bytes pro Eintrag
+        """
+        samples = list(self.sample(cache, ENTRY_SAMPLE_SIZE))
+        if samples:
+            total = sum(estimate_size(key) + estimate_size(value) for key, value in samples)
+            self.entry_bytes = ENTRY_OVERHEAD_BYTES + total // len(samples)
+        return self.entry_bytes
+
+    def used_bytes(self, cache: Any) -> int:
+        return self.entry_count(cache) * self._measure_entry_bytes(cache)
+
+    def ceiling_bytes(self, cache: Any, max_growth: float) -> Optional[int]:
+        return int(self.configured_entries * max_growth) * self.entry_bytes
+
+    def resize(self, cache: Any, max_bytes: int) -> None:
+        self.set_max_entries(cache, max(1, max_bytes // self.entry_bytes))
+
+
+class OrderedCacheAdapter(EntryCacheAdapter):
+    """
+    Adapter für MemoryCache, InMemoryCache und den Datei-Cache des Downloaders.
+
+    Alle drei halten ihre Einträge in einem OrderedDict `cache` und bieten
+    `resize(max_size)`. Mit einem byte-gewichteten W-TinyLFU-Kern (`core`)
+    wird direkt dessen Byte-Budget gesetzt.
+    """
+
+    def __init__(self, cache: Any, min_bytes: int = DEFAULT_MIN_CACHE_BYTES):
+        super().__init__(cache, min_bytes)
+        core = self._byte_core(cache)
+        self.configured_bytes = core.maximum_weight if core is not None else None
+
+    def _core(self, cache: Any) -> Optional[Any]:
+        return getattr(cache, "core", None)
+
+    def _byte_core(self, cache: Any) -> Optional[Any]:
+        core = self._core(cache)
+        return core if core is not None and core.weigher is not None else None
+
+    def entry_count(self, cache: Any) -> int:
+        core = self._core(cache)
+        return len(core) if core is not None else len(cache.cache)
+
+    def max_entries(self, cache: Any) -> int:
+        return cache.max_size
+
+    def set_max_entries(self, cache: Any, max_entries: int) -> None:
+        cache.resize(max_entries)
+
+    def sample(self, cache: Any, count: int) -> Iterable[Tuple[Hashable, Any]]:
+        core = self._core(cache)
+        if core is not None:
+            return core.items()[-count:]
+        return list(islice(reversed(cache.cache.items()), count))
+
+    def hit_count(self, cache: Any) -> int:
+        stats = getattr(cache, "stats", None)
+        if isinstance(stats, dict):
+            return stats.get("hits", 0)
+        core = self._core(cache)
+        if core is not None:
+            return core.get_stats()["hits"]
+        return cache.hits
+
+    def used_bytes(self, cache: Any) -> int:
+        core = self._byte_core(cache)
+        if core is not None:
+            return core.weighted_size
+        return super().used_bytes(cache)
+
+    def ceiling_bytes(self, cache: Any, max_growth: float) -> Optional[int]:
+        core = self._byte_core(cache)
+        if core is not None:
+            return int(self.configured_bytes * max_growth)
+        return super().ceiling_bytes(cache, max_growth)
+
+    def resize(self, cache: Any, max_bytes: int) -> None:
+        core = self._byte_core(cache)
+        if core is not None:
+            core.resize(max_bytes)
+            return
+        super().resize(cache, max_bytes)
+
+
+class MemoryEfficientSetAdapter(EntryCacheAdapter):
+    """Adapter für MemoryEfficientSet (nur Schlüssel, keine Werte)."""
+
+    def entry_count(self, cache: Any) -> int:
+        return len(cache._primary_set)
+
+    def max_entries(self, cache: Any) -> int:
+        return cache.max_size
+
+    def set_max_entries(self, cache: Any, max_entries: int) -> None:
+        cache.resize(max_entries)
+
+    def sample(self, cache: Any, count: int) -> Iterable[Tuple[Hashable, Any]]:
+        return [(item, None) for item in islice(cache._primary_set, count)]
+
+    def hit_count(self, cache: Any) -> int:
+        return cache.hits
+
+
+class LazyLoaderAdapter(CacheAdapter):
+    """
+    Adapter für den LazyLoader.
+
+    Geladene Objekte werden einzeln geschätzt (einmal pro Objekt); über dem
+    Budget werden die am seltensten genutzten Objekte entladen. Ein LazyLoader
+    hat keine eigene Obergrenze.
+    """
+
+    def __init__(self, cache: Any, min_bytes: int = 0):
+        super().__init__(cache, min_bytes)
+        self._sizes: Dict[str, Tuple[int, int]] = {}
+
+    def _object_bytes(self, key: str, obj: Any) -> int:
+        cached = self._sizes.get(key)
+        if cached is None or cached[0] != id(obj):
+            cached = (id(obj), estimate_size(obj))
+            self._sizes[key] = cached
+        return cached[1]
+
+    def used_bytes(self, cache: Any) -> int:
+        loaded = cache._loaded_objects
+        for key in list(self._sizes):
+            if key not in loaded:
+                del self._sizes[key]
+        return sum(self._object_bytes(key, obj) for key, obj in list(loaded.items()))
+
+    def ceiling_bytes(self, cache: Any, max_growth: float) -> Optional[int]:
+        return None
+
+    def hit_count(self, cache: Any) -> int:
+        return cache.hits
+
+    def resize(self, cache: Any, max_bytes: int) -> None:
+        used = self.used_bytes(cache)
+        while used > max_bytes and cache._loaded_objects:
+            key = min(cache._loaded_objects, key=lambda k: cache._access_count.get(k, 0))
+            used -= self._object_bytes(key, cache._loaded_objects[key])
+            cache.unload(key)
+            self._sizes.pop(key, None)
+
+
+class CacheGovernor:
+    """
+    Verteilt ein prozessweites Byte-Budget auf alle registrierten Caches.
+
+    Jeder Cache erhält zunächst seine Mindestzuteilung. Der Rest wird in
+    kleinen Stücken jeweils an den Cache mit dem höchsten Grenznutzen
+    vergeben. Der Grenznutzen ist die geglättete Trefferzahl pro Intervall
+    geteilt durch die Zuteilung nach dem nächsten Stück, also die
+    Trefferquote pro Byte unter der Annahme abnehmender Erträge. Unter
+    Speicherdruck schrumpft das verteilte Budget gemäß PRESSURE_FACTORS.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BUDGET_BYTES,
+                 rebalance_interval: float = DEFAULT_REBALANCE_INTERVAL,
+                 max_growth: float = 4.0, smoothing: float = 0.5, chunks: int = 256):
+        """
+        Initialisiert den Governor.
+
+        Args:
+            max_bytes: Gemeinsames Budget aller Caches in Bytes
+            rebalance_interval: Mindestabstand zwischen automatischen Neuverteilungen in Sekunden
+            max_growth: Faktor, um den ein Cache über seine konfigurierte Größe wachsen darf
+            smoothing: Gewicht des letzten Intervalls bei der Glättung der Treffer
+            chunks: Anzahl der Stücke, in die das freie Budget aufgeteilt wird
+        """
+        self.max_bytes = max_bytes
+        self.rebalance_interval = rebalance_interval
+        self.max_growth = max_growth
+        self.smoothing = smoothing
+        self.chunks = chunks
+        self.pressure_level = "normal"
+        self.rebalance_count = 0
+        self._adapters: Dict[str, CacheAdapter] = {}
+        self._shares: Dict[str, CacheShare] = {}
+        self._last_hits: Dict[str, int] = {}
+        self._pressure_source: Optional[Callable[[], str]] = None
+        self._last_rebalance = 0.0
+        self._lock = threading.RLock()
+
+        logger.info(f"CacheGovernor initialisiert mit Budget {max_bytes / (1024 * 1024):.0f}MB")
+
+    def register(self, name: str, adapter: CacheAdapter) -> str:
+        """
+        Registriert einen Cache.
+
+        Args:
+            name: Gewünschter Name (bei Konflikt mit laufender Nummer ergänzt)
+            adapter: Adapter des Caches
+
+        Returns:
+            Tatsächlich vergebener Name
+        """
+        with self._lock:
+            self._prune()
+            unique_name = name
+            suffix = 2
+            while unique_name in self._adapters:
+                unique_name = f"{name}#{suffix}"
+                suffix += 1
+            self._adapters[unique_name] = adapter
+            self._shares[unique_name] = CacheShare(name=unique_name)
+            self._last_hits[unique_name] = adapter.hit_count(adapter.cache)
+            logger.debug(f"Cache '{unique_name}' beim Governor registriert")
+            return unique_name
+
+    def unregister(self, name: str) -> None:
+        """
+        Entfernt einen Cache aus der Verwaltung.
+
+        Args:
+            name: Name des Caches
+        """
+        with self._lock:
+            self._adapters.pop(name, None)
+            self._shares.pop(name, None)
+            self._last_hits.pop(name, None)
+
+    def attach_memory_manager(self, memory_manager: Any) -> None:
+        """
+        Verwendet check_memory_pressure() eines AdvancedMemoryManager als Drucksignal.
+
+        Args:
+            memory_manager: Objekt mit check_memory_pressure() -> 'normal' | 'warning' | 'critical'
+        """
+        manager_ref = weakref.ref(memory_manager)
+
+        def pressure() -> str:
+            manager = manager_ref()
+            return manager.check_memory_pressure() if manager is not None else "normal"
+
+        self._pressure_source = pressure
+
+    def _prune(self) -> None:
+        """Entfernt Caches, die nicht mehr existieren."""
+        for name in [name for name, adapter in self._adapters.items() if adapter.cache is None]:
+            self.unregister(name)
+
+    @property
+    def effective_budget(self) -> int:
+        """Unter dem aktuellen Drucklevel verfügbares Budget in Bytes."""
+        return int(self.max_bytes * PRESSURE_FACTORS.get(self.pressure_level, 1.0))
+
+    def on_memory_pressure(self, level: str) -> Dict[str, CacheShare]:
+        """
+        Reagiert auf ein Drucksignal und verteilt das Budget sofort neu.
+
+        Args:
+            level: 'normal', 'warning' oder 'critical'
+
+        Returns:
+            Neue Zuteilungen
+        """
+        if level != self.pressure_level:
+            logger.info(f"Cache-Governor: Speicherdruck {self.pressure_level} -> {level}")
+        self.pressure_level = level
+        return self.rebalance(poll_pressure=False)
+
+    def maybe_rebalance(self) -> bool:
+        """
+        Verteilt neu, wenn das Intervall seit der letzten Verteilung abgelaufen ist.
+
+        Returns:
+            True, wenn neu verteilt wurde
+        """
+        if time.monotonic() - self._last_rebalance < self.rebalance_interval:
+            return False
+        self.rebalance()
+        return True
+
+    def _allocate(self, demands: Dict[str, Tuple[float, int, Optional[int]]], budget: int) -> Dict[str, int]:
+        """
+        Verteilt das Budget nach Grenznutzen.
+
+        Args:
+            demands: Name -> (geglättete Treffer, Mindestzuteilung, Obergrenze)
+            budget: Zu verteilendes Budget
+
+        Returns:
+            Name -> Zuteilung in Bytes
+        """
+        allocation = {}
+        for name, (_, floor, ceiling) in demands.items():
+            allocation[name] = floor if ceiling is None else min(floor, ceiling)
+        reserved = sum(allocation.values())
+        if reserved >= budget:
+            # Nicht einmal die Mindestzuteilungen passen: anteilig kürzen
+            scale = budget / reserved if reserved else 0.0
+            return {name: int(value * scale) for name, value in allocation.items()}
+
+        remaining = budget - reserved
+        chunk = max(1, remaining // self.chunks)
+
+        def marginal(name: str) -> float:
+            # Treffer pro Byte nach dem nächsten Stück (+1, damit neue Caches nicht leer ausgehen)
+            return (demands[name][0] + 1.0) / (allocation[name] + chunk)
+
+        heap = [(-marginal(name), name) for name in demands]
+        heapq.heapify(heap)
+        while remaining > 0 and heap:
+            _, name = heapq.heappop(heap)
+            ceiling = demands[name][2]
+            grant = min(chunk, remaining)
+            if ceiling is not None:
+                grant = min(grant, ceiling - allocation[name])
+            if grant <= 0:
+                continue
+            allocation[name] += grant
+            remaining -= grant
+            heapq.heappush(heap, (-marginal(name), name))
+        return allocation
+
+    def rebalance(self, poll_pressure: bool = True) -> Dict[str, CacheShare]:
+        """
+        Misst alle Caches, verteilt das Budget neu und passt ihre Kapazität an.
+
+        Args:
+            poll_pressure: Drucklevel vorher beim angebundenen Speicher-Manager abfragen
+
+        Returns:
+            Name -> CacheShare
+        """
+        if poll_pressure and self._pressure_source is not None:
+            try:
+                self.pressure_level = self._pressure_source()
+            except Exception as e:
+                logger.error(f"Fehler beim Abfragen des Speicherdrucks: {e}")
+
+        with self._lock:
+            self._prune()
+            demands = {}
+            live = {}
+            for name, adapter in self._adapters.items():
+                cache = adapter.cache
+                if cache is None:
+                    continue
+                live[name] = (adapter, cache)
+                share = self._shares[name]
+                hits = adapter.hit_count(cache)
+                delta = hits - self._last_hits.get(name, 0)
+                if delta < 0:
+                    # Statistiken wurden zurückgesetzt
+                    delta = hits
+                self._last_hits[name] = hits
+                if self.rebalance_count == 0:
+                    share.hits_per_interval = float(delta)
+                else:
+                    share.hits_per_interval = (
+                        self.smoothing * delta + (1 - self.smoothing) * share.hits_per_interval
+                    )
+                share.used_bytes = adapter.used_bytes(cache)
+                share.ceiling_bytes = adapter.ceiling_bytes(cache, self.max_growth)
+                demands[name] = (share.hits_per_interval, adapter.min_bytes, share.ceiling_bytes)
+
+            allocation = self._allocate(demands, self.effective_budget)
+            for name, (adapter, cache) in live.items():
+                share = self._shares[name]
+                target = allocation[name]
+                if target != share.allocated_bytes or share.used_bytes > target:
+                    try:
+                        adapter.resize(cache, target)
+                        share.resizes += 1
+                    except Exception as e:
+                        logger.error(f"Fehler beim Anpassen des Caches '{name}': {e}")
+                share.allocated_bytes = target
+
+            self.rebalance_count += 1
+            self._last_rebalance = time.monotonic()
+            return dict(self._shares)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gibt Budget, Drucklevel und Zuteilungen zurück.
+
+        Returns:
+            Dictionary mit Statistiken
+        """
+        with self._lock:
+            return {
+                "max_bytes": self.max_bytes,
+                "effective_budget": self.effective_budget,
+                "pressure_level": self.pressure_level,
+                "rebalance_count": self.rebalance_count,
+                "allocated_bytes": sum(share.allocated_bytes for share in self._shares.values()),
+                "used_bytes": sum(share.used_bytes for share in self._shares.values()),
+                "caches": {
+                    name: {
+                        "used_bytes": share.used_bytes,
+                        "allocated_bytes": share.allocated_bytes,
+                        "ceiling_bytes": share.ceiling_bytes,
+                        "hits_per_interval": round(share.hits_per_interval, 2),
+                        "hits_per_mb": round(share.hits_per_mb, 2),
+                        "resizes": share.resizes,
+                    }
+                    for name, share in self._shares.items()
+                },
+            }
+
+
+# Globale Instanz des Cache-Governors
+_cache_governor: Optional[CacheGovernor] = None
+
+
+def get_cache_governor(max_bytes: int = DEFAULT_CACHE_BUDGET_BYTES) -> CacheGovernor:
+    """
+    Gibt die globale Instanz des Cache-Governors zurück.
+
+    Args:
+        max_bytes: Budget in Bytes (nur beim ersten Aufruf wirksam)
+
+    Returns:
+        CacheGovernor-Instanz
+    """
+    global _cache_governor
+    if _cache_governor is None:
+        _cache_governor = CacheGovernor(max_bytes)
+    return _cache_governor
+
+
+def register_cache(name: str, adapter: CacheAdapter) -> Optional[str]:
+    """
+    Registriert einen Cache beim globalen Governor.
+
+    Args:
+        name: Gewünschter Name
+        adapter: Adapter des Caches
+
+    Returns:
+        Vergebener Name oder None bei Fehler
+    """
+    try:
+        return get_cache_governor().register(name, adapter)
+    except Exception as e:
+        logger.error(f"Fehler beim Registrieren des Caches '{name}': {e}")
+        return None
+
+
+def get_cache_budget_stats() -> Dict[str, Any]:
+    """
+    Gibt die Statistiken des globalen Governors zurück.
+
+    Returns:
+        Dictionary mit Statistiken
+    """
+    try:
+        return get_cache_governor().get_stats()
+    except Exception as e:
+        logger.error(f"Fehler beim Abrufen der Cache-Budget-Statistiken: {e}")
+        return {}
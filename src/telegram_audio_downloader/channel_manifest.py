@@ -0,0 +1,164 @@
+"""
+Lokales Manifest der Audio-Dokumente einer Telegram-Gruppe.
+
+Statt bei jeder Suche den gesamten Kanal mit `iter_messages` zu durchlaufen,
+werden die Audio-Dokumente einmalig in `ManifestEntry` gespeichert. Weitere
+Synchronisationen holen nur Nachrichten nach der zuletzt gesehenen ID; die
+Suche selbst läuft vollständig gegen die lokale Datenbank.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from peewee import fn
+from telethon import TelegramClient
+
+from .logging_config import get_logger
+from .message_scan import SCAN_MODE_FILTERED, ScanStats, iter_audio_messages
+from .models import ChannelManifest, ManifestEntry, db
+
+logger = get_logger(__name__)
+
+# Anzahl der Audiodateien, nach denen der Synchronisationsstand gespeichert wird
+SYNC_BATCH_SIZE = 500
+
+# Innerhalb dieses Zeitraums (Sekunden) gilt ein Manifest als aktuell
+DEFAULT_MIN_SYNC_INTERVAL = 60.0
+
+_ENTRY_FIELDS = ("file_id", "file_name", "file_size", "mime_type", "duration", "title", "performer")
+
+_tables_ready_for: Optional[str] = None
+
+
+@db.func("casefold", 1, deterministic=True)
+def _casefold(value: Optional[str]) -> Optional[str]:
+    """SQL-Funktion für Vergleiche ohne Groß-/Kleinschreibung; LIKE ignoriert sie nur für ASCII."""
+    return value.casefold() if value is not None else None
+
+
+def _ensure_tables() -> None:
+    """Legt die Manifest-Tabellen einmal pro Datenbankdatei an."""
+    global _tables_ready_for
+    if _tables_ready_for != db.database:
+        db.create_tables([ChannelManifest, ManifestEntry], safe=True)
+        _tables_ready_for = db.database
+
+
+def _store_batch(group_id: int, rows: List[Dict[str, Any]], last_message_id: int, final: bool = False) -> None:
+    """Speichert gesammelte Einträge und den neuen Synchronisationsstand atomar."""
+    with db.atomic():
+        # SQLite erlaubt nur eine begrenzte Anzahl Parameter pro Anweisung
+        for start in range(0, len(rows), 50):
+            ManifestEntry.insert_many(rows[start:start + 50]).on_conflict_ignore().execute()
+        manifest, _ = ChannelManifest.get_or_create(group_id=group_id)
+        manifest.last_message_id = max(manifest.last_message_id, last_message_id)
+        if final:
+            manifest.entry_count = ManifestEntry.select().where(ManifestEntry.group_id == group_id).count()
+            manifest.synced_at = datetime.now()
+        manifest.save()
+
+
+async def sync_channel_manifest(
+    client: TelegramClient,
+    group_entity: Any,
+    group_id: int,
+    min_sync_interval: float = DEFAULT_MIN_SYNC_INTERVAL,
+    scan_mode: str = SCAN_MODE_FILTERED,
+) -> int:
+    """
+    Gleicht das Manifest einer Gruppe mit Telegram ab.
+
+    Es werden nur Nachrichten nach der zuletzt gesehenen ID abgerufen (ältere
+    zuerst), sodass ein abgebrochener Abgleich beim nächsten Mal fortgesetzt wird.
+
+    Args:
+        client: TelegramClient-Instanz
+        group_entity: Entity oder InputPeer der Gruppe
+        group_id: ID der Gruppe
+        min_sync_interval: Abstand in Sekunden, innerhalb dessen kein erneuter Abgleich erfolgt
+        scan_mode: Scan-Modus für Telegram (siehe message_scan)
+
+    Returns:
+        Anzahl der neu aufgenommenen Audio-Dokumente
+    """
+    # Lokaler Import vermeidet einen Zyklus mit search.py
+    from .search import _extract_audio_info, _is_audio_file
+
+    _ensure_tables()
+    manifest = ChannelManifest.get_or_none(ChannelManifest.group_id == group_id)
+    last_message_id = manifest.last_message_id if manifest else 0
+    if manifest and manifest.synced_at and min_sync_interval > 0:
+        if (datetime.now() - manifest.synced_at).total_seconds() < min_sync_interval:
+            return 0
+
+    added = 0
+    stats = ScanStats()
+    rows: List[Dict[str, Any]] = []
+    newest_id = last_message_id
+    async for message, document in iter_audio_messages(
+        client, group_entity, _is_audio_file, mode=scan_mode, stats=stats,
+        min_id=last_message_id, reverse=True
+    ):
+        newest_id = max(newest_id, message.id)
+        info = _extract_audio_info(document, message)
+        row = {field: info[field] for field in _ENTRY_FIELDS}
+        row.update(group_id=group_id, message_id=message.id, date=info["date"])
+        rows.append(row)
+        if len(rows) >= SYNC_BATCH_SIZE:
+            _store_batch(group_id, rows, newest_id)
+            added += len(rows)
+            rows = []
+
+    _store_batch(group_id, rows, newest_id, final=True)
+    added += len(rows)
+    logger.info(
+        f"Manifest für Gruppe {group_id} abgeglichen: {stats.messages_fetched} Nachrichten abgerufen, "
+        f"{added} neue Audiodateien"
+    )
+    return added
+
+
+def search_channel_manifest(group_id: int, query: Optional[str] = None, limit: Optional[int] = None) -> List[dict]:
+    """
+    Durchsucht das lokale Manifest einer Gruppe.
+
+    Args:
+        group_id: ID der Gruppe
+        query: Optionale Suchanfrage (Titel, Künstler oder Dateiname)
+        limit: Maximale Anzahl an Ergebnissen
+
+    Returns:
+        Liste von Audiodatei-Informationen (neueste zuerst), wie von search_audio_files
+    """
+    _ensure_tables()
+    select = ManifestEntry.select().where(ManifestEntry.group_id == group_id)
+    if query:
+        needle = query.casefold()
+        select = select.where(
+            fn.casefold(ManifestEntry.title).contains(needle)
+            | fn.casefold(ManifestEntry.performer).contains(needle)
+            | fn.casefold(ManifestEntry.file_name).contains(needle)
+        )
+    select = select.order_by(ManifestEntry.message_id.desc())
+    if limit:
+        select = select.limit(limit)
+
+    results = []
+    for entry in select.dicts():
+        info = {field: entry[field] for field in _ENTRY_FIELDS}
+        info.update(message_id=entry["message_id"], date=entry["date"])
+        results.append(info)
+    return results
+
+
+def reset_channel_manifest(group_id: int) -> None:
+    """
+    Verwirft das Manifest einer Gruppe; der nächste Abgleich beginnt von vorn.
+
+    Args:
+        group_id: ID der Gruppe
+    """
+    _ensure_tables()
+    with db.atomic():
+        ManifestEntry.delete().where(ManifestEntry.group_id == group_id).execute()
+        ChannelManifest.delete().where(ChannelManifest.group_id == group_id).execute()
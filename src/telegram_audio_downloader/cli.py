@@ -14,6 +14,7 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from .config import Config
 from .database import init_db
+from .database_scaling import enable_configured_sharding
 from .downloader import AudioDownloader
 from .error_handling import handle_error, ConfigurationError
 from .logger import get_logger, log_function_call
@@ -82,6 +83,8 @@ def cli(ctx, debug: bool, config: str, interactive: bool):
 
     # Datenbank initialisieren
     init_db()
+    # Konfigurierte Shards aktivieren, damit Suche und Statistik sie mitlesen
+    enable_configured_sharding(config_obj.shard_count, config_obj.shard_dir)
 
     # Kontext für Unterkommandos vorbereiten
     ctx.ensure_object(dict)
@@ -60,14 +60,21 @@ class Config:
             # Neue Einstellungen für die fortgeschrittene Download-Wiederaufnahme
             'max_retries': '3',
             'retry_delay': '5',
-            'checksum_algorithm': 'sha256'
+            'checksum_algorithm': 'sha256',
+            # filtered (serverseitige Filter), music oder full (alle Nachrichten)
+            'scan_mode': 'filtered'
         }
         
         # Performance-Einstellungen
         self.config['performance'] = {
             'chunk_size': '8192',
             'timeout': '30',
-            'connection_pool_size': '10'
+            'connection_pool_size': '10',
+            # Verbindungen zu den Medien-DCs nach dem Durchsuchen vorab öffnen
+            'prewarm_media_dcs': 'true',
+            # Anzahl der Datenbank-Shards für Audiodateien (0 = kein Sharding)
+            'shard_count': '0',
+            'shard_dir': 'data/shards'
         }
     
     def get_api_id(self) -> str:
@@ -117,6 +124,11 @@ class Config:
         """Algorithmus für die Prüfsummenberechnung."""
         return self.config.get('download', 'checksum_algorithm', fallback='sha256')
     
+    @property
+    def scan_mode(self) -> str:
+        """Modus für das Durchsuchen der Gruppen (filtered, music oder full)."""
+        return self.config.get('download', 'scan_mode', fallback='filtered')
+    
     @property
     def proxy_type(self) -> str:
         """Typ des Proxys (socks5, http, etc.)."""
@@ -157,6 +169,21 @@ class Config:
         """Größe des Verbindungspools."""
         return self.config.getint('performance', 'connection_pool_size', fallback=10)
     
+    @property
+    def prewarm_media_dcs(self) -> bool:
+        """Ob Verbindungen zu den Medien-Rechenzentren vorab geöffnet werden."""
+        return self.config.getboolean('performance', 'prewarm_media_dcs', fallback=True)
+    
+    @property
+    def shard_count(self) -> int:
+        """Anzahl der Datenbank-Shards für Audiodateien (0 = kein Sharding)."""
+        return self.config.getint('performance', 'shard_count', fallback=0)
+    
+    @property
+    def shard_dir(self) -> str:
+        """Verzeichnis für die Shard-Dateien."""
+        return self.config.get('performance', 'shard_dir', fallback='data/shards')
+    
     def validate_required_fields(self) -> None:
         """
         Validiert, dass alle erforderlichen Felder gesetzt sind.
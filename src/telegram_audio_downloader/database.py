@@ -11,10 +11,11 @@ from playhouse.migrate import SqliteMigrator
 
 from .db_error_handler import handle_database_error, with_database_error_handling
 from .error_handling import DatabaseError
-from .models import AudioFile, TelegramGroup, db
+from .models import AudioFile, ChannelManifest, ManifestEntry, TelegramGroup, db
 from .logging_config import get_logger
 from .database_indexing import optimize_database_indexes
 from .database_migrations import run_migrations
+from .database_statistics import ensure_statistics_tables
 from .extended_models import create_extended_tables
 
 logger = get_logger(__name__)
@@ -78,7 +79,7 @@ class Database:
             db.connect()
         
         # Erstelle die Tabellen
-        db.create_tables([TelegramGroup, AudioFile], safe=True)
+        db.create_tables([TelegramGroup, AudioFile, ChannelManifest, ManifestEntry], safe=True)
         
         # Füge die neuen Felder hinzu, falls sie noch nicht existieren
         try:
@@ -118,6 +119,16 @@ class Database:
                 # Füge message_id hinzu, falls nicht vorhanden
                 if 'message_id' not in columns:
                     db.execute_sql("ALTER TABLE audio_files ADD COLUMN message_id INTEGER NULL;")
+
+                # Gespeicherte Auflösung der Gruppen
+                cursor = db.execute_sql("PRAGMA table_info(telegram_groups);")
+                group_columns = {row[1] for row in cursor.fetchall()}
+                if 'access_hash' not in group_columns:
+                    db.execute_sql("ALTER TABLE telegram_groups ADD COLUMN access_hash INTEGER NULL;")
+                if 'entity_type' not in group_columns:
+                    db.execute_sql("ALTER TABLE telegram_groups ADD COLUMN entity_type VARCHAR(16) NULL;")
+                if 'resolved_at' not in group_columns:
+                    db.execute_sql("ALTER TABLE telegram_groups ADD COLUMN resolved_at DATETIME NULL;")
         except Exception as e:
             logger.warning(f"Fehler beim Hinzufügen der Felder: {e}")
         
@@ -135,6 +146,13 @@ class Database:
             logger.warning(f"Fehler bei der Datenbank-Migration: {e}")
             # Nicht kritisch - die Anwendung kann weiterlaufen
         
+        # Richte die materialisierten Statistiktabellen ein
+        try:
+            ensure_statistics_tables()
+        except Exception as e:
+            logger.warning(f"Fehler beim Einrichten der Statistiktabellen: {e}")
+            # Nicht kritisch - die Statistiken werden beim ersten Lesen nachgezogen
+        
         # Erstelle erweiterte Tabellen
         try:
             create_extended_tables()
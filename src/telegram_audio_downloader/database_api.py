@@ -8,25 +8,380 @@ Abstraktionsschicht mit:
 - Zugriffskontrolle
 """
 
+import base64
+import binascii
+import heapq
+import itertools
 import json
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterator, List, Any, Optional, Union
 from datetime import datetime
 from functools import wraps
 import sqlite3
 
-from flask import Flask, request, jsonify, Blueprint
+from flask import Flask, Response, request, jsonify, Blueprint, stream_with_context
 from flask_graphql import GraphQLView
 import graphene
 from graphene import ObjectType, String, Int, Float, DateTime, List as GrapheneList, Field
+from graphql import GraphQLError
+from promise import Promise
+from promise.dataloader import DataLoader
 
 from .models import AudioFile, TelegramGroup, db
+from .database_caching import cache_database_query
+from .database_replication import read_from_replica
+from .config import Config
+from .database_scaling import enable_configured_sharding, find_audio_file, get_shard_databases
+from .database_statistics import get_group_statistics, get_library_statistics
 from .database_validation import get_database_validator
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Standard- und Maximalgröße einer Seite bei der Keyset-Paginierung
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Maximale Anzahl von Schlüsseln pro IN (...)-Abfrage (SQLite-Variablenlimit)
+LOADER_BATCH_SIZE = 500
+
+# Spalten, die von der API für AudioFiles ausgegeben werden
+AUDIO_FILE_API_FIELDS = (
+    AudioFile.id,
+    AudioFile.file_id,
+    AudioFile.file_name,
+    AudioFile.file_size,
+    AudioFile.duration,
+    AudioFile.title,
+    AudioFile.performer,
+    AudioFile.group.alias('group_id'),
+    AudioFile.downloaded_at,
+    AudioFile.status,
+    AudioFile.error_message,
+    AudioFile.download_attempts,
+    AudioFile.updated_at,
+)
+
+
+class InvalidCursorError(ValueError):
+    """Fehler bei einem ungültigen Paginierungs-Cursor."""
+    pass
+
+
+def encode_cursor(row_id: int) -> str:
+    """
+    Kodiert die Position (id der letzten Zeile) als undurchsichtigen Cursor.
+    
+    Args:
+        row_id: ID der letzten Zeile
+        
+    Returns:
+        URL-sicherer Cursor
+    """
+    payload = json.dumps([row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Dekodiert einen Cursor in die Position (id der letzten Zeile).
+    
+    Args:
+        cursor: Cursor aus einer vorherigen Seite
+        
+    Returns:
+        ID der letzten Zeile
+        
+    Raises:
+        InvalidCursorError: Wenn der Cursor nicht gelesen werden kann
+    """
+    try:
+        (row_id,) = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return int(row_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Ungültiger Cursor: {cursor}") from e
+
+
+def keyset_audio_files_query(status: Optional[str] = None, after: Optional[str] = None,
+                             columns: Optional[tuple] = None):
+    """
+    Erstellt eine AudioFile-Abfrage mit Keyset-Paginierung über die id.
+    
+    Statt OFFSET setzt die Abfrage direkt hinter der letzten gelieferten Zeile
+    auf, sodass tiefe Seiten genauso schnell sind wie die erste. Sortiert wird
+    nach der unveränderlichen id: updated_at ändert sich bei jedem save(), so
+    dass Zeilen während des Blätterns doppelt erscheinen oder fehlen würden.
+    
+    Args:
+        status: Optionaler Statusfilter
+        after: Cursor der letzten Zeile der vorherigen Seite
+        columns: Optionale Spaltenauswahl
+        
+    Returns:
+        Sortierte AudioFile-Abfrage
+    """
+    query = AudioFile.select(*(columns or ()))
+    if status:
+        query = query.where(AudioFile.status == status)
+    if after:
+        query = query.where(AudioFile.id > decode_cursor(after))
+    return query.order_by(AudioFile.id)
+
+
+def read_audio_file_rows(query, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Liest eine AudioFile-Abfrage nach id sortiert als Zeilen.
+    
+    Bei aktivem Sharding wird die Abfrage zusätzlich auf allen Shards
+    ausgeführt und nach id zusammengeführt; limit und offset gelten für das
+    Gesamtergebnis.
+    
+    Args:
+        query: AudioFile-Abfrage
+        limit: Maximale Anzahl von Zeilen
+        offset: Anzahl zu überspringender Zeilen
+        
+    Returns:
+        Liste von Zeilen
+    """
+    query = query.order_by(AudioFile.id)
+    shard_databases = get_shard_databases()
+    if shard_databases:
+        # Jede Quelle liefert höchstens offset + limit Zeilen, übersprungen wird nach dem Zusammenführen
+        if limit:
+            query = query.limit(offset + limit)
+    else:
+        if limit:
+            query = query.limit(limit)
+        if offset:
+            query = query.offset(offset)
+    
+    # bind() verändert die Abfrage selbst: nur Kopien an Replika und Shards binden
+    rows = read_from_replica(
+        lambda database: list((query if database is db else query.clone().bind(database)).dicts())
+    )
+    if not shard_databases:
+        return rows
+    
+    sources = [rows] + [list(query.clone().bind(database).dicts()) for database in shard_databases]
+    merged = heapq.merge(*sources, key=lambda row: row['id'])
+    return list(itertools.islice(merged, offset, offset + limit if limit else None))
+
+
+def iter_audio_file_rows(query) -> Iterator[Dict[str, Any]]:
+    """
+    Liefert die Zeilen einer nach id sortierten AudioFile-Abfrage als Stream.
+    
+    Bei aktivem Sharding werden die Cursor der Hauptdatenbank und aller
+    Shards nach id zusammengeführt.
+    
+    Args:
+        query: Nach id sortierte AudioFile-Abfrage
+        
+    Returns:
+        Iterator über Zeilen
+    """
+    sources = [query.dicts().iterator()]
+    sources.extend(query.clone().bind(database).dicts().iterator() for database in get_shard_databases())
+    if len(sources) == 1:
+        return sources[0]
+    return heapq.merge(*sources, key=lambda row: row['id'])
+
+
+def _serialize_audio_file_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Bereitet eine AudioFile-Zeile für die JSON-Ausgabe vor.
+    
+    Args:
+        row: Zeile als Dictionary
+        
+    Returns:
+        JSON-serialisierbares Dictionary
+    """
+    for key in ('downloaded_at', 'updated_at'):
+        value = row.get(key)
+        if isinstance(value, datetime):
+            row[key] = value.isoformat()
+    return row
+
+
+@cache_database_query(tables=("audio_files",))
+def list_audio_file_rows(status: Optional[str] = None, limit: Optional[int] = None,
+                         offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Lädt eine Seite von AudioFiles mit limit/offset als JSON-fähige Zeilen.
+    
+    Args:
+        status: Optionaler Statusfilter
+        limit: Maximale Anzahl von Zeilen
+        offset: Anzahl zu überspringender Zeilen
+        
+    Returns:
+        Liste von Zeilen
+    """
+    query = AudioFile.select(*AUDIO_FILE_API_FIELDS)
+    if status:
+        query = query.where(AudioFile.status == status)
+    rows = read_audio_file_rows(query, limit, offset)
+    return [_serialize_audio_file_row(row) for row in rows]
+
+
+@cache_database_query(tables=("audio_files",))
+def list_audio_file_page(status: Optional[str] = None, cursor: Optional[str] = None,
+                         page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Lädt eine Seite von AudioFiles per Keyset-Paginierung.
+    
+    Args:
+        status: Optionaler Statusfilter
+        cursor: Cursor der vorherigen Seite
+        page_size: Anzahl der Zeilen pro Seite
+        
+    Returns:
+        Dictionary mit Zeilen und dem Cursor der nächsten Seite
+        
+    Raises:
+        InvalidCursorError: Wenn der Cursor ungültig ist
+    """
+    query = keyset_audio_files_query(status, cursor, AUDIO_FILE_API_FIELDS)
+    rows = read_audio_file_rows(query, page_size)
+    next_cursor = None
+    if len(rows) == page_size:
+        next_cursor = encode_cursor(rows[-1]['id'])
+    return {
+        'audio_files': [_serialize_audio_file_row(row) for row in rows],
+        'next_cursor': next_cursor
+    }
+
+
+@cache_database_query(tables=("audio_files", "telegram_groups"))
+def collect_statistics() -> Dict[str, Any]:
+    """
+    Sammelt die Datenbankstatistiken für den Statistik-Endpunkt.
+    
+    Returns:
+        Dictionary mit Statistiken
+    """
+    # Die Zahlen stammen aus den per Trigger gepflegten Statistiktabellen
+    # (bei aktivem Sharding einschließlich der Shards)
+    def read_statistics(database):
+        connection = database.connection()
+        return (
+            get_library_statistics(connection, include_shards=True),
+            get_group_statistics(connection, include_shards=True),
+        )
+    
+    library, group_stats = read_from_replica(read_statistics)
+    
+    return {
+        'total_files': library['total_files'],
+        'total_groups': len(group_stats),
+        'total_bytes': library['total_bytes'],
+        'total_duration': library['total_duration'],
+        'last_download': library['last_download'],
+        'status_distribution': library['status_distribution'],
+        'group_statistics': group_stats
+    }
+
+
+def _chunked(keys: List[Any]) -> Iterator[List[Any]]:
+    """
+    Teilt Schlüssel in Blöcke für IN (...)-Abfragen auf.
+    
+    Args:
+        keys: Liste von Schlüsseln
+        
+    Returns:
+        Iterator über Schlüsselblöcke
+    """
+    for start in range(0, len(keys), LOADER_BATCH_SIZE):
+        yield keys[start:start + LOADER_BATCH_SIZE]
+
+
+class TelegramGroupLoader(DataLoader):
+    """Lädt TelegramGroups gebündelt über ihre Datenbank-ID."""
+    
+    def batch_load_fn(self, keys: List[int]) -> Promise:
+        groups = {}
+        for chunk in _chunked(list(keys)):
+            for group in TelegramGroup.select().where(TelegramGroup.id.in_(chunk)):
+                groups[group.id] = group
+        return Promise.resolve([groups.get(key) for key in keys])
+
+
+class TelegramGroupByGroupIdLoader(DataLoader):
+    """Lädt TelegramGroups gebündelt über ihre Telegram-Gruppen-ID."""
+    
+    def batch_load_fn(self, keys: List[int]) -> Promise:
+        groups = {}
+        for chunk in _chunked(list(keys)):
+            for group in TelegramGroup.select().where(TelegramGroup.group_id.in_(chunk)):
+                groups[group.group_id] = group
+        return Promise.resolve([groups.get(key) for key in keys])
+
+
+class AudioFilesByGroupLoader(DataLoader):
+    """Lädt die AudioFiles mehrerer Gruppen gebündelt über die Gruppen-ID."""
+    
+    def batch_load_fn(self, keys: List[int]) -> Promise:
+        files: Dict[int, List[AudioFile]] = {key: [] for key in keys}
+        for chunk in _chunked(list(keys)):
+            query = AudioFile.select().where(AudioFile.group.in_(chunk)).order_by(AudioFile.id)
+            for row in read_audio_file_rows(query):
+                audio = AudioFile(**row)
+                files[audio.group_id].append(audio)
+        return Promise.resolve([files[key] for key in keys])
+
+
+class GraphQLLoaders:
+    """Bündelt die DataLoader einer einzelnen GraphQL-Anfrage."""
+    
+    def __init__(self):
+        """Initialisiert die Loader; ihr Cache gilt nur für eine Anfrage."""
+        self.group = TelegramGroupLoader()
+        self.group_by_group_id = TelegramGroupByGroupIdLoader()
+        self.audio_files_by_group = AudioFilesByGroupLoader()
+
+
+def get_loaders(info) -> GraphQLLoaders:
+    """
+    Gibt die DataLoader der aktuellen GraphQL-Anfrage zurück.
+    
+    Die Loader werden im Anfragekontext abgelegt, damit alle Resolver einer
+    Anfrage ihre Schlüssel gemeinsam in einer IN (...)-Abfrage laden.
+    
+    Args:
+        info: GraphQL-ResolveInfo
+        
+    Returns:
+        GraphQLLoaders-Instanz
+    """
+    context = info.context
+    if context is None:
+        return GraphQLLoaders()
+    if isinstance(context, dict):
+        return context.setdefault('loaders', GraphQLLoaders())
+    
+    loaders = getattr(context, 'graphql_loaders', None)
+    if loaders is None:
+        loaders = GraphQLLoaders()
+        setattr(context, 'graphql_loaders', loaders)
+    return loaders
+
 
 # GraphQL-Schema
+class TelegramGroupType(ObjectType):
+    """GraphQL-Typ für TelegramGroup."""
+    id = Int()
+    group_id = Int()
+    title = String()
+    username = String()
+    audio_files = GrapheneList(lambda: AudioFileType)
+    
+    def resolve_audio_files(self, info):
+        """Löst die AudioFiles der Gruppe gebündelt auf."""
+        return get_loaders(info).audio_files_by_group.load(self.id)
+
+
 class AudioFileType(ObjectType):
     """GraphQL-Typ für AudioFile."""
     id = Int()
@@ -37,18 +392,22 @@ class AudioFileType(ObjectType):
     title = String()
     performer = String()
     group_id = Int()
+    group = Field(TelegramGroupType)
     downloaded_at = DateTime()
     status = String()
     error_message = String()
     download_attempts = Int()
-
-
-class TelegramGroupType(ObjectType):
-    """GraphQL-Typ für TelegramGroup."""
-    id = Int()
-    group_id = Int()
-    title = String()
-    username = String()
+    cursor = String()
+    
+    def resolve_group(self, info):
+        """Löst die Gruppe der Datei gebündelt auf."""
+        if self.group_id is None:
+            return None
+        return get_loaders(info).group.load(self.group_id)
+    
+    def resolve_cursor(self, info):
+        """Löst den Paginierungs-Cursor der Datei auf."""
+        return encode_cursor(self.id)
 
 
 class Query(ObjectType):
@@ -56,7 +415,7 @@ class Query(ObjectType):
     
     # AudioFile-Abfragen
     audio_file = Field(AudioFileType, file_id=String())
-    audio_files = GrapheneList(AudioFileType, status=String(), limit=Int(), offset=Int())
+    audio_files = GrapheneList(AudioFileType, status=String(), limit=Int(), offset=Int(), after=String())
     audio_files_by_group = GrapheneList(AudioFileType, group_id=Int())
     
     # TelegramGroup-Abfragen
@@ -65,22 +424,24 @@ class Query(ObjectType):
     
     def resolve_audio_file(self, info, file_id):
         """Löst die audio_file-Abfrage auf."""
-        try:
-            return AudioFile.get_by_file_id(file_id)
-        except AudioFile.DoesNotExist:
-            return None
+        return find_audio_file(file_id)
     
-    def resolve_audio_files(self, info, status=None, limit=None, offset=None):
+    def resolve_audio_files(self, info, status=None, limit=None, offset=None, after=None):
         """Löst die audio_files-Abfrage auf."""
         try:
-            query = AudioFile.select()
-            if status:
-                query = query.where(AudioFile.status == status)
-            if limit:
-                query = query.limit(limit)
-            if offset:
-                query = query.offset(offset)
-            return list(query)
+            if after is not None:
+                # Keyset-Paginierung: after ist der cursor der letzten Datei
+                query = keyset_audio_files_query(status, after or None)
+                rows = read_audio_file_rows(query, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+            else:
+                query = AudioFile.select()
+                if status:
+                    query = query.where(AudioFile.status == status)
+                rows = read_audio_file_rows(query, limit, offset or 0)
+            return [AudioFile(**row) for row in rows]
+        except InvalidCursorError as e:
+            # Ein ungültiger Cursor ist ein Fehler des Aufrufers, keine leere Seite
+            raise GraphQLError(str(e))
         except Exception as e:
             logger.error(f"Fehler bei der Abfrage von AudioFiles: {e}")
             return []
@@ -88,17 +449,14 @@ class Query(ObjectType):
     def resolve_audio_files_by_group(self, info, group_id):
         """Löst die audio_files_by_group-Abfrage auf."""
         try:
-            return list(AudioFile.select().where(AudioFile.group_id == group_id))
+            return get_loaders(info).audio_files_by_group.load(group_id)
         except Exception as e:
             logger.error(f"Fehler bei der Abfrage von AudioFiles nach Gruppe: {e}")
             return []
     
     def resolve_telegram_group(self, info, group_id):
         """Löst die telegram_group-Abfrage auf."""
-        try:
-            return TelegramGroup.get_by_group_id(group_id)
-        except TelegramGroup.DoesNotExist:
-            return None
+        return get_loaders(info).group_by_group_id.load(group_id)
     
     def resolve_telegram_groups(self, info):
         """Löst die telegram_groups-Abfrage auf."""
@@ -149,6 +507,9 @@ class DatabaseAPI:
         self.blueprint.add_url_rule('/audio-files', 
                                   view_func=self.get_audio_files, 
                                   methods=['GET'])
+        self.blueprint.add_url_rule('/audio-files/export', 
+                                  view_func=self.export_audio_files, 
+                                  methods=['GET'])
         self.blueprint.add_url_rule('/audio-files/<file_id>', 
                                   view_func=self.get_audio_file, 
                                   methods=['GET'])
@@ -223,39 +584,35 @@ class DatabaseAPI:
     
     # AudioFile-Endpunkte
     def get_audio_files(self) -> Any:
-        """Gibt eine Liste von AudioFiles zurück."""
+        """
+        Gibt eine Liste von AudioFiles zurück.
+        
+        Mit dem Parameter ``cursor`` wird per Keyset über die id
+        paginiert; ein leerer Cursor liefert die erste Seite. Die Antwort
+        enthält dann ``next_cursor`` für die folgende Seite.
+        """
         try:
             # Parameter aus der Anfrage extrahieren
             status = request.args.get('status')
             limit = request.args.get('limit', type=int)
             offset = request.args.get('offset', type=int, default=0)
             
-            # Datenbankabfrage durchführen
-            query = AudioFile.select()
-            if status:
-                query = query.where(AudioFile.status == status)
-            if limit:
-                query = query.limit(limit)
-            if offset:
-                query = query.offset(offset)
-            
-            audio_files = []
-            for audio in query:
-                audio_files.append({
-                    'id': audio.id,
-                    'file_id': audio.file_id,
-                    'file_name': audio.file_name,
-                    'file_size': audio.file_size,
-                    'duration': audio.duration,
-                    'title': audio.title,
-                    'performer': audio.performer,
-                    'group_id': audio.group_id,
-                    'downloaded_at': audio.downloaded_at.isoformat() if audio.downloaded_at else None,
-                    'status': audio.status,
-                    'error_message': audio.error_message,
-                    'download_attempts': audio.download_attempts
+            if 'cursor' in request.args:
+                page_size = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+                try:
+                    page = list_audio_file_page(status, request.args.get('cursor') or None, page_size)
+                except InvalidCursorError as e:
+                    return jsonify({'error': str(e)}), 400
+                
+                return jsonify({
+                    'audio_files': page['audio_files'],
+                    'count': len(page['audio_files']),
+                    'next_cursor': page['next_cursor']
                 })
             
+            # Datenbankabfrage durchführen
+            audio_files = list_audio_file_rows(status, limit, offset)
+            
             return jsonify({
                 'audio_files': audio_files,
                 'count': len(audio_files)
@@ -265,10 +622,42 @@ class DatabaseAPI:
             logger.error(f"Fehler beim Abrufen von AudioFiles: {e}")
             return jsonify({'error': 'Interner Serverfehler'}), 500
     
+    def export_audio_files(self) -> Any:
+        """
+        Exportiert AudioFiles als NDJSON-Stream.
+        
+        Jede Zeile wird geschrieben, sobald sie vom Datenbank-Cursor kommt,
+        sodass der Speicherverbrauch unabhängig von der Tabellengröße bleibt.
+        Die letzte Zeile meldet den Ausgang des Exports: ``{"complete": true,
+        "count": n}`` oder bei einem Abbruch ``{"complete": false, "error": ...}``.
+        Fehlt sie, wurde die Verbindung unterbrochen.
+        """
+        status = request.args.get('status')
+        try:
+            query = keyset_audio_files_query(
+                status, request.args.get('cursor') or None, AUDIO_FILE_API_FIELDS
+            )
+        except InvalidCursorError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def generate() -> Iterator[str]:
+            count = 0
+            try:
+                for row in iter_audio_file_rows(query):
+                    yield json.dumps(_serialize_audio_file_row(row), ensure_ascii=False) + '\n'
+                    count += 1
+            except Exception as e:
+                logger.error(f"Fehler beim Exportieren von AudioFiles: {e}")
+                yield json.dumps({'error': 'Interner Serverfehler', 'complete': False, 'count': count}) + '\n'
+                return
+            yield json.dumps({'complete': True, 'count': count}) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
     def get_audio_file(self, file_id: str) -> Any:
         """Gibt ein einzelnes AudioFile zurück."""
         try:
-            audio = AudioFile.get_by_file_id(file_id)
+            audio = find_audio_file(file_id)
             if not audio:
                 return jsonify({'error': 'AudioFile nicht gefunden'}), 404
             
@@ -332,7 +721,7 @@ class DatabaseAPI:
     def update_audio_file(self, file_id: str) -> Any:
         """Aktualisiert ein vorhandenes AudioFile."""
         try:
-            audio = AudioFile.get_by_file_id(file_id)
+            audio = find_audio_file(file_id)
             if not audio:
                 return jsonify({'error': 'AudioFile nicht gefunden'}), 404
             
@@ -367,7 +756,7 @@ class DatabaseAPI:
     def delete_audio_file(self, file_id: str) -> Any:
         """Löscht ein AudioFile."""
         try:
-            audio = AudioFile.get_by_file_id(file_id)
+            audio = find_audio_file(file_id)
             if not audio:
                 return jsonify({'error': 'AudioFile nicht gefunden'}), 404
             
@@ -457,32 +846,7 @@ class DatabaseAPI:
     def get_statistics(self) -> Any:
         """Gibt Datenbankstatistiken zurück."""
         try:
-            # Hole Gesamtzahlen
-            total_files = AudioFile.select().count()
-            total_groups = TelegramGroup.select().count()
-            
-            # Hole Status-Verteilung
-            status_distribution = {}
-            for status in AudioFile.select(AudioFile.status).distinct():
-                count = AudioFile.select().where(AudioFile.status == status.status).count()
-                status_distribution[status.status] = count
-            
-            # Hole Gruppenstatistiken
-            group_stats = []
-            for group in TelegramGroup.select():
-                file_count = AudioFile.select().where(AudioFile.group_id == group.id).count()
-                group_stats.append({
-                    'group_id': group.group_id,
-                    'title': group.title,
-                    'file_count': file_count
-                })
-            
-            return jsonify({
-                'total_files': total_files,
-                'total_groups': total_groups,
-                'status_distribution': status_distribution,
-                'group_statistics': group_stats
-            })
+            return jsonify(collect_statistics())
             
         except Exception as e:
             logger.error(f"Fehler beim Abrufen von Statistiken: {e}")
@@ -490,11 +854,35 @@ class DatabaseAPI:
     
     # Validierungs-Endpunkte
     def validate_database(self) -> Any:
-        """Führt eine Datenbankvalidierung durch."""
+        """
+        Führt eine Datenbankvalidierung durch.
+
+        ``mode=incremental`` prüft nur die seit dem letzten Lauf geänderten
+        Zeilen. Mit ``stream=1`` werden die Verstöße als NDJSON geliefert,
+        sobald sie gefunden werden; die letzte Zeile enthält die
+        Zusammenfassung (``complete: true``) oder bei einem Abbruch einen
+        Fehlerdatensatz (``complete: false``).
+        """
+        incremental = request.args.get('mode', 'full') == 'incremental'
         try:
             validator = get_database_validator()
-            validation_results = validator.run_full_validation()
-            
+
+            if request.args.get('stream', type=int):
+                def generate() -> Iterator[str]:
+                    try:
+                        for violation in validator.iter_violations(incremental):
+                            yield json.dumps(violation.to_dict(), ensure_ascii=False, default=str) + '\n'
+                        yield json.dumps(
+                            {'summary': validator.last_run, 'complete': True}, ensure_ascii=False
+                        ) + '\n'
+                    except Exception as e:
+                        logger.error(f"Fehler bei der Datenbankvalidierung: {e}")
+                        yield json.dumps({'error': 'Interner Serverfehler', 'complete': False}) + '\n'
+
+                return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+            validation_results = validator.run_validation(incremental=incremental)
+
             return jsonify(validation_results)
             
         except Exception as e:
@@ -551,6 +939,10 @@ def run_database_api_server(host: str = '127.0.0.1', port: int = 5000,
         debug: Debug-Modus
     """
     try:
+        # Konfigurierte Shards aktivieren, damit die API deren Dateien ausliefert
+        config = Config()
+        enable_configured_sharding(config.shard_count, config.shard_dir)
+        
         app = Flask(__name__)
         api = get_database_api(app)
         
@@ -6,197 +6,1024 @@ Features:
 - Inkrementelle Backups
 - Verschlüsselung
 - Cloud-Integration
+- Streaming-Backups über die SQLite-Online-Backup-API
 """
 
+import base64
 import os
 import shutil
 import gzip
 import json
+import sqlite3
+import struct
+import zlib
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, BinaryIO, Callable, Iterator, Iterable, Tuple
 import hashlib
 import schedule
 import time
 import threading
 
-from .models import db
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from .models import db, write_generations
 from .logging_config import get_logger
+from .error_handling import DatabaseError
+from .database_change_tracking import (
+    UNTRACKED_TABLES,
+    ensure_change_tracking,
+    get_change_sequence,
+    get_changed_tables,
+    get_table_columns,
+    iter_changes,
+    prune_changes,
+    schema_fingerprint,
+)
+from .database_statistics import rebuild_statistics
 from .database_security import get_security_manager, encrypt_sensitive_data, decrypt_sensitive_data
 
 logger = get_logger(__name__)
 
+# Format der Streaming-Backups
+BACKUP_STREAM_MAGIC = b"TADBKUP"
+BACKUP_STREAM_VERSION = 1
+STREAM_BACKUP_SUFFIX = ".dbs"
+FLAG_COMPRESSED = 0x01
+FLAG_ENCRYPTED = 0x02
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_BACKUP_PAGES_PER_STEP = 1024
+
+# Inkrementelle Backups
+DELTA_BACKUP_SUFFIX = ".dlt"
+CHAIN_MANIFEST_NAME = "backup_chain.json"
+DEFAULT_MAX_CHAIN_LENGTH = 24
+_DELTA_BATCH_SIZE = 500
+_DELTA_BUFFER_SIZE = 64 * 1024
+
+# Kopf: Magic, Version, Flags, Blockgröße, Nonce-Präfix
+_HEADER = struct.Struct(">7sBBI8s")
+# Block: Länge der Nutzdaten, Endmarkierung
+_RECORD = struct.Struct(">IB")
+_GCM_TAG_SIZE = 16
+_MAX_CHUNKS = 2 ** 32
+
+ProgressCallback = Callable[["BackupMetrics"], None]
+
+
+@dataclass
+class BackupMetrics:
+    """Fortschritt und Durchsatz einer Sicherung oder Wiederherstellung."""
+    operation: str
+    phase: str = "pending"
+    pages_total: int = 0
+    pages_copied: int = 0
+    total_bytes: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    chunks: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    duration_seconds: Optional[float] = None
+    
+    @property
+    def elapsed_seconds(self) -> float:
+        """Bisherige bzw. gesamte Laufzeit in Sekunden."""
+        if self.duration_seconds is not None:
+            return self.duration_seconds
+        return time.perf_counter() - self.started_at
+    
+    @property
+    def database_bytes(self) -> int:
+        """Anzahl der unkomprimierten Datenbank-Bytes."""
+        return self.bytes_in if self.operation == "backup" else self.bytes_out
+    
+    @property
+    def stream_bytes(self) -> int:
+        """Anzahl der Bytes im Backup-Stream."""
+        return self.bytes_out if self.operation == "backup" else self.bytes_in
+    
+    @property
+    def progress(self) -> float:
+        """Fortschritt der aktuellen Phase zwischen 0 und 1."""
+        if self.phase == "done":
+            return 1.0
+        if self.phase in ("snapshot", "apply"):
+            return self.pages_copied / self.pages_total if self.pages_total else 0.0
+        if self.phase == "stream" and self.total_bytes:
+            processed = self.bytes_in
+            return min(processed / self.total_bytes, 1.0)
+        return 0.0
+    
+    @property
+    def throughput_bytes_per_second(self) -> float:
+        """Durchsatz in Datenbank-Bytes pro Sekunde."""
+        elapsed = self.elapsed_seconds
+        return self.database_bytes / elapsed if elapsed > 0 else 0.0
+    
+    @property
+    def compression_ratio(self) -> float:
+        """Verhältnis von Datenbankgröße zu Backup-Größe."""
+        return self.database_bytes / self.stream_bytes if self.stream_bytes else 0.0
+    
+    def finish(self) -> None:
+        """Markiert den Vorgang als abgeschlossen."""
+        self.duration_seconds = time.perf_counter() - self.started_at
+        self.phase = "done"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Gibt die Metriken als Dictionary zurück."""
+        return {
+            "operation": self.operation,
+            "phase": self.phase,
+            "progress": self.progress,
+            "pages_total": self.pages_total,
+            "pages_copied": self.pages_copied,
+            "database_bytes": self.database_bytes,
+            "stream_bytes": self.stream_bytes,
+            "chunks": self.chunks,
+            "elapsed_seconds": self.elapsed_seconds,
+            "throughput_bytes_per_second": self.throughput_bytes_per_second,
+            "compression_ratio": self.compression_ratio,
+        }
+
+
+def derive_backup_key(secret: bytes) -> bytes:
+    """
+    Leitet den AES-256-Schlüssel für Streaming-Backups ab.
+    
+    Args:
+        secret: Geheimnis, z.B. der Schlüssel des DatabaseSecurityManager
+        
+    Returns:
+        32 Byte langer Schlüssel
+    """
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"telegram-audio-downloader/backup-stream",
+    ).derive(secret)
+
+
+def is_stream_backup(backup_path: Path) -> bool:
+    """
+    Prüft, ob eine Datei ein Streaming-Backup ist.
+    
+    Args:
+        backup_path: Pfad zur Backup-Datei
+        
+    Returns:
+        True, wenn die Datei mit der Kennung des Streaming-Formats beginnt
+    """
+    try:
+        with open(backup_path, "rb") as f:
+            return f.read(len(BACKUP_STREAM_MAGIC)) == BACKUP_STREAM_MAGIC
+    except OSError:
+        return False
+
+
+def _encode_value(value: Any) -> Any:
+    """Macht einen SQLite-Wert JSON-serialisierbar."""
+    if isinstance(value, bytes):
+        return {"b": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Kehrt _encode_value um."""
+    if isinstance(value, dict):
+        return base64.b64decode(value["b"])
+    return value
+
+
+def _encode_delta_record(record: Dict[str, Any]) -> bytes:
+    """Kodiert einen Delta-Datensatz als JSON-Zeile."""
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _iter_delta_records(blocks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Zerlegt die entpackten Blöcke eines Deltas in Datensätze."""
+    pending = b""
+    for block in blocks:
+        lines = (pending + block).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line:
+                yield json.loads(line)
+    if pending:
+        raise DatabaseError("Delta endet mit einem unvollständigen Datensatz")
+
+
+def _chunk_aad(header: bytes, index: int, final: bool) -> bytes:
+    """Zusätzliche authentifizierte Daten eines Blocks."""
+    return header + struct.pack(">QB", index, int(final))
+
+
+class ChunkedBackupWriter:
+    """
+    Schreibt einen komprimierten, optional verschlüsselten Backup-Stream.
+    
+    Die Daten werden mit zlib komprimiert und in Blöcken fester Größe
+    geschrieben. Jeder Block wird einzeln mit AES-GCM verschlüsselt; Dateikopf,
+    Blockindex und Endmarkierung werden mitauthentifiziert, sodass vertauschte,
+    veränderte oder abgeschnittene Blöcke beim Lesen auffallen. Der
+    Speicherbedarf ist durch die Blockgröße begrenzt.
+    """
+    
+    def __init__(self, fileobj: BinaryIO, key: Optional[bytes] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, compression_level: int = 6,
+                 metrics: Optional[BackupMetrics] = None):
+        """
+        Initialisiert den Writer und schreibt den Dateikopf.
+        
+        Args:
+            fileobj: Binär geöffnete Zieldatei
+            key: AES-Schlüssel (16, 24 oder 32 Byte) oder None für keine Verschlüsselung
+            chunk_size: Größe der komprimierten Blöcke in Bytes
+            compression_level: zlib-Kompressionsstufe
+            metrics: Optionale Metriken, die fortgeschrieben werden
+        """
+        self._file = fileobj
+        self._aead = AESGCM(key) if key else None
+        self._compressor = zlib.compressobj(compression_level)
+        self._buffer = bytearray()
+        self._index = 0
+        self._closed = False
+        self.chunk_size = chunk_size
+        self.metrics = metrics or BackupMetrics("backup")
+        
+        flags = FLAG_COMPRESSED | (FLAG_ENCRYPTED if key else 0)
+        self._nonce_prefix = os.urandom(8) if key else bytes(8)
+        self._header = _HEADER.pack(
+            BACKUP_STREAM_MAGIC, BACKUP_STREAM_VERSION, flags, chunk_size, self._nonce_prefix
+        )
+        self._file.write(self._header)
+        self.metrics.bytes_out += len(self._header)
+    
+    def write(self, data: bytes) -> None:
+        """
+        Komprimiert Daten und schreibt volle Blöcke.
+        
+        Args:
+            data: Unkomprimierte Daten
+        """
+        if self._closed:
+            raise DatabaseError("Backup-Stream ist bereits geschlossen")
+        self.metrics.bytes_in += len(data)
+        self._buffer += self._compressor.compress(data)
+        self._write_full_chunks()
+    
+    def close(self) -> None:
+        """Schreibt die restlichen Daten und den abschließenden Block."""
+        if self._closed:
+            return
+        self._buffer += self._compressor.flush()
+        self._write_full_chunks(keep_last=True)
+        self._write_chunk(bytes(self._buffer), final=True)
+        self._buffer.clear()
+        self._closed = True
+    
+    def _write_full_chunks(self, keep_last: bool = False) -> None:
+        """Schreibt alle vollständigen Blöcke aus dem Puffer."""
+        while len(self._buffer) > self.chunk_size or (
+                not keep_last and len(self._buffer) == self.chunk_size):
+            chunk = bytes(self._buffer[:self.chunk_size])
+            del self._buffer[:self.chunk_size]
+            self._write_chunk(chunk, final=False)
+    
+    def _write_chunk(self, payload: bytes, final: bool) -> None:
+        """Verschlüsselt einen Block und hängt ihn an die Datei an."""
+        if self._index >= _MAX_CHUNKS:
+            raise DatabaseError("Backup-Stream enthält zu viele Blöcke")
+        if self._aead is not None:
+            nonce = self._nonce_prefix + struct.pack(">I", self._index)
+            payload = self._aead.encrypt(nonce, payload, _chunk_aad(self._header, self._index, final))
+        self._file.write(_RECORD.pack(len(payload), int(final)))
+        self._file.write(payload)
+        self._index += 1
+        self.metrics.chunks += 1
+        self.metrics.bytes_out += _RECORD.size + len(payload)
+
+
+class ChunkedBackupReader:
+    """
+    Liest einen mit ChunkedBackupWriter geschriebenen Backup-Stream.
+    
+    Die Blöcke werden nacheinander geprüft, entschlüsselt und dekomprimiert.
+    Die Ausgabe erfolgt in Stücken von höchstens ``max_output`` Bytes, sodass
+    auch stark komprimierte Daten den Speicher nicht überlaufen lassen.
+    """
+    
+    def __init__(self, fileobj: BinaryIO, key: Optional[bytes] = None,
+                 max_output: int = DEFAULT_CHUNK_SIZE, metrics: Optional[BackupMetrics] = None):
+        """
+        Initialisiert den Reader und prüft den Dateikopf.
+        
+        Args:
+            fileobj: Binär geöffnete Backup-Datei
+            key: AES-Schlüssel für verschlüsselte Backups
+            max_output: Maximale Größe eines ausgegebenen Stücks
+            metrics: Optionale Metriken, die fortgeschrieben werden
+            
+        Raises:
+            DatabaseError: Wenn die Datei kein gültiges Streaming-Backup ist
+        """
+        self._file = fileobj
+        self.max_output = max_output
+        self.metrics = metrics or BackupMetrics("restore")
+        
+        header = fileobj.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise DatabaseError("Backup-Stream ist unvollständig")
+        magic, version, flags, chunk_size, nonce_prefix = _HEADER.unpack(header)
+        if magic != BACKUP_STREAM_MAGIC:
+            raise DatabaseError("Datei ist kein Streaming-Backup")
+        if version != BACKUP_STREAM_VERSION:
+            raise DatabaseError(f"Nicht unterstützte Backup-Version {version}")
+        self.metrics.bytes_in += len(header)
+        
+        self.encrypted = bool(flags & FLAG_ENCRYPTED)
+        if self.encrypted and not key:
+            raise DatabaseError("Backup ist verschlüsselt, aber es wurde kein Schlüssel angegeben")
+        self._header = header
+        self._chunk_size = chunk_size
+        self._nonce_prefix = nonce_prefix
+        self._aead = AESGCM(key) if self.encrypted else None
+        self._decompressor = zlib.decompressobj()
+    
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Liefert die unkomprimierten Daten stückweise.
+        
+        Raises:
+            DatabaseError: Bei beschädigten, manipulierten oder abgeschnittenen Daten
+        """
+        max_payload = self._chunk_size + (_GCM_TAG_SIZE if self.encrypted else 0)
+        index = 0
+        final = False
+        while not final:
+            record = self._file.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                raise DatabaseError("Backup-Stream ist abgeschnitten")
+            length, final_flag = _RECORD.unpack(record)
+            if length > max_payload or final_flag > 1:
+                raise DatabaseError(f"Backup-Block {index} ist beschädigt")
+            payload = self._file.read(length)
+            if len(payload) < length:
+                raise DatabaseError("Backup-Stream ist abgeschnitten")
+            self.metrics.bytes_in += _RECORD.size + length
+            self.metrics.chunks += 1
+            final = bool(final_flag)
+            
+            if self._aead is not None:
+                nonce = self._nonce_prefix + struct.pack(">I", index)
+                try:
+                    payload = self._aead.decrypt(nonce, payload, _chunk_aad(self._header, index, final))
+                except InvalidTag:
+                    raise DatabaseError(f"Backup-Block {index} ist beschädigt oder manipuliert")
+            
+            try:
+                yield from self._decompress(payload)
+            except zlib.error as e:
+                raise DatabaseError(f"Backup-Block {index} lässt sich nicht dekomprimieren: {e}")
+            index += 1
+        
+        if not self._decompressor.eof or self._file.read(1):
+            raise DatabaseError("Backup-Stream ist unvollständig")
+    
+    def _decompress(self, data: bytes) -> Iterator[bytes]:
+        """Dekomprimiert einen Block mit begrenzter Ausgabegröße."""
+        while True:
+            output = self._decompressor.decompress(data, self.max_output)
+            if output:
+                self.metrics.bytes_out += len(output)
+                yield output
+            data = self._decompressor.unconsumed_tail
+            if not data and len(output) < self.max_output:
+                return
+
 
 class DatabaseBackupManager:
     """Verwaltet Datenbank-Backups."""
     
-    def __init__(self, backup_dir: Path = None, retention_days: int = 30):
+    def __init__(self, backup_dir: Path = None, retention_days: int = 30,
+                 encryption_key: Optional[bytes] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 pages_per_step: int = DEFAULT_BACKUP_PAGES_PER_STEP,
+                 max_chain_length: int = DEFAULT_MAX_CHAIN_LENGTH,
+                 database_path: Optional[Path] = None):
         """
         Initialisiert den DatabaseBackupManager.
         
         Args:
             backup_dir: Verzeichnis für Backups
             retention_days: Aufbewahrungszeit für Backups in Tagen
+            encryption_key: Geheimnis für die Backup-Verschlüsselung
+                (Standard: Schlüssel des DatabaseSecurityManager)
+            chunk_size: Blockgröße der Streaming-Backups in Bytes
+            pages_per_step: Seiten pro Schritt der Online-Backup-API
+            max_chain_length: Anzahl inkrementeller Backups, ab der eine Kette
+                zu einer neuen Basis verdichtet wird
+            database_path: Zu sichernde Datenbank (Standard: Modell-Datenbank)
         """
         self.backup_dir = backup_dir or Path("data/backups")
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         self.retention_days = retention_days
+        self.encryption_key = encryption_key
+        self.chunk_size = chunk_size
+        self.pages_per_step = pages_per_step
+        self.max_chain_length = max_chain_length
+        self.compression_level = 6
+        self.last_metrics: Optional[BackupMetrics] = None
         self.backup_schedule = None
         self.scheduler_thread = None
+        self._database_path = Path(database_path) if database_path else None
         
         logger.info(f"DatabaseBackupManager initialisiert mit Backup-Verzeichnis {self.backup_dir}")
     
-    def create_full_backup(self, encrypt: bool = True) -> Optional[Path]:
+    @property
+    def database_path(self) -> Path:
+        """Pfad der zu sichernden Datenbank."""
+        return self._database_path or Path(db.database)
+    
+    def _uses_model_database(self) -> bool:
+        """Prüft, ob die Modell-Datenbank gesichert wird."""
+        return self._database_path is None or (
+            db.database is not None and Path(db.database) == self._database_path
+        )
+    
+    def create_full_backup(self, encrypt: bool = True,
+                           progress: Optional[ProgressCallback] = None) -> Optional[Path]:
         """
         Erstellt ein vollständiges Backup der Datenbank.
         
+        Die Datenbank wird mit der Online-Backup-API schrittweise in eine
+        temporäre Snapshot-Datei kopiert. Eine WAL-Lesetransaktion hält dabei
+        einen festen Stand fest, sodass laufende Downloads weiterschreiben
+        können. Der Snapshot wird anschließend blockweise komprimiert,
+        verschlüsselt und direkt in die Backup-Datei geschrieben.
+        
         Args:
             encrypt: Ob das Backup verschlüsselt werden soll
+            progress: Optionaler Callback, der die aktuellen Metriken erhält
             
         Returns:
             Pfad zum Backup oder None bei Fehler
         """
+        metrics = BackupMetrics("backup")
+        self.last_metrics = metrics
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"backup_full_{timestamp}.db"
-            if encrypt:
-                backup_filename += ".enc"
-            
-            backup_path = self.backup_dir / backup_filename
-            
-            # Kopiere die Datenbankdatei
-            db_path = Path(db.database)
+            db_path = self.database_path
             if not db_path.exists():
                 logger.error(f"Datenbankdatei {db_path} nicht gefunden")
                 return None
             
-            # Schließe die Datenbankverbindung vor dem Kopieren
-            if not db.is_closed():
-                db.close()
-            
-            # Kopiere die Datei
-            shutil.copy2(db_path, backup_path)
-            
-            # Verschlüssele das Backup, wenn gewünscht
-            if encrypt:
-                self._encrypt_backup_file(backup_path)
-            
-            # Komprimiere das Backup
-            compressed_path = self._compress_backup(backup_path)
-            if compressed_path != backup_path:
-                # Lösche die unkomprimierte Datei
-                backup_path.unlink()
-                backup_path = compressed_path
-            
-            logger.info(f"Vollständiges Backup erstellt: {backup_path}")
+            backup_path, _ = self._create_stream_backup(db_path, encrypt, metrics, progress)
+            logger.info(
+                f"Vollständiges Backup erstellt: {backup_path} "
+                f"({metrics.database_bytes} -> {metrics.stream_bytes} Bytes, "
+                f"{metrics.throughput_bytes_per_second / 1024 / 1024:.1f} MiB/s)"
+            )
             return backup_path
             
         except Exception as e:
+            metrics.phase = "failed"
             logger.error(f"Fehler beim Erstellen des vollständigen Backups: {e}")
             return None
+    
+    def _create_stream_backup(self, db_path: Path, encrypt: bool, metrics: BackupMetrics,
+                              progress: Optional[ProgressCallback]) -> Tuple[Path, Dict[str, Any]]:
+        """
+        Erstellt ein vollständiges Streaming-Backup.
+        
+        Args:
+            db_path: Pfad zur Quelldatenbank
+            encrypt: Ob das Backup verschlüsselt werden soll
+            metrics: Metriken des Backups
+            progress: Optionaler Fortschritts-Callback
+            
+        Returns:
+            Tuple aus (Backup-Pfad, Snapshot-Informationen)
+        """
+        backup_path = self._new_backup_path("full", STREAM_BACKUP_SUFFIX)
+        snapshot_path = self.backup_dir / f".{backup_path.name}.snapshot"
+        try:
+            snapshot = self._snapshot_database(db_path, snapshot_path, metrics, progress)
+            key = self._get_backup_key() if encrypt else None
+            self._stream_file_to_backup(snapshot_path, backup_path, key, metrics, progress)
         finally:
-            # Stelle die Datenbankverbindung wieder her
-            try:
-                if db.is_closed():
-                    db.connect()
-            except Exception as e:
-                logger.error(f"Fehler beim Wiederherstellen der Datenbankverbindung: {e}")
+            if snapshot_path.exists():
+                snapshot_path.unlink()
+        
+        metrics.finish()
+        self._report_progress(progress, metrics)
+        return backup_path, snapshot
+    
+    def _new_backup_path(self, kind: str, suffix: str) -> Path:
+        """Erzeugt einen Dateinamen mit Zeitstempel für ein neues Backup."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        return self.backup_dir / f"backup_{kind}_{timestamp}{suffix}"
+    
+    def _connect_source(self, db_path: Path) -> sqlite3.Connection:
+        """Öffnet eine eigene Verbindung zur Quelldatenbank."""
+        connection = sqlite3.connect(str(db_path), isolation_level=None)
+        connection.execute("PRAGMA busy_timeout=30000")
+        return connection
+    
+    def _snapshot_database(self, db_path: Path, snapshot_path: Path, metrics: BackupMetrics,
+                           progress: Optional[ProgressCallback]) -> Dict[str, Any]:
+        """
+        Kopiert die Datenbank schrittweise mit der Online-Backup-API.
+        
+        Args:
+            db_path: Pfad zur Quelldatenbank
+            snapshot_path: Pfad zur Snapshot-Datei
+            metrics: Metriken des Backups
+            progress: Optionaler Fortschritts-Callback
+            
+        Returns:
+            Wasserstand der Änderungsverfolgung und Schema-Fingerabdruck des Snapshots
+        """
+        metrics.phase = "snapshot"
+        
+        def on_step(status: int, remaining: int, total: int) -> None:
+            metrics.pages_total = total
+            metrics.pages_copied = total - remaining
+            self._report_progress(progress, metrics)
+        
+        source = self._connect_source(db_path)
+        target = sqlite3.connect(str(snapshot_path))
+        try:
+            # Snapshot für alle Backup-Schritte festhalten
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            snapshot = {
+                "watermark": get_change_sequence(source),
+                "schema": schema_fingerprint(source),
+            }
+            source.backup(target, pages=self.pages_per_step, progress=on_step)
+            source.execute("COMMIT")
+            # Das Backup soll ohne WAL-Datei wiederherstellbar sein
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target.close()
+            source.close()
+        return snapshot
+    
+    def _stream_file_to_backup(self, source_path: Path, backup_path: Path, key: Optional[bytes],
+                               metrics: BackupMetrics, progress: Optional[ProgressCallback]) -> None:
+        """
+        Schreibt eine Datei komprimiert und verschlüsselt als Streaming-Backup.
+        
+        Args:
+            source_path: Pfad zur unkomprimierten Datenbankdatei
+            backup_path: Pfad der fertigen Backup-Datei
+            key: AES-Schlüssel oder None
+            metrics: Metriken des Backups
+            progress: Optionaler Fortschritts-Callback
+        """
+        partial_path = self.backup_dir / f".{backup_path.name}.partial"
+        metrics.phase = "stream"
+        metrics.total_bytes = source_path.stat().st_size
+        try:
+            with open(source_path, "rb") as source, open(partial_path, "wb") as target:
+                writer = ChunkedBackupWriter(
+                    target, key, self.chunk_size, self.compression_level, metrics
+                )
+                for block in iter(lambda: source.read(self.chunk_size), b""):
+                    writer.write(block)
+                    self._report_progress(progress, metrics)
+                writer.close()
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(partial_path, backup_path)
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+    
+    def _get_backup_key(self) -> bytes:
+        """Gibt den Schlüssel für verschlüsselte Streaming-Backups zurück."""
+        secret = self.encryption_key or get_security_manager().encryption_key
+        return derive_backup_key(secret)
+    
+    def _report_progress(self, progress: Optional[ProgressCallback], metrics: BackupMetrics) -> None:
+        """Ruft den Fortschritts-Callback auf, ohne den Vorgang abzubrechen."""
+        if progress is None:
+            return
+        try:
+            progress(metrics)
+        except Exception as e:
+            logger.error(f"Fehler im Backup-Fortschritts-Callback: {e}")
     
-    def create_incremental_backup(self) -> Optional[Path]:
+    def create_incremental_backup(self, encrypt: bool = True,
+                                  progress: Optional[ProgressCallback] = None) -> Optional[Path]:
         """
         Erstellt ein inkrementelles Backup.
         
+        Gesichert werden nur die Zeilen, die sich seit dem letzten Backup der
+        Kette geändert haben oder gelöscht wurden. Die Änderungsverfolgung
+        übernehmen Trigger (siehe database_change_tracking). Existiert noch
+        keine gültige Kette, etwa beim ersten Aufruf, nach einer
+        Schemaänderung oder einer Wiederherstellung, wird stattdessen ein
+        vollständiges Backup als neue Basis erstellt. Erreicht die Kette
+        ``max_chain_length``, wird sie vorher verdichtet.
+        
+        Args:
+            encrypt: Ob eine neue Kette verschlüsselt werden soll
+            progress: Optionaler Callback, der die aktuellen Metriken erhält
+            
         Returns:
             Pfad zum Backup oder None bei Fehler
         """
+        metrics = BackupMetrics("backup")
+        self.last_metrics = metrics
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"backup_incremental_{timestamp}.json.gz"
-            backup_path = self.backup_dir / backup_filename
-            
-            # In einer echten Implementierung würden wir hier nur die geänderten Daten sichern
-            # Für dieses Beispiel erstellen wir ein JSON-Backup der Metadaten
-            
-            backup_data = {
-                "timestamp": timestamp,
-                "type": "incremental",
-                "version": "1.0"
-            }
+            db_path = self.database_path
+            if not db_path.exists():
+                logger.error(f"Datenbankdatei {db_path} nicht gefunden")
+                return None
             
-            # Komprimiere und speichere die Daten
-            with gzip.open(backup_path, 'wt', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2, ensure_ascii=False)
+            source = self._connect_source(db_path)
+            try:
+                untracked = ensure_change_tracking(source)
+                chain = self._load_chain()
+                if self._needs_new_base(chain, untracked, encrypt):
+                    return self._start_chain(source, db_path, encrypt, metrics, progress)
+                
+                if len(chain["deltas"]) >= self.max_chain_length:
+                    self.compact_backup_chain()
+                    chain = self._load_chain()
+                    self.last_metrics = metrics
+                
+                delta_path = self._write_delta(source, chain, metrics, progress)
+                if delta_path is None:
+                    # Das Schema hat sich geändert
+                    return self._start_chain(source, db_path, encrypt, metrics, progress)
+            finally:
+                source.close()
             
-            logger.info(f"Inkrementelles Backup erstellt: {backup_path}")
-            return backup_path
+            metrics.finish()
+            self._report_progress(progress, metrics)
+            logger.info(f"Inkrementelles Backup erstellt: {delta_path} ({metrics.stream_bytes} Bytes)")
+            return delta_path
             
         except Exception as e:
+            metrics.phase = "failed"
             logger.error(f"Fehler beim Erstellen des inkrementellen Backups: {e}")
             return None
     
-    def _encrypt_backup_file(self, backup_path: Path) -> bool:
+    def _needs_new_base(self, chain: Optional[Dict[str, Any]], untracked: set, encrypt: bool) -> bool:
         """
-        Verschlüsselt eine Backup-Datei.
+        Prüft, ob eine Kette mit einer neuen Basis begonnen werden muss.
         
         Args:
-            backup_path: Pfad zur Backup-Datei
+            chain: Aktuelle Kette oder None
+            untracked: Tabellen, deren Änderungen bisher nicht verfolgt wurden
+            encrypt: Gewünschte Verschlüsselung
             
         Returns:
-            True, wenn die Verschlüsselung erfolgreich war
+            True, wenn ein neues Basis-Backup nötig ist
+        """
+        if chain is None or chain.get("sealed") or untracked:
+            return True
+        if chain["encrypted"] != encrypt:
+            return True
+        files = [chain["base"]] + [delta["name"] for delta in chain["deltas"]]
+        return not all((self.backup_dir / name).exists() for name in files)
+    
+    def _start_chain(self, source: sqlite3.Connection, db_path: Path, encrypt: bool,
+                     metrics: BackupMetrics, progress: Optional[ProgressCallback]) -> Path:
         """
+        Erstellt ein Basis-Backup und beginnt damit eine neue Kette.
+        
+        Args:
+            source: Verbindung zur Quelldatenbank
+            db_path: Pfad zur Quelldatenbank
+            encrypt: Ob die Kette verschlüsselt werden soll
+            metrics: Metriken des Backups
+            progress: Optionaler Fortschritts-Callback
+            
+        Returns:
+            Pfad zum Basis-Backup
+        """
+        base_path, snapshot = self._create_stream_backup(db_path, encrypt, metrics, progress)
+        self._save_chain({
+            "base": base_path.name,
+            "encrypted": encrypt,
+            "schema": snapshot["schema"],
+            "base_watermark": snapshot["watermark"],
+            "watermark": snapshot["watermark"],
+            "sealed": False,
+            "deltas": [],
+        })
+        prune_changes(source, snapshot["watermark"])
+        logger.info(f"Neue Backup-Kette mit Basis {base_path} begonnen")
+        return base_path
+    
+    def _write_delta(self, source: sqlite3.Connection, chain: Dict[str, Any],
+                     metrics: BackupMetrics, progress: Optional[ProgressCallback]) -> Optional[Path]:
+        """
+        Schreibt die Änderungen seit dem Wasserstand der Kette in eine Delta-Datei.
+        
+        Alle Änderungen werden innerhalb einer Lesetransaktion gelesen und
+        bilden daher einen konsistenten Stand.
+        
+        Args:
+            source: Verbindung zur Quelldatenbank
+            chain: Aktuelle Kette
+            metrics: Metriken des Backups
+            progress: Optionaler Fortschritts-Callback
+            
+        Returns:
+            Pfad zum Delta, zum letzten Backup der Kette ohne Änderungen oder
+            None, wenn sich das Schema geändert hat
+        """
+        after_seq = chain["watermark"]
+        delta_path = self._new_backup_path("incremental", DELTA_BACKUP_SUFFIX)
+        partial_path = self.backup_dir / f".{delta_path.name}.partial"
+        key = self._get_backup_key() if chain["encrypted"] else None
+        metrics.phase = "delta"
+        changes = 0
+        
+        source.execute("BEGIN")
         try:
-            security_manager = get_security_manager()
+            if schema_fingerprint(source) != chain["schema"]:
+                return None
+            upto_seq = get_change_sequence(source)
+            if upto_seq == after_seq:
+                latest = chain["deltas"][-1]["name"] if chain["deltas"] else chain["base"]
+                logger.debug("Keine Änderungen seit dem letzten Backup")
+                return self.backup_dir / latest
             
-            # Lese die Backup-Datei
-            with open(backup_path, 'rb') as f:
-                data = f.read()
+            tables = get_changed_tables(source, after_seq, upto_seq)
+            columns = {table: get_table_columns(source, table) for table in tables}
+            with open(partial_path, "wb") as target:
+                writer = ChunkedBackupWriter(
+                    target, key, self.chunk_size, self.compression_level, metrics
+                )
+                buffer = bytearray(_encode_delta_record({
+                    "type": "delta",
+                    "base": chain["base"],
+                    "from_seq": after_seq,
+                    "to_seq": upto_seq,
+                    "tables": columns,
+                    "created": datetime.now().isoformat(),
+                }))
+                for table in tables:
+                    for row_id, values in iter_changes(source, table, columns[table], after_seq, upto_seq):
+                        if values is None:
+                            record = {"t": table, "r": row_id, "d": 1}
+                        else:
+                            record = {"t": table, "r": row_id, "v": [_encode_value(v) for v in values]}
+                        buffer += _encode_delta_record(record)
+                        changes += 1
+                        if len(buffer) >= _DELTA_BUFFER_SIZE:
+                            writer.write(bytes(buffer))
+                            buffer.clear()
+                            self._report_progress(progress, metrics)
+                writer.write(bytes(buffer))
+                writer.close()
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(partial_path, delta_path)
+        finally:
+            source.execute("COMMIT")
+            if partial_path.exists():
+                partial_path.unlink()
+        
+        chain["deltas"].append({
+            "name": delta_path.name,
+            "from_seq": after_seq,
+            "to_seq": upto_seq,
+            "changes": changes,
+            "size_bytes": delta_path.stat().st_size,
+        })
+        chain["watermark"] = upto_seq
+        self._save_chain(chain)
+        prune_changes(source, upto_seq)
+        return delta_path
+    
+    def _load_chain(self) -> Optional[Dict[str, Any]]:
+        """Lädt das Manifest der aktuellen Backup-Kette."""
+        manifest_path = self.backup_dir / CHAIN_MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Manifest der Backup-Kette nicht lesbar: {e}")
+            return None
+    
+    def _save_chain(self, chain: Dict[str, Any]) -> None:
+        """Speichert das Manifest der Backup-Kette atomar."""
+        manifest_path = self.backup_dir / CHAIN_MANIFEST_NAME
+        temp_path = self.backup_dir / f".{CHAIN_MANIFEST_NAME}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(chain, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, manifest_path)
+    
+    def _seal_chain(self) -> None:
+        """
+        Schließt die aktuelle Kette ab.
+        
+        Nach einer Wiederherstellung passt der Wasserstand der Kette nicht
+        mehr zur Änderungsverfolgung der Datenbank; das nächste inkrementelle
+        Backup beginnt daher mit einer neuen Basis.
+        """
+        chain = self._load_chain()
+        if chain is not None and not chain.get("sealed"):
+            chain["sealed"] = True
+            self._save_chain(chain)
+    
+    def get_backup_chain(self) -> Optional[Dict[str, Any]]:
+        """
+        Gibt das Manifest der aktuellen Backup-Kette zurück.
+        
+        Returns:
+            Manifest oder None, wenn noch keine Kette existiert
+        """
+        return self._load_chain()
+    
+    def compact_backup_chain(self, progress: Optional[ProgressCallback] = None) -> Optional[Path]:
+        """
+        Verdichtet die aktuelle Kette zu einer neuen Basis.
+        
+        Basis und Deltas werden offline zusammengeführt; die Live-Datenbank
+        wird dafür nicht gelesen. Die alten Dateien der Kette werden danach
+        gelöscht.
+        
+        Args:
+            progress: Optionaler Callback, der die aktuellen Metriken erhält
+            
+        Returns:
+            Pfad zur neuen Basis oder None bei Fehler bzw. ohne Kette
+        """
+        chain = self._load_chain()
+        if chain is None:
+            return None
+        if not chain["deltas"]:
+            return self.backup_dir / chain["base"]
+        
+        merged_path = self.backup_dir / f".{CHAIN_MANIFEST_NAME}.compact"
+        try:
+            key = self._get_backup_key() if chain["encrypted"] else None
+            self._materialize_chain(chain, chain["deltas"], merged_path, key,
+                                    BackupMetrics("restore"), progress)
             
-            # Verschlüssele die Daten
-            encrypted_data = security_manager.encrypt_data(data.decode('latin1'))
+            metrics = BackupMetrics("backup")
+            self.last_metrics = metrics
+            base_path = self._new_backup_path("full", STREAM_BACKUP_SUFFIX)
+            self._stream_file_to_backup(merged_path, base_path, key, metrics, progress)
+            metrics.finish()
+            self._report_progress(progress, metrics)
             
-            # Schreibe die verschlüsselten Daten zurück
-            with open(backup_path, 'w') as f:
-                f.write(encrypted_data)
+            old_files = [chain["base"]] + [delta["name"] for delta in chain["deltas"]]
+            self._save_chain(dict(
+                chain, base=base_path.name, base_watermark=chain["watermark"], deltas=[]
+            ))
+            for name in old_files:
+                (self.backup_dir / name).unlink(missing_ok=True)
             
-            logger.debug(f"Backup-Datei verschlüsselt: {backup_path}")
-            return True
+            logger.info(f"Backup-Kette mit {len(old_files) - 1} Deltas zu {base_path} verdichtet")
+            return base_path
             
         except Exception as e:
-            logger.error(f"Fehler beim Verschlüsseln der Backup-Datei {backup_path}: {e}")
-            return False
+            logger.error(f"Fehler beim Verdichten der Backup-Kette: {e}")
+            return None
+        finally:
+            if merged_path.exists():
+                merged_path.unlink()
     
-    def _compress_backup(self, backup_path: Path) -> Path:
+    def _materialize_chain(self, chain: Dict[str, Any], deltas: List[Dict[str, Any]],
+                           target_path: Path, key: Optional[bytes], metrics: BackupMetrics,
+                           progress: Optional[ProgressCallback]) -> None:
         """
-        Komprimiert eine Backup-Datei.
+        Stellt Basis und Deltas einer Kette in einer Datenbankdatei wieder her.
+        
+        Trigger werden während des Einspielens entfernt: Die Deltas enthalten
+        bereits den Endstand aller verfolgten Tabellen. Die nicht verfolgten
+        Statistiktabellen werden anschließend aus ``audio_files`` neu berechnet.
         
         Args:
-            backup_path: Pfad zur Backup-Datei
+            chain: Kette
+            deltas: Einzuspielende Deltas in Reihenfolge
+            target_path: Pfad der wiederhergestellten Datenbank
+            key: AES-Schlüssel oder None
+            metrics: Metriken der Wiederherstellung
+            progress: Optionaler Fortschritts-Callback
+        """
+        files = [chain["base"]] + [delta["name"] for delta in deltas]
+        metrics.total_bytes = sum((self.backup_dir / name).stat().st_size for name in files)
+        self._decode_stream_to_file(self.backup_dir / chain["base"], target_path, key, metrics, progress)
+        
+        connection = sqlite3.connect(str(target_path), isolation_level=None)
+        try:
+            connection.execute("PRAGMA synchronous=OFF")
+            triggers = connection.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"
+            ).fetchall()
+            connection.execute("BEGIN")
+            for name, _ in triggers:
+                connection.execute(f'DROP TRIGGER "{name}"')
+            
+            metrics.phase = "delta"
+            watermark = chain["base_watermark"]
+            for delta in deltas:
+                watermark = self._apply_delta(
+                    connection, self.backup_dir / delta["name"], chain["base"], watermark,
+                    key, metrics, progress
+                )
+            tables = {
+                name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            if deltas and set(UNTRACKED_TABLES) <= tables:
+                rebuild_statistics(connection)
+            
+            for _, sql in triggers:
+                connection.execute(sql)
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+    
+    def _apply_delta(self, connection: sqlite3.Connection, delta_path: Path, base: str,
+                     watermark: int, key: Optional[bytes], metrics: BackupMetrics,
+                     progress: Optional[ProgressCallback]) -> int:
+        """
+        Spielt eine Delta-Datei ein.
+        
+        Args:
+            connection: Verbindung zur wiederherzustellenden Datenbank
+            delta_path: Pfad zur Delta-Datei
+            base: Name der Basis der Kette
+            watermark: Wasserstand, an den das Delta anschließen muss
+            key: AES-Schlüssel oder None
+            metrics: Metriken der Wiederherstellung
+            progress: Optionaler Fortschritts-Callback
             
         Returns:
-            Pfad zur komprimierten Backup-Datei
+            Wasserstand nach dem Delta
+            
+        Raises:
+            DatabaseError: Wenn das Delta nicht zur Kette passt
         """
-        try:
-            compressed_path = backup_path.with_suffix(backup_path.suffix + '.gz')
+        with open(delta_path, "rb") as f:
+            records = _iter_delta_records(ChunkedBackupReader(f, key, self.chunk_size, metrics))
+            header = next(records, None)
+            if (header is None or header.get("type") != "delta" or header["base"] != base
+                    or header["from_seq"] != watermark):
+                raise DatabaseError(f"Delta {delta_path.name} passt nicht zur Backup-Kette")
             
-            # Komprimiere die Datei
-            with open(backup_path, 'rb') as f_in:
-                with gzip.open(compressed_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            statements = {}
+            for table, columns in header["tables"].items():
+                quoted_columns = ", ".join(f'"{column}"' for column in columns)
+                placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+                statements[table] = (
+                    f'INSERT OR REPLACE INTO "{table}" (rowid, {quoted_columns}) VALUES ({placeholders})',
+                    f'DELETE FROM "{table}" WHERE rowid = ?',
+                )
+            pending: Dict[Tuple[str, int], List[tuple]] = {}
             
-            logger.debug(f"Backup-Datei komprimiert: {compressed_path}")
-            return compressed_path
+            def flush(batch_key: Tuple[str, int]) -> None:
+                table, kind = batch_key
+                connection.executemany(statements[table][kind], pending.pop(batch_key))
             
-        except Exception as e:
-            logger.error(f"Fehler beim Komprimieren der Backup-Datei {backup_path}: {e}")
-            return backup_path
+            for record in records:
+                if "d" in record:
+                    batch_key, params = (record["t"], 1), (record["r"],)
+                else:
+                    batch_key = (record["t"], 0)
+                    params = (record["r"], *(_decode_value(v) for v in record["v"]))
+                batch = pending.setdefault(batch_key, [])
+                batch.append(params)
+                if len(batch) >= _DELTA_BATCH_SIZE:
+                    flush(batch_key)
+                    self._report_progress(progress, metrics)
+            for batch_key in list(pending):
+                flush(batch_key)
+        
+        return header["to_seq"]
     
-    def restore_backup(self, backup_path: Path, decrypt: bool = True) -> bool:
+    def restore_backup(self, backup_path: Path, decrypt: bool = True,
+                       progress: Optional[ProgressCallback] = None) -> bool:
         """
         Stellt ein Backup wieder her.
         
+        Streaming-Backups werden blockweise entschlüsselt und dekomprimiert
+        und anschließend über die Online-Backup-API in die geöffnete Datenbank
+        übernommen. Für ein inkrementelles Backup wird die Kette bis zu diesem
+        Stand eingespielt. Ältere Backups im gzip-Format werden weiterhin
+        unterstützt.
+        
         Args:
             backup_path: Pfad zur Backup-Datei
             decrypt: Ob die Backup-Datei entschlüsselt werden muss
+            progress: Optionaler Callback, der die aktuellen Metriken erhält
             
         Returns:
             True, wenn die Wiederherstellung erfolgreich war
@@ -207,6 +1034,14 @@ class DatabaseBackupManager:
                 logger.error(f"Backup-Datei {backup_path} nicht gefunden")
                 return False
             
+            if backup_path.suffix == DELTA_BACKUP_SUFFIX:
+                return self.restore_incremental_backup(backup_path, decrypt, progress)
+            if is_stream_backup(backup_path):
+                restored = self._restore_stream_backup(backup_path, decrypt, progress)
+                if restored:
+                    self._seal_chain()
+                return restored
+            
             # Dekomprimiere die Datei, wenn sie komprimiert ist
             if backup_path.suffix == '.gz':
                 decompressed_path = self._decompress_backup(backup_path)
@@ -228,6 +1063,7 @@ class DatabaseBackupManager:
             
             # Stelle die Datenbankverbindung wieder her
             db.connect()
+            self._seal_chain()
             
             logger.info(f"Backup wiederhergestellt: {backup_path}")
             return True
@@ -236,6 +1072,161 @@ class DatabaseBackupManager:
             logger.error(f"Fehler bei der Wiederherstellung des Backups {backup_path}: {e}")
             return False
     
+    def restore_incremental_backup(self, backup_path: Optional[Path] = None, decrypt: bool = True,
+                                   progress: Optional[ProgressCallback] = None) -> bool:
+        """
+        Stellt den Stand eines inkrementellen Backups wieder her.
+        
+        Basis und Deltas der aktuellen Kette werden in eine temporäre Datei
+        eingespielt und dann in einem Schritt übernommen.
+        
+        Args:
+            backup_path: Delta, bis zu dem eingespielt wird (Standard: jüngstes)
+            decrypt: Ob die Backups entschlüsselt werden müssen
+            progress: Optionaler Callback, der die aktuellen Metriken erhält
+            
+        Returns:
+            True, wenn die Wiederherstellung erfolgreich war
+        """
+        metrics = BackupMetrics("restore")
+        self.last_metrics = metrics
+        restore_path = None
+        try:
+            chain = self._load_chain()
+            if chain is None:
+                logger.error("Keine Backup-Kette vorhanden")
+                return False
+            
+            deltas = chain["deltas"]
+            if backup_path is not None:
+                names = [delta["name"] for delta in deltas]
+                if backup_path.name not in names:
+                    raise DatabaseError(f"{backup_path.name} gehört nicht zur aktuellen Backup-Kette")
+                deltas = deltas[:names.index(backup_path.name) + 1]
+            
+            db_path = self.database_path
+            restore_path = db_path.with_name(f".{db_path.name}.restore")
+            key = self._get_backup_key() if decrypt else None
+            self._materialize_chain(chain, deltas, restore_path, key, metrics, progress)
+            self._apply_restored_database(restore_path, metrics, progress)
+            # Zwischengespeicherte Leseergebnisse stammen vom alten Stand
+            write_generations.invalidate_all()
+            self._seal_chain()
+            
+            metrics.finish()
+            self._report_progress(progress, metrics)
+            logger.info(
+                f"Backup-Kette mit {len(deltas)} Deltas wiederhergestellt "
+                f"({metrics.elapsed_seconds:.2f}s)"
+            )
+            return True
+            
+        except Exception as e:
+            metrics.phase = "failed"
+            logger.error(f"Fehler bei der Wiederherstellung der Backup-Kette: {e}")
+            return False
+        finally:
+            if restore_path is not None and restore_path.exists():
+                restore_path.unlink()
+    
+    def _restore_stream_backup(self, backup_path: Path, decrypt: bool,
+                               progress: Optional[ProgressCallback]) -> bool:
+        """
+        Stellt ein Streaming-Backup wieder her.
+        
+        Args:
+            backup_path: Pfad zum Streaming-Backup
+            decrypt: Ob ein Schlüssel zum Entschlüsseln verwendet werden soll
+            progress: Optionaler Fortschritts-Callback
+            
+        Returns:
+            True, wenn die Wiederherstellung erfolgreich war
+        """
+        metrics = BackupMetrics("restore")
+        self.last_metrics = metrics
+        db_path = self.database_path
+        restore_path = db_path.with_name(f".{db_path.name}.restore")
+        try:
+            key = self._get_backup_key() if decrypt else None
+            metrics.total_bytes = backup_path.stat().st_size
+            self._decode_stream_to_file(backup_path, restore_path, key, metrics, progress)
+            self._apply_restored_database(restore_path, metrics, progress)
+            # Zwischengespeicherte Leseergebnisse stammen vom alten Stand
+            write_generations.invalidate_all()
+            
+            metrics.finish()
+            self._report_progress(progress, metrics)
+            logger.info(
+                f"Backup wiederhergestellt: {backup_path} "
+                f"({metrics.throughput_bytes_per_second / 1024 / 1024:.1f} MiB/s)"
+            )
+            return True
+            
+        except Exception as e:
+            metrics.phase = "failed"
+            logger.error(f"Fehler bei der Wiederherstellung des Backups {backup_path}: {e}")
+            return False
+        finally:
+            if restore_path.exists():
+                restore_path.unlink()
+    
+    def _decode_stream_to_file(self, backup_path: Path, target_path: Path, key: Optional[bytes],
+                               metrics: BackupMetrics, progress: Optional[ProgressCallback]) -> None:
+        """
+        Entschlüsselt und dekomprimiert ein Streaming-Backup in eine Datei.
+        
+        Args:
+            backup_path: Pfad zum Streaming-Backup
+            target_path: Pfad der entpackten Datenbankdatei
+            key: AES-Schlüssel oder None
+            metrics: Metriken der Wiederherstellung
+            progress: Optionaler Fortschritts-Callback
+        """
+        metrics.phase = "stream"
+        with open(backup_path, "rb") as source, open(target_path, "wb") as target:
+            for block in ChunkedBackupReader(source, key, self.chunk_size, metrics):
+                target.write(block)
+                self._report_progress(progress, metrics)
+    
+    def _apply_restored_database(self, restore_path: Path, metrics: BackupMetrics,
+                                 progress: Optional[ProgressCallback]) -> None:
+        """
+        Übernimmt eine wiederhergestellte Datei in die geöffnete Datenbank.
+        
+        Args:
+            restore_path: Pfad zur wiederhergestellten Datenbankdatei
+            metrics: Metriken der Wiederherstellung
+            progress: Optionaler Fortschritts-Callback
+            
+        Raises:
+            DatabaseError: Wenn die wiederhergestellte Datei beschädigt ist
+        """
+        def on_step(status: int, remaining: int, total: int) -> None:
+            metrics.pages_total = total
+            metrics.pages_copied = total - remaining
+            self._report_progress(progress, metrics)
+        
+        source = sqlite3.connect(str(restore_path))
+        try:
+            result = source.execute("PRAGMA quick_check").fetchone()[0]
+            if result != "ok":
+                raise DatabaseError(f"Wiederhergestellte Datenbank ist beschädigt: {result}")
+            
+            metrics.phase = "apply"
+            metrics.pages_total = metrics.pages_copied = 0
+            if self._uses_model_database():
+                if db.is_closed():
+                    db.connect()
+                source.backup(db.connection(), pages=self.pages_per_step, progress=on_step)
+            else:
+                target = self._connect_source(self.database_path)
+                try:
+                    source.backup(target, pages=self.pages_per_step, progress=on_step)
+                finally:
+                    target.close()
+        finally:
+            source.close()
+    
     def _decompress_backup(self, backup_path: Path) -> Optional[Path]:
         """
         Dekomprimiert eine Backup-Datei.
@@ -308,7 +1299,9 @@ class DatabaseBackupManager:
             
             # Durchsuche das Backup-Verzeichnis
             for backup_file in self.backup_dir.iterdir():
-                if backup_file.is_file():
+                # Temporäre Dateien laufender Backups beginnen mit einem Punkt
+                if (backup_file.is_file() and not backup_file.name.startswith(".")
+                        and backup_file.name != CHAIN_MANIFEST_NAME):
                     stat = backup_file.stat()
                     backups.append({
                         "name": backup_file.name,
@@ -354,8 +1347,15 @@ class DatabaseBackupManager:
             cutoff_date = datetime.now() - timedelta(days=self.retention_days)
             deleted_count = 0
             
+            # Dateien der aktuellen Kette werden für deren Wiederherstellung benötigt
+            protected = {CHAIN_MANIFEST_NAME}
+            chain = self._load_chain()
+            if chain is not None:
+                protected.add(chain["base"])
+                protected.update(delta["name"] for delta in chain["deltas"])
+            
             for backup_file in self.backup_dir.iterdir():
-                if backup_file.is_file():
+                if backup_file.is_file() and backup_file.name not in protected:
                     modified_time = datetime.fromtimestamp(backup_file.stat().st_mtime)
                     if modified_time < cutoff_date:
                         try:
@@ -434,6 +1434,8 @@ class DatabaseBackupManager:
             total_size = sum(backup["size_bytes"] for backup in backups)
             backup_count = len(backups)
             
+            chain = self._load_chain()
+            
             # Zähle verschiedene Backup-Typen
             backup_types = {}
             for backup in backups:
@@ -445,7 +1447,9 @@ class DatabaseBackupManager:
                 "total_size_bytes": total_size,
                 "backup_types": backup_types,
                 "retention_days": self.retention_days,
-                "next_scheduled_backup": None  # In einer echten Implementierung würden wir dies berechnen
+                "next_scheduled_backup": None,  # In einer echten Implementierung würden wir dies berechnen
+                "last_operation": self.last_metrics.to_dict() if self.last_metrics else None,
+                "chain_length": len(chain["deltas"]) if chain else 0
             }
             
         except Exception as e:
@@ -548,4 +1552,102 @@ def get_backup_statistics() -> Dict[str, Any]:
         return manager.get_backup_stats()
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Backup-Statistiken: {e}")
-        return {}
\ No newline at end of file
+        return {}
+
+def benchmark_incremental_backups(directory: str, rows: int = 20000, changed_rows: int = 200,
+                                  rounds: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Vergleicht Größe und Dauer inkrementeller und vollständiger Backups.
+    
+    Es wird eine eigene Datenbank mit ``rows`` Audiodateien angelegt. In
+    jeder Runde werden ``changed_rows`` Zeilen geändert, gelöscht oder neu
+    eingefügt und anschließend je ein vollständiges und ein inkrementelles
+    Backup erstellt. Zum Schluss werden beide Wiederherstellungswege gemessen.
+    
+    Args:
+        directory: Arbeitsverzeichnis
+        rows: Anzahl der Zeilen zu Beginn
+        changed_rows: Geänderte Zeilen pro Runde
+        rounds: Anzahl der Runden
+        
+    Returns:
+        Mittelwerte von Dauer und Größe pro Backup-Art
+    """
+    import random
+    from peewee import SqliteDatabase
+    from .database_statistics import ensure_statistics_tables
+    from .models import AudioFile, TelegramGroup
+    
+    work_dir = Path(directory)
+    db_path = work_dir / "benchmark.db"
+    database = SqliteDatabase(str(db_path), pragmas={"journal_mode": "wal"})
+    with database.bind_ctx([TelegramGroup, AudioFile]):
+        database.create_tables([TelegramGroup, AudioFile])
+    database.close()
+    
+    insert_sql = (
+        "INSERT INTO audio_files (file_id, file_name, title, file_size, status, downloaded_bytes, "
+        "checksum_verified, download_attempts, resume_offset, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, 'pending', 0, 0, 0, 0, datetime('now'), datetime('now'))"
+    )
+    rng = random.Random(42)
+    connection = sqlite3.connect(str(db_path), isolation_level=None)
+    connection.execute("BEGIN")
+    connection.executemany(insert_sql, (
+        (f"file_{i}", f"song_{i}.mp3", f"Titel {i} " + "x" * rng.randint(10, 80), rng.randint(1, 10 ** 7))
+        for i in range(rows)
+    ))
+    connection.execute("COMMIT")
+    ensure_statistics_tables(connection)
+    
+    manager = DatabaseBackupManager(
+        backup_dir=work_dir / "backups", encryption_key=b"benchmark", database_path=db_path,
+        max_chain_length=rounds + 1,
+    )
+    manager.create_incremental_backup()
+    
+    results = {kind: {"seconds": 0.0, "bytes": 0.0} for kind in ("full", "incremental")}
+    full_path = delta_path = None
+    next_id = rows
+    for _ in range(rounds):
+        connection.execute("BEGIN")
+        for _ in range(changed_rows):
+            action = rng.random()
+            row_id = rng.randint(1, next_id)
+            if action < 0.6:
+                connection.execute(
+                    "UPDATE audio_files SET status = 'completed', downloaded_bytes = file_size "
+                    "WHERE id = ?", (row_id,)
+                )
+            elif action < 0.8:
+                connection.execute("DELETE FROM audio_files WHERE id = ?", (row_id,))
+            else:
+                connection.execute(insert_sql, (f"file_{next_id}", f"song_{next_id}.mp3", "neu", 1))
+                next_id += 1
+        connection.execute("COMMIT")
+        
+        for kind, create in (("full", manager.create_full_backup),
+                             ("incremental", manager.create_incremental_backup)):
+            start = time.perf_counter()
+            path = create()
+            results[kind]["seconds"] += (time.perf_counter() - start) / rounds
+            results[kind]["bytes"] += path.stat().st_size / rounds
+            if kind == "full":
+                full_path = path
+            else:
+                delta_path = path
+    connection.close()
+    
+    for kind, path in (("full", full_path), ("incremental", delta_path)):
+        start = time.perf_counter()
+        if not manager.restore_backup(path):
+            raise DatabaseError(f"Wiederherstellung ({kind}) im Benchmark fehlgeschlagen")
+        results[kind]["restore_seconds"] = time.perf_counter() - start
+    
+    logger.info(
+        "Backup-Benchmark: vollständig {:.0f} Bytes / {:.3f}s, inkrementell {:.0f} Bytes / {:.3f}s".format(
+            results["full"]["bytes"], results["full"]["seconds"],
+            results["incremental"]["bytes"], results["incremental"]["seconds"],
+        )
+    )
+    return results
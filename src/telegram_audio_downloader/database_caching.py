@@ -8,11 +8,13 @@ Ebenen:
 - Objekt-Cache
 """
 
+import re
 import time
 import hashlib
 import json
 import threading
-from typing import Optional, Dict, Any, List, Callable
+from functools import wraps
+from typing import Optional, Dict, Any, List, Callable, Sequence
 from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -23,11 +25,49 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
-from .models import db
+from .models import db, write_generations
+from .database_scaling import get_shard_databases
 from .logging_config import get_logger
+from .cache_governor import OrderedCacheAdapter, register_cache
+from .utils.tinylfu_cache import WTinyLFUCache, create_cache_core
 
 logger = get_logger(__name__)
 
+# Findet die Tabellen, aus denen eine SQL-Abfrage liest
+_QUERY_TABLES_RE = re.compile(r'\b(?:FROM|JOIN)\s+["`]?(\w+)', re.IGNORECASE)
+
+
+def extract_query_tables(query: str) -> List[str]:
+    """
+    Ermittelt die Tabellen, die eine SQL-Abfrage liest.
+    
+    Args:
+        query: SQL-Abfrage
+        
+    Returns:
+        Sortierte Liste der Tabellennamen
+    """
+    return sorted({table.lower() for table in _QUERY_TABLES_RE.findall(query)})
+
+
+def get_generation_token(tables: Optional[Sequence[str]] = None) -> str:
+    """
+    Gibt die aktuellen Schreib-Generationen als Teil eines Cache-Schlüssels zurück.
+    
+    Commits anderer Prozesse werden in der Hauptdatenbank und bei aktivem
+    Sharding auch in den Shards erkannt.
+    
+    Args:
+        tables: Betroffene Tabellen (None für alle Tabellen)
+        
+    Returns:
+        Generations-Token
+    """
+    write_generations.sync_external(db)
+    for shard_database in get_shard_databases():
+        write_generations.sync_external(shard_database)
+    return ".".join(str(generation) for generation in write_generations.snapshot(tables))
+
 
 @dataclass
 class CacheEntry:
@@ -41,15 +81,24 @@ class CacheEntry:
 
 
 class InMemoryCache:
-    """In-Memory-Cache mit LRU-Eviction."""
+    """
+    In-Memory-Cache mit LRU-Eviction.
+    
+    Mit policy="tinylfu" oder max_bytes übernimmt ein WTinyLFUCache die
+    Speicherung; die Statistiken enthalten dann die Namensräume "query" und
+    "object" der spezialisierten Caches getrennt.
+    """
     
-    def __init__(self, max_size: int = 1000, default_ttl_seconds: int = 300):
+    def __init__(self, max_size: int = 1000, default_ttl_seconds: int = 300,
+                 max_bytes: Optional[int] = None, policy: str = "lru"):
         """
         Initialisiert den InMemoryCache.
         
         Args:
             max_size: Maximale Anzahl von Einträgen
             default_ttl_seconds: Standard-TTL in Sekunden
+            max_bytes: Byte-Budget statt max_size (optional)
+            policy: "lru" oder "tinylfu"
         """
         self.max_size = max_size
         self.default_ttl_seconds = default_ttl_seconds
@@ -57,8 +106,11 @@ class InMemoryCache:
         self.hits = 0
         self.misses = 0
         self._lock = threading.RLock()
+        self.core: Optional[WTinyLFUCache] = create_cache_core(
+            max_size, max_bytes, policy, default_ttl_seconds if default_ttl_seconds > 0 else None
+        )
         
-        logger.info(f"InMemoryCache initialisiert mit max. {max_size} Einträgen")
+        logger.info(f"InMemoryCache initialisiert mit max. {max_size} Einträgen ({policy})")
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -70,6 +122,8 @@ class InMemoryCache:
         Returns:
             Wert oder None, wenn nicht gefunden
         """
+        if self.core is not None:
+            return self.core.get(key)
         with self._lock:
             if key in self.cache:
                 entry = self.cache[key]
@@ -99,6 +153,9 @@ class InMemoryCache:
             value: Wert
             ttl_seconds: TTL in Sekunden (None für Standard-TTL)
         """
+        if self.core is not None:
+            self.core.put(key, value, ttl_seconds)
+            return
         with self._lock:
             # Entferne den Eintrag, falls er bereits existiert
             if key in self.cache:
@@ -134,6 +191,8 @@ class InMemoryCache:
         Returns:
             True, wenn der Eintrag gelöscht wurde
         """
+        if self.core is not None:
+            return self.core.delete(key)
         with self._lock:
             if key in self.cache:
                 del self.cache[key]
@@ -142,6 +201,10 @@ class InMemoryCache:
     
     def clear(self) -> None:
         """Leert den Cache."""
+        if self.core is not None:
+            self.core.clear()
+            self.core.reset_stats()
+            return
         with self._lock:
             self.cache.clear()
             self.hits = 0
@@ -154,6 +217,23 @@ class InMemoryCache:
         Returns:
             Dictionary mit Cache-Statistiken
         """
+        if self.core is not None:
+            core_stats = self.core.get_stats()
+            return {
+                "size": core_stats["entries"],
+                "max_size": self.max_size,
+                "hits": core_stats["hits"],
+                "misses": core_stats["misses"],
+                "total_requests": core_stats["hits"] + core_stats["misses"],
+                "hit_rate_percent": core_stats["hit_rate_percent"],
+                "default_ttl_seconds": self.default_ttl_seconds,
+                "policy": core_stats["policy"],
+                "weighted_size": core_stats["weighted_size"],
+                "maximum_weight": core_stats["maximum_weight"],
+                "evictions": core_stats["evictions"],
+                "rejections": core_stats["rejections"],
+                "namespaces": core_stats["namespaces"],
+            }
         with self._lock:
             total_requests = self.hits + self.misses
             hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
@@ -175,6 +255,8 @@ class InMemoryCache:
         Returns:
             Anzahl der bereinigten Einträge
         """
+        if self.core is not None:
+            return self.core.cleanup_expired()
         with self._lock:
             current_time = datetime.now()
             expired_keys = [
@@ -189,6 +271,22 @@ class InMemoryCache:
                 logger.debug(f"{len(expired_keys)} abgelaufene Einträge bereinigt")
             
             return len(expired_keys)
+    
+    def resize(self, max_size: int) -> None:
+        """
+        Ändert die maximale Anzahl von Einträgen (z. B. durch den Cache-Governor).
+        
+        Args:
+            max_size: Neue maximale Anzahl von Einträgen
+        """
+        with self._lock:
+            self.max_size = max(1, max_size)
+            if self.core is not None:
+                if self.core.weigher is None:
+                    self.core.resize(self.max_size)
+                return
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
 
 
 class RedisCache:
@@ -383,6 +481,9 @@ class QueryResultCache:
         """
         Generiert einen Cache-Schlüssel für eine Abfrage.
         
+        Der Schlüssel enthält die Schreib-Generationen der gelesenen Tabellen,
+        sodass jeder Schreibzugriff auf diese Tabellen ältere Ergebnisse ungültig macht.
+        
         Args:
             query: SQL-Abfrage
             params: Abfrageparameter
@@ -390,8 +491,9 @@ class QueryResultCache:
         Returns:
             Cache-Schlüssel
         """
-        # Kombiniere Abfrage und Parameter
-        key_data = f"{query}:{params}"
+        # Kombiniere Abfrage, Parameter und Schreib-Generationen
+        generation = get_generation_token(extract_query_tables(query))
+        key_data = f"{query}:{params}:{generation}"
         # Erstelle SHA-256-Hash als Schlüssel (sicherer als MD5)
         return self.query_cache_prefix + hashlib.sha256(key_data.encode()).hexdigest()
     
@@ -495,6 +597,23 @@ class ObjectCache:
         
         logger.info("ObjectCache initialisiert")
     
+    def _generate_cache_key(self, object_type: str, object_id: str) -> str:
+        """
+        Generiert einen Cache-Schlüssel für ein Objekt.
+        
+        Der Objekttyp entspricht dem Tabellennamen; dessen Schreib-Generation
+        ist Teil des Schlüssels.
+        
+        Args:
+            object_type: Typ des Objekts
+            object_id: ID des Objekts
+            
+        Returns:
+            Cache-Schlüssel
+        """
+        generation = get_generation_token([object_type])
+        return f"{self.object_cache_prefix}{object_type}:{object_id}@{generation}"
+    
     def get_object(self, object_type: str, object_id: str) -> Optional[Any]:
         """
         Holt ein Objekt aus dem Cache.
@@ -506,7 +625,7 @@ class ObjectCache:
         Returns:
             Objekt oder None, wenn nicht im Cache
         """
-        cache_key = f"{self.object_cache_prefix}{object_type}:{object_id}"
+        cache_key = self._generate_cache_key(object_type, object_id)
         
         # Prüfe zuerst den Memory-Cache
         result = self.memory_cache.get(cache_key)
@@ -537,7 +656,7 @@ class ObjectCache:
             obj: Objekt
             ttl_seconds: TTL in Sekunden
         """
-        cache_key = f"{self.object_cache_prefix}{object_type}:{object_id}"
+        cache_key = self._generate_cache_key(object_type, object_id)
         
         # Speichere im Memory-Cache
         self.memory_cache.set(cache_key, obj, ttl_seconds)
@@ -556,7 +675,7 @@ class ObjectCache:
             object_type: Typ des Objekts
             object_id: ID des Objekts
         """
-        cache_key = f"{self.object_cache_prefix}{object_type}:{object_id}"
+        cache_key = self._generate_cache_key(object_type, object_id)
         
         # Lösche aus dem Memory-Cache
         self.memory_cache.delete(cache_key)
@@ -590,6 +709,7 @@ class DatabaseCacheManager:
         """
         # Initialisiere die Caches
         self.memory_cache = InMemoryCache(max_size=1000, default_ttl_seconds=300)
+        register_cache("database_memory_cache", OrderedCacheAdapter(self.memory_cache))
         
         self.redis_cache = None
         if redis_config and REDIS_AVAILABLE:
@@ -602,6 +722,10 @@ class DatabaseCacheManager:
         self.query_cache = QueryResultCache(self.memory_cache, self.redis_cache)
         self.object_cache = ObjectCache(self.memory_cache, self.redis_cache)
         
+        # Treffer und Fehlschläge pro gecachter Abfragefunktion
+        self.query_function_stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        
         # Hintergrund-Task für Cache-Bereinigung
         self.cleanup_thread = None
         self.cleanup_interval = 60  # Sekunden
@@ -622,6 +746,18 @@ class DatabaseCacheManager:
         self.cleanup_thread = threading.Thread(target=cleanup_loop, daemon=True)
         self.cleanup_thread.start()
     
+    def record_query_lookup(self, name: str, hit: bool) -> None:
+        """
+        Erfasst einen Cache-Zugriff einer gecachten Abfragefunktion.
+        
+        Args:
+            name: Name der Abfragefunktion
+            hit: Ob der Zugriff ein Treffer war
+        """
+        with self._stats_lock:
+            stats = self.query_function_stats.setdefault(name, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """
         Gibt Statistiken für alle Caches zurück.
@@ -629,10 +765,20 @@ class DatabaseCacheManager:
         Returns:
             Dictionary mit Cache-Statistiken
         """
+        with self._stats_lock:
+            functions = {}
+            for name, counts in self.query_function_stats.items():
+                total = counts["hits"] + counts["misses"]
+                functions[name] = dict(
+                    counts, hit_rate_percent=round(counts["hits"] / total * 100, 2) if total else 0
+                )
+        
         stats = {
             "memory_cache": self.memory_cache.get_stats(),
             "query_cache": {
-                "enabled": True
+                "enabled": True,
+                "functions": functions,
+                "write_generations": write_generations.get_stats()
             },
             "object_cache": {
                 "enabled": True
@@ -652,6 +798,8 @@ class DatabaseCacheManager:
     def clear_all_caches(self) -> None:
         """Leert alle Caches."""
         self.memory_cache.clear()
+        with self._stats_lock:
+            self.query_function_stats.clear()
         if self.redis_cache:
             self.redis_cache.clear()
         logger.info("Alle Caches geleert")
@@ -674,17 +822,25 @@ def get_cache_manager() -> DatabaseCacheManager:
     return _cache_manager
 
 
-def cache_database_query(ttl_seconds: Optional[int] = None):
+def cache_database_query(ttl_seconds: Optional[int] = None,
+                         tables: Optional[Sequence[str]] = None):
     """
     Dekorator zum Cachen von Datenbankabfragen.
     
+    Der Cache-Schlüssel enthält die Schreib-Generationen der angegebenen
+    Tabellen. Ein Schreibzugriff macht zwischengespeicherte Ergebnisse damit
+    sofort ungültig; die TTL dient nur noch als Obergrenze.
+    
     Args:
         ttl_seconds: TTL in Sekunden (None für Standard-TTL)
+        tables: Gelesene Tabellen (None für alle Tabellen)
     """
     def decorator(func: Callable):
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            # Erstelle Cache-Schlüssel aus Funktionsname und Argumenten
-            key_data = f"{func.__name__}:{args}:{kwargs}"
+            # Erstelle Cache-Schlüssel aus Funktionsname, Argumenten und Schreib-Generationen
+            generation = get_generation_token(tables)
+            key_data = f"{func.__module__}.{func.__qualname__}:{args}:{kwargs}:{generation}"
             cache_key = hashlib.sha256(key_data.encode()).hexdigest()
             
             # Hole Cache-Manager
@@ -693,13 +849,16 @@ def cache_database_query(ttl_seconds: Optional[int] = None):
             # Prüfe, ob Ergebnis im Cache ist
             cached_result = cache_manager.memory_cache.get(cache_key)
             if cached_result is not None:
+                cache_manager.record_query_lookup(func.__qualname__, hit=True)
                 logger.debug(f"Ergebnis aus Cache geholt für {func.__name__}")
                 return cached_result
             
+            cache_manager.record_query_lookup(func.__qualname__, hit=False)
+            
             # Führe Funktion aus
             result = func(*args, **kwargs)
             
-            # Speichere Ergebnis im Cache
+            # Speichere Ergebnis unter dem vor der Ausführung berechneten Schlüssel
             cache_manager.memory_cache.set(cache_key, result, ttl_seconds)
             logger.debug(f"Ergebnis im Cache gespeichert für {func.__name__}")
             
@@ -0,0 +1,368 @@
+"""
+Änderungsverfolgung für inkrementelle Backups im Telegram Audio Downloader.
+
+SQLite-Trigger protokollieren für jede Tabelle, welche Zeilen (rowid) seit
+einem Wasserstand geändert oder gelöscht wurden. Jeder Schreibzugriff erhöht
+eine fortlaufende Sequenznummer; das Protokoll enthält pro Zeile nur die
+jüngste Änderung und wächst daher höchstens mit der Anzahl der Zeilen.
+Anders als ``updated_at`` werden so auch Massen-Updates, Löschungen und
+Zugriffe anderer Prozesse erfasst.
+
+Neben den Backups können weitere Verbraucher (z. B. die inkrementelle
+Validierung) einen eigenen Wasserstand hinterlegen; das Protokoll wird nur
+bis zum kleinsten Wasserstand aller Verbraucher bereinigt.
+
+Die per Trigger gepflegten Statistiktabellen werden nicht verfolgt: Sie
+ändern sich mit jeder Zeile von ``audio_files`` und lassen sich daraus
+jederzeit neu berechnen.
+"""
+
+import hashlib
+import sqlite3
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+from .database_statistics import GROUP_STATISTICS_TABLE, STATUS_STATISTICS_TABLE
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CHANGE_LOG_TABLE = "backup_changes"
+CHANGE_SEQUENCE_TABLE = "backup_change_sequence"
+CHANGE_TRIGGER_PREFIX = "backup_changes_"
+CHANGE_CONSUMER_TABLE = "backup_change_consumers"
+
+# Abgeleitete Tabellen, deren Änderungen nicht protokolliert werden
+UNTRACKED_TABLES = (STATUS_STATISTICS_TABLE, GROUP_STATISTICS_TABLE)
+
+_TABLES_SQL = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_SEQUENCE_TABLE} (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        seq INTEGER NOT NULL
+    )
+    """,
+    f"INSERT OR IGNORE INTO {CHANGE_SEQUENCE_TABLE} (id, seq) VALUES (1, 0)",
+    f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        PRIMARY KEY (table_name, row_id)
+    ) WITHOUT ROWID
+    """,
+    f"CREATE INDEX IF NOT EXISTS {CHANGE_LOG_TABLE}_seq ON {CHANGE_LOG_TABLE} (seq)",
+    f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_CONSUMER_TABLE} (
+        name TEXT PRIMARY KEY,
+        seq INTEGER NOT NULL
+    )
+    """,
+)
+
+# Protokolliert eine Zeile mit der nächsten Sequenznummer
+_RECORD_CHANGE_SQL = """
+    UPDATE {sequence} SET seq = seq + 1 WHERE {condition};
+    INSERT INTO {log} (table_name, row_id, seq)
+    SELECT {table_literal}, {row}.rowid, seq FROM {sequence} WHERE {condition}
+    ON CONFLICT (table_name, row_id) DO UPDATE SET seq = excluded.seq;
+"""
+
+
+def _quote_identifier(name: str) -> str:
+    """Setzt einen Bezeichner in doppelte Anführungszeichen."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    """Setzt einen Text in einfache Anführungszeichen."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _is_tracking_object(name: str) -> bool:
+    """Prüft, ob ein Schemaobjekt zur Änderungsverfolgung gehört."""
+    return (
+        name in (CHANGE_LOG_TABLE, CHANGE_SEQUENCE_TABLE, CHANGE_CONSUMER_TABLE)
+        or name.startswith(CHANGE_TRIGGER_PREFIX)
+    )
+
+
+def _record_sql(table: str, row: str, condition: str = "1") -> str:
+    """Erzeugt die Anweisungen zum Protokollieren einer Zeile."""
+    return _RECORD_CHANGE_SQL.format(
+        sequence=CHANGE_SEQUENCE_TABLE,
+        log=CHANGE_LOG_TABLE,
+        table_literal=_quote_literal(table),
+        row=row,
+        condition=condition,
+    )
+
+
+def _triggers_sql(table: str) -> List[Tuple[str, str]]:
+    """
+    Erzeugt die Trigger für eine Tabelle.
+
+    Args:
+        table: Tabellenname
+
+    Returns:
+        Liste von (Triggername, CREATE TRIGGER-Anweisung)
+    """
+    quoted = _quote_identifier(table)
+    triggers = []
+    for event, body in (
+        ("insert", _record_sql(table, "NEW")),
+        ("delete", _record_sql(table, "OLD")),
+        # Ändert sich die rowid, ist auch die alte Zeile betroffen
+        ("update", _record_sql(table, "NEW") + _record_sql(table, "OLD", "OLD.rowid IS NOT NEW.rowid")),
+    ):
+        name = f"{CHANGE_TRIGGER_PREFIX}{table}_{event}"
+        triggers.append((name, f"""
+            CREATE TRIGGER IF NOT EXISTS {_quote_identifier(name)}
+            AFTER {event.upper()} ON {quoted}
+            BEGIN
+                {body}
+            END
+        """))
+    return triggers
+
+
+def get_trackable_tables(connection: sqlite3.Connection) -> List[str]:
+    """
+    Gibt alle Tabellen zurück, deren Änderungen verfolgt werden.
+
+    Args:
+        connection: SQLite-Verbindung
+
+    Returns:
+        Sortierte Liste der Tabellennamen
+    """
+    return [
+        row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+        if not _is_tracking_object(row[0]) and row[0] not in UNTRACKED_TABLES
+    ]
+
+
+def ensure_change_tracking(connection: sqlite3.Connection) -> Set[str]:
+    """
+    Richtet Protokolltabellen und Trigger für alle Tabellen ein.
+
+    Args:
+        connection: SQLite-Verbindung
+
+    Returns:
+        Tabellen, die bisher nicht verfolgt wurden. Deren frühere
+        Änderungen fehlen im Protokoll.
+    """
+    existing = {
+        row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    }
+    missing = [
+        (table, name, sql)
+        for table in get_trackable_tables(connection)
+        for name, sql in _triggers_sql(table)
+        if name not in existing
+    ]
+    # Trigger früherer Versionen auf nicht verfolgten Tabellen
+    obsolete = [
+        name for table in UNTRACKED_TABLES for name, _ in _triggers_sql(table) if name in existing
+    ]
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if not missing and not obsolete and {CHANGE_LOG_TABLE, CHANGE_CONSUMER_TABLE} <= tables:
+        return set()
+
+    connection.execute("SAVEPOINT change_tracking_setup")
+    try:
+        for statement in _TABLES_SQL:
+            connection.execute(statement)
+        for _, _, sql in missing:
+            connection.execute(sql)
+        for name in obsolete:
+            connection.execute(f"DROP TRIGGER IF EXISTS {_quote_identifier(name)}")
+        if obsolete:
+            placeholders = ", ".join("?" for _ in UNTRACKED_TABLES)
+            connection.execute(
+                f"DELETE FROM {CHANGE_LOG_TABLE} WHERE table_name IN ({placeholders})", UNTRACKED_TABLES
+            )
+    except Exception:
+        connection.execute("ROLLBACK TO SAVEPOINT change_tracking_setup")
+        connection.execute("RELEASE SAVEPOINT change_tracking_setup")
+        raise
+    connection.execute("RELEASE SAVEPOINT change_tracking_setup")
+
+    new_tables = {table for table, _, _ in missing}
+    if new_tables:
+        logger.info(f"Änderungsverfolgung eingerichtet für: {', '.join(sorted(new_tables))}")
+    return new_tables
+
+
+def get_change_sequence(connection: sqlite3.Connection) -> int:
+    """
+    Gibt die aktuelle Sequenznummer zurück.
+
+    Args:
+        connection: SQLite-Verbindung
+
+    Returns:
+        Sequenznummer der letzten Änderung oder 0 ohne Änderungsverfolgung
+    """
+    try:
+        row = connection.execute(f"SELECT seq FROM {CHANGE_SEQUENCE_TABLE} WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+def get_table_columns(connection: sqlite3.Connection, table: str) -> List[str]:
+    """
+    Gibt die Spaltennamen einer Tabelle zurück.
+
+    Args:
+        connection: SQLite-Verbindung
+        table: Tabellenname
+
+    Returns:
+        Spaltennamen in Tabellenreihenfolge
+    """
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({_quote_identifier(table)})")]
+
+
+def get_changed_tables(connection: sqlite3.Connection, after_seq: int, upto_seq: int) -> List[str]:
+    """
+    Gibt die Tabellen mit Änderungen in einem Sequenzbereich zurück.
+
+    Args:
+        connection: SQLite-Verbindung
+        after_seq: Wasserstand (exklusiv)
+        upto_seq: Obergrenze (inklusiv)
+
+    Returns:
+        Sortierte Liste der Tabellennamen
+    """
+    return [
+        row[0] for row in connection.execute(
+            f"SELECT DISTINCT table_name FROM {CHANGE_LOG_TABLE} "
+            "WHERE seq > ? AND seq <= ? ORDER BY table_name",
+            (after_seq, upto_seq),
+        )
+    ]
+
+
+def iter_changes(connection: sqlite3.Connection, table: str, columns: List[str],
+                 after_seq: int, upto_seq: int) -> Iterator[Tuple[int, Optional[Tuple[Any, ...]]]]:
+    """
+    Liefert die geänderten Zeilen einer Tabelle.
+
+    Args:
+        connection: SQLite-Verbindung
+        table: Tabellenname
+        columns: Spalten, deren Werte geliefert werden
+        after_seq: Wasserstand (exklusiv)
+        upto_seq: Obergrenze (inklusiv)
+
+    Yields:
+        (rowid, Werte) für vorhandene Zeilen und (rowid, None) für gelöschte
+    """
+    column_list = ", ".join(f"t.{_quote_identifier(column)}" for column in columns)
+    cursor = connection.execute(
+        f"SELECT c.row_id, t.rowid IS NOT NULL, {column_list} "
+        f"FROM {CHANGE_LOG_TABLE} c LEFT JOIN {_quote_identifier(table)} t ON t.rowid = c.row_id "
+        "WHERE c.table_name = ? AND c.seq > ? AND c.seq <= ? ORDER BY c.row_id",
+        (table, after_seq, upto_seq),
+    )
+    for row in cursor:
+        yield row[0], (row[2:] if row[1] else None)
+
+
+def get_consumer_watermark(connection: sqlite3.Connection, consumer: str) -> Optional[int]:
+    """
+    Gibt den Wasserstand eines Verbrauchers zurück.
+
+    Args:
+        connection: SQLite-Verbindung
+        consumer: Name des Verbrauchers
+
+    Returns:
+        Zuletzt verarbeitete Sequenznummer oder None
+    """
+    try:
+        row = connection.execute(
+            f"SELECT seq FROM {CHANGE_CONSUMER_TABLE} WHERE name = ?", (consumer,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def set_consumer_watermark(connection: sqlite3.Connection, consumer: str, seq: int) -> None:
+    """
+    Speichert den Wasserstand eines Verbrauchers.
+
+    Args:
+        connection: SQLite-Verbindung
+        consumer: Name des Verbrauchers
+        seq: Höchste verarbeitete Sequenznummer
+    """
+    connection.execute(
+        f"INSERT INTO {CHANGE_CONSUMER_TABLE} (name, seq) VALUES (?, ?) "
+        "ON CONFLICT (name) DO UPDATE SET seq = excluded.seq",
+        (consumer, seq),
+    )
+
+
+def remove_consumer_watermark(connection: sqlite3.Connection, consumer: str) -> None:
+    """
+    Entfernt den Wasserstand eines Verbrauchers.
+
+    Args:
+        connection: SQLite-Verbindung
+        consumer: Name des Verbrauchers
+    """
+    try:
+        connection.execute(f"DELETE FROM {CHANGE_CONSUMER_TABLE} WHERE name = ?", (consumer,))
+    except sqlite3.OperationalError:
+        pass
+
+
+def prune_changes(connection: sqlite3.Connection, upto_seq: int) -> int:
+    """
+    Entfernt Protokolleinträge bis zu einem gesicherten Wasserstand.
+
+    Einträge, die ein Verbraucher noch nicht verarbeitet hat, bleiben
+    erhalten.
+
+    Args:
+        connection: SQLite-Verbindung
+        upto_seq: Höchste gesicherte Sequenznummer
+
+    Returns:
+        Anzahl der entfernten Einträge
+    """
+    try:
+        row = connection.execute(f"SELECT MIN(seq) FROM {CHANGE_CONSUMER_TABLE}").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row and row[0] is not None:
+        upto_seq = min(upto_seq, row[0])
+    cursor = connection.execute(f"DELETE FROM {CHANGE_LOG_TABLE} WHERE seq <= ?", (upto_seq,))
+    return cursor.rowcount
+
+
+def schema_fingerprint(connection: sqlite3.Connection) -> str:
+    """
+    Berechnet einen Fingerabdruck des Schemas ohne die Änderungsverfolgung.
+
+    Args:
+        connection: SQLite-Verbindung
+
+    Returns:
+        SHA-256-Hash über alle Schemaobjekte
+    """
+    digest = hashlib.sha256()
+    for kind, name, sql in connection.execute(
+            "SELECT type, name, sql FROM sqlite_master ORDER BY type, name"):
+        if not _is_tracking_object(name):
+            digest.update(f"{kind}\0{name}\0{sql or ''}\0".encode("utf-8"))
+    return digest.hexdigest()
@@ -7,12 +7,22 @@ Optimiert die Datenbankperformance durch strategische Indizierung:
 - AudioFile.group (Fremdschlüssel)
 - TelegramGroup.group_id (eindeutig)
 - AudioFile.downloaded_at (Sortierung/Filterung)
+- AudioFile.(status, id) (Keyset-Paginierung)
+
+Zusätzlich leitet der IndexAdvisor aus der tatsächlichen Abfragelast
+(Fingerabdrücke des Abfrage-Profilings) zusammengesetzte und abdeckende
+Indizes ab und schätzt deren Nutzen per EXPLAIN QUERY PLAN.
 """
 
-from typing import List
+import math
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from peewee import OperationalError
 from playhouse.migrate import SqliteMigrator, migrate
 
+from .database_monitoring import DatabasePerformanceMonitor, get_performance_monitor
 from .models import AudioFile, TelegramGroup, db
 from .logging_config import get_logger
 
@@ -154,6 +164,9 @@ class DatabaseIndexer:
         self.create_composite_index("audio_files", ["status", "downloaded_at"])
         self.create_composite_index("audio_files", ["group_id", "downloaded_at"])
         
+        # Index für Keyset-Paginierung über die id mit Statusfilter
+        self.create_composite_index("audio_files", ["status", "id"])
+        
         logger.info("Datenbank-Optimierung abgeschlossen")
     
     def get_index_statistics(self) -> dict:
@@ -215,6 +228,703 @@ class DatabaseIndexer:
             return False
 
 
+# Anweisungstypen, für die Indizes vorgeschlagen werden
+_ADVISABLE_STATEMENTS = ("SELECT", "UPDATE", "DELETE")
+
+# Wörter, die nach einem Tabellennamen folgen können, aber kein Alias sind
+_NON_ALIAS_KEYWORDS = {
+    "WHERE", "ON", "JOIN", "LEFT", "INNER", "OUTER", "CROSS", "NATURAL", "ORDER",
+    "GROUP", "LIMIT", "SET", "USING", "HAVING", "WINDOW", "INDEXED", "NOT",
+}
+
+_IDENTIFIER = r'"?(\w+)"?'
+_TABLE_REF_RE = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE)\s+{_IDENTIFIER}(?:\s+(?:AS\s+)?{_IDENTIFIER})?", re.I
+)
+_COLUMN_TOKEN_RE = re.compile(rf"(?:{_IDENTIFIER}\.)?{_IDENTIFIER}")
+_PREDICATE_RE = re.compile(
+    rf"(?:{_IDENTIFIER}\.)?{_IDENTIFIER}\s*"
+    r"(==|=|<=|>=|<(?![>=])|>|\bIN\b|\bIS\b(?!\s+NOT\b)|\bBETWEEN\b)",
+    re.I,
+)
+_ORDER_TERM_RE = re.compile(rf"^\s*(?:{_IDENTIFIER}\.)?{_IDENTIFIER}\s*(ASC|DESC)?\s*$", re.I)
+_SELECT_ITEM_RE = re.compile(rf"^\s*(?:{_IDENTIFIER}\.)?{_IDENTIFIER}(?:\s+AS\s+\S+)?\s*$", re.I)
+_CONSTANT_ITEM_RE = re.compile(
+    r"^\s*(?:\?|COUNT\s*\(\s*(?:\*|\?|1|\.\.\.)\s*\))(?:\s+AS\s+\S+)?\s*$", re.I
+)
+# Peewees count() umschließt die eigentliche Abfrage mit einer Unterabfrage
+_WRAPPED_COUNT_RE = re.compile(
+    r'^\s*SELECT\s+COUNT\s*\([^)]*\)\s+FROM\s+\((SELECT\b.*)\)\s+AS\s+"?\w+"?(?:\s+LIMIT\s+\?)?\s*$',
+    re.I | re.S,
+)
+_WHERE_END = r"(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bRETURNING\b|$)"
+_WHERE_RE = re.compile(rf"\bWHERE\b(.*?){_WHERE_END}", re.I | re.S)
+_FROM_RE = re.compile(rf"\bFROM\b(.*?){_WHERE_END}", re.I | re.S)
+_GROUP_BY_RE = re.compile(r"\bGROUP\s+BY\b(.*?)(?=\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|$)", re.I | re.S)
+_ORDER_BY_RE = re.compile(r"\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|\bOFFSET\b|$)", re.I | re.S)
+_SELECT_LIST_RE = re.compile(r"^\s*SELECT\s+(?:DISTINCT\s+)?(.*?)\bFROM\b", re.I | re.S)
+
+# Zeilen von EXPLAIN QUERY PLAN (SQLite >= 3.24)
+_PLAN_ACCESS_RE = re.compile(
+    r"^(SCAN|SEARCH) (\S+)"
+    r"(?: USING (COVERING INDEX|INDEX|INTEGER PRIMARY KEY|PRIMARY KEY)(?: ([^\s(]\S*))?)?"
+    r"(?: \((.*)\))?"
+)
+_PLAN_CONDITION_RE = re.compile(r"(\w+)\s*(=|<=|>=|<|>)")
+_TEMP_BTREE_RE = re.compile(r"^USE TEMP B-TREE FOR (.+)$")
+
+# Sortieren im Speicher ist je Zeile günstiger als ein Seitenzugriff
+_SORT_COST_FACTOR = 0.25
+
+
+@dataclass
+class _ParsedStatement:
+    """Aus einem Fingerabdruck gelesene Tabellen- und Spaltenbezüge."""
+    sql: str
+    statement_type: str
+    tables: Dict[str, str] = field(default_factory=dict)
+    equality: Dict[str, List[str]] = field(default_factory=dict)
+    ranges: Dict[str, List[str]] = field(default_factory=dict)
+    order_by: List[Tuple[str, str, bool]] = field(default_factory=list)
+    group_by: List[Tuple[str, str]] = field(default_factory=list)
+    # None bedeutet "alle Spalten" (SELECT *) oder nicht auswertbar
+    selected: Dict[str, Optional[List[str]]] = field(default_factory=dict)
+    referenced: Dict[str, List[str]] = field(default_factory=dict)
+
+
+@dataclass
+class IndexRecommendation:
+    """Vorgeschlagener Index mit dem per EXPLAIN QUERY PLAN geschätzten Nutzen."""
+    table: str
+    columns: List[str]
+    index_name: str
+    reasons: List[str] = field(default_factory=list)
+    statements: List[str] = field(default_factory=list)
+    executions: int = 0
+    covering: bool = False
+    cost_before: float = 0.0
+    cost_after: float = 0.0
+    plan_before: List[str] = field(default_factory=list)
+    plan_after: List[str] = field(default_factory=list)
+    applied: bool = False
+    
+    @property
+    def estimated_benefit(self) -> float:
+        """Geschätzte eingesparte Zeilenzugriffe über alle Ausführungen."""
+        return max(0.0, self.cost_before - self.cost_after)
+    
+    @property
+    def improvement(self) -> float:
+        """Anteil der eingesparten Kosten (0.0 bis 1.0)."""
+        return self.estimated_benefit / self.cost_before if self.cost_before else 0.0
+    
+    @property
+    def create_sql(self) -> str:
+        """CREATE INDEX-Anweisung für den Vorschlag."""
+        return f"CREATE INDEX IF NOT EXISTS {self.index_name} ON {self.table} ({', '.join(self.columns)});"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Gibt den Vorschlag als Dictionary zurück."""
+        return {
+            "table": self.table,
+            "columns": self.columns,
+            "index_name": self.index_name,
+            "create_sql": self.create_sql,
+            "reasons": self.reasons,
+            "statements": self.statements,
+            "executions": self.executions,
+            "covering": self.covering,
+            "cost_before": round(self.cost_before, 1),
+            "cost_after": round(self.cost_after, 1),
+            "estimated_benefit": round(self.estimated_benefit, 1),
+            "improvement": round(self.improvement, 3),
+            "plan_before": self.plan_before,
+            "plan_after": self.plan_after,
+            "applied": self.applied,
+        }
+
+
+class IndexAdvisor:
+    """
+    Schlägt Indizes anhand der tatsächlichen Abfragelast vor.
+    
+    Grundlage sind die Fingerabdrücke des automatischen Abfrage-Profilings.
+    Für die häufigsten und teuersten Anweisungen werden vollständige
+    Tabellenscans, nur teilweise genutzte Indizes und temporäre B-Bäume zum
+    Sortieren erkannt. Daraus entstehen zusammengesetzte Indizes
+    (Gleichheitsspalten vor Bereichs- und Sortierspalten), bei schmalen
+    Abfragen als abdeckende Indizes.
+    
+    Der Nutzen wird geschätzt, ohne die Datenbank zu verändern: Die Indizes
+    werden in einer Kopie des Schemas im Speicher angelegt, in die auch die
+    Statistiken aus sqlite_stat1 übernommen werden, und die Pläne vorher und
+    nachher per EXPLAIN QUERY PLAN verglichen. Die Kosten eines Plans sind
+    die geschätzten gelesenen Zeilen; Zeilenzahlen und Selektivitäten stammen
+    aus einer Stichprobe der echten Daten.
+    """
+    
+    def __init__(self, database: Any = None, monitor: Optional[DatabasePerformanceMonitor] = None,
+                 min_executions: int = 2, top_n: int = 20, sample_size: int = 10000,
+                 max_key_columns: int = 4, max_covering_columns: int = 6):
+        """
+        Initialisiert den IndexAdvisor.
+        
+        Args:
+            database: Peewee-Datenbank (Standard: globale Datenbank)
+            monitor: Performance-Monitor mit den Fingerabdrücken
+            min_executions: Mindestanzahl an Ausführungen einer Anweisung
+            top_n: Anzahl der teuersten Anweisungen, die untersucht werden
+            sample_size: Zeilen je Stichprobe zur Schätzung der Selektivität
+            max_key_columns: Maximale Anzahl an Schlüsselspalten eines Index
+            max_covering_columns: Maximale Spaltenzahl eines abdeckenden Index
+        """
+        self.database = database if database is not None else db
+        self.monitor = monitor
+        self.min_executions = min_executions
+        self.top_n = top_n
+        self.sample_size = sample_size
+        self.max_key_columns = max_key_columns
+        self.max_covering_columns = max_covering_columns
+        self._columns: Dict[str, List[str]] = {}
+        self._rowid_columns: Dict[str, Optional[str]] = {}
+        self._row_counts: Dict[str, int] = {}
+        self._rows_per_key: Dict[Tuple[str, Tuple[str, ...]], float] = {}
+    
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """Rohe SQLite-Verbindung; umgeht das Abfrage-Profiling."""
+        return self.database.connection()
+    
+    def collect_workload(self) -> List[Tuple[str, int]]:
+        """
+        Sammelt die teuersten Anweisungen aus den Fingerabdrücken.
+        
+        Returns:
+            Liste von (Fingerabdruck, Anzahl Ausführungen), nach Gesamtzeit sortiert
+        """
+        monitor = self.monitor or get_performance_monitor()
+        with monitor._stats_lock:
+            candidates = list(monitor.fingerprint_stats.values())
+        
+        workload = [
+            stats for stats in candidates
+            if stats.statement_type in _ADVISABLE_STATEMENTS
+            and stats.count >= self.min_executions
+            and stats.errors < stats.count
+        ]
+        workload.sort(key=lambda stats: stats.total_time_ms, reverse=True)
+        return [(stats.fingerprint, stats.count) for stats in workload[:self.top_n]]
+    
+    def recommend(self, workload: Optional[Iterable[Tuple[str, int]]] = None) -> List[IndexRecommendation]:
+        """
+        Ermittelt Indexvorschläge, ohne die Datenbank zu verändern (Dry-Run).
+        
+        Args:
+            workload: Paare aus SQL und Ausführungsanzahl (Standard: Fingerabdrücke)
+            
+        Returns:
+            Vorschläge mit Nutzen, absteigend nach geschätztem Nutzen
+        """
+        workload = list(workload) if workload is not None else self.collect_workload()
+        if not workload:
+            return []
+        
+        clone = self._clone_schema()
+        try:
+            candidates: Dict[Tuple[str, Tuple[str, ...]], IndexRecommendation] = {}
+            statements: Dict[str, Tuple[_ParsedStatement, int, List[str]]] = {}
+            for sql, count in workload:
+                parsed = self._parse(sql)
+                if parsed is None:
+                    continue
+                plan = self._explain(clone, sql)
+                if plan is None:
+                    continue
+                statements[sql] = (parsed, count, plan)
+                
+                for table, reasons in self._find_issues(parsed, plan).items():
+                    columns, covering = self._candidate_columns(parsed, table)
+                    if not columns or self._is_served_by_existing_index(table, columns):
+                        continue
+                    key = (table, tuple(columns))
+                    recommendation = candidates.get(key)
+                    if recommendation is None:
+                        recommendation = candidates[key] = IndexRecommendation(
+                            table=table,
+                            columns=columns,
+                            index_name=f"idx_{table}_{'_'.join(columns)}",
+                            covering=covering,
+                        )
+                    recommendation.statements.append(sql)
+                    recommendation.reasons.extend(r for r in reasons if r not in recommendation.reasons)
+            
+            recommendations = []
+            for recommendation in self._merge_prefixes(candidates):
+                if self._evaluate(clone, recommendation, statements):
+                    recommendations.append(recommendation)
+        finally:
+            clone.close()
+        
+        recommendations.sort(key=lambda r: r.estimated_benefit, reverse=True)
+        logger.info(f"Index-Advisor: {len(recommendations)} Vorschläge aus {len(workload)} Anweisungen")
+        return recommendations
+    
+    def apply(self, recommendations: Optional[List[IndexRecommendation]] = None,
+              min_improvement: float = 0.0) -> List[IndexRecommendation]:
+        """
+        Legt vorgeschlagene Indizes an.
+        
+        Args:
+            recommendations: Anzulegende Vorschläge (Standard: recommend())
+            min_improvement: Mindestanteil eingesparter Kosten
+            
+        Returns:
+            Angelegte Vorschläge
+        """
+        if recommendations is None:
+            recommendations = self.recommend()
+        
+        indexer = DatabaseIndexer()
+        applied = []
+        for recommendation in recommendations:
+            if recommendation.improvement < min_improvement or recommendation.estimated_benefit <= 0:
+                continue
+            if not indexer.create_composite_index(
+                    recommendation.table, recommendation.columns, recommendation.index_name):
+                continue
+            try:
+                # Statistiken für den neuen Index, damit der Planer ihn bewerten kann
+                self.database.execute_sql(f"ANALYZE {recommendation.index_name};")
+            except Exception as e:
+                logger.debug(f"ANALYZE für {recommendation.index_name} fehlgeschlagen: {e}")
+            recommendation.applied = True
+            applied.append(recommendation)
+        return applied
+    
+    def _parse(self, sql: str) -> Optional[_ParsedStatement]:
+        """
+        Liest Tabellen, Prädikate und Sortierung aus einer Anweisung.
+        
+        Args:
+            sql: Normalisierte SQL-Anweisung
+            
+        Returns:
+            Gelesene Bezüge oder None, wenn die Anweisung nicht auswertbar ist
+        """
+        wrapped = _WRAPPED_COUNT_RE.match(sql)
+        if wrapped:
+            sql = wrapped.group(1)
+        statement_type = sql.lstrip().split(" ", 1)[0].upper()
+        # Sonstige Unterabfragen und OR-Verknüpfungen werden nicht ausgewertet
+        if statement_type not in _ADVISABLE_STATEMENTS or len(re.findall(r"\bSELECT\b", sql, re.I)) > 1:
+            return None
+        where = _WHERE_RE.search(sql)
+        if where and re.search(r"\bOR\b", where.group(1), re.I):
+            return None
+        
+        parsed = _ParsedStatement(sql=sql, statement_type=statement_type)
+        for match in _TABLE_REF_RE.finditer(sql):
+            table, alias = match.group(1), match.group(2)
+            if not self._get_columns(table):
+                continue
+            parsed.tables[table] = table
+            if alias and alias.upper() not in _NON_ALIAS_KEYWORDS:
+                parsed.tables[alias] = table
+        if not parsed.tables:
+            return None
+        
+        # Prädikate aus WHERE und den JOIN-Bedingungen
+        predicates = " ".join(
+            m.group(1) for m in (_FROM_RE.search(sql) if statement_type != "UPDATE" else None, where) if m
+        )
+        for qualifier, column, operator in _PREDICATE_RE.findall(predicates):
+            table = self._resolve(parsed, qualifier, column)
+            if table is None:
+                continue
+            target = parsed.ranges if operator.upper() in ("<", ">", "<=", ">=", "BETWEEN") else parsed.equality
+            columns = target.setdefault(table, [])
+            if column not in columns:
+                columns.append(column)
+        
+        order_by = _ORDER_BY_RE.search(sql)
+        for term in (order_by.group(1).split(",") if order_by else []):
+            match = _ORDER_TERM_RE.match(term)
+            table = self._resolve(parsed, match.group(1), match.group(2)) if match else None
+            if table is None:
+                # Ausdrücke in ORDER BY lassen sich nicht über einen Index sortieren
+                parsed.order_by = []
+                break
+            parsed.order_by.append((table, match.group(2), (match.group(3) or "").upper() == "DESC"))
+        
+        group_by = _GROUP_BY_RE.search(sql)
+        for term in (group_by.group(1).split(",") if group_by else []):
+            match = _ORDER_TERM_RE.match(term)
+            table = self._resolve(parsed, match.group(1), match.group(2)) if match else None
+            if table is not None:
+                parsed.group_by.append((table, match.group(2)))
+        
+        self._parse_selection(parsed)
+        return parsed
+    
+    def _parse_selection(self, parsed: _ParsedStatement) -> None:
+        """Ermittelt ausgewählte und insgesamt verwendete Spalten je Tabelle."""
+        for qualifier, column in _COLUMN_TOKEN_RE.findall(parsed.sql):
+            table = self._resolve(parsed, qualifier, column)
+            if table is not None and column not in parsed.referenced.setdefault(table, []):
+                parsed.referenced[table].append(column)
+        
+        select_list = _SELECT_LIST_RE.match(parsed.sql) if parsed.statement_type == "SELECT" else None
+        if select_list is None:
+            return
+        selected: Dict[str, Optional[List[str]]] = {table: [] for table in parsed.tables.values()}
+        for item in select_list.group(1).split(","):
+            if _CONSTANT_ITEM_RE.match(item):
+                continue
+            match = _SELECT_ITEM_RE.match(item)
+            table = self._resolve(parsed, match.group(1), match.group(2)) if match else None
+            if table is None:
+                # SELECT * oder Ausdrücke: ein abdeckender Index ist nicht sinnvoll
+                return
+            if selected[table] is not None and match.group(2) not in selected[table]:
+                selected[table].append(match.group(2))
+        parsed.selected = selected
+    
+    def _resolve(self, parsed: _ParsedStatement, qualifier: str, column: str) -> Optional[str]:
+        """Ordnet einen Spaltenbezug seiner Tabelle zu."""
+        if qualifier:
+            table = parsed.tables.get(qualifier)
+            return table if table and column in self._get_columns(table) else None
+        owners = {table for table in parsed.tables.values() if column in self._get_columns(table)}
+        return owners.pop() if len(owners) == 1 else None
+    
+    def _find_issues(self, parsed: _ParsedStatement, plan: List[str]) -> Dict[str, List[str]]:
+        """
+        Sucht Schwachstellen im Plan einer Anweisung.
+        
+        Args:
+            parsed: Gelesene Bezüge der Anweisung
+            plan: Zeilen von EXPLAIN QUERY PLAN
+            
+        Returns:
+            Gründe je Tabelle ("full_scan", "partial_index", "temp_b_tree")
+        """
+        issues: Dict[str, List[str]] = {}
+        for line in plan:
+            detail = line.strip()
+            access = _PLAN_ACCESS_RE.match(detail)
+            if access:
+                table = parsed.tables.get(access.group(2))
+                if table is None:
+                    continue
+                if access.group(1) == "SCAN":
+                    if parsed.equality.get(table) or parsed.ranges.get(table):
+                        issues.setdefault(table, []).append("full_scan")
+                else:
+                    used = {column for column, _ in _PLAN_CONDITION_RE.findall(access.group(5) or "")}
+                    if set(parsed.equality.get(table, [])) - used - {"rowid"}:
+                        issues.setdefault(table, []).append("partial_index")
+            elif _TEMP_BTREE_RE.match(detail):
+                sort_tables = {table for table, _, _ in parsed.order_by} or {
+                    table for table, _ in parsed.group_by}
+                for table in sort_tables:
+                    issues.setdefault(table, []).append("temp_b_tree")
+        return issues
+    
+    def _candidate_columns(self, parsed: _ParsedStatement, table: str) -> Tuple[List[str], bool]:
+        """
+        Leitet die Spalten eines Index für eine Tabelle ab.
+        
+        Gleichheitsspalten stehen vorne, danach folgen die Sortierspalten (wenn
+        die Sortierung nur diese Tabelle betrifft und einheitlich ist) oder die
+        erste Bereichsspalte. Bei schmalen Abfragen werden die übrigen
+        verwendeten Spalten angehängt, sodass der Index die Abfrage abdeckt.
+        
+        Args:
+            parsed: Gelesene Bezüge der Anweisung
+            table: Tabellenname
+            
+        Returns:
+            (Spalten, abdeckend)
+        """
+        rowid_column = self._get_rowid_column(table)
+        columns = [c for c in parsed.equality.get(table, []) if c != rowid_column]
+        ranges = [c for c in parsed.ranges.get(table, []) if c not in columns]
+        order_columns = [column for owner, column, _ in parsed.order_by if owner == table]
+        sortable = (
+            order_columns
+            and len(order_columns) == len(parsed.order_by)
+            and len({descending for _, _, descending in parsed.order_by}) == 1
+            and (not ranges or ranges[0] == order_columns[0])
+        )
+        if sortable:
+            columns += [c for c in order_columns if c not in columns]
+        elif ranges:
+            columns.append(ranges[0])
+        elif parsed.group_by and all(owner == table for owner, _ in parsed.group_by):
+            columns += [c for _, c in parsed.group_by if c not in columns]
+        columns = columns[:self.max_key_columns]
+        if not columns:
+            return [], False
+        
+        if parsed.selected.get(table) is not None:
+            extra = [c for c in parsed.referenced.get(table, []) if c not in columns and c != rowid_column]
+            if len(columns) + len(extra) <= self.max_covering_columns:
+                return columns + extra, True
+        return columns, False
+    
+    def _merge_prefixes(self, candidates: Dict[Tuple[str, Tuple[str, ...]], IndexRecommendation]
+                        ) -> List[IndexRecommendation]:
+        """Fasst Vorschläge zusammen, deren Spalten ein Präfix eines anderen sind."""
+        merged = []
+        ordered = sorted(candidates.values(), key=lambda r: len(r.columns), reverse=True)
+        for recommendation in ordered:
+            wider = next((
+                other for other in merged
+                if other.table == recommendation.table
+                and other.columns[:len(recommendation.columns)] == recommendation.columns
+            ), None)
+            if wider is None:
+                merged.append(recommendation)
+                continue
+            wider.statements.extend(s for s in recommendation.statements if s not in wider.statements)
+            wider.reasons.extend(r for r in recommendation.reasons if r not in wider.reasons)
+        return merged
+    
+    def _evaluate(self, clone: sqlite3.Connection, recommendation: IndexRecommendation,
+                  statements: Dict[str, Tuple[_ParsedStatement, int, List[str]]]) -> bool:
+        """
+        Schätzt den Nutzen eines Vorschlags mit einem hypothetischen Index.
+        
+        Args:
+            clone: Schema-Kopie im Speicher
+            recommendation: Zu bewertender Vorschlag
+            statements: Gelesene Anweisungen mit Anzahl und bisherigem Plan
+            
+        Returns:
+            True, wenn der Index genutzt wird und Kosten spart
+        """
+        stat = self._index_stat(recommendation.table, recommendation.columns)
+        used = False
+        try:
+            clone.execute(recommendation.create_sql)
+            if stat is not None:
+                clone.execute(
+                    "INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?)",
+                    (recommendation.table, recommendation.index_name, stat),
+                )
+                clone.execute("ANALYZE sqlite_master")
+            
+            for sql in recommendation.statements:
+                parsed, count, plan_before = statements[sql]
+                plan_after = self._explain(clone, sql) or plan_before
+                recommendation.executions += count
+                recommendation.cost_before += count * self._plan_cost(parsed, plan_before)
+                recommendation.cost_after += count * self._plan_cost(parsed, plan_after)
+                if any(recommendation.index_name in line for line in plan_after):
+                    used = True
+                    if not recommendation.plan_before:
+                        recommendation.plan_before, recommendation.plan_after = plan_before, plan_after
+        except sqlite3.Error as e:
+            logger.debug(f"Hypothetischer Index {recommendation.index_name} nicht bewertbar: {e}")
+            return False
+        finally:
+            clone.execute(f"DROP INDEX IF EXISTS {recommendation.index_name}")
+            if stat is not None:
+                clone.execute("DELETE FROM sqlite_stat1 WHERE idx = ?", (recommendation.index_name,))
+                clone.execute("ANALYZE sqlite_master")
+        return used and recommendation.estimated_benefit > 0
+    
+    def _plan_cost(self, parsed: _ParsedStatement, plan: List[str]) -> float:
+        """
+        Schätzt die gelesenen Zeilen eines Plans.
+        
+        Ein Scan liest die ganze Tabelle, eine Suche die Zeilen je Schlüssel
+        (Bereichsbedingungen ein Viertel davon). Nicht abdeckende Indizes
+        kosten einen zusätzlichen Tabellenzugriff je Zeile, temporäre
+        B-Bäume das Sortieren der gelesenen Zeilen.
+        
+        Args:
+            parsed: Gelesene Bezüge der Anweisung
+            plan: Zeilen von EXPLAIN QUERY PLAN
+            
+        Returns:
+            Geschätzte Kosten einer Ausführung
+        """
+        cost = 0.0
+        rows_read = 0.0
+        for line in plan:
+            detail = line.strip()
+            access = _PLAN_ACCESS_RE.match(detail)
+            if access:
+                table = parsed.tables.get(access.group(2))
+                if table is None:
+                    continue
+                kind, using, conditions = access.group(1), access.group(3) or "", access.group(5) or ""
+                rows = self._access_rows(table, kind, using, conditions)
+                lookups = 2 if using == "INDEX" else 1
+                cost += rows * lookups
+                rows_read = max(rows_read, rows)
+            elif _TEMP_BTREE_RE.match(detail):
+                cost += _SORT_COST_FACTOR * rows_read * math.log2(rows_read + 1)
+        return cost
+    
+    def _access_rows(self, table: str, kind: str, using: str, conditions: str) -> float:
+        """Schätzt die gelesenen Zeilen eines Tabellenzugriffs."""
+        total = self._get_row_count(table)
+        if kind == "SCAN":
+            return float(total)
+        parsed_conditions = _PLAN_CONDITION_RE.findall(conditions)
+        equality = [column for column, operator in parsed_conditions if operator == "="]
+        has_range = any(operator != "=" for _, operator in parsed_conditions)
+        if "PRIMARY KEY" in using and equality and not has_range:
+            return 1.0
+        rows = self._get_rows_per_key(table, equality) if equality else float(total)
+        return max(1.0, rows / 4) if has_range else rows
+    
+    def _explain(self, connection: sqlite3.Connection, sql: str) -> Optional[List[str]]:
+        """
+        Ermittelt den Plan eines Fingerabdrucks mit NULL für alle Parameter.
+        
+        Args:
+            connection: SQLite-Verbindung
+            sql: Normalisierte SQL-Anweisung
+            
+        Returns:
+            Eingerückte Planzeilen oder None
+        """
+        # Zusammengefasste Wertelisten wieder als gültiges SQL schreiben
+        sql = sql.replace("(...)", "(?)")
+        try:
+            rows = connection.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * sql.count("?")).fetchall()
+        except sqlite3.Error as e:
+            logger.debug(f"Query-Plan nicht verfügbar: {e}")
+            return None
+        depths = {0: -1}
+        plan = []
+        for node_id, parent_id, _, detail in rows:
+            depths[node_id] = depths.get(parent_id, -1) + 1
+            plan.append("  " * depths[node_id] + detail)
+        return plan
+    
+    def _clone_schema(self) -> sqlite3.Connection:
+        """
+        Kopiert Schema und Planer-Statistiken in eine Datenbank im Speicher.
+        
+        Returns:
+            Verbindung zur Schema-Kopie
+        """
+        source = self._connection
+        clone = sqlite3.connect(":memory:")
+        objects = source.execute(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE type IN ('table', 'index', 'view') AND sql IS NOT NULL "
+            "AND name NOT LIKE 'sqlite_%' "
+            "ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END, "
+            "sql NOT LIKE 'CREATE VIRTUAL%'"
+        ).fetchall()
+        for kind, name, sql in objects:
+            try:
+                clone.execute(sql)
+            except sqlite3.Error as e:
+                # z. B. Schattentabellen, die eine virtuelle Tabelle schon angelegt hat
+                logger.debug(f"Schemaobjekt {name} nicht kopiert: {e}")
+        
+        try:
+            stats = source.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+        except sqlite3.OperationalError:
+            stats = []
+        if stats:
+            clone.execute("ANALYZE")
+            clone.execute("DELETE FROM sqlite_stat1")
+            clone.executemany("INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?)", stats)
+            clone.execute("ANALYZE sqlite_master")
+        return clone
+    
+    def _index_stat(self, table: str, columns: List[str]) -> Optional[str]:
+        """
+        Erzeugt einen sqlite_stat1-Eintrag für einen hypothetischen Index.
+        
+        Nur nötig, wenn die Datenbank analysiert wurde; sonst arbeitet der
+        Planer für alle Indizes mit denselben Standardannahmen.
+        """
+        try:
+            analyzed = self._connection.execute(
+                "SELECT 1 FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        if not analyzed:
+            return None
+        values = [self._get_row_count(table)] + [
+            max(1, round(self._get_rows_per_key(table, columns[:i]))) for i in range(1, len(columns) + 1)
+        ]
+        return " ".join(str(value) for value in values)
+    
+    def _get_columns(self, table: str) -> List[str]:
+        """Gibt die Spalten einer Tabelle zurück (leer, wenn es sie nicht gibt)."""
+        if table not in self._columns:
+            info = self._connection.execute(f'PRAGMA table_info("{table}")').fetchall()
+            self._columns[table] = [row[1] for row in info]
+            self._rowid_columns[table] = next(
+                (row[1] for row in info if row[5] == 1 and row[2].upper() == "INTEGER"
+                 and sum(r[5] > 0 for r in info) == 1),
+                None,
+            )
+        return self._columns[table]
+    
+    def _get_rowid_column(self, table: str) -> Optional[str]:
+        """Gibt die Spalte zurück, die die rowid der Tabelle ist."""
+        self._get_columns(table)
+        return self._rowid_columns.get(table)
+    
+    def _get_row_count(self, table: str) -> int:
+        """Gibt die Zeilenzahl einer Tabelle zurück."""
+        if table not in self._row_counts:
+            row = self._connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()
+            self._row_counts[table] = row[0] if row else 0
+        return self._row_counts[table]
+    
+    def _get_rows_per_key(self, table: str, columns: List[str]) -> float:
+        """
+        Schätzt die Zeilen je Schlüsselwert aus einer Stichprobe.
+        
+        Args:
+            table: Tabellenname
+            columns: Schlüsselspalten
+            
+        Returns:
+            Durchschnittliche Zeilenzahl je unterschiedlichem Schlüssel
+        """
+        key = (table, tuple(columns))
+        if key not in self._rows_per_key:
+            total = self._get_row_count(table)
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            sample = f'SELECT {column_list} FROM "{table}" LIMIT {int(self.sample_size)}'
+            sampled = self._connection.execute(f"SELECT COUNT(*) FROM ({sample})").fetchone()[0]
+            distinct = self._connection.execute(
+                f"SELECT COUNT(*) FROM (SELECT DISTINCT {column_list} FROM ({sample}))"
+            ).fetchone()[0]
+            if not sampled or not distinct:
+                rows = 1.0
+            elif sampled >= total or distinct * 10 <= sampled:
+                # Wenige Werte, die sich über die ganze Tabelle wiederholen
+                rows = total / distinct
+            else:
+                # Viele Werte: die Stichprobe spiegelt die Verteilung wider
+                rows = sampled / distinct
+            self._rows_per_key[key] = max(1.0, rows)
+        return self._rows_per_key[key]
+    
+    def _is_served_by_existing_index(self, table: str, columns: List[str]) -> bool:
+        """Prüft, ob ein vorhandener Index mit den Spalten beginnt."""
+        connection = self._connection
+        for index in connection.execute(f'PRAGMA index_list("{table}")').fetchall():
+            indexed = [row[2] for row in connection.execute(f'PRAGMA index_info("{index[1]}")')]
+            if indexed[:len(columns)] == columns:
+                return True
+        return False
+
+
 def optimize_database_indexes() -> None:
     """
     Optimiert die Datenbankindizes.
@@ -229,4 +939,32 @@ def optimize_database_indexes() -> None:
         logger.info(f"Datenbank hat {stats['total_indexes']} Indizes")
         
     except Exception as e:
-        logger.error(f"Fehler bei der Datenbank-Indizierung: {e}")
\ No newline at end of file
+        logger.error(f"Fehler bei der Datenbank-Indizierung: {e}")
+
+
+def advise_database_indexes(apply: bool = False, min_improvement: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    Schlägt Indizes anhand der aufgezeichneten Abfragelast vor.
+    
+    Args:
+        apply: Ob die Vorschläge angelegt werden sollen (sonst nur Dry-Run)
+        min_improvement: Mindestanteil eingesparter Kosten beim Anlegen
+        
+    Returns:
+        Vorschläge als Dictionaries
+    """
+    try:
+        advisor = IndexAdvisor()
+        recommendations = advisor.recommend()
+        if apply:
+            advisor.apply(recommendations, min_improvement=min_improvement)
+        for recommendation in recommendations:
+            logger.info(
+                f"Index-Vorschlag {recommendation.index_name}: "
+                f"{recommendation.improvement:.0%} geschätzte Einsparung "
+                f"({', '.join(recommendation.reasons)})"
+            )
+        return [recommendation.to_dict() for recommendation in recommendations]
+    except Exception as e:
+        logger.error(f"Fehler beim Ermitteln der Index-Vorschläge: {e}")
+        return []
@@ -6,12 +6,17 @@ Metriken:
 - Verbindungsstatistiken
 - Indizeffizienz
 - Locks und Deadlocks
+- Automatisches Abfrage-Profiling (Fingerabdrücke, Latenz-Histogramme, Query-Pläne)
 """
 
+import hashlib
+import random
+import re
 import time
 import threading
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any, Callable
+from typing import Optional, Dict, List, Any, Callable, Tuple
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
 import sqlite3
@@ -32,6 +37,133 @@ class QueryMetrics:
     error: Optional[str] = None
 
 
+# Obergrenzen der Latenz-Buckets in Millisekunden (der letzte Bucket ist offen)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 5000.0)
+
+# Anweisungen, für die SQLite einen Query-Plan liefert
+_EXPLAINABLE_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST_RE = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_INDEX_IN_PLAN_RE = re.compile(r"USING (?:COVERING )?INDEX (\S+)")
+
+
+@lru_cache(maxsize=2048)
+def normalize_query(query: str) -> str:
+    """
+    Normalisiert eine SQL-Anweisung zu einem Fingerabdruck.
+    
+    Literale werden durch ``?`` ersetzt, Platzhalterlisten (``IN (?, ?)``,
+    mehrzeilige ``VALUES``) zu ``(...)`` zusammengefasst und Leerraum
+    vereinheitlicht. Anweisungen, die sich nur in Werten unterscheiden,
+    ergeben so denselben Fingerabdruck.
+    
+    Args:
+        query: SQL-Anweisung
+        
+    Returns:
+        Normalisierte Anweisung
+    """
+    normalized = _STRING_LITERAL_RE.sub("?", query)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST_RE.sub("(...)", normalized)
+    normalized = _VALUES_LIST_RE.sub("(...)", normalized)
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+class LatencyHistogram:
+    """Histogramm der Ausführungszeiten mit festen, logarithmisch verteilten Buckets."""
+    
+    def __init__(self):
+        """Initialisiert die Bucket-Zähler."""
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+    
+    def record(self, value_ms: float) -> None:
+        """
+        Zählt eine Ausführungszeit.
+        
+        Args:
+            value_ms: Ausführungszeit in Millisekunden
+        """
+        index = 0
+        while index < len(LATENCY_BUCKETS_MS) and value_ms > LATENCY_BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += 1
+    
+    def percentile(self, percentile: float) -> float:
+        """
+        Schätzt ein Perzentil anhand der Bucket-Obergrenzen.
+        
+        Args:
+            percentile: Perzentil zwischen 0 und 100
+            
+        Returns:
+            Obergrenze des Buckets, in dem das Perzentil liegt
+        """
+        if self.total == 0:
+            return 0.0
+        threshold = self.total * percentile / 100
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= threshold and count:
+                return LATENCY_BUCKETS_MS[min(index, len(LATENCY_BUCKETS_MS) - 1)]
+        return LATENCY_BUCKETS_MS[-1]
+    
+    def to_dict(self) -> Dict[str, int]:
+        """Gibt die belegten Buckets als Dictionary zurück."""
+        labels = [f"<={bound:g}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]:g}ms"]
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+
+@dataclass
+class QueryFingerprintStats:
+    """Aggregierte Metriken aller Anweisungen mit demselben Fingerabdruck."""
+    fingerprint: str
+    statement_type: str
+    count: int = 0
+    errors: int = 0
+    total_time_ms: float = 0.0
+    max_time_ms: float = 0.0
+    rows: int = 0
+    slow_count: int = 0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    last_seen: Optional[datetime] = None
+    query_plan: Optional[List[str]] = None
+    
+    @property
+    def fingerprint_id(self) -> str:
+        """Kurze, stabile Kennung des Fingerabdrucks."""
+        return hashlib.sha1(self.fingerprint.encode("utf-8")).hexdigest()[:12]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Gibt die Metriken als Dictionary zurück."""
+        return {
+            "fingerprint_id": self.fingerprint_id,
+            "fingerprint": self.fingerprint,
+            "statement_type": self.statement_type,
+            "count": self.count,
+            "errors": self.errors,
+            "total_time_ms": round(self.total_time_ms, 3),
+            "average_time_ms": round(self.total_time_ms / self.count, 3) if self.count else 0.0,
+            "max_time_ms": round(self.max_time_ms, 3),
+            "p50_ms": self.histogram.percentile(50),
+            "p95_ms": self.histogram.percentile(95),
+            "p99_ms": self.histogram.percentile(99),
+            "rows": self.rows,
+            "rows_per_query": round(self.rows / self.count, 2) if self.count else 0.0,
+            "slow_count": self.slow_count,
+            "histogram": self.histogram.to_dict(),
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "query_plan": self.query_plan,
+        }
+
+
 @dataclass
 class ConnectionMetrics:
     """Metriken für Datenbankverbindungen."""
@@ -69,6 +201,8 @@ class DatabasePerformanceMonitor:
         self.total_query_time_ms = 0.0
         self.slow_query_threshold_ms = 100.0  # Schwellenwert für langsame Abfragen
         self.slow_queries = deque(maxlen=100)
+        self.fingerprint_stats: Dict[str, QueryFingerprintStats] = {}
+        self._stats_lock = threading.Lock()
         
         # Monitoring-Status
         self.is_monitoring = False
@@ -158,39 +292,102 @@ class DatabasePerformanceMonitor:
             error: Fehlermeldung (falls aufgetreten)
         """
         try:
-            metric = QueryMetrics(
-                query=query[:200],  # Kürze lange Abfragen
-                execution_time_ms=execution_time_ms,
-                rows_returned=rows_returned,
-                error=error
-            )
+            self._record(query, execution_time_ms, rows_returned, error)
+        except Exception as e:
+            logger.error(f"Fehler beim Aufzeichnen der Abfrage: {e}")
+    
+    def _record(self, query: str, execution_time_ms: float, rows_returned: int = 0,
+                error: Optional[str] = None) -> Tuple[QueryMetrics, QueryFingerprintStats]:
+        """
+        Zeichnet eine Abfrage auf und aggregiert sie nach Fingerabdruck.
+        
+        Args:
+            query: SQL-Abfrage
+            execution_time_ms: Ausführungszeit in Millisekunden
+            rows_returned: Anzahl zurückgegebener Zeilen
+            error: Fehlermeldung (falls aufgetreten)
             
+        Returns:
+            Tuple aus (Einzelmetrik, Fingerabdruck-Statistik)
+        """
+        metric = QueryMetrics(
+            query=query[:200],  # Kürze lange Abfragen
+            execution_time_ms=execution_time_ms,
+            rows_returned=rows_returned,
+            error=error
+        )
+        fingerprint = normalize_query(query)
+        is_slow = execution_time_ms > self.slow_query_threshold_ms
+        
+        with self._stats_lock:
             self.query_history.append(metric)
             self.total_queries += 1
             self.total_query_time_ms += execution_time_ms
             
+            stats = self.fingerprint_stats.get(fingerprint)
+            if stats is None:
+                statement_type = fingerprint.split(" ", 1)[0].upper() if fingerprint else "UNKNOWN"
+                stats = QueryFingerprintStats(fingerprint, statement_type)
+                self.fingerprint_stats[fingerprint] = stats
+            stats.count += 1
+            stats.total_time_ms += execution_time_ms
+            stats.max_time_ms = max(stats.max_time_ms, execution_time_ms)
+            stats.rows += rows_returned
+            stats.histogram.record(execution_time_ms)
+            stats.last_seen = metric.timestamp
+            if error:
+                stats.errors += 1
+            
             # Zeichne langsame Abfragen separat auf
-            if execution_time_ms > self.slow_query_threshold_ms:
+            if is_slow:
+                stats.slow_count += 1
                 self.slow_queries.append(metric)
-                logger.debug(f"Langsame Abfrage erkannt: {execution_time_ms:.2f}ms - {query[:100]}...")
-            
-            # Aktualisiere Index-Nutzungsstatistiken
-            self._update_index_usage(query)
-            
-        except Exception as e:
-            logger.error(f"Fehler beim Aufzeichnen der Abfrage: {e}")
+        
+        if is_slow:
+            logger.debug(f"Langsame Abfrage erkannt: {execution_time_ms:.2f}ms - {query[:100]}...")
+        return metric, stats
+    
+    def record_query_plan(self, stats: QueryFingerprintStats, plan: List[str]) -> None:
+        """
+        Speichert den Query-Plan eines Fingerabdrucks.
+        
+        Args:
+            stats: Statistik des Fingerabdrucks
+            plan: Zeilen von ``EXPLAIN QUERY PLAN``
+        """
+        stats.query_plan = plan
+        self._update_index_usage(plan)
     
-    def _update_index_usage(self, query: str) -> None:
+    def _update_index_usage(self, plan: List[str]) -> None:
         """
         Aktualisiert die Index-Nutzungsstatistiken.
         
         Args:
-            query: SQL-Abfrage
+            plan: Zeilen eines Query-Plans
         """
-        # In einer echten Implementierung würden wir hier die tatsächlich
-        # verwendeten Indizes aus dem Query Plan extrahieren
-        # Für dieses Beispiel simulieren wir die Aktualisierung
-        pass
+        for line in plan:
+            match = _INDEX_IN_PLAN_RE.search(line)
+            if match:
+                self.index_usage_stats[match.group(1)] += 1
+    
+    def get_top_queries(self, top_n: int = 10, order_by: str = "total_time_ms") -> List[Dict[str, Any]]:
+        """
+        Gibt die teuersten Fingerabdrücke zurück.
+        
+        Args:
+            top_n: Anzahl der Einträge
+            order_by: Sortierschlüssel (total_time_ms, count, max_time_ms, rows)
+            
+        Returns:
+            Liste der Fingerabdruck-Statistiken, absteigend sortiert
+        """
+        with self._stats_lock:
+            stats = sorted(
+                self.fingerprint_stats.values(),
+                key=lambda entry: getattr(entry, order_by),
+                reverse=True
+            )[:top_n]
+            return [entry.to_dict() for entry in stats]
     
     def record_connection(self, connection_id: int) -> None:
         """
@@ -320,12 +517,16 @@ class DatabasePerformanceMonitor:
             logger.error(f"Fehler beim Erstellen des Performance-Berichts: {e}")
             return {}
     
-    def get_query_analysis(self, time_window_minutes: int = 60) -> Dict[str, Any]:
+    def get_query_analysis(self, time_window_minutes: int = 60, top_n: int = 10) -> Dict[str, Any]:
         """
         Analysiert Abfragen in einem Zeitfenster.
         
+        ``top_queries`` enthält die nach Gesamtzeit teuersten Fingerabdrücke
+        seit dem letzten Zurücksetzen der Statistiken.
+        
         Args:
             time_window_minutes: Zeitfenster in Minuten
+            top_n: Anzahl der Fingerabdrücke in ``top_queries``
             
         Returns:
             Dictionary mit Abfrage-Analysen
@@ -380,7 +581,8 @@ class DatabasePerformanceMonitor:
                     recent_queries, 
                     key=lambda q: q.execution_time_ms, 
                     reverse=True
-                )[:10]  # Langsamste 10 Abfragen
+                )[:10],  # Langsamste 10 Abfragen
+                "top_queries": self.get_top_queries(top_n)
             }
             
         except Exception as e:
@@ -402,12 +604,56 @@ class DatabasePerformanceMonitor:
             self.total_queries = 0
             self.total_query_time_ms = 0.0
             self.slow_queries.clear()
+            with self._stats_lock:
+                self.fingerprint_stats.clear()
             
             logger.info("Datenbank-Performance-Statistiken zurückgesetzt")
         except Exception as e:
             logger.error(f"Fehler beim Zurücksetzen der Statistiken: {e}")
 
 
+class _RowCountingCursor:
+    """Cursor-Hülle, die gelesene Zeilen der profilierten Abfrage zuschreibt."""
+    
+    __slots__ = ("_cursor", "_metric", "_stats")
+    
+    def __init__(self, cursor: Any, metric: QueryMetrics, stats: QueryFingerprintStats):
+        self._cursor = cursor
+        self._metric = metric
+        self._stats = stats
+    
+    def _count(self, rows: int) -> None:
+        self._metric.rows_returned += rows
+        self._stats.rows += rows
+    
+    def fetchone(self) -> Any:
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+    
+    def fetchmany(self, *args: Any) -> List[Any]:
+        rows = self._cursor.fetchmany(*args)
+        self._count(len(rows))
+        return rows
+    
+    def fetchall(self) -> List[Any]:
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+        return rows
+    
+    def __iter__(self) -> "_RowCountingCursor":
+        return self
+    
+    def __next__(self) -> Any:
+        row = next(self._cursor)
+        self._count(1)
+        return row
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
 class DatabaseQueryProfiler:
     """Profilierer für Datenbankabfragen."""
     
@@ -419,8 +665,116 @@ class DatabaseQueryProfiler:
             monitor: DatabasePerformanceMonitor-Instanz
         """
         self.monitor = monitor
+        self.sample_rate = 1.0
+        self.explain_slow_queries = True
+        self._database = None
+        self._random = random.Random()
         logger.info("DatabaseQueryProfiler initialisiert")
     
+    def enable_automatic_profiling(self, database: Any = None, sample_rate: float = 1.0,
+                                   explain_slow_queries: bool = True) -> None:
+        """
+        Profiliert automatisch alle Anweisungen einer Datenbank.
+        
+        Jede Anweisung wird gemessen; aufgezeichnet werden ein Anteil von
+        ``sample_rate`` sowie alle langsamen Anweisungen. Für langsame
+        Anweisungen wird einmal pro Fingerabdruck ``EXPLAIN QUERY PLAN``
+        erfasst.
+        
+        Args:
+            database: TrackedSqliteDatabase (Standard: Modell-Datenbank)
+            sample_rate: Anteil der aufgezeichneten Anweisungen (0 bis 1)
+            explain_slow_queries: Ob Query-Pläne langsamer Anweisungen erfasst werden
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate muss zwischen 0 und 1 liegen")
+        self.disable_automatic_profiling()
+        self.sample_rate = sample_rate
+        self.explain_slow_queries = explain_slow_queries
+        self._database = database if database is not None else db
+        self._database.query_observer = self.observe_execution
+        logger.info(f"Automatisches Abfrage-Profiling aktiviert (Sampling {sample_rate:.0%})")
+    
+    def disable_automatic_profiling(self) -> None:
+        """Beendet das automatische Profiling."""
+        if self._database is not None:
+            self._database.query_observer = None
+            self._database = None
+            logger.info("Automatisches Abfrage-Profiling deaktiviert")
+    
+    @property
+    def is_automatic_profiling_enabled(self) -> bool:
+        """Gibt an, ob das automatische Profiling aktiv ist."""
+        return self._database is not None
+    
+    def observe_execution(self, execute: Callable[[], Any], sql: str, params: Any) -> Any:
+        """
+        Führt eine Anweisung aus und zeichnet sie auf.
+        
+        Wird von TrackedSqliteDatabase.execute_sql aufgerufen.
+        
+        Args:
+            execute: Führt die Anweisung aus und gibt den Cursor zurück
+            sql: SQL-Anweisung
+            params: Parameter der Anweisung
+            
+        Returns:
+            Cursor der Anweisung
+        """
+        start_time = time.perf_counter()
+        try:
+            cursor = execute()
+        except Exception as e:
+            self.monitor.record_query(sql, (time.perf_counter() - start_time) * 1000, error=str(e))
+            raise
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
+        
+        is_slow = execution_time_ms > self.monitor.slow_query_threshold_ms
+        if not is_slow and self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+            return cursor
+        
+        try:
+            # Zeilen von SELECT-Abfragen werden beim Lesen gezählt
+            returns_rows = cursor.description is not None
+            rows = 0 if returns_rows else max(cursor.rowcount, 0)
+            metric, stats = self.monitor._record(sql, execution_time_ms, rows)
+            if is_slow and self.explain_slow_queries and stats.query_plan is None:
+                plan = self._explain(cursor.connection, sql, params)
+                if plan is not None:
+                    self.monitor.record_query_plan(stats, plan)
+        except Exception as e:
+            logger.debug(f"Fehler beim Profilieren der Abfrage: {e}")
+            return cursor
+        
+        return _RowCountingCursor(cursor, metric, stats) if returns_rows else cursor
+    
+    def _explain(self, connection: sqlite3.Connection, sql: str, params: Any) -> Optional[List[str]]:
+        """
+        Ermittelt den Query-Plan einer Anweisung.
+        
+        Args:
+            connection: Verbindung, auf der die Anweisung lief
+            sql: SQL-Anweisung
+            params: Parameter der Anweisung
+            
+        Returns:
+            Eingerückte Zeilen des Plans oder None
+        """
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE_STATEMENTS):
+            return None
+        try:
+            rows = connection.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+        except sqlite3.Error as e:
+            logger.debug(f"Query-Plan nicht verfügbar: {e}")
+            return None
+        
+        depths = {0: -1}
+        plan = []
+        for node_id, parent_id, _, detail in rows:
+            depths[node_id] = depths.get(parent_id, -1) + 1
+            plan.append("  " * depths[node_id] + detail)
+        return plan
+    
     def profile_query(self, query_func: Callable, *args, **kwargs) -> Any:
         """
         Profiliert eine Datenbankabfrage.
@@ -504,11 +858,17 @@ def get_query_profiler() -> DatabaseQueryProfiler:
     return _query_profiler
 
 
-def start_database_monitoring() -> None:
-    """Startet das Datenbank-Performance-Monitoring."""
+def start_database_monitoring(sample_rate: float = 1.0) -> None:
+    """
+    Startet das Datenbank-Performance-Monitoring.
+    
+    Args:
+        sample_rate: Anteil der automatisch profilierten Anweisungen
+    """
     try:
         monitor = get_performance_monitor()
         monitor.start_monitoring()
+        get_query_profiler().enable_automatic_profiling(sample_rate=sample_rate)
     except Exception as e:
         logger.error(f"Fehler beim Starten des Datenbank-Monitoring: {e}")
 
@@ -516,6 +876,7 @@ def start_database_monitoring() -> None:
 def stop_database_monitoring() -> None:
     """Stoppt das Datenbank-Performance-Monitoring."""
     try:
+        get_query_profiler().disable_automatic_profiling()
         monitor = get_performance_monitor()
         monitor.stop_monitoring()
     except Exception as e:
@@ -6,12 +6,20 @@ Vorteile:
 - Geringere Latenz
 - Bessere Skalierbarkeit
 - Kontrollierter Ressourcenverbrauch
+
+Für asynchronen Code gibt es mit AsyncDatabasePool eine Variante, deren
+Verbindungsausgabe über asyncio.Queue läuft und die Abfragen auf einem
+eigenen Thread je Verbindung ausführt, sodass die Ereignisschleife beim
+Warten auf eine Verbindung oder auf SQLite nicht blockiert.
 """
 
+import asyncio
 import threading
 import time
-from typing import Optional, List
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, List
+from contextlib import asynccontextmanager, contextmanager
 from queue import Queue, Empty
 from dataclasses import dataclass, field
 
@@ -242,6 +250,447 @@ class DatabaseConnectionPool:
                     break
 
 
+class PoolTimeoutError(TimeoutError):
+    """Wird ausgelöst, wenn innerhalb des Timeouts keine Verbindung frei wird."""
+
+
+@dataclass
+class PoolMetrics:
+    """Kennzahlen eines asynchronen Verbindungspools."""
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+    connections_opened: int = 0
+    connections_closed: int = 0
+    busy_time: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+
+class AsyncPooledConnection:
+    """
+    Eine Datenbankverbindung mit eigenem Ausführungs-Thread.
+    
+    SQLite-Verbindungen dürfen nur in dem Thread verwendet werden, in dem sie
+    geöffnet wurden. Deshalb besitzt jede Verbindung einen Executor mit genau
+    einem Thread, auf dem sie geöffnet, benutzt und geschlossen wird.
+    """
+    
+    def __init__(self, database: SqliteDatabase, name: str):
+        """
+        Initialisiert die Verbindung.
+        
+        Args:
+            database: Noch nicht geöffnete SqliteDatabase-Instanz
+            name: Name für den Ausführungs-Thread
+        """
+        self.database = database
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+    
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Führt eine Funktion auf dem Thread der Verbindung aus.
+        
+        Args:
+            func: Funktion, die die SqliteDatabase als erstes Argument erhält
+            *args: Weitere Positionsargumente
+            **kwargs: Weitere Schlüsselwortargumente
+            
+        Returns:
+            Rückgabewert der Funktion
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, self.database, *args, **kwargs))
+    
+    async def execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """
+        Führt eine SQL-Anweisung aus und gibt alle Ergebniszeilen zurück.
+        
+        Args:
+            sql: SQL-Anweisung
+            params: Parameter der Anweisung
+            
+        Returns:
+            Liste der Ergebniszeilen
+        """
+        return await self.run(lambda database: database.execute_sql(sql, params).fetchall())
+    
+    async def open(self) -> None:
+        """Öffnet die Verbindung auf ihrem Thread."""
+        await self.run(lambda database: database.connect(reuse_if_open=True))
+    
+    async def close(self) -> None:
+        """Schließt die Verbindung und beendet ihren Thread."""
+        try:
+            await self.run(lambda database: database.close())
+        finally:
+            self.executor.shutdown(wait=False)
+
+
+class AsyncConnectionPool:
+    """
+    Asynchroner Verbindungspool auf Basis von asyncio.Queue.
+    
+    Freie Verbindungen liegen in einer asyncio.Queue. Ist sie leer, wird bis
+    zur Obergrenze eine neue Verbindung geöffnet, sonst wird höchstens
+    checkout_timeout Sekunden gewartet, ohne die Ereignisschleife zu blockieren.
+    Ein Pool gehört zu der Ereignisschleife, in der er zuerst benutzt wird.
+    """
+    
+    def __init__(self, db_path: str, max_connections: int = 4, readonly: bool = False,
+                 checkout_timeout: float = 5.0, max_connection_age: Optional[float] = None,
+                 name: str = "pool"):
+        """
+        Initialisiert den Pool.
+        
+        Args:
+            db_path: Pfad zur Datenbankdatei
+            max_connections: Maximale Anzahl von Verbindungen
+            readonly: Verbindungen nur lesend öffnen (PRAGMA query_only)
+            checkout_timeout: Maximale Wartezeit auf eine Verbindung (Sekunden)
+            max_connection_age: Alter, nach dem Verbindungen ersetzt werden (Sekunden)
+            name: Name des Pools für Threads und Protokollmeldungen
+        """
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.readonly = readonly
+        self.checkout_timeout = checkout_timeout
+        self.max_connection_age = max_connection_age
+        self.name = name
+        
+        self._idle: Optional[asyncio.Queue] = None
+        self._connections: List[AsyncPooledConnection] = []
+        self._opening = 0
+        self._waiting = 0
+        self._in_use = 0
+        self._last_change = time.monotonic()
+        self._closed = False
+        self.metrics = PoolMetrics()
+    
+    @property
+    def idle(self) -> asyncio.Queue:
+        """Queue der freien Verbindungen (wird in der laufenden Schleife angelegt)."""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        return self._idle
+    
+    def _create_database(self) -> SqliteDatabase:
+        """
+        Erstellt eine (noch nicht geöffnete) SqliteDatabase für diesen Pool.
+        
+        Returns:
+            SqliteDatabase-Instanz
+        """
+        pragmas = {
+            "cache_size": -1024 * 32,
+            "foreign_keys": 1,
+            "busy_timeout": int(self.checkout_timeout * 1000),
+        }
+        if self.readonly:
+            pragmas["query_only"] = 1
+        else:
+            pragmas["journal_mode"] = "wal"
+            pragmas["synchronous"] = 1
+        return SqliteDatabase(self.db_path, pragmas=pragmas)
+    
+    async def _open_connection(self) -> AsyncPooledConnection:
+        """
+        Öffnet eine neue Verbindung und nimmt sie in den Pool auf.
+        
+        Returns:
+            Geöffnete Verbindung
+        """
+        conn = AsyncPooledConnection(self._create_database(), f"{self.name}-db")
+        try:
+            await conn.open()
+        except Exception:
+            conn.executor.shutdown(wait=False)
+            raise
+        self._connections.append(conn)
+        self.metrics.connections_opened += 1
+        logger.debug(f"Neue Verbindung im Pool '{self.name}' geöffnet")
+        return conn
+    
+    async def _discard(self, conn: AsyncPooledConnection) -> None:
+        """
+        Schließt eine Verbindung und entfernt sie aus dem Pool.
+        
+        Args:
+            conn: Zu entfernende Verbindung
+        """
+        if conn in self._connections:
+            self._connections.remove(conn)
+        self.metrics.connections_closed += 1
+        try:
+            await conn.close()
+        except Exception as e:
+            logger.debug(f"Fehler beim Schließen einer Verbindung (nicht kritisch): {e}")
+    
+    def _track_usage(self, delta: int) -> None:
+        """
+        Aktualisiert die belegte Verbindungszeit und die Zahl belegter Verbindungen.
+        
+        Args:
+            delta: +1 bei Ausgabe, -1 bei Rückgabe
+        """
+        now = time.monotonic()
+        self.metrics.busy_time += self._in_use * (now - self._last_change)
+        self._last_change = now
+        self._in_use += delta
+    
+    async def _checkout(self) -> AsyncPooledConnection:
+        """
+        Entnimmt eine Verbindung oder öffnet eine neue.
+        
+        Returns:
+            Ausgegebene Verbindung
+        """
+        if self._closed:
+            raise RuntimeError(f"Pool '{self.name}' ist geschlossen")
+        
+        started = time.monotonic()
+        try:
+            conn = self.idle.get_nowait()
+        except asyncio.QueueEmpty:
+            if len(self._connections) + self._opening < self.max_connections:
+                self._opening += 1
+                try:
+                    conn = await self._open_connection()
+                finally:
+                    self._opening -= 1
+            else:
+                self._waiting += 1
+                try:
+                    conn = await asyncio.wait_for(self.idle.get(), timeout=self.checkout_timeout)
+                except asyncio.TimeoutError:
+                    self.metrics.timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Keine freie Verbindung im Pool '{self.name}' nach {self.checkout_timeout}s"
+                    ) from None
+                finally:
+                    self._waiting -= 1
+        
+        waited = time.monotonic() - started
+        self.metrics.checkouts += 1
+        self.metrics.total_wait_time += waited
+        self.metrics.max_wait_time = max(self.metrics.max_wait_time, waited)
+        self._track_usage(1)
+        conn.uses += 1
+        return conn
+    
+    async def _release(self, conn: AsyncPooledConnection) -> None:
+        """
+        Gibt eine Verbindung zurück und ersetzt sie bei Bedarf.
+        
+        Args:
+            conn: Zurückgegebene Verbindung
+        """
+        self._track_usage(-1)
+        conn.last_used = time.monotonic()
+        
+        healthy = True
+        try:
+            await conn.run(self._rollback_open_transaction)
+        except Exception as e:
+            logger.warning(f"Verbindung im Pool '{self.name}' wird nach Fehler ersetzt: {e}")
+            healthy = False
+        
+        expired = (self.max_connection_age is not None
+                   and conn.last_used - conn.created_at >= self.max_connection_age)
+        if self._closed:
+            await self._discard(conn)
+            return
+        if healthy and not expired:
+            self.idle.put_nowait(conn)
+            return
+        
+        # Ersatz sofort öffnen, damit wartende Aufrufer nicht ins Leere laufen.
+        # Der Platz bleibt dabei reserviert, sonst könnte ein gleichzeitiger
+        # Aufrufer eine zusätzliche Verbindung über max_connections hinaus öffnen.
+        self._opening += 1
+        try:
+            await self._discard(conn)
+            self.idle.put_nowait(await self._open_connection())
+        except Exception as e:
+            logger.error(f"Fehler beim Ersetzen einer Verbindung im Pool '{self.name}': {e}")
+        finally:
+            self._opening -= 1
+    
+    @staticmethod
+    def _rollback_open_transaction(database: SqliteDatabase) -> None:
+        """
+        Rollt eine offen gebliebene Transaktion zurück.
+        
+        Args:
+            database: SqliteDatabase-Instanz der Verbindung
+        """
+        connection = database.connection()
+        if connection.in_transaction:
+            connection.rollback()
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Gibt eine Verbindung aus dem Pool aus.
+        
+        Yields:
+            AsyncPooledConnection-Instanz
+        """
+        conn = await self._checkout()
+        try:
+            yield conn
+        finally:
+            await self._release(conn)
+    
+    async def warm_up(self, count: int = 1) -> None:
+        """
+        Öffnet vorab bis zu count Verbindungen.
+        
+        Args:
+            count: Anzahl der zu öffnenden Verbindungen
+        """
+        while len(self._connections) + self._opening < min(count, self.max_connections):
+            self.idle.put_nowait(await self._open_connection())
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Gibt die Kennzahlen des Pools zurück.
+        
+        Returns:
+            Dictionary mit Wartezeiten, Auslastung und Verbindungswechseln
+        """
+        self._track_usage(0)
+        metrics = self.metrics
+        elapsed = max(time.monotonic() - metrics.started_at, 1e-9)
+        return {
+            "name": self.name,
+            "readonly": self.readonly,
+            "max_connections": self.max_connections,
+            "open_connections": len(self._connections),
+            "in_use_connections": self._in_use,
+            "idle_connections": self.idle.qsize() if self._idle is not None else 0,
+            "waiting": self._waiting,
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "avg_wait_time": metrics.total_wait_time / metrics.checkouts if metrics.checkouts else 0.0,
+            "max_wait_time": metrics.max_wait_time,
+            "utilization": metrics.busy_time / (elapsed * self.max_connections),
+            "connections_opened": metrics.connections_opened,
+            "connections_closed": metrics.connections_closed,
+            "churn_per_minute": (metrics.connections_opened + metrics.connections_closed) * 60.0 / elapsed,
+        }
+    
+    async def close(self) -> None:
+        """Schließt alle freien Verbindungen; belegte werden bei Rückgabe geschlossen."""
+        self._closed = True
+        while self._idle is not None and not self._idle.empty():
+            await self._discard(self._idle.get_nowait())
+        logger.info(f"Asynchroner Pool '{self.name}' geschlossen")
+
+
+class AsyncDatabasePool:
+    """
+    Getrennte asynchrone Pools für Lese- und Schreibzugriffe.
+    
+    Im WAL-Modus können beliebig viele Leser parallel zu einem Schreiber
+    arbeiten. Schreibzugriffe laufen deshalb über einen Pool mit genau einer
+    Verbindung und werden so ohne SQLITE_BUSY serialisiert.
+    """
+    
+    def __init__(self, db_path: str, max_readers: int = 4, checkout_timeout: float = 5.0,
+                 max_connection_age: Optional[float] = None):
+        """
+        Initialisiert die Lese- und Schreibpools.
+        
+        Args:
+            db_path: Pfad zur Datenbankdatei
+            max_readers: Maximale Anzahl lesender Verbindungen
+            checkout_timeout: Maximale Wartezeit auf eine Verbindung (Sekunden)
+            max_connection_age: Alter, nach dem Verbindungen ersetzt werden (Sekunden)
+        """
+        self.db_path = db_path
+        self.writer = AsyncConnectionPool(
+            db_path, max_connections=1, readonly=False, checkout_timeout=checkout_timeout,
+            max_connection_age=max_connection_age, name="write",
+        )
+        self.readers = AsyncConnectionPool(
+            db_path, max_connections=max_readers, readonly=True, checkout_timeout=checkout_timeout,
+            max_connection_age=max_connection_age, name="read",
+        )
+    
+    async def open(self) -> None:
+        """Öffnet zuerst den Schreiber (aktiviert WAL), dann einen ersten Leser."""
+        await self.writer.warm_up(1)
+        await self.readers.warm_up(1)
+    
+    def read(self):
+        """
+        Gibt eine lesende Verbindung aus.
+        
+        Returns:
+            Asynchroner Kontextmanager für eine AsyncPooledConnection
+        """
+        return self.readers.acquire()
+    
+    def write(self):
+        """
+        Gibt die schreibende Verbindung aus.
+        
+        Returns:
+            Asynchroner Kontextmanager für eine AsyncPooledConnection
+        """
+        return self.writer.acquire()
+    
+    async def fetch_all(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """
+        Führt eine lesende Abfrage aus.
+        
+        Args:
+            sql: SQL-Anweisung
+            params: Parameter der Anweisung
+            
+        Returns:
+            Liste der Ergebniszeilen
+        """
+        async with self.read() as conn:
+            return await conn.execute(sql, params)
+    
+    async def execute_write(self, sql: str, params: tuple = ()) -> int:
+        """
+        Führt eine schreibende Anweisung in einer eigenen Transaktion aus.
+        
+        Args:
+            sql: SQL-Anweisung
+            params: Parameter der Anweisung
+            
+        Returns:
+            Anzahl der geänderten Zeilen
+        """
+        def _write(database: SqliteDatabase) -> int:
+            with database.atomic():
+                return database.execute_sql(sql, params).rowcount
+        
+        async with self.write() as conn:
+            return await conn.run(_write)
+    
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Gibt die Kennzahlen beider Pools zurück.
+        
+        Returns:
+            Dictionary mit den Schlüsseln "read" und "write"
+        """
+        return {"read": self.readers.get_metrics(), "write": self.writer.get_metrics()}
+    
+    async def close(self) -> None:
+        """Schließt beide Pools."""
+        await self.readers.close()
+        await self.writer.close()
+
+
 # Globale Instanz des ConnectionPools
 _connection_pool: Optional[DatabaseConnectionPool] = None
 
@@ -306,4 +755,43 @@ def cleanup_pool_connections(idle_timeout: float = 300.0) -> None:
         pool = get_connection_pool()
         pool.cleanup_idle_connections(idle_timeout)
     except Exception as e:
-        logger.error(f"Fehler bei der Bereinigung der Pool-Verbindungen: {e}")
\ No newline at end of file
+        logger.error(f"Fehler bei der Bereinigung der Pool-Verbindungen: {e}")
+
+
+# Globale Instanz des asynchronen Pools
+_async_database_pool: Optional[AsyncDatabasePool] = None
+
+
+def get_async_database_pool(db_path: str = None, max_readers: int = 4,
+                            checkout_timeout: float = 5.0) -> AsyncDatabasePool:
+    """
+    Gibt die globale Instanz des AsyncDatabasePool zurück.
+    
+    Args:
+        db_path: Pfad zur Datenbankdatei (nur für die erste Initialisierung)
+        max_readers: Maximale Anzahl lesender Verbindungen
+        checkout_timeout: Maximale Wartezeit auf eine Verbindung (Sekunden)
+        
+    Returns:
+        AsyncDatabasePool-Instanz
+    """
+    global _async_database_pool
+    if _async_database_pool is None:
+        if db_path is None:
+            raise ValueError("db_path ist erforderlich für die erste Initialisierung des asynchronen Pools")
+        _async_database_pool = AsyncDatabasePool(db_path, max_readers, checkout_timeout)
+    return _async_database_pool
+
+
+def get_async_pool_metrics() -> dict:
+    """
+    Gibt die Kennzahlen des asynchronen Pools zurück.
+    
+    Returns:
+        Dictionary mit Kennzahlen der Lese- und Schreibpools
+    """
+    try:
+        return get_async_database_pool().get_metrics()
+    except Exception as e:
+        logger.error(f"Fehler beim Abrufen der Kennzahlen des asynchronen Pools: {e}")
+        return {}
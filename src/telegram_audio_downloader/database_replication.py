@@ -8,6 +8,7 @@ Vorteile:
 - Lastverteilung
 """
 
+import os
 import threading
 import time
 import sqlite3
@@ -16,11 +17,16 @@ from typing import Optional, List, Dict, Any, Callable
 from pathlib import Path
 from dataclasses import dataclass, field
 
-from .models import db
+from peewee import SqliteDatabase
+
+from .models import db, write_generations
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Seiten pro Schritt der Online-Backup-API (bei 4-KiB-Seiten 4 MiB)
+DEFAULT_BACKUP_PAGES_PER_STEP = 1024
+
 
 @dataclass
 class ReplicaInfo:
@@ -35,6 +41,10 @@ class ReplicaInfo:
     sync_lag_seconds: float = 0.0
     error_count: int = 0
     last_error: Optional[str] = None
+    replicated_version: int = -1
+    sync_count: int = 0
+    last_sync_duration_seconds: float = 0.0
+    pages_copied: int = 0
 
 
 class DatabaseReplicator:
@@ -48,12 +58,22 @@ class DatabaseReplicator:
             master_db_path: Pfad zur Master-Datenbank
             replicas_config: Konfiguration der Replikas
         """
-        self.master_db_path = Path(master_db_path)
+        self._configured_master_path = Path(master_db_path) if master_db_path else None
         self.replicas: Dict[str, ReplicaInfo] = {}
         self.is_replicating = False
         self.replication_thread = None
         self.replication_interval = 30  # Sekunden
         self.sync_callbacks: List[Callable] = []
+        self.backup_pages_per_step = DEFAULT_BACKUP_PAGES_PER_STEP
+        self.backup_step_pause = 0.0  # Sekunden zwischen zwei Backup-Schritten
+        
+        # Beobachtete Master-Versionen für die Lag-Berechnung
+        self._master_conn: Optional[sqlite3.Connection] = None
+        self._master_conn_path: Optional[Path] = None
+        self._master_data_version: Optional[int] = None
+        self._master_version = 0
+        self._version_times: Dict[int, float] = {}
+        self._master_lock = threading.Lock()
         
         # Initialisiere Replikas
         if replicas_config:
@@ -62,6 +82,72 @@ class DatabaseReplicator:
         
         logger.info("DatabaseReplicator initialisiert")
     
+    @property
+    def master_db_path(self) -> Path:
+        """Pfad zur Master-Datenbank (Standard: die initialisierte Modell-Datenbank)."""
+        if self._configured_master_path is not None:
+            return self._configured_master_path
+        return Path(db.database)
+    
+    @master_db_path.setter
+    def master_db_path(self, value: str) -> None:
+        self._configured_master_path = Path(value) if value else None
+    
+    def observe_master(self) -> int:
+        """
+        Prüft, ob seit der letzten Beobachtung Commits auf dem Master erfolgt sind.
+        
+        Verwendet ``PRAGMA data_version`` auf einer eigenen Verbindung; diese
+        ändert sich bei jedem Commit einer anderen Verbindung, auch aus anderen
+        Prozessen. Der Zeitpunkt der ersten Beobachtung einer neuen Version ist
+        die Grundlage für den Replikations-Lag.
+        
+        Returns:
+            Aktuelle (lokal gezählte) Master-Version
+        """
+        with self._master_lock:
+            master_path = self.master_db_path
+            if self._master_conn is None or self._master_conn_path != master_path:
+                if self._master_conn is not None:
+                    self._master_conn.close()
+                self._master_conn = sqlite3.connect(str(master_path), check_same_thread=False)
+                # Im WAL-Modus blockieren Leser (und damit die Replikation) keine Schreiber
+                self._master_conn.execute("PRAGMA journal_mode=WAL;")
+                self._master_conn_path = master_path
+                self._master_data_version = None
+            
+            data_version = self._master_conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._master_data_version is not None and data_version != self._master_data_version:
+                self._master_version += 1
+                self._version_times[self._master_version] = time.time()
+            self._master_data_version = data_version
+            
+            self._update_lag()
+            return self._master_version
+    
+    def _update_lag(self) -> None:
+        """Berechnet den Lag aller Replikas aus den beobachteten Master-Versionen."""
+        now = time.time()
+        synced_versions = [
+            replica.replicated_version for replica in self.replicas.values()
+            if not replica.is_master and replica.last_sync is not None
+        ]
+        for replica in self.replicas.values():
+            if replica.is_master or replica.last_sync is None:
+                continue
+            if replica.replicated_version >= self._master_version:
+                replica.sync_lag_seconds = 0.0
+            else:
+                # Alter des ältesten Commits, den die Replika noch nicht enthält
+                pending = [t for v, t in self._version_times.items() if v > replica.replicated_version]
+                replica.sync_lag_seconds = now - min(pending) if pending else 0.0
+        
+        # Zeitpunkte, die keine Replika mehr benötigt, verwerfen
+        if synced_versions:
+            oldest = min(synced_versions)
+            for version in [v for v in self._version_times if v <= oldest]:
+                del self._version_times[version]
+    
     def add_replica(self, replica_id: str, host: str, port: int, database_path: str,
                    is_master: bool = False) -> None:
         """
@@ -103,6 +189,10 @@ class DatabaseReplicator:
         self.is_replicating = False
         if self.replication_thread and self.replication_thread.is_alive():
             self.replication_thread.join(timeout=5)
+        with self._master_lock:
+            if self._master_conn is not None:
+                self._master_conn.close()
+                self._master_conn = None
         logger.info("Datenbank-Replikation gestoppt")
     
     def _replication_loop(self) -> None:
@@ -152,95 +242,101 @@ class DatabaseReplicator:
         """
         Holt den aktuellen WAL-Checkpoint der Master-Datenbank.
         
+        Der Checkpoint läuft im PASSIVE-Modus und wartet weder auf Leser noch
+        auf Schreiber; die globale Datenbankverbindung bleibt geöffnet.
+        
         Returns:
             Dictionary mit WAL-Checkpoint-Informationen
         """
         try:
-            # Schließe die aktuelle Datenbankverbindung
-            if not db.is_closed():
-                db.close()
-            
-            # Verbinde direkt mit der Master-Datenbank
-            master_conn = sqlite3.connect(str(self.master_db_path))
-            
-            # Aktiviere WAL-Modus
-            master_conn.execute("PRAGMA journal_mode=WAL;")
-            
-            # Hole WAL-Status
-            cursor = master_conn.execute("PRAGMA wal_checkpoint(FULL);")
-            checkpoint_info = cursor.fetchone()
-            
-            # Hole die aktuelle Zeit als Referenz
-            timestamp = datetime.now()
-            
-            master_conn.close()
-            
-            # Stelle die Datenbankverbindung wieder her
-            db.connect()
+            version = self.observe_master()
+            with self._master_lock:
+                checkpoint_info = self._master_conn.execute("PRAGMA wal_checkpoint(PASSIVE);").fetchone()
             
             return {
-                "timestamp": timestamp,
-                "checkpoint_info": checkpoint_info
+                "timestamp": datetime.now(),
+                "checkpoint_info": checkpoint_info,
+                "version": version
             }
             
         except Exception as e:
             logger.error(f"Fehler beim Holen des Master-WAL-Checkpoint: {e}")
-            # Stelle die Datenbankverbindung wieder her
-            try:
-                if db.is_closed():
-                    db.connect()
-            except Exception as connection_error:
-                logger.debug(f"Wiederherstellung der Datenbankverbindung fehlgeschlagen (nicht kritisch): {connection_error}")
             raise
     
     def _replicate_to_slave(self, replica: ReplicaInfo, master_checkpoint: Dict[str, Any]) -> None:
         """
         Repliziert Daten zu einer Slave-Replika.
         
+        Der Master wird mit der Online-Backup-API schrittweise in eine
+        temporäre Datei kopiert. Die Quelle hält dabei eine WAL-Lesetransaktion
+        offen: Alle Schritte sehen denselben Snapshot, Commits anderer
+        Verbindungen erzwingen keinen Neustart des Backups, und Schreiber
+        warten nie auf die Replikation. Erst die vollständige Kopie ersetzt die
+        Replika atomar; Leser sehen daher immer einen konsistenten Stand. Ist
+        die Replika bereits aktuell, wird nichts kopiert.
+        
         Args:
             replica: Zielreplika
             master_checkpoint: Master-WAL-Checkpoint
         """
+        version = master_checkpoint.get("version", self._master_version)
+        replica_path = Path(replica.database_path)
+        if (replica.last_sync is not None and replica.replicated_version >= version
+                and replica_path.exists()):
+            logger.debug(f"Replika {replica.replica_id} ist aktuell")
+            return
+        
+        # Erstelle das Verzeichnis, falls es nicht existiert
+        replica_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = replica_path.with_name(f".{replica_path.name}.{os.getpid()}.tmp")
+        start = time.perf_counter()
+        pages_copied = 0
+        
+        def progress(status: int, remaining: int, total: int) -> None:
+            nonlocal pages_copied
+            pages_copied = total - remaining
+            if self.backup_step_pause > 0 and remaining:
+                time.sleep(self.backup_step_pause)
+        
         try:
-            replica_path = Path(replica.database_path)
-            
-            # Erstelle das Verzeichnis, falls es nicht existiert
-            replica_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Schließe die aktuelle Datenbankverbindung
-            if not db.is_closed():
-                db.close()
-            
-            # Kopiere die Master-Datenbank zur Replika
-            import shutil
-            shutil.copy2(self.master_db_path, replica_path)
-            
-            # Kopiere WAL- und SHM-Dateien, falls sie existieren
-            wal_file = self.master_db_path.with_suffix('.db-wal')
-            shm_file = self.master_db_path.with_suffix('.db-shm')
-            
-            if wal_file.exists():
-                shutil.copy2(wal_file, replica_path.with_suffix('.db-wal'))
-            
-            if shm_file.exists():
-                shutil.copy2(shm_file, replica_path.with_suffix('.db-shm'))
+            source = sqlite3.connect(str(self.master_db_path), isolation_level=None)
+            target = sqlite3.connect(str(temp_path))
+            try:
+                # Snapshot für alle Backup-Schritte festhalten
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                source.backup(target, pages=self.backup_pages_per_step, progress=progress)
+                source.execute("COMMIT")
+                # Replikas werden nur gelesen und brauchen kein WAL
+                target.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                target.close()
+                source.close()
+            os.replace(temp_path, replica_path)
             
             # Aktualisiere Replika-Informationen
             replica.last_sync = datetime.now()
-            replica.sync_lag_seconds = 0.0
+            replica.replicated_version = version
+            replica.sync_count += 1
+            replica.pages_copied = pages_copied
+            replica.last_sync_duration_seconds = time.perf_counter() - start
+            with self._master_lock:
+                self._update_lag()
             
-            logger.debug(f"Daten repliziert zu {replica.replica_id}")
+            # Zwischengespeicherte Leseergebnisse könnten vom alten Stand stammen
+            write_generations.invalidate_all()
+            
+            logger.debug(
+                f"Daten repliziert zu {replica.replica_id}: {pages_copied} Seiten "
+                f"in {replica.last_sync_duration_seconds:.3f}s"
+            )
             
         except Exception as e:
             logger.error(f"Fehler bei der Replikation zu {replica.replica_id}: {e}")
             raise
         finally:
-            # Stelle die Datenbankverbindung wieder her
-            try:
-                if db.is_closed():
-                    db.connect()
-            except Exception as e:
-                logger.error(f"Fehler beim Wiederherstellen der Datenbankverbindung: {e}")
+            if temp_path.exists():
+                temp_path.unlink()
     
     def _execute_sync_callbacks(self) -> None:
         """Führt registrierte Synchronisations-Callbacks aus."""
@@ -280,6 +376,11 @@ class DatabaseReplicator:
         """
         try:
             replica_status = []
+            if self.replicas:
+                try:
+                    self.observe_master()
+                except Exception as e:
+                    logger.debug(f"Master-Version konnte nicht ermittelt werden: {e}")
             for replica_id, replica in self.replicas.items():
                 replica_status.append({
                     "replica_id": replica.replica_id,
@@ -289,6 +390,10 @@ class DatabaseReplicator:
                     "is_active": replica.is_active,
                     "last_sync": replica.last_sync.isoformat() if replica.last_sync else None,
                     "sync_lag_seconds": replica.sync_lag_seconds,
+                    "replicated_version": replica.replicated_version,
+                    "sync_count": replica.sync_count,
+                    "last_sync_duration_seconds": replica.last_sync_duration_seconds,
+                    "pages_copied": replica.pages_copied,
                     "error_count": replica.error_count,
                     "last_error": replica.last_error
                 })
@@ -296,6 +401,7 @@ class DatabaseReplicator:
             return {
                 "timestamp": datetime.now().isoformat(),
                 "is_replicating": self.is_replicating,
+                "master_version": self._master_version,
                 "replica_count": len(self.replicas),
                 "active_replicas": len([r for r in self.replicas.values() if r.is_active]),
                 "replicas": replica_status
@@ -386,45 +492,115 @@ class DatabaseReplicator:
 
 
 class ReadReplicaRouter:
-    """Leitet Leseabfragen an Replikas weiter."""
+    """Leitet Leseabfragen an die Replika mit dem geringsten Lag weiter."""
     
-    def __init__(self, replicator: DatabaseReplicator):
+    def __init__(self, replicator: DatabaseReplicator, max_lag_seconds: Optional[float] = None):
         """
         Initialisiert den ReadReplicaRouter.
         
         Args:
             replicator: DatabaseReplicator-Instanz
+            max_lag_seconds: Maximal tolerierter Lag (None für beliebig)
         """
         self.replicator = replicator
+        self.max_lag_seconds = max_lag_seconds
         self.current_replica_index = 0
+        self._databases: Dict[str, SqliteDatabase] = {}
+        self._lock = threading.Lock()
+        self.read_stats: Dict[str, int] = {"master": 0}
         
         logger.info("ReadReplicaRouter initialisiert")
     
-    def get_read_replica(self) -> Optional[ReplicaInfo]:
+    def get_read_replica(self, max_lag_seconds: Optional[float] = None) -> Optional[ReplicaInfo]:
         """
-        Gibt eine verfügbare Read-Replika zurück.
+        Gibt die verfügbare Read-Replika mit dem geringsten Lag zurück.
+        
+        Bei gleichem Lag wird reihum verteilt.
         
+        Args:
+            max_lag_seconds: Maximal tolerierter Lag (Standard: Einstellung des Routers)
+            
         Returns:
             ReplicaInfo oder None, wenn keine verfügbar
         """
         try:
-            # Hole aktive Slave-Replikas
+            # Hole aktive, bereits synchronisierte Slave-Replikas
             active_slaves = [
                 replica for replica in self.replicator.replicas.values()
-                if not replica.is_master and replica.is_active
+                if not replica.is_master and replica.is_active and replica.last_sync is not None
             ]
             
             if not active_slaves:
                 return None
             
-            # Round-Robin-Verteilung
-            self.current_replica_index = (self.current_replica_index + 1) % len(active_slaves)
-            return active_slaves[self.current_replica_index]
+            self.replicator.observe_master()
+            limit = max_lag_seconds if max_lag_seconds is not None else self.max_lag_seconds
+            if limit is not None:
+                active_slaves = [r for r in active_slaves if r.sync_lag_seconds <= limit]
+                if not active_slaves:
+                    return None
+            
+            min_lag = min(replica.sync_lag_seconds for replica in active_slaves)
+            candidates = [r for r in active_slaves if r.sync_lag_seconds == min_lag]
+            
+            # Round-Robin-Verteilung unter den Replikas mit geringstem Lag
+            self.current_replica_index = (self.current_replica_index + 1) % len(candidates)
+            return candidates[self.current_replica_index]
             
         except Exception as e:
             logger.error(f"Fehler beim Auswählen der Read-Replika: {e}")
             return None
     
+    def _get_replica_database(self, replica: ReplicaInfo) -> SqliteDatabase:
+        """
+        Gibt eine schreibgeschützte peewee-Datenbank für eine Replika zurück.
+        
+        Args:
+            replica: Replika
+            
+        Returns:
+            SqliteDatabase-Instanz
+        """
+        with self._lock:
+            database = self._databases.get(replica.replica_id)
+            if database is None:
+                uri = f"{Path(replica.database_path).resolve().as_uri()}?mode=ro"
+                database = self._databases[replica.replica_id] = SqliteDatabase(uri, uri=True)
+            return database
+    
+    def read(self, func: Callable[[SqliteDatabase], Any],
+             max_lag_seconds: Optional[float] = None) -> Any:
+        """
+        Führt eine Lesefunktion auf einer Replika aus.
+        
+        Die Funktion erhält die zu verwendende Datenbank und bindet ihre
+        Abfragen daran (``query.bind(database)``). Ohne passende Replika oder
+        bei einem Fehler auf der Replika wird der Master verwendet.
+        
+        Args:
+            func: Lesefunktion
+            max_lag_seconds: Maximal tolerierter Lag
+            
+        Returns:
+            Ergebnis der Lesefunktion
+        """
+        replica = self.get_read_replica(max_lag_seconds)
+        if replica is not None:
+            database = self._get_replica_database(replica)
+            try:
+                result = func(database)
+                self.read_stats[replica.replica_id] = self.read_stats.get(replica.replica_id, 0) + 1
+                return result
+            except Exception as e:
+                logger.warning(f"Lesen von Replika {replica.replica_id} fehlgeschlagen, Fallback auf Master: {e}")
+            finally:
+                # Neu verbinden, damit die nächste Abfrage eine aufgefrischte Replika sieht
+                if not database.is_closed():
+                    database.close()
+        
+        self.read_stats["master"] += 1
+        return func(db)
+    
     def execute_read_query(self, query: str, params: tuple = ()) -> Any:
         """
         Führt eine Leseabfrage auf einer Replika aus.
@@ -437,20 +613,7 @@ class ReadReplicaRouter:
             Abfrageergebnis
         """
         try:
-            replica = self.get_read_replica()
-            if not replica:
-                # Fallback auf Master-Datenbank
-                logger.warning("Keine Read-Replika verfügbar, Fallback auf Master")
-                return db.execute_sql(query, params)
-            
-            # Verbinde mit der Replika-Datenbank
-            replica_conn = sqlite3.connect(replica.database_path)
-            cursor = replica_conn.execute(query, params)
-            result = cursor.fetchall()
-            replica_conn.close()
-            
-            logger.debug(f"Leseabfrage auf Replika {replica.replica_id} ausgeführt")
-            return result
+            return self.read(lambda database: database.execute_sql(query, params).fetchall())
             
         except Exception as e:
             logger.error(f"Fehler bei der Ausführung der Leseabfrage: {e}")
@@ -471,8 +634,8 @@ def get_database_replicator() -> DatabaseReplicator:
     """
     global _replicator
     if _replicator is None:
-        # In einer echten Implementierung würden wir hier die Konfiguration laden
-        _replicator = DatabaseReplicator(master_db_path=db.database)
+        # Ohne expliziten Pfad folgt der Replikator der initialisierten Modell-Datenbank
+        _replicator = DatabaseReplicator(master_db_path=None)
     return _replicator
 
 
@@ -550,4 +713,22 @@ def execute_read_query_on_replica(query: str, params: tuple = ()) -> Any:
         return router.execute_read_query(query, params)
     except Exception as e:
         logger.error(f"Fehler bei der Ausführung der Read-Replika-Abfrage: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def read_from_replica(func: Callable[[SqliteDatabase], Any],
+                      max_lag_seconds: Optional[float] = None) -> Any:
+    """
+    Führt eine Lesefunktion auf der Read-Replika mit dem geringsten Lag aus.
+    
+    Ohne konfigurierte Replikas wird die Funktion direkt mit der
+    Modell-Datenbank aufgerufen.
+    
+    Args:
+        func: Lesefunktion, die die zu verwendende Datenbank erhält
+        max_lag_seconds: Maximal tolerierter Lag
+        
+    Returns:
+        Ergebnis der Lesefunktion
+    """
+    router = get_read_replica_router()
+    return router.read(func, max_lag_seconds)
@@ -9,18 +9,60 @@ Ansätze:
 """
 
 import hashlib
+import multiprocessing
+import threading
 import time
+from collections import defaultdict
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Iterable, Iterator, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from .models import db, AudioFile, TelegramGroup
+from peewee import JOIN, ForeignKeyField, SqliteDatabase
+from playhouse.sqlite_ext import AutoIncrementField
+
+from .database_statistics import ensure_statistics_tables
+from .error_handling import DatabaseError
+from .models import db, AudioFile, DownloadStatus, TelegramGroup, TrackedSqliteDatabase
 from .logging_config import get_logger
 from .database_replication import get_database_replicator, get_read_replica_router
 
 logger = get_logger(__name__)
 
+# Shard-Keys liegen im Bereich 0..0xFFFF (letzte vier Hex-Ziffern des SHA-256)
+SHARD_KEY_SPACE = 0x10000
+
+SHARD_BY_GROUP = "group"
+SHARD_BY_FILE_ID = "file_id"
+
+# Die ids der Audiodateien eines Shards beginnen bei einem eigenen Vielfachen von 2^40,
+# damit sie über Hauptdatenbank und Shards hinweg eindeutig bleiben
+SHARD_ID_OFFSET_BITS = 40
+
+# WAL erlaubt parallele Leser; busy_timeout wartet auf Schreibsperren statt sofort abzubrechen
+SHARD_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 30000,
+    "foreign_keys": 1,
+    # REPLACE beim Verschieben löst sonst die DELETE-Trigger der Statistiktabellen nicht aus
+    "recursive_triggers": 1,
+}
+
+
+def shard_id_base(shard_id: str) -> int:
+    """
+    Gibt den Startwert der Audiodatei-ids eines Shards zurück.
+
+    Args:
+        shard_id: ID des Shards
+
+    Returns:
+        Erste id abzüglich eins (Vielfaches von 2^40)
+    """
+    hash_value = hashlib.sha256(shard_id.encode()).hexdigest()
+    return (int(hash_value[:5], 16) + 1) << SHARD_ID_OFFSET_BITS
+
 
 @dataclass
 class ShardInfo:
@@ -35,59 +77,212 @@ class ShardInfo:
     last_error: Optional[str] = None
 
 
+class ShardConnection:
+    """Datenbank und gebundene Modelle eines Shards."""
+
+    def __init__(self, shard: ShardInfo):
+        """
+        Öffnet die Shard-Datenbank und legt das Schema an.
+
+        Args:
+            shard: Informationen über den Shard
+        """
+        Path(shard.database_path).parent.mkdir(parents=True, exist_ok=True)
+        self.shard = shard
+        # Schreibzugriffe erhöhen die Schreib-Generationen wie in der Hauptdatenbank
+        self.database = TrackedSqliteDatabase(shard.database_path, pragmas=SHARD_PRAGMAS)
+
+        # Eigene Modellklassen pro Shard, damit save() und Abfragen threadsicher
+        # in der Shard-Datenbank landen, ohne die globalen Modelle umzubinden
+        group_meta = type("Meta", (), {"database": self.database, "table_name": "telegram_groups"})
+        self.group_model = type("TelegramGroup", (TelegramGroup,), {
+            "Meta": group_meta,
+            "__module__": __name__,
+        })
+        audio_meta = type("Meta", (), {"database": self.database, "table_name": "audio_files"})
+        self.audio_model = type("AudioFile", (AudioFile,), {
+            "Meta": audio_meta,
+            "__module__": __name__,
+            "id": AutoIncrementField(),
+            "group": ForeignKeyField(self.group_model, backref="audio_files",
+                                     on_delete="CASCADE", null=True),
+        })
+        self.database.create_tables([self.group_model, self.audio_model], safe=True)
+        self._reserve_id_range()
+        # Eigene Statistiktabellen, damit Leser nicht jeden Shard vollständig zählen
+        ensure_statistics_tables(self.database.connection())
+        self._group_ids: Dict[int, int] = {}
+        self._groups: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def _reserve_id_range(self) -> None:
+        """Lässt die ids der Audiodateien im eigenen Bereich des Shards beginnen."""
+        base = shard_id_base(self.shard.shard_id)
+        try:
+            with self.database.atomic():
+                self.database.execute_sql(
+                    "INSERT INTO sqlite_sequence (name, seq) SELECT 'audio_files', ? "
+                    "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'audio_files')",
+                    (base,),
+                )
+                self.database.execute_sql(
+                    "UPDATE sqlite_sequence SET seq = ? WHERE name = 'audio_files' AND seq < ?",
+                    (base, base),
+                )
+        except Exception as e:
+            # Shard-Dateien ohne AUTOINCREMENT (ältere Versionen) behalten ihre ids
+            logger.debug(f"Kein eigener id-Bereich für Shard {self.shard.shard_id}: {e}")
+
+    def _lookup_groups(self, group_ids: List[int]) -> None:
+        """Lädt die Primärschlüssel der angegebenen Gruppen in den Cache."""
+        rows = self.group_model.select(self.group_model.id, self.group_model.group_id).where(
+            self.group_model.group_id.in_(group_ids)
+        ).tuples()
+        with self._lock:
+            self._group_ids.update((group_id, pk) for pk, group_id in rows)
+
+    def ensure_groups(self, groups: Iterable[Dict[str, Any]]) -> Dict[int, int]:
+        """
+        Legt Gruppen im Shard an und gibt deren Primärschlüssel zurück.
+
+        Ist der Primärschlüssel der Hauptdatenbank angegeben (Schlüssel ``id``),
+        übernimmt ihn der Shard, sodass ``audio_files.group_id`` in allen
+        Datenbanken dieselbe Gruppe bezeichnet.
+
+        Args:
+            groups: Gruppen mit den Schlüsseln group_id, title, username und optional id
+
+        Returns:
+            Dictionary Telegram-Gruppen-ID -> Primärschlüssel im Shard
+        """
+        groups = {group["group_id"]: group for group in groups if group.get("group_id") is not None}
+        with self._lock:
+            missing = [group_id for group_id in groups if group_id not in self._group_ids]
+        if missing:
+            records = []
+            for group_id in missing:
+                record = {
+                    "group_id": group_id,
+                    "title": groups[group_id].get("title") or str(group_id),
+                    "username": groups[group_id].get("username"),
+                }
+                if groups[group_id].get("id") is not None:
+                    record["id"] = groups[group_id]["id"]
+                records.append(record)
+            self.group_model.insert_many(records).on_conflict_ignore().execute()
+            self._lookup_groups(missing)
+
+            # Ist der Primärschlüssel im Shard bereits vergeben, erhält die Gruppe einen neuen
+            with self._lock:
+                conflicting = [record for record in records if record["group_id"] not in self._group_ids]
+            if conflicting:
+                for record in conflicting:
+                    record.pop("id", None)
+                self.group_model.insert_many(conflicting).on_conflict_ignore().execute()
+                self._lookup_groups([record["group_id"] for record in conflicting])
+        return {group_id: self._group_ids[group_id] for group_id in groups}
+
+    def get_group(self, group: TelegramGroup):
+        """
+        Gibt die Shard-Kopie einer Gruppe zurück.
+
+        Args:
+            group: Gruppe aus der Hauptdatenbank
+
+        Returns:
+            Gruppeninstanz des Shards
+        """
+        shard_group = self._groups.get(group.group_id)
+        if shard_group is None:
+            pk = self.ensure_groups([{
+                "id": group.id,
+                "group_id": group.group_id,
+                "title": group.title,
+                "username": group.username,
+            }])[group.group_id]
+            shard_group = self._groups[group.group_id] = self.group_model.get_by_id(pk)
+        return shard_group
+
+    def count(self) -> int:
+        """Gibt die Anzahl der Audiodateien im Shard zurück."""
+        return self.audio_model.select().count()
+
+    def close(self) -> None:
+        """Schließt die Verbindung des aktuellen Threads."""
+        if not self.database.is_closed():
+            self.database.close()
+
+
 class DatabaseSharder:
-    """Verwaltet die Datenbank-Sharding."""
-    
-    def __init__(self, shard_config: List[Dict[str, Any]] = None):
+    """
+    Verteilt Audiodateien auf mehrere SQLite-Dateien.
+
+    Der Shard-Key wird je nach Modus aus der Telegram-Gruppen-ID oder der
+    file_id gebildet. Schreibzugriffe verschiedener Downloader-Prozesse
+    landen dadurch in unterschiedlichen Dateien und konkurrieren nicht mehr
+    um dieselbe Schreibsperre.
+    """
+
+    def __init__(self, shard_config: List[Dict[str, Any]] = None, shard_by: str = SHARD_BY_GROUP,
+                 batch_size: int = 500):
         """
         Initialisiert den DatabaseSharder.
-        
+
         Args:
             shard_config: Konfiguration der Shards
+            shard_by: Shard-Key ("group" oder "file_id")
+            batch_size: Anzahl der Zeilen pro Batch beim Verschieben
         """
+        if shard_by not in (SHARD_BY_GROUP, SHARD_BY_FILE_ID):
+            raise ValueError(f"Unbekannter Shard-Key: {shard_by}")
+
         self.shards: Dict[str, ShardInfo] = {}
         self.shard_key_function: Callable = self._default_shard_key_function
+        self.shard_by = shard_by
+        self.batch_size = batch_size
         self.is_sharding_active = False
-        
+        self._connections: Dict[str, ShardConnection] = {}
+        self._lock = threading.RLock()
+
         # Initialisiere Shards
         if shard_config:
             for config in shard_config:
                 self.add_shard(**config)
-        
+
         logger.info("DatabaseSharder initialisiert")
-    
+
     def _default_shard_key_function(self, record_id: str) -> int:
         """
         Standard-Shard-Key-Funktion basierend auf Hash.
-        
+
         Args:
             record_id: ID des Datensatzes
-            
+
         Returns:
             Shard-Key als Integer
         """
         # Erstelle einen Hash des Record-IDs und verwende die letzten 4 Hex-Ziffern
         hash_value = hashlib.sha256(record_id.encode()).hexdigest()
         return int(hash_value[-4:], 16)
-    
+
     def __call__(self, record_id: str) -> int:
         """
         Berechnet den Shard-Key für eine Record-ID.
-        
+
         Args:
             record_id: ID des Datensatzes
-            
+
         Returns:
             Shard-Key als Integer
         """
         # Erstelle einen Hash des Record-IDs und verwende die letzten 4 Hex-Ziffern
         hash_value = hashlib.sha256(record_id.encode()).hexdigest()
         return int(hash_value[-4:], 16)
-    
+
     def add_shard(self, shard_id: str, shard_key_range: tuple, database_path: str) -> None:
         """
         Fügt einen Shard hinzu.
-        
+
         Args:
             shard_id: Eindeutige ID des Shards
             shard_key_range: Bereich der Shard-Keys (min, max)
@@ -95,69 +290,409 @@ class DatabaseSharder:
         """
         shard = ShardInfo(
             shard_id=shard_id,
-            shard_key_range=shard_key_range,
-            database_path=database_path
+            shard_key_range=tuple(shard_key_range),
+            database_path=str(database_path)
         )
-        self.shards[shard_id] = shard
+        with self._lock:
+            self.shards[shard_id] = shard
+            # Eine bestehende Verbindung darf nur bei gleichem Pfad weiterverwendet werden
+            connection = self._connections.get(shard_id)
+            if connection is not None and connection.shard.database_path != shard.database_path:
+                connection.close()
+                del self._connections[shard_id]
+            elif connection is not None:
+                connection.shard = shard
         logger.info(f"Shard hinzugefügt: {shard_id}")
-    
+
+    def create_uniform_shards(self, directory: str, shard_count: int) -> List[ShardInfo]:
+        """
+        Teilt den Schlüsselraum gleichmäßig auf eine Anzahl von Shard-Dateien auf.
+
+        Bestehende Shards mit gleicher ID behalten ihre Datei. Zeilen, die nach
+        der Neuaufteilung in einem anderen Shard liegen müssten, werden durch
+        rebalance() verschoben.
+
+        Args:
+            directory: Verzeichnis für die Shard-Dateien
+            shard_count: Anzahl der Shards
+
+        Returns:
+            Liste der aktiven Shards
+        """
+        if shard_count < 1:
+            raise ValueError("Es wird mindestens ein Shard benötigt")
+
+        step = SHARD_KEY_SPACE // shard_count
+        for index in range(shard_count):
+            upper = SHARD_KEY_SPACE - 1 if index == shard_count - 1 else (index + 1) * step - 1
+            shard_id = f"shard_{index:03d}"
+            self.add_shard(shard_id, (index * step, upper), str(Path(directory) / f"{shard_id}.db"))
+
+        # Überzählige Shards bleiben lesbar, nehmen aber keine neuen Zeilen mehr an
+        for shard_id, shard in self.shards.items():
+            index = int(shard_id.rsplit("_", 1)[-1]) if shard_id.startswith("shard_") else -1
+            if index >= shard_count:
+                shard.is_active = False
+                shard.shard_key_range = (-1, -1)
+
+        return [shard for shard in self.shards.values() if shard.is_active]
+
+    def get_shard_key(self, file_id: str, group_id: Optional[int] = None) -> int:
+        """
+        Berechnet den Shard-Key einer Audiodatei.
+
+        Args:
+            file_id: ID der Audiodatei
+            group_id: Telegram-ID der Gruppe
+
+        Returns:
+            Shard-Key als Integer
+        """
+        if self.shard_by == SHARD_BY_GROUP:
+            return self.shard_key_function(str(group_id if group_id is not None else 0))
+        return self.shard_key_function(str(file_id))
+
+    def _find_shard(self, shard_key: int) -> Optional[ShardInfo]:
+        """
+        Sucht den aktiven Shard für einen Shard-Key.
+
+        Args:
+            shard_key: Shard-Key
+
+        Returns:
+            ShardInfo oder None
+        """
+        for shard in self.shards.values():
+            if (shard.is_active and
+                    shard.shard_key_range[0] <= shard_key <= shard.shard_key_range[1]):
+                return shard
+        return None
+
     def get_shard_for_record(self, record_id: str) -> Optional[ShardInfo]:
         """
         Bestimmt den Shard für einen Datensatz.
-        
+
         Args:
             record_id: ID des Datensatzes
-            
+
         Returns:
             ShardInfo oder None, wenn kein passender Shard gefunden
         """
         try:
             shard_key = self.shard_key_function(record_id)
-            
-            for shard in self.shards.values():
-                if (shard.is_active and 
-                    shard.shard_key_range[0] <= shard_key <= shard.shard_key_range[1]):
-                    return shard
-            
-            logger.warning(f"Kein passender Shard für Record-ID {record_id} (Shard-Key: {shard_key})")
-            return None
-            
+            shard = self._find_shard(shard_key)
+            if shard is None:
+                logger.warning(f"Kein passender Shard für Record-ID {record_id} (Shard-Key: {shard_key})")
+            return shard
+
         except Exception as e:
             logger.error(f"Fehler bei der Shard-Zuweisung für {record_id}: {e}")
             return None
-    
-    def distribute_existing_data(self) -> Dict[str, int]:
+
+    def get_shard_for_audio_file(self, file_id: str, group_id: Optional[int] = None) -> Optional[ShardInfo]:
         """
-        Verteilt vorhandene Daten auf die Shards.
-        
+        Bestimmt den Shard für eine Audiodatei.
+
+        Args:
+            file_id: ID der Audiodatei
+            group_id: Telegram-ID der Gruppe
+
+        Returns:
+            ShardInfo oder None, wenn kein passender Shard gefunden
+        """
+        shard_key = self.get_shard_key(file_id, group_id)
+        shard = self._find_shard(shard_key)
+        if shard is None:
+            logger.warning(f"Kein passender Shard für Datei {file_id} (Shard-Key: {shard_key})")
+        return shard
+
+    def get_connection(self, shard: ShardInfo) -> ShardConnection:
+        """
+        Gibt die (zwischengespeicherte) Verbindung zu einem Shard zurück.
+
+        Args:
+            shard: Shard
+
+        Returns:
+            ShardConnection des Shards
+        """
+        connection = self._connections.get(shard.shard_id)
+        if connection is None:
+            with self._lock:
+                connection = self._connections.get(shard.shard_id)
+                if connection is None:
+                    connection = self._connections[shard.shard_id] = ShardConnection(shard)
+        return connection
+
+    def route_audio_file(self, file_id: str, group: Optional[TelegramGroup] = None) -> Tuple[Any, Any]:
+        """
+        Gibt Modell und Gruppe für Lese- und Schreibzugriffe auf eine Audiodatei zurück.
+
+        Das zurückgegebene Modell ist eine Unterklasse von AudioFile, die an die
+        Shard-Datenbank gebunden ist; Instanzen speichern sich mit save() im Shard.
+
+        Args:
+            file_id: ID der Audiodatei
+            group: Gruppe aus der Hauptdatenbank
+
+        Returns:
+            Tupel (Modellklasse, Gruppe im Shard oder None)
+
+        Raises:
+            DatabaseError: Wenn kein Shard für die Datei zuständig ist
+        """
+        group_id = getattr(group, "group_id", None)
+        shard = self.get_shard_for_audio_file(file_id, group_id)
+        if shard is None:
+            raise DatabaseError(f"Kein Shard für Datei {file_id} konfiguriert")
+
+        connection = self.get_connection(shard)
+        shard_group = connection.get_group(group) if group is not None else None
+        return connection.audio_model, shard_group
+
+    def find_audio_file(self, file_id: str, group_id: Optional[int] = None):
+        """
+        Sucht eine Audiodatei in den Shards.
+
+        Ohne Gruppen-ID werden bei gruppenbasiertem Sharding alle Shards durchsucht.
+
+        Args:
+            file_id: ID der Audiodatei
+            group_id: Telegram-ID der Gruppe
+
+        Returns:
+            AudioFile-Instanz des Shards oder None
+        """
+        if self.shard_by == SHARD_BY_FILE_ID or group_id is not None:
+            shard = self.get_shard_for_audio_file(file_id, group_id)
+            candidates = [shard] if shard else []
+        else:
+            candidates = list(self.shards.values())
+
+        for shard in candidates:
+            model = self.get_connection(shard).audio_model
+            audio_file = model.get_or_none(model.file_id == file_id)
+            if audio_file is not None:
+                return audio_file
+        return None
+
+    def iter_completed_file_ids(self) -> Iterator[str]:
+        """
+        Liefert die file_ids aller abgeschlossenen Downloads aus allen Shards.
+
+        Returns:
+            Iterator über file_ids
+        """
+        for shard in list(self.shards.values()):
+            model = self.get_connection(shard).audio_model
+            query = model.select(model.file_id).where(
+                model.status == DownloadStatus.COMPLETED.value
+            ).tuples()
+            for (file_id,) in query.iterator():
+                yield file_id
+
+    def get_read_databases(self) -> List[SqliteDatabase]:
+        """
+        Gibt die Datenbanken aller Shards für Leser zurück.
+
+        Inaktive Shards sind enthalten, da sie bis zum Rebalancing noch Zeilen enthalten.
+
+        Returns:
+            Liste der Shard-Datenbanken, sortiert nach Shard-ID
+        """
+        return [self.get_connection(self.shards[shard_id]).database for shard_id in sorted(self.shards)]
+
+    def _select_batches(self, audio_model, group_model, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Liest Audiodateien samt Gruppe in Batches per Keyset-Paginierung.
+
+        Args:
+            audio_model: Quellmodell für Audiodateien
+            group_model: Quellmodell für Gruppen
+            batch_size: Anzahl der Zeilen pro Batch
+
+        Returns:
+            Iterator über Listen von Zeilen
+        """
+        last_id = 0
+        while True:
+            batch = list(
+                audio_model.select(
+                    audio_model,
+                    group_model.group_id.alias("telegram_group_id"),
+                    group_model.title.alias("group_title"),
+                    group_model.username.alias("group_username"),
+                )
+                .join(group_model, JOIN.LEFT_OUTER, on=(audio_model.group == group_model.id))
+                .where(audio_model.id > last_id)
+                .order_by(audio_model.id)
+                .limit(batch_size)
+                .dicts()
+            )
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1]["id"]
+
+    def _write_rows(self, connection: ShardConnection, rows: List[Dict[str, Any]],
+                    keep_ids: bool = False) -> None:
+        """
+        Schreibt Zeilen idempotent in einen Shard.
+
+        Zeilen aus einem anderen Shard behalten ihre id, da diese aus dem
+        reservierten Bereich des Quell-Shards stammt und nie neu vergeben
+        wird. Zeilen aus der Hauptdatenbank erhalten eine neue id aus dem
+        Bereich des Ziel-Shards, weil die Hauptdatenbank freie ids erneut
+        vergeben kann.
+
+        Args:
+            connection: Ziel-Shard
+            rows: Zeilen aus _select_batches
+            keep_ids: Ob die id der Quellzeile übernommen wird
+        """
+        group_ids = connection.ensure_groups(
+            {
+                "id": row["group"],
+                "group_id": row["telegram_group_id"],
+                "title": row["group_title"],
+                "username": row["group_username"],
+            }
+            for row in rows
+        )
+        excluded = {"group"} if keep_ids else {"group", "id"}
+        field_names = [name for name in AudioFile._meta.fields if name not in excluded]
+        records = []
+        for row in rows:
+            record = {name: row[name] for name in field_names}
+            record["group"] = group_ids.get(row["telegram_group_id"])
+            records.append(record)
+
+        with connection.database.atomic():
+            connection.audio_model.insert_many(records).on_conflict_replace().execute()
+
+    def _move_batch(self, rows: List[Dict[str, Any]], source: Optional[ShardConnection],
+                    stats: Dict[str, int]) -> List[int]:
+        """
+        Kopiert Zeilen in ihre Ziel-Shards und löscht sie anschließend in der Quelle.
+
+        Da zuerst geschrieben und erst danach gelöscht wird, gehen bei einem
+        Abbruch keine Zeilen verloren; doppelte Kopien werden beim nächsten
+        Lauf über die eindeutige file_id ersetzt.
+
+        Args:
+            rows: Zu verschiebende Zeilen
+            source: Quell-Shard oder None für die Hauptdatenbank
+            stats: Zähler pro Ziel-Shard
+
+        Returns:
+            IDs der Quellzeilen, die in einen Ziel-Shard geschrieben wurden
+        """
+        written_ids: List[int] = []
+        by_target: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            shard = self.get_shard_for_audio_file(row["file_id"], row["telegram_group_id"])
+            if shard is None or (source is not None and shard.shard_id == source.shard.shard_id):
+                continue
+            by_target[shard.shard_id].append(row)
+
+        for shard_id, target_rows in by_target.items():
+            self._write_rows(self.get_connection(self.shards[shard_id]), target_rows,
+                             keep_ids=source is not None)
+            stats[shard_id] = stats.get(shard_id, 0) + len(target_rows)
+            moved_ids = [row["id"] for row in target_rows]
+            written_ids.extend(moved_ids)
+
+            if source is not None:
+                model = source.audio_model
+                with source.database.atomic():
+                    model.delete().where(model.id.in_(moved_ids)).execute()
+
+        return written_ids
+
+    def distribute_existing_data(self, batch_size: Optional[int] = None,
+                                 delete_source: bool = False) -> Dict[str, int]:
+        """
+        Verteilt vorhandene Daten der Hauptdatenbank auf die Shards.
+
+        Die Zeilen werden in Batches gelesen und geschrieben, sodass der
+        Speicherbedarf unabhängig von der Tabellengröße bleibt. Zeilen, für die
+        kein aktiver Shard zuständig ist, bleiben in der Hauptdatenbank.
+
+        Args:
+            batch_size: Anzahl der Zeilen pro Batch
+            delete_source: Ob verteilte Zeilen aus der Hauptdatenbank gelöscht werden
+
         Returns:
             Dictionary mit Verteilungsstatistiken
         """
         try:
-            distribution_stats = {}
-            
-            # Hole alle AudioFiles
-            audio_files = list(AudioFile.select())
-            logger.info(f"Verteile {len(audio_files)} AudioFiles auf Shards")
-            
-            for audio_file in audio_files:
-                shard = self.get_shard_for_record(audio_file.file_id)
-                if shard:
-                    # In einer echten Implementierung würden wir hier die Daten
-                    # in den entsprechenden Shard migrieren
-                    distribution_stats[shard.shard_id] = distribution_stats.get(shard.shard_id, 0) + 1
-            
+            distribution_stats: Dict[str, int] = {}
+            batch_size = batch_size or self.batch_size
+
+            skipped_file_ids: List[str] = []
+
+            for batch in self._select_batches(AudioFile, TelegramGroup, batch_size):
+                written_ids = self._move_batch(batch, None, distribution_stats)
+                if len(written_ids) < len(batch):
+                    written = set(written_ids)
+                    skipped_file_ids.extend(row["file_id"] for row in batch if row["id"] not in written)
+                if delete_source and written_ids:
+                    with db.atomic():
+                        AudioFile.delete().where(AudioFile.id.in_(written_ids)).execute()
+
+            if skipped_file_ids:
+                logger.warning(
+                    f"{len(skipped_file_ids)} Audiodateien ohne zuständigen Shard bleiben in der "
+                    f"Hauptdatenbank: {skipped_file_ids[:10]}"
+                )
+
+            self._refresh_record_counts()
             logger.info(f"Datenverteilung abgeschlossen: {distribution_stats}")
             return distribution_stats
-            
+
         except Exception as e:
             logger.error(f"Fehler bei der Datenverteilung: {e}")
             return {}
-    
+
+    def rebalance(self, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Verschiebt Zeilen, die nach einer Neuaufteilung im falschen Shard liegen.
+
+        Jeder Shard wird in Batches gelesen; nur falsch platzierte Zeilen
+        werden in ihren Ziel-Shard kopiert und danach in der Quelle gelöscht.
+
+        Args:
+            batch_size: Anzahl der Zeilen pro Batch
+
+        Returns:
+            Dictionary mit der Anzahl verschobener Zeilen pro Ziel-Shard
+        """
+        moved: Dict[str, int] = {}
+        batch_size = batch_size or self.batch_size
+
+        for shard in list(self.shards.values()):
+            source = self.get_connection(shard)
+            for batch in self._select_batches(source.audio_model, source.group_model, batch_size):
+                self._move_batch(batch, source, moved)
+
+        self._refresh_record_counts()
+        logger.info(f"Rebalancing abgeschlossen: {moved}")
+        return moved
+
+    def _refresh_record_counts(self) -> None:
+        """Aktualisiert die Zeilenzahlen der Shards."""
+        for shard in self.shards.values():
+            try:
+                shard.record_count = self.get_connection(shard).count()
+                shard.last_updated = datetime.now()
+            except Exception as e:
+                shard.error_count += 1
+                shard.last_error = str(e)
+
     def get_shard_statistics(self) -> List[Dict[str, Any]]:
         """
         Gibt Statistiken für alle Shards zurück.
-        
+
         Returns:
             Liste von Shard-Statistiken
         """
@@ -174,17 +709,126 @@ class DatabaseSharder:
                 "last_error": shard.last_error
             })
         return stats
-    
+
     def enable_sharding(self) -> None:
         """Aktiviert das Sharding."""
+        if not any(shard.is_active for shard in self.shards.values()):
+            raise DatabaseError("Sharding kann ohne aktive Shards nicht aktiviert werden")
         self.is_sharding_active = True
         logger.info("Datenbank-Sharding aktiviert")
-    
+
     def disable_sharding(self) -> None:
         """Deaktiviert das Sharding."""
         self.is_sharding_active = False
         logger.info("Datenbank-Sharding deaktiviert")
 
+    def close(self) -> None:
+        """Schließt alle Shard-Verbindungen des aktuellen Threads."""
+        with self._lock:
+            for connection in self._connections.values():
+                connection.close()
+
+
+def _benchmark_writer(shard_directory: str, shard_count: int, shard_by: str,
+                      group_ids: List[int], rows: int, writer_index: int,
+                      barrier: Any, finished: Any) -> None:
+    """
+    Schreibt Zeilen als eigener Prozess für benchmark_shard_write_throughput().
+
+    Args:
+        shard_directory: Verzeichnis der Shard-Dateien
+        shard_count: Anzahl der Shards
+        shard_by: Shard-Key
+        group_ids: Telegram-IDs der Gruppen dieses Schreibers
+        rows: Anzahl der Zeilen
+        writer_index: Index des Schreibers
+        barrier: Gemeinsamer Startpunkt aller Schreiber
+        finished: Warteschlange für die Endzeitpunkte
+    """
+    sharder = DatabaseSharder(shard_by=shard_by)
+    sharder.create_uniform_shards(shard_directory, shard_count)
+    groups = {
+        group_id: TelegramGroup(group_id=group_id, title=f"Gruppe {group_id}")
+        for group_id in group_ids
+    }
+    # Verbindungen und Gruppen vorab anlegen, damit nur Schreibzugriffe gemessen werden
+    for group in groups.values():
+        sharder.route_audio_file(f"warmup_{writer_index}", group)
+
+    barrier.wait()
+    for index in range(rows):
+        group = groups[group_ids[index % len(group_ids)]]
+        file_id = f"w{writer_index}_{index}"
+        model, shard_group = sharder.route_audio_file(file_id, group)
+        # Eine Transaktion pro Zeile wie bei Statusaktualisierungen im Downloader
+        model.create(file_id=file_id, file_name=f"{file_id}.mp3", file_size=index, group=shard_group)
+    finished.put(time.monotonic())
+    sharder.close()
+
+
+def benchmark_shard_write_throughput(directory: str, shard_counts: Iterable[int] = (1, 2, 4),
+                                     writers: int = 4, rows_per_writer: int = 500,
+                                     shard_by: str = SHARD_BY_GROUP) -> Dict[int, float]:
+    """
+    Misst den Schreibdurchsatz paralleler Prozesse in Abhängigkeit von der Shard-Anzahl.
+
+    Jeder Schreiber ist ein eigener Prozess, der für eigene Gruppen einzelne
+    Transaktionen ausführt - wie mehrere Downloader-Prozesse. Gemessen wird
+    vom gemeinsamen Start bis zum Ende des langsamsten Schreibers.
+
+    Args:
+        directory: Arbeitsverzeichnis für die Shard-Dateien
+        shard_counts: Zu messende Shard-Anzahlen
+        writers: Anzahl paralleler Schreibprozesse
+        rows_per_writer: Zeilen pro Schreiber
+        shard_by: Shard-Key
+
+    Returns:
+        Dictionary Shard-Anzahl -> geschriebene Zeilen pro Sekunde
+    """
+    results: Dict[int, float] = {}
+    context = multiprocessing.get_context()
+
+    for shard_count in shard_counts:
+        shard_directory = str(Path(directory) / f"{shard_count}_shards")
+        # Schema vorab anlegen, damit sich die Schreiber nicht beim Anlegen blockieren
+        setup = DatabaseSharder(shard_by=shard_by)
+        setup.create_uniform_shards(shard_directory, shard_count)
+        for shard in setup.shards.values():
+            setup.get_connection(shard)
+        setup.close()
+
+        barrier = context.Barrier(writers + 1)
+        finished = context.Queue()
+        processes = [
+            context.Process(
+                target=_benchmark_writer,
+                args=(shard_directory, shard_count, shard_by,
+                      [writer * 1000 + offset for offset in range(4)], rows_per_writer, writer,
+                      barrier, finished),
+            )
+            for writer in range(writers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            barrier.wait(timeout=120)
+        except Exception as e:
+            for process in processes:
+                process.terminate()
+            raise DatabaseError(f"Benchmark-Schreiber mit {shard_count} Shards nicht gestartet: {e}")
+        start = time.monotonic()
+        end_times = [finished.get(timeout=600) for _ in processes]
+        for process in processes:
+            process.join()
+
+        if any(process.exitcode != 0 for process in processes):
+            raise DatabaseError(f"Benchmark-Schreiber mit {shard_count} Shards fehlgeschlagen")
+        results[shard_count] = writers * rows_per_writer / (max(end_times) - start)
+        logger.info(f"Shard-Benchmark: {shard_count} Shards, {results[shard_count]:.0f} Zeilen/s")
+
+    return results
+
 
 class PartitionManager:
     """Verwaltet die Datenpartitionierung."""
@@ -573,19 +1217,87 @@ def scale_database(scale_type: str, scale_factor: float) -> bool:
         return False
 
 
-def get_shard_for_audio_file(file_id: str) -> Optional[ShardInfo]:
+def get_shard_for_audio_file(file_id: str, group_id: Optional[int] = None) -> Optional[ShardInfo]:
     """
     Bestimmt den Shard für eine Audiodatei.
     
     Args:
         file_id: ID der Audiodatei
+        group_id: Telegram-ID der Gruppe (für gruppenbasiertes Sharding)
         
     Returns:
         ShardInfo oder None, wenn kein passender Shard gefunden
     """
     try:
         manager = get_scaling_manager()
-        return manager.sharder.get_shard_for_record(file_id)
+        return manager.sharder.get_shard_for_audio_file(file_id, group_id)
     except Exception as e:
         logger.error(f"Fehler bei der Shard-Zuweisung für {file_id}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def enable_configured_sharding(shard_count: int, shard_dir: str,
+                               distribute_existing: bool = False) -> bool:
+    """
+    Richtet gleichmäßig aufgeteilte Shards ein und aktiviert das Routing.
+
+    Ist das Routing bereits aktiv, bleiben die Shards unverändert; vorhandene
+    Zeilen werden auf Wunsch trotzdem verschoben.
+
+    Args:
+        shard_count: Anzahl der Shards (kleiner 1 = kein Sharding)
+        shard_dir: Verzeichnis der Shard-Dateien
+        distribute_existing: Ob vorhandene Zeilen der Hauptdatenbank in die Shards verschoben werden
+
+    Returns:
+        True, wenn Sharding aktiv ist
+    """
+    sharder = get_scaling_manager().sharder
+    if not sharder.is_sharding_active:
+        if not isinstance(shard_count, int) or shard_count < 1:
+            return False
+        try:
+            sharder.create_uniform_shards(shard_dir, shard_count)
+            sharder.enable_sharding()
+        except Exception as e:
+            logger.error(f"Fehler beim Einrichten der Datenbank-Shards: {e}")
+            return False
+
+    if distribute_existing:
+        sharder.distribute_existing_data(delete_source=True)
+    return True
+
+
+def get_shard_databases() -> List[SqliteDatabase]:
+    """
+    Gibt die Shard-Datenbanken zurück, die Leser zusätzlich zur Hauptdatenbank abfragen.
+
+    Gruppen tragen in den Shards denselben Primärschlüssel wie in der
+    Hauptdatenbank und die ids der Audiodateien sind über alle Datenbanken
+    eindeutig, sodass eine AudioFile-Abfrage per ``clone().bind(database)``
+    unverändert auf jedem Shard ausgeführt werden kann.
+
+    Returns:
+        Liste der Shard-Datenbanken (leer, wenn Sharding nicht aktiv ist)
+    """
+    sharder = get_scaling_manager().sharder
+    if not sharder.is_sharding_active:
+        return []
+    return sharder.get_read_databases()
+
+
+def find_audio_file(file_id: str) -> Optional[AudioFile]:
+    """
+    Sucht eine Audiodatei in der Hauptdatenbank und bei aktivem Sharding in den Shards.
+
+    Args:
+        file_id: ID der Audiodatei
+
+    Returns:
+        AudioFile-Instanz (speichert sich in ihrer eigenen Datenbank) oder None
+    """
+    audio_file = AudioFile.get_or_none(AudioFile.file_id == file_id)
+    sharder = get_scaling_manager().sharder
+    if audio_file is None and sharder.is_sharding_active:
+        audio_file = sharder.find_audio_file(file_id)
+    return audio_file
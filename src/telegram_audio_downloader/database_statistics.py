@@ -0,0 +1,430 @@
+"""
+Materialisierte Statistiktabellen für den Telegram Audio Downloader.
+
+Anzahl, Bytes, Dauer und letzter Download werden pro Status und pro Gruppe
+in eigenen Tabellen geführt. SQLite-Trigger auf ``audio_files`` halten sie
+bei jedem Schreibzugriff aktuell - auch bei Zugriffen anderer Prozesse oder
+über rohes SQL. Dashboards und der Statistik-Endpunkt lesen dadurch eine
+Zeile pro Status bzw. Gruppe statt bei jeder Aktualisierung alle Dateien
+zu zählen.
+
+Angelegt werden Tabellen und Trigger bei der Initialisierung der Datenbank
+(``ensure_statistics_tables``). Die Leser verändern das Schema nicht: Fehlen
+die Tabellen, etwa in einer fremden Quelldatenbank, wird direkt aus
+``audio_files`` aggregiert.
+
+Bei aktivem Sharding führt jeder Shard eigene Statistiktabellen; beim Lesen
+der Modell-Datenbank werden sie zur Hauptdatenbank hinzugerechnet.
+"""
+
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from .models import db
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+STATUS_STATISTICS_TABLE = "status_statistics"
+GROUP_STATISTICS_TABLE = "group_statistics"
+
+# Gruppen-Schlüssel für Dateien ohne Gruppe
+UNGROUPED_KEY = 0
+
+_TABLES_SQL = {
+    STATUS_STATISTICS_TABLE: f"""
+        CREATE TABLE IF NOT EXISTS {STATUS_STATISTICS_TABLE} (
+            status VARCHAR(20) NOT NULL PRIMARY KEY,
+            file_count INTEGER NOT NULL DEFAULT 0,
+            total_bytes INTEGER NOT NULL DEFAULT 0,
+            downloaded_bytes INTEGER NOT NULL DEFAULT 0,
+            total_duration INTEGER NOT NULL DEFAULT 0,
+            last_download DATETIME NULL
+        )
+    """,
+    GROUP_STATISTICS_TABLE: f"""
+        CREATE TABLE IF NOT EXISTS {GROUP_STATISTICS_TABLE} (
+            group_id INTEGER NOT NULL PRIMARY KEY,
+            file_count INTEGER NOT NULL DEFAULT 0,
+            completed_count INTEGER NOT NULL DEFAULT 0,
+            total_bytes INTEGER NOT NULL DEFAULT 0,
+            downloaded_bytes INTEGER NOT NULL DEFAULT 0,
+            total_duration INTEGER NOT NULL DEFAULT 0,
+            last_download DATETIME NULL
+        )
+    """,
+}
+
+# Vorlagen zum Hinzufügen bzw. Entfernen einer Zeile ({row} ist NEW oder OLD)
+_ADD_ROW_SQL = f"""
+    INSERT INTO {STATUS_STATISTICS_TABLE}
+        (status, file_count, total_bytes, downloaded_bytes, total_duration, last_download)
+    VALUES (COALESCE({{row}}.status, ''), 1, COALESCE({{row}}.file_size, 0),
+            COALESCE({{row}}.downloaded_bytes, 0), COALESCE({{row}}.duration, 0),
+            {{row}}.downloaded_at)
+    ON CONFLICT(status) DO UPDATE SET
+        file_count = file_count + 1,
+        total_bytes = total_bytes + excluded.total_bytes,
+        downloaded_bytes = downloaded_bytes + excluded.downloaded_bytes,
+        total_duration = total_duration + excluded.total_duration,
+        last_download = CASE WHEN last_download IS NULL OR excluded.last_download > last_download
+                             THEN excluded.last_download ELSE last_download END;
+    INSERT INTO {GROUP_STATISTICS_TABLE}
+        (group_id, file_count, completed_count, total_bytes, downloaded_bytes,
+         total_duration, last_download)
+    VALUES (COALESCE({{row}}.group_id, {UNGROUPED_KEY}), 1,
+            CASE WHEN {{row}}.status = 'completed' THEN 1 ELSE 0 END,
+            COALESCE({{row}}.file_size, 0), COALESCE({{row}}.downloaded_bytes, 0),
+            COALESCE({{row}}.duration, 0), {{row}}.downloaded_at)
+    ON CONFLICT(group_id) DO UPDATE SET
+        file_count = file_count + 1,
+        completed_count = completed_count + excluded.completed_count,
+        total_bytes = total_bytes + excluded.total_bytes,
+        downloaded_bytes = downloaded_bytes + excluded.downloaded_bytes,
+        total_duration = total_duration + excluded.total_duration,
+        last_download = CASE WHEN last_download IS NULL OR excluded.last_download > last_download
+                             THEN excluded.last_download ELSE last_download END;
+"""
+
+# Der letzte Download wird nur neu ermittelt, wenn die entfernte Zeile ihn gestellt hat
+_REMOVE_ROW_SQL = f"""
+    UPDATE {STATUS_STATISTICS_TABLE} SET
+        file_count = file_count - 1,
+        total_bytes = total_bytes - COALESCE({{row}}.file_size, 0),
+        downloaded_bytes = downloaded_bytes - COALESCE({{row}}.downloaded_bytes, 0),
+        total_duration = total_duration - COALESCE({{row}}.duration, 0),
+        last_download = CASE WHEN last_download = {{row}}.downloaded_at
+                             THEN (SELECT MAX(downloaded_at) FROM audio_files
+                                   WHERE status IS {{row}}.status)
+                             ELSE last_download END
+    WHERE status = COALESCE({{row}}.status, '');
+    DELETE FROM {STATUS_STATISTICS_TABLE}
+    WHERE status = COALESCE({{row}}.status, '') AND file_count <= 0;
+    UPDATE {GROUP_STATISTICS_TABLE} SET
+        file_count = file_count - 1,
+        completed_count = completed_count
+            - CASE WHEN {{row}}.status = 'completed' THEN 1 ELSE 0 END,
+        total_bytes = total_bytes - COALESCE({{row}}.file_size, 0),
+        downloaded_bytes = downloaded_bytes - COALESCE({{row}}.downloaded_bytes, 0),
+        total_duration = total_duration - COALESCE({{row}}.duration, 0),
+        last_download = CASE WHEN last_download = {{row}}.downloaded_at
+                             THEN (SELECT MAX(downloaded_at) FROM audio_files
+                                   WHERE group_id IS {{row}}.group_id)
+                             ELSE last_download END
+    WHERE group_id = COALESCE({{row}}.group_id, {UNGROUPED_KEY});
+    DELETE FROM {GROUP_STATISTICS_TABLE}
+    WHERE group_id = COALESCE({{row}}.group_id, {UNGROUPED_KEY}) AND file_count <= 0;
+"""
+
+# Spalten, deren Änderung die Statistiken beeinflusst
+_TRACKED_COLUMNS = ("status", "file_size", "downloaded_bytes", "duration", "downloaded_at", "group_id")
+
+_TRIGGERS_SQL = {
+    "audio_files_statistics_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS audio_files_statistics_insert
+        AFTER INSERT ON audio_files
+        BEGIN
+            {_ADD_ROW_SQL.format(row="NEW")}
+        END
+    """,
+    "audio_files_statistics_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS audio_files_statistics_delete
+        AFTER DELETE ON audio_files
+        BEGIN
+            {_REMOVE_ROW_SQL.format(row="OLD")}
+        END
+    """,
+    "audio_files_statistics_update": f"""
+        CREATE TRIGGER IF NOT EXISTS audio_files_statistics_update
+        AFTER UPDATE OF {", ".join(_TRACKED_COLUMNS)} ON audio_files
+        WHEN {" OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in _TRACKED_COLUMNS)}
+        BEGIN
+            {_REMOVE_ROW_SQL.format(row="OLD")}
+            {_ADD_ROW_SQL.format(row="NEW")}
+        END
+    """,
+}
+
+# Aggregation direkt aus audio_files (Neuberechnung und Fallback der Leser)
+_STATUS_AGGREGATE_SQL = """
+    SELECT COALESCE(status, '') AS status, COUNT(*) AS file_count,
+           COALESCE(SUM(file_size), 0) AS total_bytes,
+           COALESCE(SUM(downloaded_bytes), 0) AS downloaded_bytes,
+           COALESCE(SUM(duration), 0) AS total_duration, MAX(downloaded_at) AS last_download
+    FROM audio_files
+    GROUP BY COALESCE(status, '')
+"""
+
+_GROUP_AGGREGATE_SQL = f"""
+    SELECT COALESCE(group_id, {UNGROUPED_KEY}) AS group_id, COUNT(*) AS file_count,
+           SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed_count,
+           COALESCE(SUM(file_size), 0) AS total_bytes,
+           COALESCE(SUM(downloaded_bytes), 0) AS downloaded_bytes,
+           COALESCE(SUM(duration), 0) AS total_duration, MAX(downloaded_at) AS last_download
+    FROM audio_files
+    GROUP BY COALESCE(group_id, {UNGROUPED_KEY})
+"""
+
+_REBUILD_SQL = (
+    f"DELETE FROM {STATUS_STATISTICS_TABLE}",
+    f"""
+    INSERT INTO {STATUS_STATISTICS_TABLE}
+        (status, file_count, total_bytes, downloaded_bytes, total_duration, last_download)
+    {_STATUS_AGGREGATE_SQL}
+    """,
+    f"DELETE FROM {GROUP_STATISTICS_TABLE}",
+    f"""
+    INSERT INTO {GROUP_STATISTICS_TABLE}
+        (group_id, file_count, completed_count, total_bytes, downloaded_bytes,
+         total_duration, last_download)
+    {_GROUP_AGGREGATE_SQL}
+    """,
+)
+
+_STATUS_SELECT_SQL = """
+    SELECT status, file_count, total_bytes, downloaded_bytes, total_duration, last_download
+    FROM {source} ORDER BY status
+"""
+
+_GROUP_SELECT_SQL = """
+    SELECT g.group_id, g.title, COALESCE(s.file_count, 0), COALESCE(s.completed_count, 0),
+           COALESCE(s.total_bytes, 0), COALESCE(s.downloaded_bytes, 0),
+           COALESCE(s.total_duration, 0), s.last_download
+    FROM telegram_groups g
+    LEFT JOIN {source} s ON s.group_id = g.id
+    ORDER BY g.id
+"""
+
+
+def _get_connection(connection: Optional[sqlite3.Connection]) -> Optional[sqlite3.Connection]:
+    """
+    Gibt die zu verwendende Verbindung zurück.
+
+    Args:
+        connection: Explizite Verbindung oder None für die Modell-Datenbank
+
+    Returns:
+        SQLite-Verbindung oder None, wenn die Datenbank nicht initialisiert ist
+    """
+    if connection is not None:
+        return connection
+    if db.database is None:
+        return None
+    return db.connection()
+
+
+def _shard_connections(connection: Optional[sqlite3.Connection],
+                       include_shards: Optional[bool]) -> List[sqlite3.Connection]:
+    """
+    Gibt die Verbindungen der Shards zurück, deren Statistiken hinzugerechnet werden.
+
+    Args:
+        connection: Explizit übergebene Verbindung oder None
+        include_shards: Shards einbeziehen (None: nur beim Lesen der Modell-Datenbank)
+
+    Returns:
+        Liste von SQLite-Verbindungen (leer ohne aktives Sharding)
+    """
+    if include_shards is None:
+        include_shards = connection is None
+    if not include_shards:
+        return []
+    from .database_scaling import get_shard_databases
+    return [database.connection() for database in get_shard_databases()]
+
+
+def _read_statistics(connection: sqlite3.Connection, select_sql: str, table: str,
+                     aggregate_sql: str) -> List[tuple]:
+    """
+    Liest eine Statistiktabelle oder aggregiert direkt, wenn sie fehlt.
+
+    Args:
+        connection: SQLite-Verbindung
+        select_sql: Abfrage mit Platzhalter {source}
+        table: Name der Statistiktabelle
+        aggregate_sql: Ersatzabfrage über audio_files
+
+    Returns:
+        Ergebniszeilen (leer, wenn auch audio_files fehlt)
+    """
+    try:
+        return connection.execute(select_sql.format(source=table)).fetchall()
+    except sqlite3.OperationalError:
+        pass
+    try:
+        return connection.execute(select_sql.format(source=f"({aggregate_sql})")).fetchall()
+    except sqlite3.OperationalError:
+        return []
+
+
+def rebuild_statistics(connection: Optional[sqlite3.Connection] = None) -> None:
+    """
+    Berechnet die Statistiktabellen vollständig aus ``audio_files`` neu.
+
+    Args:
+        connection: Optionale SQLite-Verbindung (Standard: Modell-Datenbank)
+    """
+    connection = _get_connection(connection)
+    if connection is None:
+        return
+
+    connection.execute("SAVEPOINT statistics_rebuild")
+    try:
+        for statement in _REBUILD_SQL:
+            connection.execute(statement)
+    except Exception:
+        connection.execute("ROLLBACK TO SAVEPOINT statistics_rebuild")
+        connection.execute("RELEASE SAVEPOINT statistics_rebuild")
+        raise
+    connection.execute("RELEASE SAVEPOINT statistics_rebuild")
+    logger.debug("Statistiktabellen neu berechnet")
+
+
+def ensure_statistics_tables(connection: Optional[sqlite3.Connection] = None) -> bool:
+    """
+    Stellt sicher, dass Statistiktabellen und Trigger vorhanden sind.
+
+    Fehlt eines der Objekte (z.B. nach dem Neuanlegen von ``audio_files``),
+    wird es angelegt und die Statistik einmalig neu berechnet.
+
+    Args:
+        connection: Optionale SQLite-Verbindung (Standard: Modell-Datenbank)
+
+    Returns:
+        True, wenn die Statistiktabellen verwendet werden können
+    """
+    connection = _get_connection(connection)
+    if connection is None:
+        return False
+
+    expected = set(_TABLES_SQL) | set(_TRIGGERS_SQL) | {"audio_files"}
+    placeholders = ", ".join("?" for _ in expected)
+    existing = {
+        row[0] for row in connection.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({placeholders})", tuple(expected)
+        )
+    }
+    if "audio_files" not in existing:
+        return False
+    if existing == expected:
+        return True
+
+    for name, sql in list(_TABLES_SQL.items()) + list(_TRIGGERS_SQL.items()):
+        if name not in existing:
+            connection.execute(sql)
+    rebuild_statistics(connection)
+    logger.info("Statistiktabellen und Trigger eingerichtet")
+    return True
+
+
+def _merge_last_download(first: Any, second: Any) -> Any:
+    """Gibt den späteren von zwei Download-Zeitpunkten zurück."""
+    if first is None or second is None:
+        return first if second is None else second
+    return max(first, second)
+
+
+def get_status_statistics(connection: Optional[sqlite3.Connection] = None,
+                          include_shards: Optional[bool] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Gibt die Statistiken pro Download-Status zurück.
+
+    Args:
+        connection: Optionale SQLite-Verbindung (Standard: Modell-Datenbank)
+        include_shards: Shards hinzurechnen (Standard: nur ohne explizite Verbindung)
+
+    Returns:
+        Dictionary Status -> Statistiken
+    """
+    shard_connections = _shard_connections(connection, include_shards)
+    connection = _get_connection(connection)
+    if connection is None:
+        return {}
+
+    statistics: Dict[str, Dict[str, Any]] = {}
+    for source in [connection] + shard_connections:
+        rows = _read_statistics(source, _STATUS_SELECT_SQL, STATUS_STATISTICS_TABLE, _STATUS_AGGREGATE_SQL)
+        for status, file_count, total_bytes, downloaded_bytes, total_duration, last_download in rows:
+            stats = statistics.setdefault(status, {
+                "file_count": 0,
+                "total_bytes": 0,
+                "downloaded_bytes": 0,
+                "total_duration": 0,
+                "last_download": None,
+            })
+            stats["file_count"] += file_count
+            stats["total_bytes"] += total_bytes
+            stats["downloaded_bytes"] += downloaded_bytes
+            stats["total_duration"] += total_duration
+            stats["last_download"] = _merge_last_download(stats["last_download"], last_download)
+    return dict(sorted(statistics.items()))
+
+
+def get_group_statistics(connection: Optional[sqlite3.Connection] = None,
+                         include_shards: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """
+    Gibt die Statistiken aller Telegram-Gruppen zurück.
+
+    Gruppen ohne Dateien sind mit Nullwerten enthalten.
+
+    Args:
+        connection: Optionale SQLite-Verbindung (Standard: Modell-Datenbank)
+        include_shards: Shards hinzurechnen (Standard: nur ohne explizite Verbindung)
+
+    Returns:
+        Liste von Gruppenstatistiken, sortiert nach Gruppen-ID
+    """
+    shard_connections = _shard_connections(connection, include_shards)
+    connection = _get_connection(connection)
+    if connection is None:
+        return []
+
+    # Die Shards kennen nur die Gruppen ihrer Dateien; zusammengeführt wird über die Telegram-ID
+    statistics: Dict[int, Dict[str, Any]] = {}
+    for source in [connection] + shard_connections:
+        rows = _read_statistics(source, _GROUP_SELECT_SQL, GROUP_STATISTICS_TABLE, _GROUP_AGGREGATE_SQL)
+        for row in rows:
+            stats = statistics.get(row[0])
+            if stats is None:
+                statistics[row[0]] = {
+                    "group_id": row[0],
+                    "title": row[1],
+                    "file_count": row[2],
+                    "completed_count": row[3],
+                    "total_bytes": row[4],
+                    "downloaded_bytes": row[5],
+                    "total_duration": row[6],
+                    "last_download": row[7],
+                }
+                continue
+            stats["file_count"] += row[2]
+            stats["completed_count"] += row[3]
+            stats["total_bytes"] += row[4]
+            stats["downloaded_bytes"] += row[5]
+            stats["total_duration"] += row[6]
+            stats["last_download"] = _merge_last_download(stats["last_download"], row[7])
+    return list(statistics.values())
+
+
+def get_library_statistics(connection: Optional[sqlite3.Connection] = None,
+                           include_shards: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Gibt die Gesamtstatistik der Bibliothek zurück.
+
+    Args:
+        connection: Optionale SQLite-Verbindung (Standard: Modell-Datenbank)
+        include_shards: Shards hinzurechnen (Standard: nur ohne explizite Verbindung)
+
+    Returns:
+        Dictionary mit Gesamtwerten und Verteilung nach Status
+    """
+    by_status = get_status_statistics(connection, include_shards)
+    last_downloads = [stats["last_download"] for stats in by_status.values() if stats["last_download"]]
+    return {
+        "total_files": sum(stats["file_count"] for stats in by_status.values()),
+        "total_bytes": sum(stats["total_bytes"] for stats in by_status.values()),
+        "downloaded_bytes": sum(stats["downloaded_bytes"] for stats in by_status.values()),
+        "total_duration": sum(stats["total_duration"] for stats in by_status.values()),
+        "last_download": max(last_downloads) if last_downloads else None,
+        "status_distribution": {status: stats["file_count"] for status, stats in by_status.items()},
+    }
@@ -6,18 +6,96 @@ Erweiterte Validierung für:
 - Geschäftsregeln
 - Konsistenzprüfungen
 - Benutzerdefinierte Constraints
+
+Spaltenregeln, Integritätsprüfungen und SQL-Geschäftsregeln werden als
+mengenbasierte SQL-Prüfungen ausgeführt. Große Tabellen werden in
+rowid-Abschnitten gelesen, sodass keine Lesetransaktion die ganze Prüfung
+überdauert. Verstöße werden als Strom geliefert; im inkrementellen Modus
+werden nur Zeilen geprüft, die sich seit dem Wasserstand des letzten Laufs
+geändert haben (über die Änderungsverfolgung der inkrementellen Backups).
 """
 
 import re
-from typing import Dict, List, Any, Optional, Callable
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Any, Optional, Callable, Tuple
 from datetime import datetime
 from pathlib import Path
 
-from .models import AudioFile, TelegramGroup, db
+from .database_change_tracking import (
+    CHANGE_LOG_TABLE,
+    ensure_change_tracking,
+    get_change_sequence,
+    get_consumer_watermark,
+    remove_consumer_watermark,
+    set_consumer_watermark,
+)
+from .models import DownloadStatus, TelegramGroup, db
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Name des Verbrauchers im Änderungsprotokoll
+VALIDATION_CONSUMER = "validation"
+
+# Kategorien der Ergebnisse
+RECORD_VALIDATION = "record_validation"
+INTEGRITY_VALIDATION = "integrity_validation"
+BUSINESS_RULES_VALIDATION = "business_rules_validation"
+CUSTOM_CONSTRAINTS_VALIDATION = "custom_constraints_validation"
+VALIDATION_CATEGORIES = (
+    RECORD_VALIDATION,
+    INTEGRITY_VALIDATION,
+    BUSINESS_RULES_VALIDATION,
+    CUSTOM_CONSTRAINTS_VALIDATION,
+)
+
+DEFAULT_CHUNK_SIZE = 50000
+DEFAULT_MAX_SAMPLES = 10
+
+_STATUS_VALUES = ", ".join(f"'{status.value}'" for status in DownloadStatus)
+
+
+@dataclass
+class SqlValidationCheck:
+    """
+    Mengenbasierte Prüfung, die verletzende Zeilen einer Tabelle findet.
+    
+    ``condition`` beschreibt einen Verstoß und bezieht sich auf die Tabelle
+    unter dem Alias ``t``. Ist ``related_table`` gesetzt, prüft der
+    inkrementelle Modus auch Zeilen, deren ``related_column`` auf eine
+    geänderte Zeile dieser Tabelle verweist.
+    """
+    name: str
+    category: str
+    table: str
+    condition: str
+    message: str
+    column: Optional[str] = None
+    related_table: Optional[str] = None
+    related_column: Optional[str] = None
+
+
+@dataclass
+class ValidationViolation:
+    """Einzelner Verstoß gegen eine Validierungsregel."""
+    category: str
+    rule: str
+    message: str
+    table: Optional[str] = None
+    row_id: Optional[int] = None
+    value: Any = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Gibt den Verstoß als Dictionary zurück."""
+        return {
+            "category": self.category,
+            "rule": self.rule,
+            "message": self.message,
+            "table": self.table,
+            "row_id": self.row_id,
+            "value": self.value if isinstance(self.value, (int, float, str, type(None))) else str(self.value),
+        }
+
 
 class DatabaseValidator:
     """Verwaltet die Datenbank-Validierung."""
@@ -27,28 +105,79 @@ class DatabaseValidator:
         self.validation_rules = {}
         self.custom_constraints = {}
         self.business_rules = {}
+        self.sql_checks: Dict[str, SqlValidationCheck] = {}
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        self.last_run: Dict[str, Any] = {}
         self._register_default_validations()
         
         logger.info("DatabaseValidator initialisiert")
     
     def _register_default_validations(self) -> None:
         """Registriert Standard-Validierungsregeln."""
-        # AudioFile Validierungen
-        self.add_validation_rule("audio_files", "file_id", self._validate_file_id)
-        self.add_validation_rule("audio_files", "status", self._validate_status)
-        self.add_validation_rule("audio_files", "duration", self._validate_duration)
-        self.add_validation_rule("audio_files", "file_size", self._validate_file_size)
-        self.add_validation_rule("audio_files", "title", self._validate_title)
-        self.add_validation_rule("audio_files", "performer", self._validate_performer)
+        # AudioFile Validierungen; die SQL-Bedingungen entsprechen den
+        # Python-Funktionen, erlauben aber NULL in nullbaren Spalten
+        self.add_validation_rule(
+            "audio_files", "file_id", self._validate_file_id,
+            sql_condition="t.file_id <> '' AND length(t.file_id) <= 255 "
+                          "AND t.file_id NOT GLOB '*[^a-zA-Z0-9_]*'",
+        )
+        self.add_validation_rule(
+            "audio_files", "status", self._validate_status,
+            sql_condition=f"t.status IN ({_STATUS_VALUES})",
+        )
+        self.add_validation_rule(
+            "audio_files", "duration", self._validate_duration,
+            sql_condition="t.duration IS NULL OR (typeof(t.duration) = 'integer' AND t.duration >= 0)",
+        )
+        self.add_validation_rule(
+            "audio_files", "file_size", self._validate_file_size,
+            sql_condition="typeof(t.file_size) = 'integer' AND t.file_size >= 0",
+        )
+        self.add_validation_rule(
+            "audio_files", "title", self._validate_title,
+            sql_condition="t.title IS NULL OR (typeof(t.title) = 'text' AND length(t.title) <= 255)",
+        )
+        self.add_validation_rule(
+            "audio_files", "performer", self._validate_performer,
+            sql_condition="t.performer IS NULL OR (typeof(t.performer) = 'text' AND length(t.performer) <= 255)",
+        )
         
         # TelegramGroup Validierungen
-        self.add_validation_rule("telegram_groups", "group_id", self._validate_group_id)
-        self.add_validation_rule("telegram_groups", "title", self._validate_group_title)
+        self.add_validation_rule(
+            "telegram_groups", "group_id", self._validate_group_id,
+            sql_condition="typeof(t.group_id) = 'integer' AND t.group_id > 0",
+        )
+        self.add_validation_rule(
+            "telegram_groups", "title", self._validate_group_title,
+            sql_condition="typeof(t.title) = 'text' AND length(t.title) BETWEEN 1 AND 255",
+        )
+        
+        # Integritätsprüfungen
+        self.add_sql_check(SqlValidationCheck(
+            name="audio_files.duplicate_file_id",
+            category=INTEGRITY_VALIDATION,
+            table="audio_files",
+            column="file_id",
+            condition="EXISTS (SELECT 1 FROM audio_files o WHERE o.file_id = t.file_id AND o.rowid <> t.rowid)",
+            message="Doppelte file_id",
+        ))
+        self.add_sql_check(SqlValidationCheck(
+            name="audio_files.group_reference",
+            category=INTEGRITY_VALIDATION,
+            table="audio_files",
+            column="group_id",
+            condition="t.group_id IS NOT NULL "
+                      "AND NOT EXISTS (SELECT 1 FROM telegram_groups g WHERE g.id = t.group_id)",
+            message="Ungültige group_id Referenz",
+            related_table="telegram_groups",
+            related_column="group_id",
+        ))
         
         logger.debug("Standard-Validierungsregeln registriert")
     
     def add_validation_rule(self, table_name: str, column_name: str, 
-                           validation_func: Callable[[Any], bool]) -> None:
+                           validation_func: Callable[[Any], bool],
+                           sql_condition: Optional[str] = None) -> None:
         """
         Fügt eine Validierungsregel hinzu.
         
@@ -56,13 +185,60 @@ class DatabaseValidator:
             table_name: Name der Tabelle
             column_name: Name der Spalte
             validation_func: Validierungsfunktion
+            sql_condition: Gleichwertige SQL-Bedingung für gültige Werte
+                (Alias ``t``). Ohne sie wird die Spalte zeilenweise in
+                Python geprüft.
         """
         if table_name not in self.validation_rules:
             self.validation_rules[table_name] = {}
         
         self.validation_rules[table_name][column_name] = validation_func
+        rule_name = f"{table_name}.{column_name}"
+        if sql_condition:
+            self.add_sql_check(SqlValidationCheck(
+                name=rule_name,
+                category=RECORD_VALIDATION,
+                table=table_name,
+                column=column_name,
+                condition=f"NOT coalesce(({sql_condition}), 0)",
+                message="Ungültiger Wert",
+            ))
+        else:
+            self.sql_checks.pop(rule_name, None)
         logger.debug(f"Validierungsregel für {table_name}.{column_name} hinzugefügt")
     
+    def add_sql_check(self, check: SqlValidationCheck) -> None:
+        """
+        Fügt eine mengenbasierte Prüfung hinzu.
+        
+        Args:
+            check: Prüfung mit Verstoß-Bedingung
+        """
+        self.sql_checks[check.name] = check
+        logger.debug(f"SQL-Prüfung '{check.name}' hinzugefügt")
+    
+    def add_sql_business_rule(self, rule_name: str, table_name: str, violation_condition: str,
+                              message: str = "Geschäftsregel nicht erfüllt") -> None:
+        """
+        Fügt eine Geschäftsregel als SQL-Bedingung hinzu.
+        
+        Anders als Regel-Funktionen liefert sie die verletzenden Zeilen und
+        kann inkrementell geprüft werden.
+        
+        Args:
+            rule_name: Name der Regel
+            table_name: Name der Tabelle
+            violation_condition: SQL-Bedingung für einen Verstoß (Alias ``t``)
+            message: Meldung je Verstoß
+        """
+        self.add_sql_check(SqlValidationCheck(
+            name=rule_name,
+            category=BUSINESS_RULES_VALIDATION,
+            table=table_name,
+            condition=violation_condition,
+            message=message,
+        ))
+    
     def add_custom_constraint(self, constraint_name: str, 
                              constraint_func: Callable[[], bool]) -> None:
         """
@@ -119,34 +295,7 @@ class DatabaseValidator:
         Returns:
             Dictionary mit Integritätsfehlern
         """
-        errors = {}
-        
-        try:
-            # Prüfe auf doppelte file_id in AudioFile
-            duplicate_files = AudioFile.select(AudioFile.file_id).group_by(AudioFile.file_id).having(
-                fn.COUNT(AudioFile.file_id) > 1
-            )
-            
-            if duplicate_files.count() > 0:
-                errors["audio_files"] = [f"Doppelte file_id gefunden: {[f.file_id for f in duplicate_files]}"]
-            
-            # Prüfe auf ungültige Fremdschlüssel
-            invalid_groups = AudioFile.select().where(
-                AudioFile.group.is_null() & (AudioFile.group_id.is_null(False))
-            )
-            
-            if invalid_groups.count() > 0:
-                errors["audio_files_foreign_keys"] = [
-                    f"Ungültige group_id Referenzen: {invalid_groups.count()} Datensätze"
-                ]
-                
-        except Exception as e:
-            logger.error(f"Fehler bei der Integritätsprüfung: {e}")
-            if "integrity_check" not in errors:
-                errors["integrity_check"] = []
-            errors["integrity_check"].append(str(e))
-        
-        return errors
+        return self._collect_category(INTEGRITY_VALIDATION)
     
     def validate_business_rules(self) -> Dict[str, List[str]]:
         """
@@ -155,28 +304,7 @@ class DatabaseValidator:
         Returns:
             Dictionary mit Geschäftsregel-Fehlern
         """
-        errors = {}
-        
-        try:
-            for rule_name, rule_func in self.business_rules.items():
-                try:
-                    if not rule_func():
-                        if rule_name not in errors:
-                            errors[rule_name] = []
-                        errors[rule_name].append("Geschäftsregel nicht erfüllt")
-                except Exception as e:
-                    logger.error(f"Fehler bei der Validierung der Geschäftsregel '{rule_name}': {e}")
-                    if rule_name not in errors:
-                        errors[rule_name] = []
-                    errors[rule_name].append(f"Fehler bei der Validierung: {str(e)}")
-                    
-        except Exception as e:
-            logger.error(f"Fehler bei der Geschäftsregel-Validierung: {e}")
-            if "business_rules" not in errors:
-                errors["business_rules"] = []
-            errors["business_rules"].append(str(e))
-        
-        return errors
+        return self._collect_category(BUSINESS_RULES_VALIDATION)
     
     def validate_custom_constraints(self) -> Dict[str, List[str]]:
         """
@@ -185,67 +313,98 @@ class DatabaseValidator:
         Returns:
             Dictionary mit Constraint-Fehlern
         """
-        errors = {}
+        return self._collect_category(CUSTOM_CONSTRAINTS_VALIDATION)
+    
+    def _collect_category(self, category: str) -> Dict[str, List[str]]:
+        """Sammelt die Meldungen einer Kategorie aus einem vollständigen Durchlauf."""
+        errors: Dict[str, List[str]] = {}
+        for violation in self._iter_checks({category}, None, None):
+            errors.setdefault(violation.rule, []).append(self._format_violation(violation))
+        return errors
+    
+    def iter_violations(self, incremental: bool = False,
+                        categories: Optional[List[str]] = None) -> Iterator[ValidationViolation]:
+        """
+        Liefert die Verstöße einer Validierung als Strom.
         
+        Im inkrementellen Modus werden nur Zeilen geprüft, die sich seit dem
+        Wasserstand des letzten Laufs geändert haben. Gibt es noch keinen
+        Wasserstand, wird vollständig geprüft. Der Wasserstand wird erst
+        weitergesetzt, wenn der Strom vollständig gelesen wurde; bei einem
+        abgebrochenen Strom gilt wieder der vorherige Wasserstand. Die
+        Zusammenfassung steht danach in ``last_run``.
+        
+        Args:
+            incremental: Nur geänderte Zeilen prüfen
+            categories: Zu prüfende Kategorien (Standard: alle)
+            
+        Yields:
+            Gefundene Verstöße
+        """
+        started = datetime.now()
+        previous_watermark = get_consumer_watermark(db.connection(), VALIDATION_CONSUMER)
+        after_seq, upto_seq = self._begin_run(incremental)
+        counts: Dict[str, int] = {}
+        completed = False
         try:
-            for constraint_name, constraint_func in self.custom_constraints.items():
-                try:
-                    if not constraint_func():
-                        if constraint_name not in errors:
-                            errors[constraint_name] = []
-                        errors[constraint_name].append("Constraint nicht erfüllt")
-                except Exception as e:
-                    logger.error(f"Fehler bei der Validierung der Constraint '{constraint_name}': {e}")
-                    if constraint_name not in errors:
-                        errors[constraint_name] = []
-                    errors[constraint_name].append(f"Fehler bei der Validierung: {str(e)}")
-                    
-        except Exception as e:
-            logger.error(f"Fehler bei der Constraint-Validierung: {e}")
-            if "custom_constraints" not in errors:
-                errors["custom_constraints"] = []
-            errors["custom_constraints"].append(str(e))
+            for violation in self._iter_checks(set(categories or VALIDATION_CATEGORIES), after_seq, upto_seq):
+                counts[violation.rule] = counts.get(violation.rule, 0) + 1
+                yield violation
+            completed = True
+        finally:
+            if not completed and upto_seq is not None:
+                # Abgebrochener Lauf: den Platzhalter eines vollständigen Laufs
+                # zurücknehmen, damit das Protokoll weiter bereinigt werden kann
+                self._restore_watermark(previous_watermark)
         
-        return errors
+        if upto_seq is not None:
+            set_consumer_watermark(db.connection(), VALIDATION_CONSUMER, upto_seq)
+        self.last_run = {
+            "mode": "incremental" if after_seq is not None else "full",
+            "checked_since": after_seq,
+            "watermark": upto_seq,
+            "violation_counts": counts,
+            "total_errors": sum(counts.values()),
+            "duration_seconds": (datetime.now() - started).total_seconds(),
+        }
     
-    def run_full_validation(self) -> Dict[str, Any]:
+    def run_validation(self, incremental: bool = False,
+                       max_samples: int = DEFAULT_MAX_SAMPLES) -> Dict[str, Any]:
         """
-        Führt eine vollständige Datenbank-Validierung durch.
+        Führt eine Datenbank-Validierung durch und fasst die Verstöße zusammen.
         
+        Je Regel werden nur die ersten Meldungen behalten, gezählt werden alle.
+        
+        Args:
+            incremental: Nur seit dem letzten Lauf geänderte Zeilen prüfen
+            max_samples: Maximale Anzahl an Meldungen je Regel
+            
         Returns:
             Dictionary mit Validierungsergebnissen
         """
-        logger.info("Starte vollständige Datenbank-Validierung")
+        logger.info(f"Starte {'inkrementelle' if incremental else 'vollständige'} Datenbank-Validierung")
         
-        results = {
-            "timestamp": datetime.now().isoformat(),
-            "record_validation": {},
-            "integrity_validation": {},
-            "business_rules_validation": {},
-            "custom_constraints_validation": {},
-            "summary": {}
-        }
+        results: Dict[str, Any] = {"timestamp": datetime.now().isoformat()}
+        results.update({category: {} for category in VALIDATION_CATEGORIES})
+        results["summary"] = {}
         
         try:
-            # Datenintegrität prüfen
-            results["integrity_validation"] = self.validate_integrity()
-            
-            # Geschäftsregeln validieren
-            results["business_rules_validation"] = self.validate_business_rules()
-            
-            # Benutzerdefinierte Constraints validieren
-            results["custom_constraints_validation"] = self.validate_custom_constraints()
-            
-            # Zusammenfassung erstellen
-            error_count = 0
-            for validation_type in ["integrity_validation", "business_rules_validation", 
-                                  "custom_constraints_validation"]:
-                error_count += sum(len(errors) for errors in results[validation_type].values())
+            for violation in self.iter_violations(incremental):
+                samples = results[violation.category].setdefault(violation.rule, [])
+                if len(samples) < max_samples:
+                    samples.append(self._format_violation(violation))
             
+            run = self.last_run
+            error_count = run["total_errors"]
+            results["mode"] = run["mode"]
+            results["violation_counts"] = run["violation_counts"]
             results["summary"] = {
                 "total_errors": error_count,
                 "validation_passed": error_count == 0,
-                "validation_types_checked": 3
+                "validation_types_checked": len(VALIDATION_CATEGORIES),
+                "checked_since": run["checked_since"],
+                "watermark": run["watermark"],
+                "duration_seconds": run["duration_seconds"],
             }
             
             if error_count == 0:
@@ -263,6 +422,161 @@ class DatabaseValidator:
         
         return results
     
+    def run_full_validation(self) -> Dict[str, Any]:
+        """
+        Führt eine vollständige Datenbank-Validierung durch.
+        
+        Returns:
+            Dictionary mit Validierungsergebnissen
+        """
+        return self.run_validation(incremental=False)
+    
+    def run_incremental_validation(self) -> Dict[str, Any]:
+        """
+        Prüft nur die seit dem letzten Lauf geänderten Zeilen.
+        
+        Returns:
+            Dictionary mit Validierungsergebnissen
+        """
+        return self.run_validation(incremental=True)
+    
+    def _begin_run(self, incremental: bool) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Bestimmt den zu prüfenden Sequenzbereich.
+        
+        Args:
+            incremental: Ob inkrementell geprüft werden soll
+            
+        Returns:
+            (Wasserstand, Obergrenze); ein Wasserstand von None bedeutet eine
+            vollständige Prüfung, eine Obergrenze von None einen Lauf ohne
+            Änderungsverfolgung
+        """
+        connection = db.connection()
+        if incremental:
+            newly_tracked = ensure_change_tracking(connection)
+        watermark = get_consumer_watermark(connection, VALIDATION_CONSUMER)
+        if watermark is None and not incremental:
+            return None, None
+        
+        upto_seq = get_change_sequence(connection)
+        if watermark is None or watermark < 0:
+            # Bis zum Ende des vollständigen Laufs nichts aus dem Protokoll entfernen
+            set_consumer_watermark(connection, VALIDATION_CONSUMER, -1)
+            return None, upto_seq
+        if not incremental or newly_tracked:
+            return None, upto_seq
+        return watermark, upto_seq
+    
+    @staticmethod
+    def _restore_watermark(watermark: Optional[int]) -> None:
+        """Setzt den Wasserstand auf den Stand vor einem abgebrochenen Lauf zurück."""
+        connection = db.connection()
+        if watermark is None or watermark < 0:
+            remove_consumer_watermark(connection, VALIDATION_CONSUMER)
+        else:
+            set_consumer_watermark(connection, VALIDATION_CONSUMER, watermark)
+    
+    def _iter_checks(self, categories: set, after_seq: Optional[int],
+                     upto_seq: Optional[int]) -> Iterator[ValidationViolation]:
+        """Führt die Prüfungen der gewählten Kategorien aus."""
+        for check in list(self.sql_checks.values()):
+            if check.category in categories:
+                yield from self._iter_sql_check(check, after_seq, upto_seq)
+        
+        if RECORD_VALIDATION in categories:
+            for table_name, rules in list(self.validation_rules.items()):
+                for column_name, validation_func in list(rules.items()):
+                    if f"{table_name}.{column_name}" not in self.sql_checks:
+                        yield from self._iter_python_rule(
+                            table_name, column_name, validation_func, after_seq, upto_seq
+                        )
+        
+        for category, rules, message in (
+            (BUSINESS_RULES_VALIDATION, self.business_rules, "Geschäftsregel nicht erfüllt"),
+            (CUSTOM_CONSTRAINTS_VALIDATION, self.custom_constraints, "Constraint nicht erfüllt"),
+        ):
+            if category not in categories:
+                continue
+            for rule_name, rule_func in list(rules.items()):
+                try:
+                    if not rule_func():
+                        yield ValidationViolation(category, rule_name, message)
+                except Exception as e:
+                    logger.error(f"Fehler bei der Validierung der Regel '{rule_name}': {e}")
+                    yield ValidationViolation(category, rule_name, f"Fehler bei der Validierung: {str(e)}")
+    
+    def _iter_sql_check(self, check: SqlValidationCheck, after_seq: Optional[int],
+                        upto_seq: Optional[int]) -> Iterator[ValidationViolation]:
+        """Liefert die Verstöße einer mengenbasierten Prüfung."""
+        value = f"t.{check.column}" if check.column else "NULL"
+        try:
+            for row_id, row_value in self._iter_rows(
+                    check.table, value, check.condition, after_seq, upto_seq,
+                    check.related_table, check.related_column):
+                yield ValidationViolation(
+                    check.category, check.name, check.message, check.table, row_id, row_value
+                )
+        except Exception as e:
+            logger.error(f"Fehler bei der Prüfung '{check.name}': {e}")
+            yield ValidationViolation(check.category, check.name, f"Fehler bei der Validierung: {str(e)}")
+    
+    def _iter_python_rule(self, table_name: str, column_name: str, validation_func: Callable[[Any], bool],
+                          after_seq: Optional[int], upto_seq: Optional[int]) -> Iterator[ValidationViolation]:
+        """Prüft eine Spalte ohne SQL-Bedingung zeilenweise in Python."""
+        rule_name = f"{table_name}.{column_name}"
+        try:
+            for row_id, value in self._iter_rows(table_name, f"t.{column_name}", "1", after_seq, upto_seq):
+                if not validation_func(value):
+                    yield ValidationViolation(
+                        RECORD_VALIDATION, rule_name, "Ungültiger Wert", table_name, row_id, value
+                    )
+        except Exception as e:
+            logger.error(f"Fehler bei der Validierung von {rule_name}: {e}")
+            yield ValidationViolation(RECORD_VALIDATION, rule_name, f"Fehler bei der Validierung: {str(e)}")
+    
+    def _iter_rows(self, table: str, value: str, condition: str, after_seq: Optional[int],
+                   upto_seq: Optional[int], related_table: Optional[str] = None,
+                   related_column: Optional[str] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Liefert (rowid, Wert) aller Zeilen, die eine Bedingung erfüllen.
+        
+        Vollständig wird in rowid-Abschnitten gelesen, damit jede Abfrage nur
+        kurz eine Lesetransaktion hält. Inkrementell werden nur Zeilen aus
+        dem Änderungsprotokoll im Bereich (after_seq, upto_seq] betrachtet.
+        """
+        query = f"SELECT t.rowid, {value} FROM {table} AS t WHERE ({condition})"
+        if after_seq is None:
+            low, high = db.execute_sql(f"SELECT MIN(rowid), MAX(rowid) FROM {table}").fetchone()
+            if low is None:
+                return
+            for start in range(low - 1, high, self.chunk_size):
+                yield from db.execute_sql(
+                    f"{query} AND t.rowid > ? AND t.rowid <= ? ORDER BY t.rowid",
+                    (start, start + self.chunk_size),
+                ).fetchall()
+            return
+        
+        changed = f"SELECT row_id FROM {CHANGE_LOG_TABLE} WHERE table_name = ? AND seq > ? AND seq <= ?"
+        scope = f"t.rowid IN ({changed})"
+        params: List[Any] = [table, after_seq, upto_seq]
+        if related_table and related_column:
+            scope += f" OR t.{related_column} IN ({changed})"
+            params += [related_table, after_seq, upto_seq]
+        cursor = db.execute_sql(f"{query} AND ({scope}) ORDER BY t.rowid", params)
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            yield from rows
+    
+    @staticmethod
+    def _format_violation(violation: ValidationViolation) -> str:
+        """Formatiert einen Verstoß als Meldung."""
+        if violation.row_id is None:
+            return violation.message
+        return f"{violation.message}: {violation.value} (Zeile {violation.row_id})"
+    
     # Validierungsfunktionen für AudioFile
     def _validate_file_id(self, value: str) -> bool:
         """Validiert die file_id."""
@@ -320,16 +634,19 @@ def get_database_validator() -> DatabaseValidator:
     return _validator
 
 
-def validate_database() -> Dict[str, Any]:
+def validate_database(incremental: bool = False) -> Dict[str, Any]:
     """
-    Führt eine vollständige Datenbank-Validierung durch.
+    Führt eine Datenbank-Validierung durch.
+    
+    Args:
+        incremental: Nur seit dem letzten Lauf geänderte Zeilen prüfen
     
     Returns:
         Dictionary mit Validierungsergebnissen
     """
     try:
         validator = get_database_validator()
-        return validator.run_full_validation()
+        return validator.run_validation(incremental=incremental)
     except Exception as e:
         logger.error(f"Fehler bei der Datenbank-Validierung: {e}")
         return {
@@ -8,22 +8,26 @@ import time
 import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Union, cast
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union, cast
 from collections import OrderedDict
 
 from telethon import TelegramClient
-from telethon.errors import FloodWaitError, RPCError
+from telethon.errors import ChannelPrivateError, FloodWaitError, RPCError
 from telethon.tl.types import (
     Document,
     DocumentAttributeAudio,
     Message,
-    MessageMediaDocument,
     TypeDocument,
 )
 from tqdm import tqdm
 
+from .entity_resolution import STALE_ENTITY_ERRORS, EntityResolver
+from .media_connections import MediaConnectionWarmer, warm_up_media_connections
+from .message_scan import SCAN_MODE_FILTERED, SCAN_MODES, ScanStats, iter_audio_messages
+from .session_pool import SessionPool
 from .models import AudioFile, TelegramGroup, DownloadStatus, GroupProgress
 from .config import Config
+from .cache_governor import OrderedCacheAdapter, get_cache_governor, register_cache
 from .logging_config import get_logger, get_error_tracker
 from .error_handling import handle_error, SecurityError
 # Neue Importe für die intelligente Warteschlange
@@ -148,13 +152,17 @@ class LRUCache:
     def __init__(self, max_size: int = 10000):
         self.max_size = max_size
         self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
         
     def get(self, key: str) -> Optional[bool]:
         """Holt einen Wert aus dem Cache und markiert ihn als zuletzt verwendet."""
         if key in self.cache:
             # Wert an das Ende verschieben (zuletzt verwendet)
             self.cache.move_to_end(key)
+            self.hits += 1
             return self.cache[key]
+        self.misses += 1
         return None
         
     def put(self, key: str, value: bool) -> None:
@@ -169,6 +177,12 @@ class LRUCache:
         if len(self.cache) > self.max_size:
             self.cache.popitem(last=False)
             
+    def resize(self, max_size: int) -> None:
+        """Ändert die maximale Größe und entfernt bei Bedarf die ältesten Einträge."""
+        self.max_size = max(1, max_size)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+            
     def __contains__(self, key: str) -> bool:
         """Prüft, ob ein Schlüssel im Cache enthalten ist."""
         return key in self.cache
@@ -193,6 +207,10 @@ class AudioDownloader:
             config: Konfigurationsobjekt
         """
         self.client: Optional[TelegramClient] = None
+        self.entity_resolver: Optional[EntityResolver] = None
+        self.session_pool: Optional[SessionPool] = None
+        self.media_warmers: List[MediaConnectionWarmer] = []
+        self.media_connection_stats: Dict[int, Dict[str, Any]] = {}
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(parents=True, exist_ok=True)
         self.max_concurrent_downloads = max_concurrent_downloads
@@ -225,8 +243,14 @@ class AudioDownloader:
         from .database import init_db
         self.db = init_db()
 
+        # Routing auf Datenbank-Shards (nur wirksam, wenn Sharding aktiviert ist)
+        from .database_scaling import get_scaling_manager
+        self.shard_router = get_scaling_manager().sharder
+        self._configure_sharding()
+
         # Speichereffizienter Cache für bereits heruntergeladene Dateien (max. 50.000 Einträge)
         self._downloaded_files_cache = LRUCache(max_size=50000)
+        register_cache("downloaded_files", OrderedCacheAdapter(self._downloaded_files_cache))
         self._load_downloaded_files()
 
         # Download-Statistiken
@@ -298,11 +322,95 @@ class AudioDownloader:
                         await start_result
                     # Falls es ein normales Ergebnis ist, ignorieren wir es
             logger.info("Telegram-Client erfolgreich initialisiert")
+
+            # Zusätzliche, bereits autorisierte Sitzungen (kommagetrennt)
+            extra_sessions = [
+                name.strip() for name in os.getenv("SESSION_NAMES", "").split(",")
+                if name.strip() and name.strip() != session_name
+            ]
+            if extra_sessions:
+                await self._initialize_session_pool(
+                    session_name, extra_sessions, api_id_int, api_hash_str, proxy_config or {}
+                )
         except Exception as e:
             error = AuthenticationError(f"Fehler bei der Authentifizierung: {e}")
             handle_error(error, "initialize_client_auth")
             raise error
 
+    async def _initialize_session_pool(
+        self, primary_name: str, session_names: List[str], api_id: int, api_hash: str, proxy: Dict[str, Any]
+    ) -> None:
+        """
+        Baut den Sitzungs-Pool aus dem primären Client und weiteren Sitzungen auf.
+
+        Args:
+            primary_name: Name der primären Sitzung
+            session_names: Namen der zusätzlichen Session-Dateien
+            api_id: API-ID
+            api_hash: API-Hash
+            proxy: Proxy-Konfiguration
+        """
+        try:
+            pool = SessionPool()
+            pool.add(primary_name, self.client, is_primary=True)
+            for name in session_names:
+                pool.add(name, TelegramClient(name, api_id, api_hash, proxy=proxy))
+            await pool.start()
+            self.session_pool = pool if len(pool.sessions) > 1 else None
+        except Exception as e:
+            logger.error(f"Fehler beim Aufbau des Sitzungs-Pools: {e}")
+            self.session_pool = None
+
+    def get_session_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Gibt Durchsatz und Drosselungszustand pro Sitzung zurück.
+
+        Returns:
+            Sitzungsname -> Statistiken (leer ohne Sitzungs-Pool)
+        """
+        if self.session_pool is None:
+            return {}
+        return self.session_pool.get_stats()
+
+    def _get_media_warmers(self) -> List[MediaConnectionWarmer]:
+        """Gibt einen Verbindungs-Warmer pro Client (primär und Sitzungs-Pool) zurück."""
+        if self.session_pool is not None:
+            clients = [session.client for session in self.session_pool.sessions]
+        else:
+            clients = [self.client] if self.client else []
+        existing = {id(warmer.client): warmer for warmer in self.media_warmers}
+        self.media_warmers = [existing.get(id(client)) or MediaConnectionWarmer(client) for client in clients]
+        return self.media_warmers
+
+    async def _warm_up_media_connections(self, documents: List[Any]) -> None:
+        """
+        Öffnet vor den Downloads die Verbindungen zu den Medien-DCs der Dateien.
+
+        Fehler werden nur protokolliert; die Downloads verbinden sich dann wie
+        gewohnt beim ersten Zugriff.
+
+        Args:
+            documents: Eingereihte Dokumente
+        """
+        if not self.config.prewarm_media_dcs:
+            return
+        try:
+            results = await warm_up_media_connections(self._get_media_warmers(), documents)
+            self.media_connection_stats.update(
+                {dc_id: stats.to_dict() for dc_id, stats in results.items()}
+            )
+        except Exception as e:
+            logger.warning(f"Vorwärmen der Medien-Verbindungen fehlgeschlagen: {e}")
+
+    def get_media_connection_stats(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Gibt die Verbindungsdauer pro Medien-DC zurück.
+
+        Returns:
+            DC-ID -> Dateien, Verbindungsdauer und Status
+        """
+        return dict(self.media_connection_stats)
+
     def _load_downloaded_files(self) -> None:
         """Lädt bereits heruntergeladene Dateien in den Cache."""
         try:
@@ -313,6 +421,10 @@ class AudioDownloader:
                     AudioFile.status == DownloadStatus.COMPLETED.value
                 )
             ]
+            # Bei aktivem Sharding zusätzlich die Shards (Zeilen ohne zuständigen
+            # Shard bleiben in der Hauptdatenbank)
+            if self._is_sharding_active():
+                downloaded_file_ids.extend(self.shard_router.iter_completed_file_ids())
             
             # In den LRU-Cache laden
             for file_id in downloaded_file_ids:
@@ -326,6 +438,36 @@ class AudioDownloader:
             handle_error(error, "_load_downloaded_files")
             raise error
 
+    def _configure_sharding(self) -> None:
+        """
+        Richtet die in der Konfiguration angegebenen Shards ein und aktiviert das Routing.
+
+        Vorhandene Audiodateien der Hauptdatenbank werden dabei in ihre Shards
+        verschoben, damit bereits heruntergeladene Dateien erkannt werden.
+        """
+        from .database_scaling import enable_configured_sharding
+        enable_configured_sharding(self.config.shard_count, self.config.shard_dir, distribute_existing=True)
+
+    def _is_sharding_active(self) -> bool:
+        """Prüft, ob Audiodateien über Datenbank-Shards geroutet werden."""
+        shard_router = getattr(self, 'shard_router', None)
+        return bool(shard_router and shard_router.is_sharding_active)
+
+    def _route_audio_file(self, file_id: str, group: TelegramGroup):
+        """
+        Bestimmt Modell und Gruppe für den Datenbankeintrag einer Audiodatei.
+
+        Args:
+            file_id: ID der Audiodatei
+            group: Gruppe aus der Hauptdatenbank
+
+        Returns:
+            Tupel (Modellklasse, Gruppe) - bei aktivem Sharding an den Shard gebunden
+        """
+        if self._is_sharding_active():
+            return self.shard_router.route_audio_file(file_id, group)
+        return AudioFile, group
+
     def _is_audio_file(self, document: Union[Document, TypeDocument]) -> bool:
         """Überprüft, ob es sich bei dem Dokument um eine Audiodatei handelt."""
         try:
@@ -412,6 +554,72 @@ class AudioDownloader:
                 "performer": None,
             }
 
+    def _get_entity_resolver(self) -> EntityResolver:
+        """Gibt den Resolver für den aktuellen Client zurück."""
+        if self.entity_resolver is None or self.entity_resolver.client is not self.client:
+            self.entity_resolver = EntityResolver(self.client)
+        return self.entity_resolver
+
+    def _scan_mode(self) -> str:
+        """Gibt den konfigurierten Scan-Modus zurück (Standard: serverseitig gefiltert)."""
+        mode = getattr(self.config, "scan_mode", SCAN_MODE_FILTERED)
+        return mode if mode in SCAN_MODES else SCAN_MODE_FILTERED
+
+    async def resolve_group(self, group_name: Union[int, str]) -> Tuple[Any, TelegramGroup]:
+        """
+        Löst eine Gruppe auf (zuerst aus der Datenbank, sonst über Telegram).
+
+        Args:
+            group_name: Name oder ID der Telegram-Gruppe
+
+        Returns:
+            (Entity oder InputPeer, zugehörige TelegramGroup)
+        """
+        if not self.client:
+            await self.initialize_client()
+        return await self._get_entity_resolver().resolve(group_name)
+
+    async def _iter_group_audio(
+        self, group_entity: Any, group: TelegramGroup, stats: ScanStats, **iter_params: Any
+    ) -> AsyncIterator[Tuple[Message, Document]]:
+        """
+        Liefert die Audio-Nachrichten einer aufgelösten Gruppe.
+
+        Lehnt Telegram den gespeicherten access_hash ab (z. B. nach einem
+        Kontowechsel), wird die Gruppe einmal über den Benutzernamen neu
+        aufgelöst und der Scan wiederholt.
+
+        Args:
+            group_entity: Entity oder InputPeer der Gruppe
+            group: Zugehörige TelegramGroup
+            stats: Zähler für den Scan
+            **iter_params: Parameter für iter_messages
+
+        Returns:
+            Asynchroner Iterator über (Nachricht, Dokument)
+        """
+        scan = iter_audio_messages(
+            self.client, group_entity, self._is_audio_file,
+            mode=self._scan_mode(), stats=stats, **iter_params
+        )
+        try:
+            first = await scan.__anext__()
+        except StopAsyncIteration:
+            return
+        except STALE_ENTITY_ERRORS as e:
+            logger.info(f"Gespeicherte Auflösung für Gruppe {group.group_id} abgelehnt: {e}")
+            resolved = await self._get_entity_resolver().resolve_again(group)
+            if resolved is None:
+                raise
+            scan = iter_audio_messages(
+                self.client, resolved[0], self._is_audio_file,
+                mode=self._scan_mode(), stats=stats, **iter_params
+            )
+        else:
+            yield first
+        async for item in scan:
+            yield item
+
     async def download_audio_files(
         self, group_name: str, limit: Optional[int] = None, last_message_id: Optional[int] = None
     ) -> int:
@@ -435,25 +643,11 @@ class AudioDownloader:
             handle_error(error, "download_audio_files_client")
             raise error
 
+        group: Optional[TelegramGroup] = None
         try:
-            # Gruppe abrufen
-            group_entity = await self.client.get_entity(group_name)
-            logger.info(
-                f"Gruppe gefunden: {getattr(group_entity, 'title', 'Unknown')} (ID: {getattr(group_entity, 'id', 'Unknown')})"
-            )
-
-            # Gruppeninformationen in der Datenbank speichern
-            group_id = getattr(group_entity, 'id', 0)
-            group_title = getattr(group_entity, "title", "")
-            group_username = getattr(group_entity, "username", None)
-            
-            group, _ = TelegramGroup.get_or_create(
-                group_id=group_id,
-                defaults={
-                    "title": group_title,
-                    "username": group_username,
-                },
-            )
+            # Gruppe abrufen (zuerst aus der Datenbank, sonst über Telegram)
+            group_entity, group = await self.resolve_group(group_name)
+            logger.info(f"Gruppe gefunden: {group.title} (ID: {group.group_id})")
 
             # Nachrichten abrufen
             logger.info("Sammle Audiodateien...")
@@ -465,23 +659,10 @@ class AudioDownloader:
                 # Verwende min_id, um nur Nachrichten nach der letzten ID zu verarbeiten
                 iter_params["min_id"] = last_message_id
 
-            # Sicherstellen, dass group_entity ein gültiges Entity-Objekt ist
-            if not group_entity:
-                raise DownloadError("Gruppe konnte nicht gefunden werden")
-                
-            # Konvertiere group_entity in eine Liste, falls es keine ist
-            entity_list = group_entity if isinstance(group_entity, list) else [group_entity]
-                
-            async for message in self.client.iter_messages(entity_list[0], **iter_params):
-                if not hasattr(message, "media") or not isinstance(
-                    message.media, MessageMediaDocument
-                ):
-                    continue
-
-                document = message.media.document
-                if not document or not self._is_audio_file(document):
-                    continue
-
+            scan_stats = ScanStats()
+            async for message, document in self._iter_group_audio(
+                group_entity, group, scan_stats, **iter_params
+            ):
                 # Prüfe, ob die Datei bereits heruntergeladen wurde
                 file_id = str(document.id)
                 if self._downloaded_files_cache.get(file_id):
@@ -493,16 +674,21 @@ class AudioDownloader:
                 audio_messages.append((message, document, group))
                 
                 # Speichere die aktuelle Nachrichten-ID für die Fortsetzung
-                if hasattr(entity_list[0], 'id') and hasattr(message, 'id'):
-                    await self.save_last_message_id(int(getattr(entity_list[0], 'id', 0)), message.id)
+                if hasattr(message, 'id'):
+                    await self.save_last_message_id(group.group_id, message.id)
 
-            logger.info(f"{len(audio_messages)} neue Audiodateien gefunden")
+            logger.info(
+                f"{len(audio_messages)} neue Audiodateien gefunden "
+                f"({scan_stats.messages_fetched} Nachrichten abgerufen)"
+            )
             self.total_downloads = len(audio_messages)
 
             if not audio_messages:
                 logger.info("Keine neuen Audiodateien zum Herunterladen gefunden")
                 return 0
 
+            await self._warm_up_media_connections([document for _, document, _ in audio_messages])
+
             # Parallele Downloads starten
             download_tasks = [
                 self._download_audio_concurrent(message, document, group)
@@ -536,6 +722,13 @@ class AudioDownloader:
 
             return successful_downloads
 
+        except (ChannelPrivateError, *STALE_ENTITY_ERRORS) as e:
+            # Kein Zugriff mehr: gespeicherte Auflösung verwerfen
+            if group is not None:
+                self._get_entity_resolver().invalidate(group.group_id)
+            error = DownloadError(f"Kein Zugriff auf die Gruppe {group_name}: {e}")
+            handle_error(error, "download_audio_files")
+            raise error
         except Exception as e:
             error = DownloadError(f"Fehler beim Herunterladen von Audiodateien: {e}")
             handle_error(error, "download_audio_files")
@@ -564,25 +757,11 @@ class AudioDownloader:
             handle_error(error, "download_audio_files_lite_client")
             raise error
 
+        group: Optional[TelegramGroup] = None
         try:
-            # Gruppe abrufen
-            group_entity = await self.client.get_entity(group_name)
-            logger.info(
-                f"Gruppe gefunden: {getattr(group_entity, 'title', 'Unknown')} (ID: {getattr(group_entity, 'id', 'Unknown')})"
-            )
-
-            # Gruppeninformationen in der Datenbank speichern
-            group_id = getattr(group_entity, 'id', 0)
-            group_title = getattr(group_entity, "title", "")
-            group_username = getattr(group_entity, "username", None)
-            
-            group, _ = TelegramGroup.get_or_create(
-                group_id=group_id,
-                defaults={
-                    "title": group_title,
-                    "username": group_username,
-                },
-            )
+            # Gruppe abrufen (zuerst aus der Datenbank, sonst über Telegram)
+            group_entity, group = await self.resolve_group(group_name)
+            logger.info(f"Gruppe gefunden: {group.title} (ID: {group.group_id})")
 
             # Nachrichten abrufen
             logger.info("Sammle Audiodateien...")
@@ -594,23 +773,10 @@ class AudioDownloader:
                 # Verwende min_id, um nur Nachrichten nach der letzten ID zu verarbeiten
                 iter_params["min_id"] = last_message_id
 
-            # Sicherstellen, dass group_entity ein gültiges Entity-Objekt ist
-            if not group_entity:
-                raise DownloadError("Gruppe konnte nicht gefunden werden")
-                
-            # Konvertiere group_entity in eine Liste, falls es keine ist
-            entity_list = group_entity if isinstance(group_entity, list) else [group_entity]
-                
-            async for message in self.client.iter_messages(entity_list[0], **iter_params):
-                if not hasattr(message, "media") or not isinstance(
-                    message.media, MessageMediaDocument
-                ):
-                    continue
-
-                document = message.media.document
-                if not document or not self._is_audio_file(document):
-                    continue
-
+            scan_stats = ScanStats()
+            async for message, document in self._iter_group_audio(
+                group_entity, group, scan_stats, **iter_params
+            ):
                 # Prüfe, ob die Datei bereits heruntergeladen wurde
                 file_id = str(document.id)
                 if self._downloaded_files_cache.get(file_id):
@@ -622,16 +788,21 @@ class AudioDownloader:
                 audio_messages.append((message, document, group))
                 
                 # Speichere die aktuelle Nachrichten-ID für die Fortsetzung
-                if hasattr(entity_list[0], 'id') and hasattr(message, 'id'):
-                    await self.save_last_message_id(int(getattr(entity_list[0], 'id', 0)), message.id)
+                if hasattr(message, 'id'):
+                    await self.save_last_message_id(group.group_id, message.id)
 
-            logger.info(f"{len(audio_messages)} neue Audiodateien gefunden")
+            logger.info(
+                f"{len(audio_messages)} neue Audiodateien gefunden "
+                f"({scan_stats.messages_fetched} Nachrichten abgerufen)"
+            )
             self.total_downloads = len(audio_messages)
 
             if not audio_messages:
                 logger.info("Keine neuen Audiodateien zum Herunterladen gefunden")
                 return 0
 
+            await self._warm_up_media_connections([document for _, document, _ in audio_messages])
+
             # Sequentielle Downloads (vereinfacht)
             successful_downloads = 0
             for message, document, group in audio_messages:
@@ -648,6 +819,13 @@ class AudioDownloader:
 
             return successful_downloads
 
+        except (ChannelPrivateError, *STALE_ENTITY_ERRORS) as e:
+            # Kein Zugriff mehr: gespeicherte Auflösung verwerfen
+            if group is not None:
+                self._get_entity_resolver().invalidate(group.group_id)
+            error = DownloadError(f"Kein Zugriff auf die Gruppe {group_name}: {e}")
+            handle_error(error, "download_audio_files_lite")
+            raise error
         except Exception as e:
             error = DownloadError(f"Fehler beim Herunterladen von Audiodateien: {e}")
             handle_error(error, "download_audio_files_lite")
@@ -752,6 +930,12 @@ class AudioDownloader:
                 except Exception:
                     pass
 
+            # Cache-Budget periodisch neu verteilen
+            try:
+                get_cache_governor().maybe_rebalance()
+            except Exception as e:
+                logger.error(f"Fehler beim Neuverteilen des Cache-Budgets: {e}")
+
             # Speicherwartung durchführen
             if hasattr(self, 'advanced_memory_manager') and self.advanced_memory_manager:
                 try:
@@ -763,12 +947,13 @@ class AudioDownloader:
                 except Exception:
                     pass
 
-            # Datenbankeintrag abrufen oder erstellen
-            audio_file, created = AudioFile.get_or_create(
+            # Datenbankeintrag abrufen oder erstellen (ggf. im zuständigen Shard)
+            audio_model, record_group = self._route_audio_file(file_id, group)
+            audio_file, created = audio_model.get_or_create(
                 file_id=file_id,
                 defaults={
                     **audio_info,
-                    "group": group,
+                    "group": record_group,
                     "status": DownloadStatus.PENDING.value,
                 },
             )
@@ -1189,11 +1374,19 @@ class AudioDownloader:
                 downloaded_bytes = 0
                 try:
                     # Prüfe, ob download_media awaitable ist
-                    download_result = self.client.download_media(
-                        message, 
-                        file=str(file_path),  # Telethon erwartet einen String oder File-Objekt
-                        progress_callback=self._progress_callback
-                    )
+                    if self.session_pool is not None:
+                        # Die am wenigsten gedrosselte Sitzung übernimmt den Download
+                        download_result = self.session_pool.download_media(
+                            message,
+                            file=str(file_path),
+                            progress_callback=self._progress_callback
+                        )
+                    else:
+                        download_result = self.client.download_media(
+                            message, 
+                            file=str(file_path),  # Telethon erwartet einen String oder File-Objekt
+                            progress_callback=self._progress_callback
+                        )
                     if asyncio.iscoroutine(download_result):
                         downloaded_bytes = await download_result
                     else:
@@ -1230,6 +1423,13 @@ class AudioDownloader:
 
     async def close(self) -> None:
         """Schließt die Verbindung zum Telegram-Client."""
+        for warmer in self.media_warmers:
+            await warmer.release()
+        self.media_warmers = []
+        if self.entity_resolver is not None:
+            await self.entity_resolver.close()
+        if self.session_pool is not None:
+            await self.session_pool.close()
         if self.client:
             try:
                 disconnect_result = self.client.disconnect()
@@ -0,0 +1,281 @@
+"""
+Persistente Auflösung von Gruppen und Kanälen für den Telegram Audio Downloader.
+
+`client.get_entity("name")` löst Benutzernamen immer über
+`ResolveUsernameRequest` auf, das bei vielen Kanälen schnell gedrosselt wird.
+Der EntityResolver speichert id, access_hash, Titel und Benutzernamen in
+`TelegramGroup` und baut daraus beim nächsten Lauf direkt einen InputPeer,
+ohne das Netzwerk zu fragen. Veraltete Einträge werden im Hintergrund über
+ihren InputPeer (ohne Benutzernamen-Auflösung) aktualisiert;
+`ChannelPrivateError` macht einen Eintrag ungültig.
+
+`ChannelInvalidError` und `PeerIdInvalidError` deuten auf einen veralteten
+access_hash hin (z. B. nach einem Kontowechsel, denn access_hash gilt nur für
+das Konto, das ihn erhalten hat). Der Eintrag wird dann verworfen und einmal
+über den Benutzernamen neu aufgelöst.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set, Tuple, Union
+
+from peewee import fn
+from telethon.errors import ChannelInvalidError, ChannelPrivateError, PeerIdInvalidError
+from telethon.tl.types import Channel, Chat, InputPeerChannel, InputPeerChat, InputPeerUser, User
+from telethon.utils import resolve_id
+
+from .logging_config import get_logger
+from .models import TelegramGroup
+
+logger = get_logger(__name__)
+
+ENTITY_TYPE_CHANNEL = "channel"
+ENTITY_TYPE_CHAT = "chat"
+ENTITY_TYPE_USER = "user"
+
+# Fehler, mit denen Telegram einen ungültigen access_hash ablehnt
+STALE_ENTITY_ERRORS = (ChannelInvalidError, PeerIdInvalidError)
+
+DEFAULT_REFRESH_AFTER = timedelta(days=1)
+DEFAULT_REFRESH_CONCURRENCY = 2
+
+_LINK_PREFIXES = ("https://t.me/", "http://t.me/", "t.me/", "@")
+
+
+def normalize_group_reference(reference: Union[int, str]) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Zerlegt eine Gruppenangabe in numerische ID oder Benutzernamen.
+
+    Args:
+        reference: ID (auch mit -100-Präfix), Benutzername, @name oder t.me-Link
+
+    Returns:
+        (group_id, username in Kleinbuchstaben); beides None für Einladungslinks
+    """
+    if isinstance(reference, int):
+        return resolve_id(reference)[0], None
+    text = str(reference).strip()
+    if text.lstrip("-").isdigit():
+        return resolve_id(int(text))[0], None
+    for prefix in _LINK_PREFIXES:
+        if text.lower().startswith(prefix):
+            text = text[len(prefix):]
+            break
+    username = text.split("/")[0].split("?")[0]
+    if not username or username.startswith("+") or username.lower() == "joinchat":
+        return None, None
+    return None, username.lower()
+
+
+def entity_type_of(entity: Any) -> Optional[str]:
+    """
+    Bestimmt den gespeicherten Typ einer Telethon-Entity.
+
+    Args:
+        entity: Channel, Chat oder User
+
+    Returns:
+        Typname oder None für unbekannte Objekte
+    """
+    if isinstance(entity, Channel):
+        return ENTITY_TYPE_CHANNEL
+    if isinstance(entity, Chat):
+        return ENTITY_TYPE_CHAT
+    if isinstance(entity, User):
+        return ENTITY_TYPE_USER
+    return None
+
+
+def input_peer_for(group: TelegramGroup) -> Any:
+    """
+    Baut aus einem gespeicherten Eintrag einen InputPeer.
+
+    Args:
+        group: TelegramGroup mit entity_type und ggf. access_hash
+
+    Returns:
+        InputPeerChannel, InputPeerChat oder InputPeerUser
+    """
+    if group.entity_type == ENTITY_TYPE_CHANNEL:
+        return InputPeerChannel(channel_id=group.group_id, access_hash=group.access_hash)
+    if group.entity_type == ENTITY_TYPE_CHAT:
+        return InputPeerChat(chat_id=group.group_id)
+    if group.entity_type == ENTITY_TYPE_USER:
+        return InputPeerUser(user_id=group.group_id, access_hash=group.access_hash)
+    raise ValueError(f"Unbekannter Entity-Typ für Gruppe {group.group_id}: {group.entity_type}")
+
+
+class EntityResolver:
+    """Löst Gruppen zuerst aus der Datenbank und erst danach über Telegram auf."""
+
+    def __init__(self, client: Any, refresh_after: Optional[timedelta] = DEFAULT_REFRESH_AFTER,
+                 refresh_concurrency: int = DEFAULT_REFRESH_CONCURRENCY):
+        """
+        Initialisiert den Resolver.
+
+        Args:
+            client: TelegramClient
+            refresh_after: Alter, ab dem ein Eintrag im Hintergrund aktualisiert wird (None = nie)
+            refresh_concurrency: Maximale Anzahl gleichzeitiger Hintergrund-Aktualisierungen
+        """
+        self.client = client
+        self.refresh_after = refresh_after
+        self.refresh_concurrency = refresh_concurrency
+        self.stats: Dict[str, int] = {
+            "db_hits": 0,
+            "network_resolutions": 0,
+            "refreshes": 0,
+            "invalidations": 0,
+        }
+        self._refreshing: Set[int] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._refresh_semaphore: Optional[asyncio.Semaphore] = None
+
+    def lookup(self, reference: Union[int, str]) -> Optional[TelegramGroup]:
+        """
+        Sucht einen verwendbaren Eintrag in der Datenbank.
+
+        Args:
+            reference: Gruppenangabe wie bei get_entity
+
+        Returns:
+            TelegramGroup oder None, wenn eine Auflösung über das Netzwerk nötig ist
+        """
+        group_id, username = normalize_group_reference(reference)
+        if group_id is not None:
+            group = TelegramGroup.get_or_none(TelegramGroup.group_id == group_id)
+        elif username:
+            group = TelegramGroup.get_or_none(fn.LOWER(TelegramGroup.username) == username)
+        else:
+            return None
+        if group is None or group.entity_type is None:
+            return None
+        if group.entity_type != ENTITY_TYPE_CHAT and group.access_hash is None:
+            return None
+        return group
+
+    async def resolve(self, reference: Union[int, str]) -> Tuple[Any, TelegramGroup]:
+        """
+        Löst eine Gruppe auf.
+
+        Args:
+            reference: Gruppenangabe wie bei get_entity
+
+        Returns:
+            (InputPeer oder Entity für iter_messages, zugehörige TelegramGroup)
+        """
+        group = self.lookup(reference)
+        if group is not None:
+            self.stats["db_hits"] += 1
+            if self._is_stale(group):
+                self._schedule_refresh(group)
+            return input_peer_for(group), group
+
+        entity = await self.client.get_entity(reference)
+        if isinstance(entity, list):
+            entity = entity[0] if entity else None
+        if not entity:
+            raise ValueError(f"Gruppe konnte nicht gefunden werden: {reference}")
+        self.stats["network_resolutions"] += 1
+        return entity, self.remember(entity)
+
+    def remember(self, entity: Any) -> TelegramGroup:
+        """
+        Speichert eine aufgelöste Entity.
+
+        Args:
+            entity: Telethon-Entity
+
+        Returns:
+            Aktualisierte TelegramGroup
+        """
+        title = getattr(entity, "title", None) or getattr(entity, "first_name", None) or ""
+        username = getattr(entity, "username", None)
+        access_hash = getattr(entity, "access_hash", None)
+
+        group, created = TelegramGroup.get_or_create(
+            group_id=getattr(entity, "id", 0),
+            defaults={"title": title, "username": username},
+        )
+        entity_type = entity_type_of(entity)
+        if entity_type is not None:
+            group.title = title
+            group.username = username
+            group.entity_type = entity_type
+            group.access_hash = access_hash if isinstance(access_hash, int) else None
+            group.resolved_at = datetime.now()
+            group.save()
+        return group
+
+    def invalidate(self, group_id: int) -> None:
+        """
+        Verwirft die gespeicherte Zugriffsinformation einer Gruppe.
+
+        Args:
+            group_id: ID der Gruppe
+        """
+        TelegramGroup.update(access_hash=None, entity_type=None, resolved_at=None).where(
+            TelegramGroup.group_id == group_id
+        ).execute()
+        self.stats["invalidations"] += 1
+        logger.info(f"Gespeicherte Auflösung für Gruppe {group_id} verworfen")
+
+    async def resolve_again(self, group: TelegramGroup) -> Optional[Tuple[Any, TelegramGroup]]:
+        """
+        Verwirft einen abgelehnten Eintrag und löst ihn einmal über den Benutzernamen neu auf.
+
+        Args:
+            group: TelegramGroup, deren access_hash abgelehnt wurde
+
+        Returns:
+            (Entity, aktualisierte TelegramGroup) oder None ohne Benutzernamen
+        """
+        self.invalidate(group.group_id)
+        if not group.username:
+            return None
+        entity = await self.client.get_entity(group.username)
+        self.stats["network_resolutions"] += 1
+        return entity, self.remember(entity)
+
+    def _is_stale(self, group: TelegramGroup) -> bool:
+        """Prüft, ob ein Eintrag im Hintergrund aktualisiert werden sollte."""
+        if self.refresh_after is None:
+            return False
+        return group.resolved_at is None or datetime.now() - group.resolved_at > self.refresh_after
+
+    def _schedule_refresh(self, group: TelegramGroup) -> None:
+        """Startet eine Hintergrund-Aktualisierung (höchstens eine pro Gruppe)."""
+        if group.group_id in self._refreshing:
+            return
+        self._refreshing.add(group.group_id)
+        task = asyncio.create_task(self._refresh(group))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(self, group: TelegramGroup) -> None:
+        """Aktualisiert Titel, Benutzernamen und access_hash über den InputPeer."""
+        if self._refresh_semaphore is None:
+            self._refresh_semaphore = asyncio.Semaphore(self.refresh_concurrency)
+        try:
+            async with self._refresh_semaphore:
+                entity = await self.client.get_entity(input_peer_for(group))
+            self.remember(entity)
+            self.stats["refreshes"] += 1
+        except ChannelPrivateError:
+            self.invalidate(group.group_id)
+        except STALE_ENTITY_ERRORS:
+            try:
+                async with self._refresh_semaphore:
+                    if await self.resolve_again(group) is not None:
+                        self.stats["refreshes"] += 1
+            except Exception as e:
+                logger.warning(f"Neuauflösung für Gruppe {group.group_id} fehlgeschlagen: {e}")
+        except Exception as e:
+            logger.warning(f"Hintergrund-Aktualisierung für Gruppe {group.group_id} fehlgeschlagen: {e}")
+        finally:
+            self._refreshing.discard(group.group_id)
+
+    async def close(self) -> None:
+        """Wartet auf laufende Hintergrund-Aktualisierungen."""
+        if self._refresh_tasks:
+            await asyncio.gather(*list(self._refresh_tasks), return_exceptions=True)
@@ -12,13 +12,16 @@ from abc import ABC, abstractmethod
 from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 import aiofiles
+from .cache_governor import OrderedCacheAdapter, register_cache
 # Entferne pickle und importiere stattdessen die sicheren Serialisierungsfunktionen
 from .secure_serialization import secure_dumps, secure_loads
 from .error_handling import handle_error
 from .file_error_handler import handle_file_error, with_file_error_handling
+from .log_structured_cache import DEFAULT_SEGMENT_BYTES, LogStructuredStore
+from .utils.tinylfu_cache import WTinyLFUCache, create_cache_core
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +35,10 @@ DEFAULT_MEMORY_TTL = 300  # 5 Minuten
 DEFAULT_DISK_TTL = 3600   # 1 Stunde
 DEFAULT_CDN_TTL = 86400   # 24 Stunden
 
+# Mindestanzahl von Journal-Einträgen bis zum nächsten Snapshot der CDN-Metadaten
+DEFAULT_CDN_SNAPSHOT_INTERVAL = 10000
+
+
 class CacheEntry:
     """Repräsentiert einen Cache-Eintrag mit Metadaten."""
     
@@ -167,18 +174,27 @@ class BaseCache(ABC):
 
 
 class MemoryCache(BaseCache):
-    """In-Memory-Cache mit LRU-Eviction-Policy."""
+    """
+    In-Memory-Cache mit LRU-Eviction-Policy.
     
-    def __init__(self, max_size: int = DEFAULT_MEMORY_CACHE_SIZE, default_ttl: int = DEFAULT_MEMORY_TTL):
+    Mit policy="tinylfu" oder max_bytes übernimmt ein WTinyLFUCache die
+    Speicherung (scan-resistente Aufnahme bzw. Byte-Budget).
+    """
+    
+    def __init__(self, max_size: int = DEFAULT_MEMORY_CACHE_SIZE, default_ttl: int = DEFAULT_MEMORY_TTL,
+                 max_bytes: Optional[int] = None, policy: str = "lru"):
         """
         Initialisiert den Memory-Cache.
         
         Args:
             max_size: Maximale Anzahl von Einträgen
             default_ttl: Standard-TTL für Einträge in Sekunden
+            max_bytes: Byte-Budget statt max_size (optional)
+            policy: "lru" oder "tinylfu"
         """
         super().__init__(max_size, default_ttl)
         self.cache = OrderedDict()
+        self.core: Optional[WTinyLFUCache] = create_cache_core(max_size, max_bytes, policy, default_ttl)
         
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -191,6 +207,10 @@ class MemoryCache(BaseCache):
             Wert oder None, wenn nicht gefunden
         """
         try:
+            if self.core is not None:
+                value = self.core.get(key)
+                self.stats["hits" if value is not None else "misses"] += 1
+                return value
             if key in self.cache:
                 entry = self.cache[key]
                 if not entry.is_expired():
@@ -223,6 +243,13 @@ class MemoryCache(BaseCache):
             True, wenn erfolgreich
         """
         try:
+            if self.core is not None:
+                evictions = self.core.eviction_count
+                effective_ttl = ttl if ttl is not None else self.default_ttl
+                stored = self.core.put(key, value, effective_ttl)
+                self.stats["evictions"] += self.core.eviction_count - evictions
+                return stored
+            
             # Wenn der Schlüssel bereits existiert, entferne ihn
             if key in self.cache:
                 del self.cache[key]
@@ -255,6 +282,8 @@ class MemoryCache(BaseCache):
             True, wenn erfolgreich
         """
         try:
+            if self.core is not None:
+                return self.core.delete(key)
             if key in self.cache:
                 del self.cache[key]
                 return True
@@ -267,6 +296,8 @@ class MemoryCache(BaseCache):
     async def clear(self) -> None:
         """Leert den gesamten Memory-Cache."""
         try:
+            if self.core is not None:
+                self.core.clear()
             self.cache.clear()
         except Exception as e:
             self.stats["errors"] += 1
@@ -279,7 +310,45 @@ class MemoryCache(BaseCache):
         Returns:
             Anzahl der Einträge im Cache
         """
+        if self.core is not None:
+            return len(self.core)
         return len(self.cache)
+    
+    def resize(self, max_size: int) -> None:
+        """
+        Ändert die maximale Anzahl von Einträgen (z. B. durch den Cache-Governor).
+        
+        Args:
+            max_size: Neue maximale Anzahl von Einträgen
+        """
+        self.max_size = max(1, max_size)
+        if self.core is not None:
+            if self.core.weigher is None:
+                evictions = self.core.eviction_count
+                self.core.resize(self.max_size)
+                self.stats["evictions"] += self.core.eviction_count - evictions
+            return
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gibt Cache-Statistiken zurück (bei W-TinyLFU mit Namensräumen).
+        
+        Returns:
+            Dictionary mit Statistiken
+        """
+        stats = self.stats.copy()
+        if self.core is not None:
+            core_stats = self.core.get_stats()
+            stats.update(
+                policy=core_stats["policy"],
+                weighted_size=core_stats["weighted_size"],
+                rejections=core_stats["rejections"],
+                namespaces=core_stats["namespaces"],
+            )
+        return stats
 
 
 class DiskCache(BaseCache):
@@ -441,11 +510,156 @@ class DiskCache(BaseCache):
             return 0
 
 
+class LogStructuredDiskCache(BaseCache):
+    """
+    Festplatten-Cache auf Basis eines segmentierten, nur anhängenden Logs.
+    
+    Ersetzt DiskCache ohne Änderung der Schnittstelle: Einfügen kostet einen
+    write-Aufruf statt eines Verzeichnisscans, Lesen einen pread-Aufruf ohne
+    Zurückschreiben der Zugriffsdaten.
+    """
+    
+    def __init__(self, cache_dir: Union[str, Path], max_size: int = DEFAULT_DISK_CACHE_SIZE,
+                 default_ttl: int = DEFAULT_DISK_TTL, max_segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 background_compaction: bool = True):
+        """
+        Initialisiert den log-strukturierten Disk-Cache.
+        
+        Args:
+            cache_dir: Verzeichnis für den Cache
+            max_size: Maximale Anzahl von Einträgen
+            default_ttl: Standard-TTL für Einträge in Sekunden
+            max_segment_bytes: Größe, ab der ein neues Segment begonnen wird
+            background_compaction: Kompaktierung im Hintergrund ausführen
+        """
+        super().__init__(max_size, default_ttl)
+        self.cache_dir = Path(cache_dir)
+        self.store = LogStructuredStore(
+            self.cache_dir,
+            max_entries=max_size,
+            max_segment_bytes=max_segment_bytes,
+            background_compaction=background_compaction,
+        )
+        
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Ruft einen Wert aus dem Disk-Cache ab.
+        
+        Args:
+            key: Schlüssel des abzurufenden Werts
+            
+        Returns:
+            Wert oder None, wenn nicht gefunden
+        """
+        try:
+            data = self.store.get(key)
+            if data is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            return secure_loads(data)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Fehler beim Abrufen aus Disk-Cache: {e}")
+            return None
+            
+    async def put(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """
+        Fügt einen Wert zum Disk-Cache hinzu.
+        
+        Args:
+            key: Schlüssel des Werts
+            value: Wert zum Cachen
+            ttl: Time-To-Live in Sekunden (optional)
+            
+        Returns:
+            True, wenn erfolgreich
+        """
+        try:
+            evictions = self.store.stats["evictions"]
+            effective_ttl = ttl if ttl is not None else self.default_ttl
+            self.store.put(key, secure_dumps(value), effective_ttl)
+            self.stats["evictions"] += self.store.stats["evictions"] - evictions
+            return True
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Fehler beim Einfügen in Disk-Cache: {e}")
+            return False
+            
+    async def delete(self, key: str) -> bool:
+        """
+        Löscht einen Eintrag aus dem Disk-Cache.
+        
+        Args:
+            key: Schlüssel des zu löschenden Eintrags
+            
+        Returns:
+            True, wenn erfolgreich
+        """
+        try:
+            return self.store.delete(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Fehler beim Löschen aus Disk-Cache: {e}")
+            return False
+            
+    async def clear(self) -> None:
+        """Leert den gesamten Disk-Cache."""
+        try:
+            self.store.clear()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Fehler beim Leeren des Disk-Cache: {e}")
+            
+    async def size(self) -> int:
+        """
+        Gibt die aktuelle Größe des Disk-Cache zurück.
+        
+        Returns:
+            Anzahl der Einträge im Cache
+        """
+        return len(self.store)
+        
+    async def flush(self) -> None:
+        """Schreibt den Index in die Hinweisdatei für einen schnellen Neustart."""
+        try:
+            self.store.flush()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Fehler beim Sichern des Disk-Cache-Index: {e}")
+            
+    async def close(self) -> None:
+        """Schließt den Speicher."""
+        self.store.close()
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gibt Cache-Statistiken einschließlich der Speicherkennzahlen zurück.
+        
+        Returns:
+            Dictionary mit Statistiken
+        """
+        stats = self.stats.copy()
+        stats["store"] = self.store.get_stats()
+        return stats
+
+
 class CDNCache(BaseCache):
-    """CDN-Cache für vorgeladene Vorschauen und häufig verwendete Daten."""
+    """
+    CDN-Cache für vorgeladene Vorschauen und häufig verwendete Daten.
+    
+    Die Metadaten liegen als Snapshot (metadata.json) plus Journal
+    (metadata.journal, eine JSON-Zeile pro Änderung). Jede Änderung hängt nur
+    eine Zeile an; erst wenn das Journal mindestens so viele Einträge hat wie
+    der Index (bzw. snapshot_interval), wird ein neuer Snapshot atomar
+    geschrieben und das Journal geleert. Beim Start wird der Snapshot geladen
+    und das Journal nachgespielt; eine beim Absturz halb geschriebene letzte
+    Zeile wird verworfen.
+    """
     
     def __init__(self, cache_dir: Union[str, Path], max_size: int = DEFAULT_CDN_CACHE_SIZE, 
-                 default_ttl: int = DEFAULT_CDN_TTL):
+                 default_ttl: int = DEFAULT_CDN_TTL, snapshot_interval: int = DEFAULT_CDN_SNAPSHOT_INTERVAL,
+                 sync_writes: bool = False):
         """
         Initialisiert den CDN-Cache.
         
@@ -453,34 +667,131 @@ class CDNCache(BaseCache):
             cache_dir: Verzeichnis für den Cache
             max_size: Maximale Anzahl von Einträgen
             default_ttl: Standard-TTL für Einträge in Sekunden
+            snapshot_interval: Mindestanzahl von Journal-Einträgen bis zum nächsten Snapshot
+            sync_writes: Journal nach jeder Änderung mit fsync sichern
         """
         super().__init__(max_size, default_ttl)
         self.cache_dir = Path(cache_dir) / "cdn"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.metadata_file = self.cache_dir / "metadata.json"
+        self.journal_file = self.cache_dir / "metadata.journal"
+        self.snapshot_interval = snapshot_interval
+        self.sync_writes = sync_writes
+        self.stats.update(journal_records=0, snapshots=0, recovered_records=0)
         self._lock = asyncio.Lock()
+        self._journal = None
         self._load_metadata()
         
     def _load_metadata(self) -> None:
-        """Lädt die Cache-Metadaten."""
+        """Lädt den Snapshot und spielt das Journal nach."""
+        snapshot = {}
         try:
             if self.metadata_file.exists():
                 with open(self.metadata_file, 'r') as f:
-                    self.metadata = json.load(f)
-            else:
-                self.metadata = {}
+                    snapshot = json.load(f)
         except Exception as e:
             logger.warning(f"Fehler beim Laden der CDN-Cache-Metadaten: {e}")
-            self.metadata = {}
+            snapshot = {}
+        # Reihenfolge des Index = Reihenfolge der letzten Zugriffe (älteste zuerst)
+        self.metadata: "OrderedDict[str, Dict[str, Any]]" = OrderedDict(
+            sorted(snapshot.items(), key=lambda item: item[1].get("last_accessed", 0))
+        )
+        
+        records = 0
+        try:
+            if self.journal_file.exists():
+                valid_end = 0
+                with open(self.journal_file, 'rb') as f:
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            self._apply_record(json.loads(line))
+                        except (ValueError, KeyError, TypeError):
+                            break
+                        valid_end += len(line)
+                        records += 1
+                if valid_end < self.journal_file.stat().st_size:
+                    logger.warning("Unvollständiger Eintrag im CDN-Cache-Journal verworfen")
+                    with open(self.journal_file, 'r+b') as f:
+                        f.truncate(valid_end)
+        except Exception as e:
+            logger.warning(f"Fehler beim Nachspielen des CDN-Cache-Journals: {e}")
+        
+        self.stats["journal_records"] = records
+        self.stats["recovered_records"] = records
+        self._journal = open(self.journal_file, 'ab')
+        
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        """
+        Wendet einen Journal-Eintrag auf den Index an.
+        
+        Args:
+            record: Journal-Eintrag mit Feld "op"
+        """
+        op = record["op"]
+        if op == "put":
+            self.metadata.pop(record["key"], None)
+            self.metadata[record["key"]] = record["entry"]
+        elif op == "access":
+            entry_info = self.metadata.get(record["key"])
+            if entry_info is not None:
+                # Absolute Werte, damit mehrfaches Nachspielen unschädlich ist
+                entry_info["access_count"] = record["access_count"]
+                entry_info["last_accessed"] = record["last_accessed"]
+                self.metadata.move_to_end(record["key"])
+        elif op == "delete":
+            self.metadata.pop(record["key"], None)
+        elif op == "clear":
+            self.metadata.clear()
+        else:
+            raise ValueError(f"Unbekannte Journal-Operation: {op}")
+            
+    def _append_record(self, record: Dict[str, Any]) -> None:
+        """
+        Hängt einen Eintrag an das Journal an und schreibt bei Bedarf einen Snapshot.
+        
+        Args:
+            record: Journal-Eintrag
+        """
+        self._journal.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._journal.flush()
+        if self.sync_writes:
+            os.fsync(self._journal.fileno())
+        self.stats["journal_records"] += 1
+        if self.stats["journal_records"] >= max(self.snapshot_interval, len(self.metadata)):
+            self._save_metadata()
             
     def _save_metadata(self) -> None:
-        """Speichert die Cache-Metadaten."""
+        """Schreibt einen Snapshot der Metadaten atomar und leert das Journal."""
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            temp_file = self.metadata_file.with_suffix(".json.tmp")
+            with open(temp_file, 'w') as f:
+                json.dump(self.metadata, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.metadata_file)
+            # Erst nach dem Ersetzen leeren: ein Absturz dazwischen spielt nur bereits enthaltene Einträge nach
+            self._journal.seek(0)
+            self._journal.truncate()
+            self.stats["journal_records"] = 0
+            self.stats["snapshots"] += 1
         except Exception as e:
             logger.error(f"Fehler beim Speichern der CDN-Cache-Metadaten: {e}")
             
+    def _remove_entry(self, key: str) -> None:
+        """
+        Entfernt Datei und Metadaten eines Eintrags.
+        
+        Args:
+            key: Schlüssel des Eintrags
+        """
+        entry_info = self.metadata.pop(key)
+        cache_file = Path(entry_info["file_path"])
+        if cache_file.exists():
+            cache_file.unlink()
+        self._append_record({"op": "delete", "key": key})
+            
     def _get_cache_file_path(self, key: str) -> Path:
         """
         Berechnet den Dateipfad für einen Cache-Schlüssel.
@@ -522,23 +833,24 @@ class CDNCache(BaseCache):
                                     # Aktualisiere Zugriffsstatistik
                                     entry_info["access_count"] += 1
                                     entry_info["last_accessed"] = time.time()
-                                    self._save_metadata()
+                                    self.metadata.move_to_end(key)
+                                    self._append_record({
+                                        "op": "access",
+                                        "key": key,
+                                        "access_count": entry_info["access_count"],
+                                        "last_accessed": entry_info["last_accessed"]
+                                    })
                                     
                                     self.stats["hits"] += 1
                                     return value
                             except Exception:
-                                # Bei Fehler entferne die beschädigte Datei
-                                if cache_file.exists():
-                                    cache_file.unlink()
-                                # Und die Metadaten
-                                del self.metadata[key]
-                                self._save_metadata()
+                                # Bei Fehler entferne die beschädigte Datei und die Metadaten
+                                self._remove_entry(key)
                         else:
                             # Entferne abgelaufene Datei und Metadaten
-                            if cache_file.exists():
-                                cache_file.unlink()
-                            del self.metadata[key]
-                            self._save_metadata()
+                            self._remove_entry(key)
+                    else:
+                        self._remove_entry(key)
                             
             self.stats["misses"] += 1
             return None
@@ -561,41 +873,31 @@ class CDNCache(BaseCache):
         """
         try:
             async with self._lock:
-                # Prüfe aktuelle Größe und entferne älteste Dateien bei Bedarf
-                if len(self.metadata) >= self.max_size:
-                    # Sortiere nach letztem Zugriff (älteste zuerst)
-                    sorted_entries = sorted(
-                        self.metadata.items(), 
-                        key=lambda x: x[1]["last_accessed"]
-                    )
-                    # Entferne älteste Einträge
-                    for i in range(len(sorted_entries) - self.max_size + 1):
-                        old_key, old_info = sorted_entries[i]
-                        old_file = Path(old_info["file_path"])
-                        if old_file.exists():
-                            old_file.unlink()
-                        del self.metadata[old_key]
-                        self.stats["evictions"] += 1
-                    self._save_metadata()
+                # Entferne bei Bedarf die am längsten nicht verwendeten Einträge
+                while key not in self.metadata and self.metadata and len(self.metadata) >= self.max_size:
+                    self._remove_entry(next(iter(self.metadata)))
+                    self.stats["evictions"] += 1
                 
                 # Erstelle neuen Eintrag
                 effective_ttl = ttl if ttl is not None else self.default_ttl
                 expires_at = time.time() + effective_ttl if effective_ttl > 0 else None
                 
-                # Speichere in Datei
+                # Speichere in Datei (vor dem Journal-Eintrag, damit dieser nie ins Leere zeigt)
                 cache_file = self._get_cache_file_path(key)
                 async with aiofiles.open(cache_file, 'wb') as f:
                     await f.write(secure_dumps(value))
                 
                 # Speichere Metadaten
-                self.metadata[key] = {
+                entry_info = {
                     "file_path": str(cache_file),
                     "created_at": time.time(),
                     "expires_at": expires_at,
                     "access_count": 0,
                     "last_accessed": time.time()
                 }
-                self._save_metadata()
+                self.metadata.pop(key, None)
+                self.metadata[key] = entry_info
+                self._append_record({"op": "put", "key": key, "entry": entry_info})
                 
                 return True
         except Exception as e:
@@ -616,12 +918,7 @@ class CDNCache(BaseCache):
         try:
             async with self._lock:
                 if key in self.metadata:
-                    entry_info = self.metadata[key]
-                    cache_file = Path(entry_info["file_path"])
-                    if cache_file.exists():
-                        cache_file.unlink()
-                    del self.metadata[key]
-                    self._save_metadata()
+                    self._remove_entry(key)
                     return True
                 return False
         except Exception as e:
@@ -656,22 +953,40 @@ class CDNCache(BaseCache):
             self.stats["errors"] += 1
             logger.error(f"Fehler beim Ermitteln der CDN-Cache-Größe: {e}")
             return 0
+            
+    async def flush(self) -> None:
+        """Schreibt sofort einen Snapshot und leert das Journal."""
+        async with self._lock:
+            self._save_metadata()
+            
+    async def close(self) -> None:
+        """Schreibt einen abschließenden Snapshot und schließt das Journal."""
+        async with self._lock:
+            if self._journal is not None and not self._journal.closed:
+                self._save_metadata()
+                self._journal.close()
 
 
 class IntelligentCachingSystem:
     """Intelligentes Caching-System mit mehrstufigem Caching."""
     
-    def __init__(self, cache_dir: Union[str, Path]):
+    def __init__(self, cache_dir: Union[str, Path], disk_backend: str = "log"):
         """
         Initialisiert das intelligente Caching-System.
         
         Args:
             cache_dir: Basis-Verzeichnis für alle Caches
+            disk_backend: "log" für den log-strukturierten Disk-Cache, "files" für eine Datei pro Eintrag
         """
         self.cache_dir = Path(cache_dir)
         self.memory_cache = MemoryCache()
-        self.disk_cache = DiskCache(self.cache_dir / "disk")
+        if disk_backend == "files":
+            self.disk_cache = DiskCache(self.cache_dir / "disk")
+        else:
+            self.disk_cache = LogStructuredDiskCache(self.cache_dir / "disk")
         self.cdn_cache = CDNCache(self.cache_dir / "cdn")
+        # Nur die Memory-Ebene belegt Prozessspeicher und teilt sich das globale Budget
+        register_cache("intelligent_memory_cache", OrderedCacheAdapter(self.memory_cache))
         
     async def get(self, key: str, cache_level: str = "all") -> Optional[Any]:
         """
@@ -810,4 +1125,116 @@ def get_intelligent_cache(cache_dir: Union[str, Path] = "cache") -> IntelligentC
     global _intelligent_cache
     if _intelligent_cache is None:
         _intelligent_cache = IntelligentCachingSystem(cache_dir)
-    return _intelligent_cache
\ No newline at end of file
+    return _intelligent_cache
+
+
+def benchmark_disk_cache(directory: Union[str, Path], num_keys: int = 1_000_000, value_size: int = 100,
+                         read_samples: int = 100_000, legacy_keys: int = 2_000) -> Dict[str, float]:
+    """
+    Misst den log-strukturierten Speicher und vergleicht ihn mit dem DiskCache.
+    
+    Der log-strukturierte Speicher wird mit num_keys Schlüsseln gefüllt; der
+    DiskCache (eine Datei pro Eintrag) nur mit legacy_keys, da jedes Einfügen
+    dort das gesamte Verzeichnis durchsucht.
+    
+    Args:
+        directory: Arbeitsverzeichnis für den Benchmark
+        num_keys: Anzahl der Schlüssel für den log-strukturierten Speicher
+        value_size: Größe der Werte in Bytes
+        read_samples: Anzahl zufälliger Lesezugriffe
+        legacy_keys: Anzahl der Schlüssel für den DiskCache
+        
+    Returns:
+        Dictionary mit Durchsätzen (Operationen/s) und Startzeiten (Sekunden)
+    """
+    import random
+    
+    directory = Path(directory)
+    value = b"x" * value_size
+    results: Dict[str, float] = {}
+    
+    store = LogStructuredStore(directory / "log", background_compaction=False)
+    started = time.perf_counter()
+    for i in range(num_keys):
+        store.put(f"key-{i}", value)
+    results["log_puts_per_second"] = num_keys / (time.perf_counter() - started)
+    
+    keys = [f"key-{random.randrange(num_keys)}" for _ in range(read_samples)]
+    started = time.perf_counter()
+    for key in keys:
+        store.get(key)
+    results["log_gets_per_second"] = read_samples / (time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    store.close()
+    results["hint_write_seconds"] = time.perf_counter() - started
+    
+    reopened = LogStructuredStore(directory / "log", background_compaction=False)
+    results["hint_startup_seconds"] = reopened.stats["startup_seconds"]
+    reopened._close_files()
+    (directory / "log" / "index.hint").unlink()
+    replayed = LogStructuredStore(directory / "log", background_compaction=False)
+    results["replay_startup_seconds"] = replayed.stats["startup_seconds"]
+    replayed.close()
+    
+    async def _legacy_puts() -> float:
+        cache = DiskCache(directory / "files", max_size=legacy_keys)
+        started = time.perf_counter()
+        for i in range(legacy_keys):
+            await cache.put(f"key-{i}", "x" * value_size)
+        return legacy_keys / (time.perf_counter() - started)
+    
+    results["legacy_puts_per_second"] = asyncio.run(_legacy_puts())
+    return results
+
+
+def benchmark_cdn_cache_puts(directory: Union[str, Path], existing_entries: int = DEFAULT_CDN_CACHE_SIZE // 2,
+                             puts: int = 200) -> Dict[str, float]:
+    """
+    Misst die Put-Latenz des CDN-Caches mit Journal gegen das vollständige Neuschreiben des Index.
+    
+    Der Index wird mit existing_entries Einträgen vorbelegt. Als Vergleich dient
+    das bisherige Verhalten, bei dem jeder Put zusätzlich die gesamte
+    metadata.json (mit indent=2) neu schreibt.
+    
+    Args:
+        directory: Arbeitsverzeichnis für den Benchmark
+        existing_entries: Anzahl der bereits vorhandenen Einträge im Index
+        puts: Anzahl der gemessenen Puts je Variante
+        
+    Returns:
+        Dictionary mit mittlerer und p99-Latenz in Millisekunden je Variante
+    """
+    directory = Path(directory)
+    
+    async def _measure(rewrite_index: bool) -> List[float]:
+        subdir = directory / ("rewrite" if rewrite_index else "journal")
+        cache = CDNCache(subdir, max_size=existing_entries + puts + 1)
+        now = time.time()
+        for i in range(existing_entries):
+            cache.metadata[f"vorhanden-{i}"] = {
+                "file_path": str(cache.cache_dir / f"vorhanden-{i}.cdn"),
+                "created_at": now,
+                "expires_at": None,
+                "access_count": 0,
+                "last_accessed": now
+            }
+        cache._save_metadata()
+        
+        latencies = []
+        for i in range(puts):
+            started = time.perf_counter()
+            await cache.put(f"neu-{i}", {"vorschau": i})
+            if rewrite_index:
+                with open(cache.metadata_file, 'w') as f:
+                    json.dump(cache.metadata, f, indent=2)
+            latencies.append((time.perf_counter() - started) * 1000)
+        await cache.close()
+        return sorted(latencies)
+    
+    results: Dict[str, float] = {}
+    for name, rewrite_index in (("journal", False), ("rewrite", True)):
+        latencies = asyncio.run(_measure(rewrite_index))
+        results[f"{name}_mean_ms"] = sum(latencies) / len(latencies)
+        results[f"{name}_p99_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return results
@@ -116,8 +116,8 @@ class InteractiveMode:
         # Suche nach Audiodateien
         self.console.print("[blue]Suche nach Audiodateien...[/blue]")
         try:
-            # Hole die Gruppen-Entity
-            group_entity = await self.downloader.client.get_entity(selected_group.group_id)
+            # Hole die Gruppen-Entity (aus der Datenbank, falls bereits aufgelöst)
+            group_entity, _ = await self.downloader.resolve_group(selected_group.group_id)
             
             # Suche nach Audiodateien
             audio_files = await search_audio_files(
@@ -0,0 +1,687 @@
+"""
+Log-strukturierter Festplattenspeicher für den Disk-Cache (Bitcask-Prinzip).
+
+Alle Schreibvorgänge werden an ein aktives Segment angehängt. Ein Index im
+Arbeitsspeicher bildet jeden Schlüssel auf (Segment, Offset, Länge) ab, sodass
+ein Lesezugriff genau einen pread-Aufruf benötigt und ein Einfügen genau einen
+write-Aufruf.
+
+Vorteile:
+- Konstanter Aufwand pro Einfügen, unabhängig von der Anzahl der Einträge
+- Lesezugriffe ohne Schreibvorgänge (Zugriffe werden gesammelt verbucht)
+- Schneller Start über eine Hinweisdatei (Hint) mit dem gespeicherten Index
+- Absturzsicherheit durch Prüfsummen und erneutes Einlesen des Segmentendes
+- Rückgewinnung von Speicherplatz durch Kompaktierung im Hintergrund
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+HINT_FILE = "index.hint"
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_COMPACTION_THRESHOLD = 0.5
+DEFAULT_ACCESS_BATCH_SIZE = 1024
+COMPACTION_BATCH_SIZE = 512
+
+# Datensatz: Prüfsumme, Ablaufzeit (0 = nie), Schlüssellänge, Wertlänge, Flags
+_RECORD_HEADER = struct.Struct("<IdHIB")
+# Hint-Kopf: Kennung, aktives Segment, Größe des aktiven Segments, Anzahl Einträge
+_HINT_HEADER = struct.Struct("<4sIQQ")
+# Hint-Eintrag: Segment, Offset, Datensatzlänge, Ablaufzeit (die Schlüssel folgen als JSON-Liste)
+_HINT_ENTRY = struct.Struct("<IQId")
+_HINT_MAGIC = b"LSH2"
+_FLAG_TOMBSTONE = 1
+
+# Indexeintrag: (Segment, Offset, Datensatzlänge, Ablaufzeit)
+IndexEntry = Tuple[int, int, int, float]
+
+
+def _encode_record(key: bytes, value: bytes, expires_at: float, flags: int = 0) -> bytes:
+    """
+    Kodiert einen Datensatz mit Prüfsumme.
+
+    Args:
+        key: Schlüssel als Bytes
+        value: Wert als Bytes
+        expires_at: Ablaufzeitpunkt (0 = kein Ablauf)
+        flags: Datensatz-Flags
+
+    Returns:
+        Kodierter Datensatz
+    """
+    header = _RECORD_HEADER.pack(0, expires_at, len(key), len(value), flags)
+    crc = zlib.crc32(value, zlib.crc32(key, zlib.crc32(header[4:])))
+    return struct.pack("<I", crc) + header[4:] + key + value
+
+
+def _iter_records(data: bytes, start: int = 0) -> Iterator[Tuple[int, bytes, int, float, int]]:
+    """
+    Liest Datensätze aus einem Segment, bis das Ende oder ein defekter Datensatz erreicht ist.
+
+    Args:
+        data: Inhalt des Segments
+        start: Offset des ersten Datensatzes
+
+    Yields:
+        Tupel aus Offset, Schlüssel, Datensatzlänge, Ablaufzeit und Flags
+    """
+    view = memoryview(data)
+    offset = start
+    header_size = _RECORD_HEADER.size
+    while offset + header_size <= len(data):
+        crc, expires_at, key_len, value_len, flags = _RECORD_HEADER.unpack_from(data, offset)
+        end = offset + header_size + key_len + value_len
+        if end > len(data) or zlib.crc32(view[offset + 4:end]) != crc:
+            return
+        yield offset, bytes(view[offset + header_size:offset + header_size + key_len]), end - offset, expires_at, flags
+        offset = end
+
+
+class LogStructuredStore:
+    """
+    Segmentierter, nur anhängender Schlüssel-Wert-Speicher.
+
+    Der Index ist ein OrderedDict in LRU-Reihenfolge. Lesezugriffe werden
+    nicht sofort einsortiert, sondern gesammelt und in Stapeln verbucht;
+    die Reihenfolge wird mit der Hinweisdatei gespeichert und übersteht so
+    auch einen Neustart. Alle öffentlichen Methoden sind thread-sicher.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_entries: Optional[int] = None,
+                 max_segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 compaction_threshold: float = DEFAULT_COMPACTION_THRESHOLD,
+                 access_batch_size: int = DEFAULT_ACCESS_BATCH_SIZE,
+                 background_compaction: bool = True, sync_writes: bool = False):
+        """
+        Öffnet den Speicher und stellt den Index wieder her.
+
+        Args:
+            directory: Verzeichnis der Segmente
+            max_entries: Maximale Anzahl von Einträgen (None = unbegrenzt)
+            max_segment_bytes: Größe, ab der ein neues Segment begonnen wird
+            compaction_threshold: Anteil lebender Daten, unter dem ein Segment kompaktiert wird
+            access_batch_size: Anzahl gesammelter Zugriffe, bevor sie verbucht werden
+            background_compaction: Kompaktierung nach Segmentwechseln im Hintergrund starten
+            sync_writes: Jeden Schreibvorgang mit fsync abschließen
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_segment_bytes = max_segment_bytes
+        self.compaction_threshold = compaction_threshold
+        self.access_batch_size = access_batch_size
+        self.background_compaction = background_compaction
+        self.sync_writes = sync_writes
+
+        self._lock = threading.RLock()
+        self._index: "OrderedDict[str, IndexEntry]" = OrderedDict()
+        self._pending_access: List[str] = []
+        self._read_fds: Dict[int, int] = {}
+        self._live_bytes: Dict[int, int] = {}
+        self._total_bytes: Dict[int, int] = {}
+        self._active_id = 0
+        self._active_fd: Optional[int] = None
+        self._active_size = 0
+        self._generation = 0
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "corrupt_records": 0,
+            "compactions": 0,
+            "reclaimed_bytes": 0,
+            "startup_mode": "empty",
+            "startup_seconds": 0.0,
+        }
+
+        started = time.perf_counter()
+        self._open()
+        self.stats["startup_seconds"] = time.perf_counter() - started
+        logger.debug(
+            f"LogStructuredStore geöffnet ({len(self._index)} Einträge, "
+            f"{self.stats['startup_mode']}, {self.stats['startup_seconds']:.3f}s)"
+        )
+
+    # ------------------------------------------------------------------
+    # Öffnen und Wiederherstellen
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, segment_id: int) -> Path:
+        """
+        Gibt den Pfad eines Segments zurück.
+
+        Args:
+            segment_id: Nummer des Segments
+
+        Returns:
+            Pfad zur Segmentdatei
+        """
+        return self.directory / f"{SEGMENT_PREFIX}{segment_id:06d}{SEGMENT_SUFFIX}"
+
+    def _existing_segments(self) -> List[int]:
+        """
+        Ermittelt die vorhandenen Segmente.
+
+        Returns:
+            Aufsteigend sortierte Segmentnummern
+        """
+        segment_ids = []
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            try:
+                segment_ids.append(int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+            except ValueError:
+                continue
+        return sorted(segment_ids)
+
+    def _open(self) -> None:
+        """Lädt die Hinweisdatei, liest neuere Datensätze ein und öffnet die Segmente."""
+        segment_ids = self._existing_segments()
+        replay: List[Tuple[int, int]] = [(segment_id, 0) for segment_id in segment_ids]
+
+        hint = self._load_hint(set(segment_ids)) if segment_ids else None
+        if hint is not None:
+            hint_active, hint_size = hint
+            replay = [(hint_active, hint_size)] + [(s, 0) for s in segment_ids if s > hint_active]
+            self.stats["startup_mode"] = "hint"
+        elif segment_ids:
+            self._index.clear()
+            self._live_bytes.clear()
+            self.stats["startup_mode"] = "replay"
+
+        for position, (segment_id, start) in enumerate(replay):
+            self._replay_segment(segment_id, start, is_last=position == len(replay) - 1)
+
+        for segment_id in segment_ids:
+            self._read_fds[segment_id] = os.open(self._segment_path(segment_id), os.O_RDONLY)
+            self._total_bytes[segment_id] = os.fstat(self._read_fds[segment_id]).st_size
+            self._live_bytes.setdefault(segment_id, 0)
+
+        if segment_ids and self._total_bytes[segment_ids[-1]] < self.max_segment_bytes:
+            self._open_active(segment_ids[-1])
+        else:
+            self._open_active((segment_ids[-1] if segment_ids else 0) + 1)
+        self._evict_overflow()
+
+    def _load_hint(self, segment_ids: set) -> Optional[Tuple[int, int]]:
+        """
+        Lädt den Index aus der Hinweisdatei.
+
+        Args:
+            segment_ids: Vorhandene Segmente
+
+        Returns:
+            (aktives Segment, Größe) zum Zeitpunkt des Schreibens oder None, wenn unbrauchbar
+        """
+        hint_path = self.directory / HINT_FILE
+        if not hint_path.exists():
+            return None
+        try:
+            data = hint_path.read_bytes()
+            magic, active_id, active_size, count = _HINT_HEADER.unpack_from(data, 0)
+            if magic != _HINT_MAGIC or active_id not in segment_ids:
+                return None
+            if self._segment_path(active_id).stat().st_size < active_size:
+                return None
+
+            # Einträge und Schlüssel werden als Ganzes dekodiert statt Eintrag für Eintrag
+            entries_end = _HINT_HEADER.size + count * _HINT_ENTRY.size
+            entries = list(_HINT_ENTRY.iter_unpack(data[_HINT_HEADER.size:entries_end]))
+            payload = json.loads(data[entries_end:].decode("utf-8"))
+            keys = payload["keys"]
+            live_bytes = {int(segment_id): size for segment_id, size in payload["live"].items()}
+            if len(keys) != count or not set(live_bytes) <= segment_ids:
+                return None
+            self._index = OrderedDict(zip(keys, entries))
+            self._live_bytes = live_bytes
+            return active_id, active_size
+        except Exception as e:
+            logger.warning(f"Hinweisdatei unbrauchbar, Segmente werden vollständig eingelesen: {e}")
+            return None
+
+    def _replay_segment(self, segment_id: int, start: int, is_last: bool) -> None:
+        """
+        Liest die Datensätze eines Segments ab einem Offset in den Index ein.
+
+        Args:
+            segment_id: Nummer des Segments
+            start: Offset, ab dem gelesen wird
+            is_last: Ob es sich um das zuletzt geschriebene Segment handelt
+        """
+        path = self._segment_path(segment_id)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        end = start
+        index = self._index
+        live_bytes = self._live_bytes
+        for offset, key_bytes, length, expires_at, flags in _iter_records(data, start):
+            key = key_bytes.decode("utf-8")
+            previous = index.pop(key, None)
+            if previous is not None:
+                live_bytes[previous[0]] -= previous[2]
+            if not flags & _FLAG_TOMBSTONE:
+                index[key] = (segment_id, offset, length, expires_at)
+                live_bytes[segment_id] = live_bytes.get(segment_id, 0) + length
+            end = offset + length
+
+        if end < len(data):
+            # Unvollständiger Datensatz nach einem Absturz
+            logger.warning(f"Segment {path.name} ab Offset {end} beschädigt ({len(data) - end} Bytes)")
+            self.stats["corrupt_records"] += 1
+            if is_last:
+                os.truncate(path, end)
+
+    def _open_active(self, segment_id: int) -> None:
+        """
+        Öffnet ein Segment als aktives Schreibsegment.
+
+        Args:
+            segment_id: Nummer des Segments
+        """
+        path = self._segment_path(segment_id)
+        self._active_fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._active_id = segment_id
+        self._active_size = os.fstat(self._active_fd).st_size
+        if segment_id not in self._read_fds:
+            self._read_fds[segment_id] = os.open(path, os.O_RDONLY)
+            self._total_bytes[segment_id] = self._active_size
+            self._live_bytes[segment_id] = 0
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+
+    def _append(self, record: bytes) -> Tuple[int, int]:
+        """
+        Hängt einen Datensatz an das aktive Segment an.
+
+        Args:
+            record: Kodierter Datensatz
+
+        Returns:
+            (Segment, Offset) des Datensatzes
+        """
+        if self._active_size and self._active_size + len(record) > self.max_segment_bytes:
+            self._rotate()
+
+        offset = self._active_size
+        written = os.write(self._active_fd, record)
+        while written < len(record):
+            written += os.write(self._active_fd, record[written:])
+        if self.sync_writes:
+            os.fsync(self._active_fd)
+
+        self._active_size += len(record)
+        self._total_bytes[self._active_id] += len(record)
+        return self._active_id, offset
+
+    def _rotate(self) -> None:
+        """Schließt das aktive Segment ab und beginnt ein neues."""
+        os.close(self._active_fd)
+        self._open_active(self._active_id + 1)
+        if self.background_compaction and self._compaction_candidates():
+            self._start_background_compaction()
+
+    def _drop(self, key: str) -> Optional[IndexEntry]:
+        """
+        Entfernt einen Schlüssel aus dem Index und verbucht den Datensatz als tot.
+
+        Args:
+            key: Zu entfernender Schlüssel
+
+        Returns:
+            Bisheriger Indexeintrag oder None
+        """
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._live_bytes[entry[0]] -= entry[2]
+        return entry
+
+    def put(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Speichert einen Wert.
+
+        Args:
+            key: Schlüssel
+            value: Wert als Bytes
+            ttl: Time-To-Live in Sekunden (None = kein Ablauf)
+        """
+        expires_at = time.time() + ttl if ttl is not None else 0.0
+        record = _encode_record(key.encode("utf-8"), value, expires_at)
+        with self._lock:
+            self._drop(key)
+            segment_id, offset = self._append(record)
+            self._index[key] = (segment_id, offset, len(record), expires_at)
+            self._live_bytes[segment_id] += len(record)
+            self._evict_overflow()
+
+    def delete(self, key: str) -> bool:
+        """
+        Löscht einen Schlüssel über einen Löschvermerk (Tombstone).
+
+        Args:
+            key: Zu löschender Schlüssel
+
+        Returns:
+            True, wenn der Schlüssel vorhanden war
+        """
+        with self._lock:
+            if self._drop(key) is None:
+                return False
+            self._append(_encode_record(key.encode("utf-8"), b"", 0.0, _FLAG_TOMBSTONE))
+            return True
+
+    def _evict_overflow(self) -> None:
+        """Verdrängt die am längsten nicht genutzten Einträge oberhalb von max_entries."""
+        if self.max_entries is None or len(self._index) <= self.max_entries:
+            return
+        self._apply_access()
+        while len(self._index) > self.max_entries:
+            _, (segment_id, _, length, _) = self._index.popitem(last=False)
+            self._live_bytes[segment_id] -= length
+            self.stats["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+
+    def _apply_access(self) -> None:
+        """Verbucht gesammelte Zugriffe in der LRU-Reihenfolge."""
+        index = self._index
+        for key in self._pending_access:
+            if key in index:
+                index.move_to_end(key)
+        self._pending_access.clear()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Liest einen Wert.
+
+        Args:
+            key: Schlüssel
+
+        Returns:
+            Wert als Bytes oder None, wenn nicht vorhanden oder abgelaufen
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            segment_id, offset, length, expires_at = entry
+            if expires_at and expires_at <= time.time():
+                self.delete(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            record = os.pread(self._read_fds[segment_id], length, offset)
+            if len(record) != length or zlib.crc32(memoryview(record)[4:]) != struct.unpack_from("<I", record)[0]:
+                logger.warning(f"Beschädigter Datensatz für Schlüssel {key!r} wird verworfen")
+                self._drop(key)
+                self.stats["corrupt_records"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._pending_access.append(key)
+            if len(self._pending_access) >= self.access_batch_size:
+                self._apply_access()
+            self.stats["hits"] += 1
+        key_len = _RECORD_HEADER.unpack_from(record, 0)[2]
+        return record[_RECORD_HEADER.size + key_len:]
+
+    def __contains__(self, key: str) -> bool:
+        """Prüft, ob ein (nicht abgelaufener) Schlüssel vorhanden ist."""
+        with self._lock:
+            entry = self._index.get(key)
+            return entry is not None and not (entry[3] and entry[3] <= time.time())
+
+    def __len__(self) -> int:
+        """Gibt die Anzahl der Einträge zurück."""
+        return len(self._index)
+
+    # ------------------------------------------------------------------
+    # Hinweisdatei, Kompaktierung und Verwaltung
+    # ------------------------------------------------------------------
+
+    def _write_hint(self) -> None:
+        """Schreibt den Index atomar in die Hinweisdatei."""
+        self._apply_access()
+        index = self._index
+        parts = [_HINT_HEADER.pack(_HINT_MAGIC, self._active_id, self._active_size, len(index))]
+        parts.extend(_HINT_ENTRY.pack(*entry) for entry in index.values())
+        payload = {"keys": list(index), "live": self._live_bytes}
+        parts.append(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+        hint_path = self.directory / HINT_FILE
+        tmp_path = hint_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, hint_path)
+
+    def flush(self) -> None:
+        """Verbucht gesammelte Zugriffe und schreibt die Hinweisdatei."""
+        with self._lock:
+            if self._closed:
+                return
+            if self._active_fd is not None:
+                os.fsync(self._active_fd)
+            self._write_hint()
+
+    def _compaction_candidates(self, force: bool = False) -> List[int]:
+        """
+        Ermittelt abgeschlossene Segmente mit zu wenig lebenden Daten.
+
+        Args:
+            force: Alle Segmente mit toten Daten berücksichtigen
+
+        Returns:
+            Liste der Segmentnummern
+        """
+        candidates = []
+        for segment_id, total in self._total_bytes.items():
+            if segment_id == self._active_id or not total:
+                continue
+            live_ratio = self._live_bytes[segment_id] / total
+            if live_ratio < (1.0 if force else self.compaction_threshold):
+                candidates.append(segment_id)
+        return sorted(candidates)
+
+    def compact(self, force: bool = False) -> int:
+        """
+        Kopiert lebende Datensätze schwach belegter Segmente um und löscht diese Segmente.
+
+        Args:
+            force: Alle abgeschlossenen Segmente mit toten Daten kompaktieren
+
+        Returns:
+            Anzahl der kompaktierten Segmente
+        """
+        with self._lock:
+            candidates = self._compaction_candidates(force)
+            generation = self._generation
+
+        compacted = 0
+        for segment_id in candidates:
+            if self._compact_segment(segment_id, generation):
+                compacted += 1
+
+        if compacted:
+            with self._lock:
+                if generation == self._generation and not self._closed:
+                    self._write_hint()
+            logger.debug(f"{compacted} Segment(e) kompaktiert")
+        return compacted
+
+    def _compact_segment(self, segment_id: int, generation: int) -> bool:
+        """
+        Kompaktiert ein einzelnes Segment.
+
+        Das Segment ist unveränderlich und wird ohne Sperre gelesen; nur das
+        Umkopieren erfolgt stapelweise unter der Sperre, damit Zugriffe
+        währenddessen weiterlaufen.
+
+        Args:
+            segment_id: Nummer des Segments
+            generation: Generation des Speichers beim Start der Kompaktierung
+
+        Returns:
+            True, wenn das Segment entfernt wurde
+        """
+        try:
+            data = self._segment_path(segment_id).read_bytes()
+        except FileNotFoundError:
+            return False
+
+        batch: List[Tuple[int, bytes, int, int]] = []
+        for offset, key_bytes, length, _, flags in _iter_records(data):
+            batch.append((offset, key_bytes, length, flags))
+            if len(batch) >= COMPACTION_BATCH_SIZE:
+                if not self._copy_live_records(segment_id, data, batch, generation):
+                    return False
+                batch = []
+        if not self._copy_live_records(segment_id, data, batch, generation):
+            return False
+
+        with self._lock:
+            if generation != self._generation or segment_id not in self._read_fds:
+                return False
+            os.close(self._read_fds.pop(segment_id))
+            self.stats["reclaimed_bytes"] += self._total_bytes.pop(segment_id) - self._live_bytes.pop(segment_id)
+            self.stats["compactions"] += 1
+            self._segment_path(segment_id).unlink()
+        return True
+
+    def _copy_live_records(self, segment_id: int, data: bytes,
+                           batch: List[Tuple[int, bytes, int, int]], generation: int) -> bool:
+        """
+        Kopiert die noch gültigen Datensätze eines Stapels in das aktive Segment.
+
+        Args:
+            segment_id: Nummer des kompaktierten Segments
+            data: Inhalt des Segments
+            batch: Liste aus Offset, Schlüssel, Länge und Flags
+            generation: Generation des Speichers beim Start der Kompaktierung
+
+        Returns:
+            False, wenn der Speicher inzwischen geleert oder geschlossen wurde
+        """
+        with self._lock:
+            if generation != self._generation or self._closed:
+                return False
+            index = self._index
+            has_older = any(other < segment_id for other in self._read_fds)
+            for offset, key_bytes, length, flags in batch:
+                key = key_bytes.decode("utf-8")
+                record = data[offset:offset + length]
+                if flags & _FLAG_TOMBSTONE:
+                    # Löschvermerke werden nur benötigt, solange ältere Werte existieren
+                    if key not in index and has_older:
+                        self._append(record)
+                    continue
+                entry = index.get(key)
+                if entry is None or entry[0] != segment_id or entry[1] != offset:
+                    continue
+                new_segment, new_offset = self._append(record)
+                index[key] = (new_segment, new_offset, length, entry[3])
+                self._live_bytes[segment_id] -= length
+                self._live_bytes[new_segment] += length
+        return True
+
+    def _start_background_compaction(self) -> None:
+        """Startet die Kompaktierung in einem Hintergrund-Thread, falls keine läuft."""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+
+        def _worker() -> None:
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Fehler bei der Kompaktierung im Hintergrund: {e}")
+
+        self._compaction_thread = threading.Thread(target=_worker, name="log-store-compaction", daemon=True)
+        self._compaction_thread.start()
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        """
+        Wartet auf eine laufende Hintergrund-Kompaktierung.
+
+        Args:
+            timeout: Maximale Wartezeit in Sekunden
+        """
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def clear(self) -> None:
+        """Löscht alle Einträge und Segmente."""
+        with self._lock:
+            self._generation += 1
+            self._close_files()
+            for segment_id in list(self._total_bytes):
+                self._segment_path(segment_id).unlink(missing_ok=True)
+            (self.directory / HINT_FILE).unlink(missing_ok=True)
+            self._index.clear()
+            self._pending_access.clear()
+            self._live_bytes.clear()
+            self._total_bytes.clear()
+            self._open_active(1)
+
+    def _close_files(self) -> None:
+        """Schließt alle Dateideskriptoren."""
+        if self._active_fd is not None:
+            os.close(self._active_fd)
+            self._active_fd = None
+        for fd in self._read_fds.values():
+            os.close(fd)
+        self._read_fds.clear()
+
+    def close(self) -> None:
+        """Wartet auf die Kompaktierung, schreibt die Hinweisdatei und schließt die Segmente."""
+        self.wait_for_compaction()
+        with self._lock:
+            if self._closed:
+                return
+            self._write_hint()
+            self._close_files()
+            self._closed = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gibt Statistiken über den Speicher zurück.
+
+        Returns:
+            Dictionary mit Statistiken
+        """
+        with self._lock:
+            total = sum(self._total_bytes.values())
+            live = sum(self._live_bytes.values())
+            stats = dict(self.stats)
+            stats.update({
+                "entries": len(self._index),
+                "segments": len(self._total_bytes),
+                "total_bytes": total,
+                "live_bytes": live,
+                "garbage_ratio": (total - live) / total if total else 0.0,
+                "pending_accesses": len(self._pending_access),
+            })
+            return stats
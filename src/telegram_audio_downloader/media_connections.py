@@ -0,0 +1,193 @@
+"""
+Vorgewärmte Verbindungen zu den Medien-Rechenzentren von Telegram.
+
+Telegram liefert jedes Dokument aus dem Rechenzentrum (DC), in dem es liegt.
+Telethon baut die Verbindung zu einem fremden DC erst beim ersten Download
+auf (TCP, Schlüsselaustausch, Export und Import der Autorisierung) und trennt
+sie wieder, sobald sie eine Weile ungenutzt ist. Verteilt sich ein Lauf über
+mehrere DCs, steht der jeweils erste Download sekundenlang.
+
+Nach dem Durchsuchen werden deshalb die DCs der eingereihten Dateien
+ermittelt und die Verbindungen vorab geöffnet:
+
+- Pro Client und DC wird ein Sender ausgeliehen und bis zum Ende des Laufs
+  gehalten, damit Telethon ihn nicht zwischendurch trennt
+- Das Heimat-DC des Clients wird übersprungen (dafür gibt es die Hauptverbindung)
+- Die DCs eines Clients werden nacheinander verbunden: Telethon serialisiert
+  das Ausleihen über eine Sperre pro Client, gleichzeitige Aufrufe würden nur
+  in der Warteschlange stehen und deren Wartezeit in Timeout und Messung zählen
+- Mehrere Clients (Sitzungs-Pool) werden gleichzeitig vorgewärmt
+- Die Verbindungsdauer wird pro DC gemessen und protokolliert
+"""
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Maximale Dauer für den Aufbau einer einzelnen Verbindung in Sekunden
+DEFAULT_CONNECT_TIMEOUT = 15.0
+
+
+@dataclass
+class DCConnectionStats:
+    """Ergebnis des Verbindungsaufbaus zu einem Rechenzentrum."""
+    dc_id: int
+    files: int = 0
+    connect_seconds: float = 0.0
+    connected: bool = False
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Gibt das Ergebnis als Dictionary zurück."""
+        return asdict(self)
+
+
+def media_dc_ids(documents: Iterable[Any]) -> Counter:
+    """
+    Zählt die Dokumente pro Rechenzentrum.
+
+    Args:
+        documents: Telegram-Dokumente
+
+    Returns:
+        DC-ID -> Anzahl der Dokumente
+    """
+    counts: Counter = Counter()
+    for document in documents:
+        dc_id = getattr(document, "dc_id", None)
+        if isinstance(dc_id, int) and dc_id > 0:
+            counts[dc_id] += 1
+    return counts
+
+
+def _home_dc_id(client: Any) -> Optional[int]:
+    """DC, mit dem der Client ohnehin verbunden ist."""
+    session = getattr(client, "session", None)
+    dc_id = getattr(session, "dc_id", None)
+    return dc_id if isinstance(dc_id, int) else None
+
+
+class MediaConnectionWarmer:
+    """Hält vorab geöffnete Verbindungen eines Clients zu fremden Rechenzentren."""
+
+    def __init__(self, client: Any, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT):
+        """
+        Initialisiert den Warmer.
+
+        Args:
+            client: Telegram-Client
+            connect_timeout: Maximale Dauer pro Verbindungsaufbau in Sekunden
+        """
+        self.client = client
+        self.connect_timeout = connect_timeout
+        self.senders: Dict[int, Any] = {}
+        self.stats: Dict[int, DCConnectionStats] = {}
+
+    def supported(self) -> bool:
+        """Prüft, ob der Client ausgeliehene Sender unterstützt."""
+        return hasattr(self.client, "_borrow_exported_sender") and hasattr(
+            self.client, "_return_exported_sender"
+        )
+
+    async def _connect(self, stats: DCConnectionStats) -> None:
+        """Öffnet und autorisiert die Verbindung zu einem Rechenzentrum."""
+        started = time.perf_counter()
+        try:
+            sender = await asyncio.wait_for(
+                self.client._borrow_exported_sender(stats.dc_id), self.connect_timeout
+            )
+        except Exception as e:
+            stats.error = str(e) or type(e).__name__
+            logger.warning(f"Verbindung zu DC {stats.dc_id} konnte nicht vorgewärmt werden: {stats.error}")
+        else:
+            self.senders[stats.dc_id] = sender
+            stats.connected = True
+        finally:
+            stats.connect_seconds = time.perf_counter() - started
+
+    async def warm_up(self, dc_counts: Dict[int, int]) -> Dict[int, DCConnectionStats]:
+        """
+        Öffnet die Verbindungen zu allen noch nicht verbundenen Rechenzentren.
+
+        Args:
+            dc_counts: DC-ID -> Anzahl der Dateien aus diesem DC
+
+        Returns:
+            DC-ID -> Ergebnis des Verbindungsaufbaus (nur neu geöffnete DCs)
+        """
+        if not self.supported():
+            return {}
+
+        home_dc = _home_dc_id(self.client)
+        pending: List[DCConnectionStats] = []
+        for dc_id, files in sorted(dc_counts.items()):
+            if dc_id == home_dc:
+                continue
+            if dc_id in self.senders:
+                self.stats[dc_id].files = files
+                continue
+            stats = DCConnectionStats(dc_id=dc_id, files=files)
+            self.stats[dc_id] = stats
+            pending.append(stats)
+
+        # Nacheinander, damit Timeout und Messung nur den eigenen Verbindungsaufbau erfassen
+        for stats in pending:
+            await self._connect(stats)
+        return {stats.dc_id: stats for stats in pending}
+
+    async def release(self) -> None:
+        """Gibt alle gehaltenen Sender an Telethon zurück."""
+        senders, self.senders = self.senders, {}
+        for dc_id, sender in senders.items():
+            try:
+                await self.client._return_exported_sender(sender)
+            except Exception as e:
+                logger.debug(f"Fehler beim Zurückgeben des Senders für DC {dc_id}: {e}")
+
+    def get_stats(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Gibt die Ergebnisse aller Verbindungsaufbauten zurück.
+
+        Returns:
+            DC-ID -> Statistiken
+        """
+        return {dc_id: stats.to_dict() for dc_id, stats in self.stats.items()}
+
+
+async def warm_up_media_connections(
+    warmers: List[MediaConnectionWarmer], documents: Iterable[Any]
+) -> Dict[int, DCConnectionStats]:
+    """
+    Wärmt die Verbindungen aller Clients zu den DCs der Dokumente vor.
+
+    Args:
+        warmers: Ein Warmer pro Client
+        documents: Eingereihte Dokumente
+
+    Returns:
+        DC-ID -> langsamster Verbindungsaufbau über alle Clients
+    """
+    dc_counts = media_dc_ids(documents)
+    if not dc_counts:
+        return {}
+
+    results = await asyncio.gather(*(warmer.warm_up(dc_counts) for warmer in warmers))
+
+    slowest: Dict[int, DCConnectionStats] = {}
+    for result in results:
+        for dc_id, stats in result.items():
+            if dc_id not in slowest or stats.connect_seconds > slowest[dc_id].connect_seconds:
+                slowest[dc_id] = stats
+    for dc_id, stats in sorted(slowest.items()):
+        status = "verbunden" if stats.connected else f"fehlgeschlagen ({stats.error})"
+        logger.info(
+            f"Medien-DC {dc_id}: {stats.files} Dateien, {status} "
+            f"nach {stats.connect_seconds * 1000:.0f} ms"
+        )
+    return slowest
@@ -10,6 +10,7 @@ from pathlib import Path
 
 import psutil
 
+from .cache_governor import MemoryEfficientSetAdapter, register_cache
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -26,6 +27,9 @@ class MemoryEfficientSet:
         self._primary_set: Set[str] = set()
         self._overflow_cache = weakref.WeakValueDictionary()
         self._access_order = deque(maxlen=max_size // 10)  # Für LRU-ähnliches Verhalten
+        self.hits = 0
+        self.misses = 0
+        register_cache("memory_efficient_set", MemoryEfficientSetAdapter(self))
         
     def add(self, item: str) -> None:
         """Fügt ein Element zum Set hinzu."""
@@ -48,7 +52,12 @@ class MemoryEfficientSet:
     
     def __contains__(self, item: str) -> bool:
         """Prüft, ob ein Element im Set enthalten ist."""
-        return item in self._primary_set or item in self._overflow_cache
+        found = item in self._primary_set or item in self._overflow_cache
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
     
     def __len__(self) -> int:
         """Gibt die Anzahl der Elemente im Set zurück."""
@@ -59,6 +68,23 @@ class MemoryEfficientSet:
         self._primary_set.clear()
         self._overflow_cache.clear()
         self._access_order.clear()
+    
+    def resize(self, max_size: int) -> None:
+        """
+        Ändert die maximale Größe (z. B. durch den Cache-Governor).
+        
+        Args:
+            max_size: Neue maximale Anzahl von Elementen
+        """
+        self.max_size = max(1, max_size)
+        # Zuletzt hinzugefügte Elemente bleiben möglichst erhalten
+        recent = set(self._access_order)
+        excess = len(self._primary_set) - self.max_size
+        for item in [item for item in self._primary_set if item not in recent][:max(0, excess)]:
+            self._primary_set.discard(item)
+        while len(self._primary_set) > self.max_size and self._access_order:
+            self._primary_set.discard(self._access_order.popleft())
+        self._access_order = deque(self._access_order, maxlen=max(1, self.max_size // 10))
 
 
 class StreamingDataProcessor:
@@ -0,0 +1,196 @@
+"""
+Durchsuchen von Telegram-Gruppen nach Audio-Nachrichten.
+
+Im gefilterten Modus (Standard) wählt Telegram die Nachrichten bereits
+serverseitig aus (`InputMessagesFilterMusic`, `...Document`, `...Voice`), sodass
+Text, Fotos und Videos gar nicht erst übertragen werden. Die drei Ergebnisströme
+werden nach Nachrichten-ID zusammengeführt, damit Aufrufer die gewohnte
+Reihenfolge erhalten. Als Dokument gesendete Audiodateien ohne Audio-Attribut
+liefert der Dokument-Filter; für alles andere bleibt der vollständige Durchlauf
+(`SCAN_MODE_FULL`), der auch automatisch verwendet wird, wenn Telegram einen
+Filter ablehnt.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from telethon.errors import RPCError
+from telethon.tl.types import (
+    Document,
+    InputMessagesFilterDocument,
+    InputMessagesFilterMusic,
+    InputMessagesFilterVoice,
+    Message,
+    MessageMediaDocument,
+)
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SCAN_MODE_FILTERED = "filtered"
+SCAN_MODE_MUSIC = "music"
+SCAN_MODE_FULL = "full"
+SCAN_MODES = (SCAN_MODE_FILTERED, SCAN_MODE_MUSIC, SCAN_MODE_FULL)
+
+# Serverseitige Filter je Modus (None = alle Nachrichten)
+_MODE_FILTERS: Dict[str, Optional[List[Any]]] = {
+    SCAN_MODE_FILTERED: [InputMessagesFilterMusic, InputMessagesFilterDocument, InputMessagesFilterVoice],
+    SCAN_MODE_MUSIC: [InputMessagesFilterMusic],
+    SCAN_MODE_FULL: None,
+}
+
+
+@dataclass
+class ScanStats:
+    """Zähler eines Durchlaufs."""
+    messages_fetched: int = 0
+    audio_found: int = 0
+    fallbacks: int = 0
+
+    @property
+    def messages_per_audio(self) -> float:
+        """Abgerufene Nachrichten je gefundener Audiodatei."""
+        return self.messages_fetched / self.audio_found if self.audio_found else float(self.messages_fetched)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Gibt die Zähler als Dictionary zurück."""
+        return dict(asdict(self), messages_per_audio=self.messages_per_audio)
+
+
+async def _merge_by_id(streams: List[AsyncIterator[Any]], reverse: bool) -> AsyncIterator[Any]:
+    """Führt nach ID sortierte Nachrichtenströme zusammen und entfernt Duplikate."""
+    heads: List[Optional[Any]] = []
+    for stream in streams:
+        heads.append(await stream.__anext__() if stream is not None else None)
+
+    def pick() -> int:
+        candidates = [i for i, head in enumerate(heads) if head is not None]
+        if reverse:
+            return min(candidates, key=lambda i: heads[i].id)
+        return max(candidates, key=lambda i: heads[i].id)
+
+    last_id = None
+    while any(head is not None for head in heads):
+        index = pick()
+        message = heads[index]
+        try:
+            heads[index] = await streams[index].__anext__()
+        except StopAsyncIteration:
+            heads[index] = None
+        if message.id != last_id:
+            last_id = message.id
+            yield message
+
+
+async def _first_or_none(stream: AsyncIterator[Any]) -> Tuple[AsyncIterator[Any], bool]:
+    """Startet einen Strom; Fehler des Servers treten dadurch vor der ersten Ausgabe auf."""
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        return stream, False
+
+    async def chained() -> AsyncIterator[Any]:
+        yield first
+        async for message in stream:
+            yield message
+
+    return chained(), True
+
+
+async def iter_audio_messages(
+    client: Any,
+    entity: Any,
+    is_audio: Callable[[Document], bool],
+    mode: str = SCAN_MODE_FILTERED,
+    stats: Optional[ScanStats] = None,
+    **iter_params: Any,
+) -> AsyncIterator[Tuple[Message, Document]]:
+    """
+    Liefert alle Nachrichten einer Gruppe, die eine Audiodatei enthalten.
+
+    Args:
+        client: TelegramClient
+        entity: Entity oder InputPeer der Gruppe
+        is_audio: Prüft, ob ein Dokument eine Audiodatei ist
+        mode: SCAN_MODE_FILTERED, SCAN_MODE_MUSIC oder SCAN_MODE_FULL
+        stats: Optionale Zähler, die während des Durchlaufs aktualisiert werden
+        iter_params: Weitere Parameter für iter_messages (limit, min_id, reverse, ...).
+            Im gefilterten Modus zählt ``limit`` die gelieferten Audionachrichten,
+            beim vollständigen Durchlauf (auch als Fallback) die abgerufenen Nachrichten.
+
+    Yields:
+        (Nachricht, Dokument)
+    """
+    if mode not in SCAN_MODES:
+        raise ValueError(f"Unbekannter Scan-Modus: {mode}")
+    stats = stats if stats is not None else ScanStats()
+    filters = _MODE_FILTERS[mode]
+
+    messages: Optional[AsyncIterator[Any]] = None
+    # Die gefilterten Ströme werden nur so weit gelesen, wie das Zusammenführen
+    # es verlangt; das Limit gilt deshalb erst für die gelieferten Audionachrichten
+    audio_limit: Optional[int] = None
+    if filters is not None:
+        stream_params = {key: value for key, value in iter_params.items() if key != "limit"}
+        try:
+            streams = []
+            for message_filter in filters:
+                stream, has_items = await _first_or_none(
+                    client.iter_messages(entity, filter=message_filter, **stream_params).__aiter__()
+                )
+                streams.append(stream if has_items else None)
+            messages = _merge_by_id(streams, bool(iter_params.get("reverse")))
+            audio_limit = iter_params.get("limit")
+        except RPCError as e:
+            stats.fallbacks += 1
+            logger.warning(f"Serverseitiger Filter nicht verfügbar, durchlaufe alle Nachrichten: {e}")
+    if messages is None:
+        messages = client.iter_messages(entity, **iter_params).__aiter__()
+
+    if audio_limit is not None and audio_limit <= 0:
+        return
+    yielded = 0
+    async for message in messages:
+        stats.messages_fetched += 1
+        media = getattr(message, "media", None)
+        if not isinstance(media, MessageMediaDocument):
+            continue
+        document = media.document
+        if not document or not is_audio(document):
+            continue
+        stats.audio_found += 1
+        yield message, document
+        yielded += 1
+        if audio_limit is not None and yielded >= audio_limit:
+            return
+
+
+async def benchmark_scan_modes(
+    client: Any, entity: Any, is_audio: Callable[[Document], bool], **iter_params: Any
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Vergleicht die Scan-Modi anhand abgerufener Nachrichten je gefundener Audiodatei.
+
+    Args:
+        client: TelegramClient (oder ein Offline-Ersatz mit iter_messages)
+        entity: Entity oder InputPeer der Gruppe
+        is_audio: Prüft, ob ein Dokument eine Audiodatei ist
+        iter_params: Weitere Parameter für iter_messages
+
+    Returns:
+        Modus -> Zähler und Laufzeit in Sekunden
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for mode in SCAN_MODES:
+        stats = ScanStats()
+        started = time.perf_counter()
+        async for _ in iter_audio_messages(client, entity, is_audio, mode=mode, stats=stats, **iter_params):
+            pass
+        results[mode] = dict(stats.to_dict(), seconds=time.perf_counter() - started)
+        logger.info(
+            f"Scan-Modus {mode}: {stats.messages_fetched} Nachrichten für {stats.audio_found} Audiodateien "
+            f"({stats.messages_per_audio:.1f} je Datei)"
+        )
+    return results
@@ -0,0 +1,283 @@
+"""
+Abfrageschicht für externe Metadaten-Dienste (MusicBrainz, Last.fm, Spotify).
+
+Features:
+- Zusammenfassen gleichzeitiger, identischer Abfragen (Singleflight)
+- Persistenter Cache für Treffer und Fehlschläge mit getrennten TTLs
+- Rate-Limiter pro Anbieter (Token-Bucket aus performance.RateLimiter)
+- Begrenzte Anzahl gleichzeitiger Anfragen
+
+Ein Abrufer liefert ein Dictionary (Treffer) oder None (Dienst kennt den
+Titel nicht, wird negativ gecacht). Ausnahmen, etwa bei Drosselung oder einer
+abgelehnten Anfrage, werden nicht gecacht.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from .performance import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POSITIVE_TTL = 30 * 24 * 3600  # 30 Tage
+DEFAULT_NEGATIVE_TTL = 24 * 3600       # 1 Tag
+DEFAULT_MAX_CONCURRENT_LOOKUPS = 4
+
+# Anfragen pro Sekunde und Burst-Größe je Anbieter (MusicBrainz erlaubt 1/s)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "musicbrainz": (1.0, 1),
+    "lastfm": (5.0, 5),
+    "spotify": (10.0, 10),
+}
+
+
+class LookupTransientError(Exception):
+    """Vorübergehender Fehler eines Dienstes (z. B. HTTP 429 oder 503); wird nicht gecacht."""
+
+
+class LookupRequestError(Exception):
+    """Vom Dienst abgelehnte Anfrage (z. B. HTTP 400, 401 oder 403); wird nicht gecacht."""
+
+
+@dataclass
+class LookupStats:
+    """Zähler der Abfrageschicht."""
+    requests: int = 0
+    cache_hits: int = 0
+    negative_hits: int = 0
+    coalesced: int = 0
+    fetches: int = 0
+    errors: int = 0
+    stored_positive: int = 0
+    stored_negative: int = 0
+
+
+def make_lookup_key(*parts: Optional[str]) -> str:
+    """
+    Normalisiert Suchbegriffe zu einem Cache-Schlüssel.
+
+    Groß-/Kleinschreibung und mehrfache Leerzeichen spielen keine Rolle.
+
+    Args:
+        parts: Suchbegriffe (z. B. Titel und Künstler)
+
+    Returns:
+        Schlüssel
+    """
+    return "\x1f".join(" ".join((part or "").split()).casefold() for part in parts)
+
+
+class LookupResultCache:
+    """Persistenter Cache für Abfrageergebnisse in einer SQLite-Datei."""
+
+    def __init__(self, path: Union[str, Path], positive_ttl: float = DEFAULT_POSITIVE_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        """
+        Initialisiert den Cache (die Datei wird erst beim ersten Zugriff geöffnet).
+
+        Args:
+            path: Pfad zur SQLite-Datei
+            positive_ttl: Gültigkeit von Treffern in Sekunden
+            negative_ttl: Gültigkeit von Fehlschlägen in Sekunden
+        """
+        self.path = Path(path)
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Öffnet die Datenbank und legt die Tabelle bei Bedarf an."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS lookup_results ("
+                "provider TEXT NOT NULL, lookup_key TEXT NOT NULL, payload TEXT, "
+                "expires_at REAL NOT NULL, PRIMARY KEY (provider, lookup_key))"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, provider: str, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Sucht ein gültiges Ergebnis.
+
+        Args:
+            provider: Name des Dienstes
+            key: Normalisierter Schlüssel
+
+        Returns:
+            (gefunden, Wert); Wert ist None bei einem gecachten Fehlschlag
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT payload FROM lookup_results WHERE provider = ? AND lookup_key = ? AND expires_at > ?",
+                (provider, key, time.time()),
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0]) if row[0] is not None else None
+
+    def put(self, provider: str, key: str, value: Optional[Dict[str, Any]]) -> None:
+        """
+        Speichert ein Ergebnis (None = Fehlschlag mit negativer TTL).
+
+        Args:
+            provider: Name des Dienstes
+            key: Normalisierter Schlüssel
+            value: Ergebnis oder None
+        """
+        ttl = self.positive_ttl if value is not None else self.negative_ttl
+        payload = json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO lookup_results (provider, lookup_key, payload, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (provider, key, payload, time.time() + ttl),
+            )
+            connection.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Entfernt abgelaufene Ergebnisse.
+
+        Returns:
+            Anzahl der entfernten Einträge
+        """
+        with self._lock:
+            connection = self._connect()
+            deleted = connection.execute(
+                "DELETE FROM lookup_results WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            connection.commit()
+        return deleted
+
+    def close(self) -> None:
+        """Schließt die Datenbank."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class MetadataLookupService:
+    """
+    Führt Abfragen bei externen Diensten gebündelt, gecacht und gedrosselt aus.
+
+    Reihenfolge je Abfrage: persistenter Cache, laufende identische Abfrage,
+    Concurrency-Pool, Rate-Limiter des Anbieters, eigentlicher Abruf.
+    """
+
+    def __init__(self, cache_path: Union[str, Path], positive_ttl: float = DEFAULT_POSITIVE_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENT_LOOKUPS,
+                 rate_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        """
+        Initialisiert die Abfrageschicht.
+
+        Args:
+            cache_path: Pfad zur SQLite-Datei des Ergebnis-Caches
+            positive_ttl: Gültigkeit von Treffern in Sekunden
+            negative_ttl: Gültigkeit von Fehlschlägen in Sekunden
+            max_concurrency: Maximale Anzahl gleichzeitiger Anfragen über alle Anbieter
+            rate_limits: Anbieter -> (Anfragen pro Sekunde, Burst-Größe)
+        """
+        self.cache = LookupResultCache(cache_path, positive_ttl, negative_ttl)
+        self.max_concurrency = max_concurrency
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.stats = LookupStats()
+        self._rate_limiters: Dict[str, RateLimiter] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _rate_limiter(self, provider: str) -> Optional[RateLimiter]:
+        """Gibt den Rate-Limiter eines Anbieters zurück (None = unbegrenzt)."""
+        if provider not in self._rate_limiters and provider in self.rate_limits:
+            rate, burst = self.rate_limits[provider]
+            self._rate_limiters[provider] = RateLimiter(max_requests_per_second=rate, burst_size=burst)
+        return self._rate_limiters.get(provider)
+
+    async def lookup(self, provider: str, key: str,
+                     fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """
+        Liefert das Ergebnis einer Abfrage.
+
+        Args:
+            provider: Name des Dienstes
+            key: Schlüssel (siehe make_lookup_key)
+            fetch: Führt die eigentliche Anfrage aus
+
+        Returns:
+            Ergebnis oder None (nicht gefunden oder vorübergehender Fehler)
+        """
+        self.stats.requests += 1
+        found, value = self.cache.get(provider, key)
+        if found:
+            self.stats.cache_hits += 1
+            if value is None:
+                self.stats.negative_hits += 1
+            return value
+
+        inflight_key = (provider, key)
+        pending = self._inflight.get(inflight_key)
+        if pending is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            value = await self._fetch(provider, key, fetch)
+            future.set_result(value)
+            return value
+        except BaseException:
+            # Auch bei Abbruch dürfen wartende Aufrufer nicht hängen bleiben
+            if not future.done():
+                future.set_result(None)
+            raise
+        finally:
+            del self._inflight[inflight_key]
+
+    async def _fetch(self, provider: str, key: str,
+                     fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """Ruft das Ergebnis gedrosselt ab und speichert es im Cache."""
+        async with self._semaphore:
+            limiter = self._rate_limiter(provider)
+            if limiter is not None:
+                await limiter.acquire()
+            self.stats.fetches += 1
+            try:
+                value = await fetch()
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"Fehler bei {provider}-Abfrage: {e}")
+                return None
+
+        self.cache.put(provider, key, value)
+        if value is not None:
+            self.stats.stored_positive += 1
+        else:
+            self.stats.stored_negative += 1
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gibt die Zähler der Abfrageschicht zurück.
+
+        Returns:
+            Dictionary mit Statistiken
+        """
+        return dict(asdict(self.stats), inflight=len(self._inflight))
+
+    def close(self) -> None:
+        """Schließt den persistenten Cache."""
+        self.cache.close()
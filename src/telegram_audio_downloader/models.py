@@ -2,14 +2,18 @@
 Datenbankmodelle für den Telegram Audio Downloader.
 """
 
+import re
+import threading
 import weakref
+from functools import partial
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional, Any, Dict, Set
+from typing import Optional, Any, Callable, Dict, Iterable, Set, Tuple
 from collections import defaultdict
 
 from peewee import (
+    BigIntegerField,
     BooleanField,
     CharField,
     DateTimeField,
@@ -20,8 +24,140 @@ from peewee import (
     TextField,
 )
 
+# Erkennt schreibende Anweisungen und die betroffene Tabelle
+_WRITE_STATEMENT_RE = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM'
+    r'|DROP\s+TABLE(?:\s+IF\s+EXISTS)?|ALTER\s+TABLE)\s+["`]?(\w+)',
+    re.IGNORECASE
+)
+
+
+class WriteGenerations:
+    """
+    Schreib-Generationen pro Tabelle.
+    
+    Jeder Schreibzugriff erhöht die Generation der betroffenen Tabelle. Caches
+    nehmen die Generationen in ihre Schlüssel auf, sodass Einträge nach einem
+    Schreibzugriff nicht mehr getroffen werden, ohne sie explizit zu löschen.
+    """
+    
+    def __init__(self):
+        """Initialisiert die Generationszähler."""
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._total = 0
+        self._external = 0
+        self._data_versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+    
+    def bump(self, table: str) -> None:
+        """
+        Erhöht die Generation einer Tabelle.
+        
+        Args:
+            table: Tabellenname
+        """
+        with self._lock:
+            self._generations[table] += 1
+            self._total += 1
+    
+    def get(self, table: str) -> int:
+        """
+        Gibt die aktuelle Generation einer Tabelle zurück.
+        
+        Args:
+            table: Tabellenname
+            
+        Returns:
+            Generation der Tabelle
+        """
+        return self._generations.get(table, 0)
+    
+    def sync_external(self, database: SqliteDatabase) -> None:
+        """
+        Erkennt Commits anderer Prozesse über ``PRAGMA data_version``.
+        
+        Hat sich die Datenversion seit der letzten Prüfung auf dieser
+        Verbindung geändert, werden alle Generationen ungültig.
+        
+        Args:
+            database: Datenbank, deren aktuelle Verbindung geprüft wird
+        """
+        if database.database is None or database.is_closed():
+            return
+        try:
+            connection = database.connection()
+            data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+        except Exception:
+            return
+        with self._lock:
+            last_version = self._data_versions.get(id(connection))
+            if last_version is not None and last_version != data_version:
+                self._external += 1
+            self._data_versions[id(connection)] = data_version
+    
+    def invalidate_all(self) -> None:
+        """Macht alle Generationen ungültig, z.B. nach dem Auffrischen einer Lese-Replika."""
+        with self._lock:
+            self._external += 1
+    
+    def snapshot(self, tables: Optional[Iterable[str]] = None) -> Tuple[int, ...]:
+        """
+        Gibt eine Momentaufnahme der Generationen für einen Cache-Schlüssel zurück.
+        
+        Args:
+            tables: Betroffene Tabellen (None für alle Tabellen)
+            
+        Returns:
+            Tupel aus externer Generation und Tabellengenerationen
+        """
+        if tables is None:
+            return (self._external, self._total)
+        return (self._external,) + tuple(self.get(table) for table in tables)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gibt die aktuellen Generationen zurück.
+        
+        Returns:
+            Dictionary mit Generationen
+        """
+        with self._lock:
+            return {
+                "total": self._total,
+                "external": self._external,
+                "tables": dict(self._generations)
+            }
+
+
+# Globale Schreib-Generationen
+write_generations = WriteGenerations()
+
+
+class TrackedSqliteDatabase(SqliteDatabase):
+    """
+    SqliteDatabase, die Schreibzugriffe pro Tabelle in den Schreib-Generationen zählt.
+    
+    Ist ein ``query_observer`` gesetzt, wird jede Anweisung über ihn
+    ausgeführt. Er erhält die Ausführungsfunktion, das SQL und die Parameter
+    und gibt den Cursor zurück (siehe database_monitoring).
+    """
+    
+    query_observer: Optional[Callable[[Callable[[], Any], str, Any], Any]] = None
+    
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        observer = self.query_observer
+        if observer is None:
+            cursor = super().execute_sql(sql, params, *args, **kwargs)
+        else:
+            cursor = observer(partial(super().execute_sql, sql, params, *args, **kwargs), sql, params)
+        match = _WRITE_STATEMENT_RE.match(sql)
+        if match:
+            write_generations.bump(match.group(1).lower())
+        return cursor
+
+
 # Datenbank-Initialisierung erfolgt in database.py
-db = SqliteDatabase(None)  # Wird später initialisiert
+db = TrackedSqliteDatabase(None)  # Wird später initialisiert
 
 
 class BaseModel(Model):
@@ -52,6 +188,10 @@ class TelegramGroup(BaseModel):
     title = CharField(max_length=255)
     username = CharField(max_length=255, null=True)
     last_checked = DateTimeField(null=True)
+    # Gespeicherte Auflösung (siehe entity_resolution.EntityResolver)
+    access_hash = BigIntegerField(null=True)
+    entity_type = CharField(max_length=16, null=True)
+    resolved_at = DateTimeField(null=True)
 
     class Meta:
         table_name = "telegram_groups"
@@ -75,6 +215,41 @@ class GroupProgress(BaseModel):
         )
 
 
+class ChannelManifest(BaseModel):
+    """Synchronisationsstand des lokalen Audio-Manifests einer Gruppe."""
+
+    group_id = IntegerField(unique=True)
+    last_message_id = IntegerField(default=0)
+    entry_count = IntegerField(default=0)
+    synced_at = DateTimeField(null=True)
+
+    class Meta:
+        table_name = "channel_manifests"
+        database = db
+
+
+class ManifestEntry(BaseModel):
+    """Audio-Dokument im lokalen Manifest einer Gruppe (siehe channel_manifest)."""
+
+    group_id = IntegerField()
+    message_id = IntegerField()
+    file_id = CharField(max_length=255)
+    file_name = CharField(max_length=510)
+    file_size = IntegerField(default=0)
+    mime_type = CharField(max_length=100, null=True)
+    duration = IntegerField(null=True)
+    title = CharField(max_length=255, null=True)
+    performer = CharField(max_length=255, null=True)
+    date = DateTimeField(null=True)
+
+    class Meta:
+        table_name = "manifest_entries"
+        database = db
+        indexes = (
+            (('group_id', 'message_id'), True),
+        )
+
+
 class AudioFile(BaseModel):
     """Modell für eine Audiodatei mit speichereffizienten Methoden."""
 
@@ -6,47 +6,262 @@ Hybrid-Ansatz für:
 - Zeitreihendatenbank (InfluxDB)
 - Graph-Datenbank (Neo4j)
 - Schlüssel-Wert-Speicher (Redis)
+
+Der Export liest die SQLite-Tabellen stapelweise per Keyset (``id > ?``),
+sodass der Speicherbedarf von der Stapelgröße statt von der Datenbankgröße
+abhängt. Die Stapel werden parallel in das Ziel geschrieben (idempotent als
+Upsert). Nach jedem lückenlos geschriebenen Stapel wird der Fortschritt in
+einer Checkpoint-Datei festgehalten, sodass eine abgebrochene Migration
+mitten in der Tabelle fortgesetzt werden kann. Als lokales Ziel für
+Durchsatztests dient ``FileMigrationSink``.
 """
 
 import json
-from typing import Dict, List, Any, Optional
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterator, List, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 import sqlite3
 
 # Bedingter Import für NoSQL-Datenbanken
 try:
-    from pymongo import MongoClient
+    from pymongo import MongoClient, ReplaceOne
     from influxdb_client import InfluxDBClient, Point
+    from influxdb_client.client.write_api import SYNCHRONOUS
     from redis import Redis
     # Neo4j-Import wird bei Bedarf erfolgen
     HAS_NOSQL_DRIVERS = True
 except ImportError:
     HAS_NOSQL_DRIVERS = False
     MongoClient = None
+    ReplaceOne = None
     InfluxDBClient = None
     Point = None
+    SYNCHRONOUS = None
     Redis = None
 
 from .models import AudioFile, TelegramGroup, db
+from .database_statistics import get_group_statistics
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
+DEFAULT_MIGRATION_BATCH_SIZE = 1000
+DEFAULT_MIGRATION_WORKERS = 4
+CHECKPOINT_SUFFIX = ".nosql_checkpoint.json"
+
+# Ein Stapel von Dokumenten
+Batch = List[Dict[str, Any]]
+
+
+@dataclass
+class MigrationTable:
+    """
+    Zu migrierende Datenquelle.
+    
+    ``batches`` liefert die Stapel ab einem Schlüssel (exklusiv). Nur
+    fortsetzbare Quellen liefern aufsteigend nach ``key_field`` sortiert und
+    bekommen beim Fortsetzen den letzten gesicherten Schlüssel übergeben.
+    """
+    collection: str
+    batches: Callable[[Any], Iterator[Batch]]
+    key_field: Optional[str] = None
+    resumable: bool = False
+
+
+class MigrationSink(ABC):
+    """
+    Ziel einer Migration, das Dokumente stapelweise schreibt.
+    
+    ``write_batch`` wird aus mehreren Threads aufgerufen und muss
+    idempotent sein: Ein nach einem Abbruch erneut geschriebener Stapel
+    ersetzt die bereits vorhandenen Dokumente.
+    """
+    
+    @abstractmethod
+    def write_batch(self, collection: str, documents: Batch, key_field: Optional[str]) -> int:
+        """
+        Schreibt einen Stapel von Dokumenten.
+        
+        Args:
+            collection: Ziel-Collection bzw. Schlüsselpräfix
+            documents: Zu schreibende Dokumente
+            key_field: Feld, das ein Dokument eindeutig identifiziert
+            
+        Returns:
+            Anzahl der geschriebenen Dokumente
+        """
+    
+    def close(self) -> None:
+        """Schließt die Verbindung zum Ziel."""
+
+
+class FileMigrationSink(MigrationSink):
+    """
+    Lokales Migrationsziel, das je Collection eine JSON-Lines-Datei anhängt.
+    
+    Beim Lesen gewinnt je Schlüssel das zuletzt geschriebene Dokument, was
+    dem Upsert-Verhalten der echten Ziele entspricht. ``write_latency``
+    simuliert die Umlaufzeit eines entfernten Servers je Stapel.
+    """
+    
+    def __init__(self, directory: str, write_latency: float = 0.0):
+        """
+        Initialisiert das Dateiziel.
+        
+        Args:
+            directory: Verzeichnis für die Collection-Dateien
+            write_latency: Künstliche Wartezeit je Stapel in Sekunden
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.write_latency = write_latency
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+    
+    def _path(self, collection: str) -> Path:
+        """Gibt den Dateipfad einer Collection zurück."""
+        return self.directory / f"{collection}.jsonl"
+    
+    def write_batch(self, collection: str, documents: Batch, key_field: Optional[str]) -> int:
+        """Hängt einen Stapel an die Datei der Collection an."""
+        if self.write_latency:
+            time.sleep(self.write_latency)
+        payload = "".join(json.dumps(document, default=str) + "\n" for document in documents)
+        with self._locks_guard:
+            lock = self._locks.setdefault(collection, threading.Lock())
+        with lock:
+            with open(self._path(collection), "a", encoding="utf-8") as f:
+                f.write(payload)
+        return len(documents)
+    
+    def read_collection(self, collection: str, key_field: Optional[str] = "id") -> List[Dict[str, Any]]:
+        """
+        Liest eine Collection mit Upsert-Semantik.
+        
+        Args:
+            collection: Name der Collection
+            key_field: Schlüsselfeld (None liefert alle Zeilen)
+            
+        Returns:
+            Dokumente, je Schlüssel das zuletzt geschriebene
+        """
+        path = self._path(collection)
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as f:
+            documents = [json.loads(line) for line in f if line.strip()]
+        if key_field is None:
+            return documents
+        return list({document[key_field]: document for document in documents}.values())
+
+
+class MongoDBSink(MigrationSink):
+    """Schreibt Stapel per ungeordnetem bulk_write als Upserts nach MongoDB."""
+    
+    def __init__(self, connection_string: str, database_name: str):
+        self.client = MongoClient(connection_string)
+        self.database = self.client[database_name]
+    
+    def write_batch(self, collection: str, documents: Batch, key_field: Optional[str]) -> int:
+        operations = [
+            ReplaceOne({"_id": document[key_field]}, dict(document, _id=document[key_field]), upsert=True)
+            for document in documents
+        ]
+        if operations:
+            self.database[collection].bulk_write(operations, ordered=False)
+        return len(operations)
+    
+    def close(self) -> None:
+        self.client.close()
+
+
+class RedisSink(MigrationSink):
+    """Schreibt Stapel über eine Pipeline als ``<collection>:<schlüssel>`` nach Redis."""
+    
+    def __init__(self, host: str, port: int, db: int = 0):
+        self.client = Redis(host=host, port=port, db=db)
+    
+    def write_batch(self, collection: str, documents: Batch, key_field: Optional[str]) -> int:
+        pipeline = self.client.pipeline(transaction=False)
+        for document in documents:
+            pipeline.set(f"{collection}:{document[key_field]}", json.dumps(document, default=str))
+        pipeline.execute()
+        return len(documents)
+    
+    def close(self) -> None:
+        self.client.close()
+
+
+class InfluxDBSink(MigrationSink):
+    """Schreibt Stapel von Punkten (measurement, tags, fields, time) synchron nach InfluxDB."""
+    
+    def __init__(self, url: str, token: str, org: str, bucket: str):
+        self.client = InfluxDBClient(url=url, token=token, org=org)
+        self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+        self.org = org
+        self.bucket = bucket
+    
+    def write_batch(self, collection: str, documents: Batch, key_field: Optional[str]) -> int:
+        points = [Point.from_dict(dict(document, measurement=collection)) for document in documents]
+        if points:
+            self.write_api.write(bucket=self.bucket, org=self.org, record=points)
+        return len(points)
+    
+    def close(self) -> None:
+        self.client.close()
+
+
+class Neo4jSink(MigrationSink):
+    """Schreibt Stapel per ``UNWIND $rows`` mit einer Cypher-Anweisung je Collection."""
+    
+    def __init__(self, uri: str, username: str, password: str, statements: Dict[str, str]):
+        from neo4j import GraphDatabase
+        self.driver = GraphDatabase.driver(uri, auth=(username, password))
+        self.statements = statements
+    
+    def write_batch(self, collection: str, documents: Batch, key_field: Optional[str]) -> int:
+        # Sitzungen sind nicht threadsicher, der Treiber schon
+        with self.driver.session() as session:
+            session.run(self.statements[collection], rows=documents)
+        return len(documents)
+    
+    def close(self) -> None:
+        self.driver.close()
+
 
 class NoSQLMigrationManager:
     """Verwaltet die Migration zu NoSQL-Datenbanken."""
     
-    def __init__(self, sqlite_db_path: str = None):
+    def __init__(self, sqlite_db_path: str = None, batch_size: int = DEFAULT_MIGRATION_BATCH_SIZE,
+                 max_workers: int = DEFAULT_MIGRATION_WORKERS, checkpoint_path: str = None):
         """
         Initialisiert den NoSQL-MigrationManager.
         
         Args:
             sqlite_db_path: Pfad zur SQLite-Datenbank
+            batch_size: Anzahl der Datensätze je gelesenem und geschriebenem Stapel
+            max_workers: Anzahl paralleler Schreibvorgänge
+            checkpoint_path: Datei für den Fortschritt (Standard: neben der Datenbank)
         """
         self.sqlite_db_path = sqlite_db_path or db.database
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        if checkpoint_path is None and self.sqlite_db_path:
+            checkpoint_path = f"{self.sqlite_db_path}{CHECKPOINT_SUFFIX}"
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
         self.nosql_configs = {}
         self.migration_status = {}
+        self.migration_metrics: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._checkpoint_lock = threading.Lock()
+        # Fortschritt im Speicher; die Datei wird nur beim ersten Zugriff gelesen
+        self._checkpoint: Optional[Dict[str, Any]] = None
         
         logger.info("NoSQLMigrationManager initialisiert")
     
@@ -114,6 +329,20 @@ class NoSQLMigrationManager:
         }
         logger.debug("Neo4j-Konfiguration hinzugefügt")
     
+    def configure_file_sink(self, directory: str, write_latency: float = 0.0) -> None:
+        """
+        Konfiguriert ein lokales Dateiziel, z. B. für Durchsatztests.
+        
+        Args:
+            directory: Verzeichnis für die Collection-Dateien
+            write_latency: Künstliche Wartezeit je Stapel in Sekunden
+        """
+        self.nosql_configs["file"] = {
+            "directory": directory,
+            "write_latency": write_latency
+        }
+        logger.debug("Dateiziel-Konfiguration hinzugefügt")
+    
     def migrate_to_mongodb(self) -> bool:
         """
         Migriert Daten zu MongoDB.
@@ -125,35 +354,12 @@ class NoSQLMigrationManager:
             logger.warning("MongoDB-Migration nicht möglich: Treiber nicht verfügbar oder nicht konfiguriert")
             return False
         
-        try:
-            config = self.nosql_configs["mongodb"]
-            client = MongoClient(config["connection_string"])
-            mongodb = client[config["database_name"]]
-            
-            # Migriere AudioFile-Daten
-            audio_collection = mongodb["audio_files"]
-            audio_files = self._get_all_audio_files()
-            
-            if audio_files:
-                result = audio_collection.insert_many(audio_files)
-                logger.info(f"{len(result.inserted_ids)} AudioFile-Datensätze zu MongoDB migriert")
-            
-            # Migriere TelegramGroup-Daten
-            group_collection = mongodb["telegram_groups"]
-            telegram_groups = self._get_all_telegram_groups()
-            
-            if telegram_groups:
-                result = group_collection.insert_many(telegram_groups)
-                logger.info(f"{len(result.inserted_ids)} TelegramGroup-Datensätze zu MongoDB migriert")
-            
-            client.close()
-            self.migration_status["mongodb"] = "completed"
-            return True
-            
-        except Exception as e:
-            logger.error(f"Fehler bei der MongoDB-Migration: {e}")
-            self.migration_status["mongodb"] = f"failed: {str(e)}"
-            return False
+        config = self.nosql_configs["mongodb"]
+        return self._run_migration(
+            "mongodb",
+            lambda: MongoDBSink(config["connection_string"], config["database_name"]),
+            self._document_tables(),
+        )
     
     def migrate_to_influxdb(self) -> bool:
         """
@@ -166,35 +372,25 @@ class NoSQLMigrationManager:
             logger.warning("InfluxDB-Migration nicht möglich: Treiber nicht verfügbar oder nicht konfiguriert")
             return False
         
-        try:
-            config = self.nosql_configs["influxdb"]
-            client = InfluxDBClient(url=config["url"], token=config["token"], org=config["org"])
-            write_api = client.write_api()
-            
+        config = self.nosql_configs["influxdb"]
+        
+        def points(after_key: Any) -> Iterator[Batch]:
             # Migriere Download-Statistiken als Zeitreihendaten
-            download_stats = self._get_download_statistics()
-            
-            points = []
-            for stat in download_stats:
-                point = Point("downloads") \
-                    .tag("status", stat["status"]) \
-                    .field("count", stat["count"]) \
-                    .field("total_size", stat["total_size"]) \
-                    .time(stat["timestamp"])
-                points.append(point)
-            
-            if points:
-                write_api.write(bucket=config["bucket"], org=config["org"], record=points)
-                logger.info(f"{len(points)} Download-Statistikpunkte zu InfluxDB migriert")
-            
-            client.close()
-            self.migration_status["influxdb"] = "completed"
-            return True
-            
-        except Exception as e:
-            logger.error(f"Fehler bei der InfluxDB-Migration: {e}")
-            self.migration_status["influxdb"] = f"failed: {str(e)}"
-            return False
+            for batch in self._iter_download_statistics():
+                yield [
+                    {
+                        "tags": {"status": stat["status"]},
+                        "fields": {"count": stat["count"], "total_size": stat["total_size"]},
+                        "time": stat["timestamp"],
+                    }
+                    for stat in batch
+                ]
+        
+        return self._run_migration(
+            "influxdb",
+            lambda: InfluxDBSink(config["url"], config["token"], config["org"], config["bucket"]),
+            [MigrationTable("downloads", points)],
+        )
     
     def migrate_to_redis(self) -> bool:
         """
@@ -207,35 +403,23 @@ class NoSQLMigrationManager:
             logger.warning("Redis-Migration nicht möglich: Treiber nicht verfügbar oder nicht konfiguriert")
             return False
         
-        try:
-            config = self.nosql_configs["redis"]
-            redis_client = Redis(host=config["host"], port=config["port"], db=config["db"])
-            
-            # Migriere häufig abgerufene AudioFile-Daten
-            audio_files = self._get_frequently_accessed_audio_files()
-            
-            for audio_file in audio_files:
-                key = f"audio_file:{audio_file['file_id']}"
-                redis_client.set(key, json.dumps(audio_file))
-            
-            logger.info(f"{len(audio_files)} AudioFile-Datensätze zu Redis migriert")
-            
-            # Migriere Gruppenstatistiken
-            group_stats = self._get_group_statistics()
-            for group_id, stats in group_stats.items():
-                key = f"group_stats:{group_id}"
-                redis_client.set(key, json.dumps(stats))
-            
-            logger.info(f"{len(group_stats)} Gruppenstatistik-Einträge zu Redis migriert")
-            
-            redis_client.close()
-            self.migration_status["redis"] = "completed"
-            return True
-            
-        except Exception as e:
-            logger.error(f"Fehler bei der Redis-Migration: {e}")
-            self.migration_status["redis"] = f"failed: {str(e)}"
-            return False
+        config = self.nosql_configs["redis"]
+        
+        def group_stats(after_key: Any) -> Iterator[Batch]:
+            stats = [dict(values, group_id=group_id) for group_id, values in self._get_group_statistics().items()]
+            for i in range(0, len(stats), self.batch_size):
+                yield stats[i:i + self.batch_size]
+        
+        return self._run_migration(
+            "redis",
+            lambda: RedisSink(config["host"], config["port"], config["db"]),
+            [
+                # Häufig abgerufene AudioFile-Daten
+                MigrationTable("audio_file", lambda after_key: self._iter_frequently_accessed_audio_files(),
+                               key_field="file_id"),
+                MigrationTable("group_stats", group_stats, key_field="group_id"),
+            ],
+        )
     
     def migrate_to_neo4j(self) -> bool:
         """
@@ -249,53 +433,214 @@ class NoSQLMigrationManager:
             return False
         
         try:
-            # Bedingter Import für Neo4j
-            try:
-                from neo4j import GraphDatabase
-            except ImportError:
-                logger.warning("Neo4j-Treiber nicht installiert")
-                return False
-            
-            config = self.nosql_configs["neo4j"]
-            driver = GraphDatabase.driver(config["uri"], auth=(config["username"], config["password"]))
-            
-            # Migriere Gruppen- und Datei-Beziehungen
-            with driver.session() as session:
-                # Erstelle Gruppenknoten
-                telegram_groups = self._get_all_telegram_groups()
-                for group in telegram_groups:
-                    session.run(
-                        "MERGE (g:TelegramGroup {id: $id}) "
-                        "SET g.group_id = $group_id, g.title = $title",
-                        id=group["id"],
-                        group_id=group["group_id"],
-                        title=group["title"]
-                    )
-                
-                # Erstelle Dateiknoten und Beziehungen
-                audio_files = self._get_all_audio_files()
-                for audio in audio_files:
-                    session.run(
-                        "MERGE (a:AudioFile {file_id: $file_id}) "
-                        "SET a.file_name = $file_name, a.title = $title "
-                        "WITH a "
-                        "MATCH (g:TelegramGroup {id: $group_id}) "
-                        "MERGE (a)-[:BELONGS_TO]->(g)",
-                        file_id=audio["file_id"],
-                        file_name=audio["file_name"],
-                        title=audio["title"],
-                        group_id=audio["group_id"]
-                    )
+            import neo4j  # noqa: F401
+        except ImportError:
+            logger.warning("Neo4j-Treiber nicht installiert")
+            return False
+        
+        config = self.nosql_configs["neo4j"]
+        statements = {
+            # Gruppenknoten vor den Dateien, damit die Beziehungen ihr Ziel finden
+            "telegram_groups": (
+                "UNWIND $rows AS row "
+                "MERGE (g:TelegramGroup {id: row.id}) "
+                "SET g.group_id = row.group_id, g.title = row.title"
+            ),
+            "audio_files": (
+                "UNWIND $rows AS row "
+                "MERGE (a:AudioFile {file_id: row.file_id}) "
+                "SET a.file_name = row.file_name, a.title = row.title "
+                "WITH a, row "
+                "MATCH (g:TelegramGroup {id: row.group_id}) "
+                "MERGE (a)-[:BELONGS_TO]->(g)"
+            ),
+        }
+        return self._run_migration(
+            "neo4j",
+            lambda: Neo4jSink(config["uri"], config["username"], config["password"], statements),
+            self._document_tables(),
+        )
+    
+    def migrate_to_file(self) -> bool:
+        """
+        Migriert Dokumentdaten in ein lokales Dateiziel.
+        
+        Returns:
+            True, wenn die Migration erfolgreich war
+        """
+        if "file" not in self.nosql_configs:
+            logger.warning("Datei-Migration nicht möglich: nicht konfiguriert")
+            return False
+        
+        config = self.nosql_configs["file"]
+        return self._run_migration(
+            "file",
+            lambda: FileMigrationSink(config["directory"], config["write_latency"]),
+            self._document_tables(),
+        )
+    
+    def _document_tables(self) -> List[MigrationTable]:
+        """Gibt die Tabellen der dokumentenorientierten Ziele zurück."""
+        return [
+            MigrationTable("telegram_groups", lambda after_key: self._iter_telegram_groups(after_key or 0),
+                           key_field="id", resumable=True),
+            MigrationTable("audio_files", lambda after_key: self._iter_audio_files(after_key or 0),
+                           key_field="id", resumable=True),
+        ]
+    
+    def _run_migration(self, target: str, sink_factory: Callable[[], MigrationSink],
+                       tables: List[MigrationTable]) -> bool:
+        """
+        Migriert mehrere Tabellen in ein Ziel und setzt den Status.
+        
+        Args:
+            target: Name des Ziels
+            sink_factory: Erzeugt die Verbindung zum Ziel
+            tables: Zu migrierende Datenquellen in dieser Reihenfolge
             
-            logger.info("Daten zu Neo4j migriert")
-            driver.close()
-            self.migration_status["neo4j"] = "completed"
+        Returns:
+            True, wenn die Migration erfolgreich war
+        """
+        sink = None
+        try:
+            sink = sink_factory()
+            for table in tables:
+                self._migrate_table(target, sink, table)
+            self.migration_status[target] = "completed"
+            self.reset_checkpoint(target)
             return True
-            
         except Exception as e:
-            logger.error(f"Fehler bei der Neo4j-Migration: {e}")
-            self.migration_status["neo4j"] = f"failed: {str(e)}"
+            logger.error(f"Fehler bei der {target}-Migration: {e}")
+            self.migration_status[target] = f"failed: {str(e)}"
             return False
+        finally:
+            if sink is not None:
+                try:
+                    sink.close()
+                except Exception as e:
+                    logger.debug(f"Fehler beim Schließen des Ziels {target}: {e}")
+    
+    def _migrate_table(self, target: str, sink: MigrationSink, table: MigrationTable) -> int:
+        """
+        Schreibt eine Tabelle stapelweise und parallel in ein Ziel.
+        
+        Es sind höchstens ``2 * max_workers`` Stapel gleichzeitig im Speicher.
+        Der Checkpoint rückt nur bis zum letzten Stapel vor, vor dem alle
+        Stapel geschrieben sind; nach einem Abbruch wird ab dort fortgesetzt.
+        
+        Args:
+            target: Name des Ziels
+            sink: Migrationsziel
+            table: Zu migrierende Datenquelle
+            
+        Returns:
+            Anzahl der in diesem Lauf geschriebenen Datensätze
+        """
+        collection, key_field = table.collection, table.key_field
+        state = self._load_checkpoint().get(target, {}).get(collection, {})
+        if state.get("completed"):
+            logger.info(f"{collection} wurde bereits nach {target} migriert")
+            return 0
+        after_key = state.get("last_key") if table.resumable else None
+        if after_key is not None:
+            logger.info(f"Setze Migration von {collection} nach {target} nach Schlüssel {after_key} fort")
+        
+        metrics = {"rows": 0, "batches": 0, "resumed_after": after_key, "duration_seconds": 0.0}
+        self.migration_metrics.setdefault(target, {})[collection] = metrics
+        started = time.perf_counter()
+        max_in_flight = max(1, self.max_workers) * 2
+        pending: Deque[Tuple[Future, Any, int]] = deque()
+        
+        def complete_oldest() -> None:
+            future, last_key, size = pending.popleft()
+            future.result()
+            metrics["rows"] += size
+            metrics["batches"] += 1
+            if table.resumable:
+                self._save_checkpoint(target, collection, last_key=last_key, rows=metrics["rows"])
+        
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers),
+                                thread_name_prefix=f"migrate-{target}") as executor:
+            try:
+                for batch in table.batches(after_key):
+                    if not batch:
+                        continue
+                    last_key = batch[-1][key_field] if table.resumable else None
+                    pending.append((executor.submit(sink.write_batch, collection, batch, key_field),
+                                    last_key, len(batch)))
+                    while len(pending) >= max_in_flight or (pending and pending[0][0].done()):
+                        complete_oldest()
+                while pending:
+                    complete_oldest()
+            except Exception:
+                for future, _, _ in pending:
+                    future.cancel()
+                raise
+        
+        metrics["duration_seconds"] = time.perf_counter() - started
+        metrics["rows_per_second"] = (
+            metrics["rows"] / metrics["duration_seconds"] if metrics["duration_seconds"] else 0.0
+        )
+        self._save_checkpoint(target, collection, completed=True, rows=metrics["rows"])
+        logger.info(f"{metrics['rows']} {collection}-Datensätze zu {target} migriert "
+                    f"({metrics['rows_per_second']:.0f}/s)")
+        return metrics["rows"]
+    
+    def _checkpoint_state(self) -> Dict[str, Any]:
+        """Gibt den Fortschritt im Speicher zurück und liest ihn beim ersten Zugriff (Lock gehalten)."""
+        if self._checkpoint is None:
+            self._checkpoint = {}
+            if self.checkpoint_path is not None and self.checkpoint_path.exists():
+                try:
+                    with open(self.checkpoint_path, encoding="utf-8") as f:
+                        self._checkpoint = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Migrations-Checkpoint nicht lesbar, beginne von vorn: {e}")
+        return self._checkpoint
+    
+    def _write_checkpoint(self) -> None:
+        """Schreibt den Fortschritt atomar über eine temporäre Datei (Lock gehalten)."""
+        if not self._checkpoint:
+            if self.checkpoint_path.exists():
+                self.checkpoint_path.unlink()
+            return
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        """Gibt eine Kopie des Migrationsfortschritts zurück."""
+        if self.checkpoint_path is None:
+            return {}
+        with self._checkpoint_lock:
+            return json.loads(json.dumps(self._checkpoint_state()))
+    
+    def _save_checkpoint(self, target: str, collection: str, **state: Any) -> None:
+        """Aktualisiert den Fortschritt einer Collection und schreibt ihn atomar."""
+        if self.checkpoint_path is None:
+            return
+        with self._checkpoint_lock:
+            self._checkpoint_state().setdefault(target, {}).setdefault(collection, {}).update(
+                state, updated_at=datetime.now().isoformat()
+            )
+            self._write_checkpoint()
+    
+    def reset_checkpoint(self, target: Optional[str] = None) -> None:
+        """
+        Verwirft den Fortschritt, sodass die nächste Migration von vorn beginnt.
+        
+        Args:
+            target: Name des Ziels (None: alle Ziele)
+        """
+        if self.checkpoint_path is None:
+            return
+        with self._checkpoint_lock:
+            if target:
+                self._checkpoint_state().pop(target, None)
+            else:
+                self._checkpoint = {}
+            self._write_checkpoint()
     
     def run_full_migration(self) -> Dict[str, Any]:
         """
@@ -316,7 +661,8 @@ class NoSQLMigrationManager:
             ("mongodb", self.migrate_to_mongodb),
             ("influxdb", self.migrate_to_influxdb),
             ("redis", self.migrate_to_redis),
-            ("neo4j", self.migrate_to_neo4j)
+            ("neo4j", self.migrate_to_neo4j),
+            ("file", self.migrate_to_file)
         ]
         
         for db_name, migration_method in migration_methods:
@@ -353,72 +699,75 @@ class NoSQLMigrationManager:
         return {
             "timestamp": datetime.now().isoformat(),
             "configured_databases": list(self.nosql_configs.keys()),
-            "migration_status": self.migration_status
+            "migration_status": self.migration_status,
+            "migration_metrics": self.migration_metrics,
+            "checkpoint": self._load_checkpoint()
         }
     
-    def _get_all_audio_files(self) -> List[Dict[str, Any]]:
+    def _iter_table(self, table: str, after_id: int = 0) -> Iterator[Batch]:
         """
-        Holt alle AudioFile-Datensätze aus der SQLite-Datenbank.
+        Liest eine Tabelle stapelweise per Keyset über die id.
         
-        Returns:
-            Liste von AudioFile-Datensätzen
+        Jeder Stapel ist eine eigene kurze Abfrage; zwischen den Stapeln
+        wird keine Lesetransaktion gehalten.
+        
+        Args:
+            table: Tabellenname
+            after_id: Letzte bereits migrierte id (exklusiv)
+            
+        Yields:
+            Stapel von Datensätzen als Dictionaries
         """
+        conn = sqlite3.connect(self.sqlite_db_path)
+        conn.row_factory = sqlite3.Row
         try:
-            conn = sqlite3.connect(self.sqlite_db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM audio_files")
-            rows = cursor.fetchall()
-            
-            # Konvertiere zu Dictionaries
-            audio_files = [dict(row) for row in rows]
-            
+            while True:
+                rows = conn.execute(
+                    f"SELECT * FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, self.batch_size),
+                ).fetchall()
+                if not rows:
+                    return
+                yield [dict(row) for row in rows]
+                after_id = rows[-1]["id"]
+        finally:
             conn.close()
-            return audio_files
-            
-        except Exception as e:
-            logger.error(f"Fehler beim Abrufen der AudioFile-Daten: {e}")
-            return []
     
-    def _get_all_telegram_groups(self) -> List[Dict[str, Any]]:
+    def _iter_audio_files(self, after_id: int = 0) -> Iterator[Batch]:
         """
-        Holt alle TelegramGroup-Datensätze aus der SQLite-Datenbank.
+        Liefert die AudioFile-Datensätze stapelweise.
         
-        Returns:
-            Liste von TelegramGroup-Datensätzen
-        """
-        try:
-            conn = sqlite3.connect(self.sqlite_db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM telegram_groups")
-            rows = cursor.fetchall()
-            
-            # Konvertiere zu Dictionaries
-            telegram_groups = [dict(row) for row in rows]
+        Args:
+            after_id: Letzte bereits migrierte id (exklusiv)
             
-            conn.close()
-            return telegram_groups
+        Yields:
+            Stapel von AudioFile-Datensätzen
+        """
+        return self._iter_table("audio_files", after_id)
+    
+    def _iter_telegram_groups(self, after_id: int = 0) -> Iterator[Batch]:
+        """
+        Liefert die TelegramGroup-Datensätze stapelweise.
+        
+        Args:
+            after_id: Letzte bereits migrierte id (exklusiv)
             
-        except Exception as e:
-            logger.error(f"Fehler beim Abrufen der TelegramGroup-Daten: {e}")
-            return []
+        Yields:
+            Stapel von TelegramGroup-Datensätzen
+        """
+        return self._iter_table("telegram_groups", after_id)
     
-    def _get_download_statistics(self) -> List[Dict[str, Any]]:
+    def _iter_download_statistics(self) -> Iterator[Batch]:
         """
-        Holt Download-Statistiken für die InfluxDB-Migration.
+        Liefert Download-Statistiken für die InfluxDB-Migration.
         
-        Returns:
-            Liste von Statistikdaten
+        Yields:
+            Stapel von Statistikdaten
         """
+        conn = sqlite3.connect(self.sqlite_db_path)
         try:
-            conn = sqlite3.connect(self.sqlite_db_path)
-            cursor = conn.cursor()
-            
             # Hole aggregierte Download-Statistiken
-            cursor.execute("""
+            cursor = conn.execute("""
                 SELECT 
                     status,
                     COUNT(*) as count,
@@ -427,60 +776,51 @@ class NoSQLMigrationManager:
                 FROM audio_files 
                 GROUP BY status
             """)
-            
-            rows = cursor.fetchall()
-            stats = [
-                {
-                    "status": row[0],
-                    "count": row[1],
-                    "total_size": row[2] or 0,
-                    "timestamp": row[3]
-                }
-                for row in rows
-            ]
-            
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    return
+                yield [
+                    {
+                        "status": row[0],
+                        "count": row[1],
+                        "total_size": row[2] or 0,
+                        "timestamp": row[3]
+                    }
+                    for row in rows
+                ]
+        finally:
             conn.close()
-            return stats
-            
-        except Exception as e:
-            logger.error(f"Fehler beim Abrufen der Download-Statistiken: {e}")
-            return []
     
-    def _get_frequently_accessed_audio_files(self, limit: int = 100) -> List[Dict[str, Any]]:
+    def _iter_frequently_accessed_audio_files(self, limit: int = 100) -> Iterator[Batch]:
         """
-        Holt häufig abgerufene AudioFile-Daten für Redis.
+        Liefert häufig abgerufene AudioFile-Daten für Redis.
         
         Args:
             limit: Maximale Anzahl von Datensätzen
             
-        Returns:
-            Liste von AudioFile-Datensätzen
+        Yields:
+            Stapel von AudioFile-Datensätzen
         """
+        # In einer echten Implementierung würden wir hier
+        # Zugriffsstatistiken aus der Datenbank abrufen
+        # Für dieses Beispiel verwenden wir einfach die neuesten Dateien
+        conn = sqlite3.connect(self.sqlite_db_path)
+        conn.row_factory = sqlite3.Row
         try:
-            # In einer echten Implementierung würden wir hier
-            # Zugriffsstatistiken aus der Datenbank abrufen
-            # Für dieses Beispiel verwenden wir einfach die neuesten Dateien
-            
-            conn = sqlite3.connect(self.sqlite_db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            cursor = conn.execute("""
                 SELECT * FROM audio_files 
                 WHERE downloaded_at IS NOT NULL
                 ORDER BY downloaded_at DESC
                 LIMIT ?
             """, (limit,))
-            
-            rows = cursor.fetchall()
-            audio_files = [dict(row) for row in rows]
-            
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    return
+                yield [dict(row) for row in rows]
+        finally:
             conn.close()
-            return audio_files
-            
-        except Exception as e:
-            logger.error(f"Fehler beim Abrufen häufig abgerufener AudioFile-Daten: {e}")
-            return []
     
     def _get_group_statistics(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -491,38 +831,64 @@ class NoSQLMigrationManager:
         """
         try:
             conn = sqlite3.connect(self.sqlite_db_path)
-            cursor = conn.cursor()
-            
-            # Hole Gruppenstatistiken
-            cursor.execute("""
-                SELECT 
-                    g.group_id,
-                    COUNT(a.id) as file_count,
-                    SUM(a.file_size) as total_size,
-                    MAX(a.downloaded_at) as last_download
-                FROM telegram_groups g
-                LEFT JOIN audio_files a ON g.id = a.group_id
-                GROUP BY g.id, g.group_id
-            """)
-            
-            rows = cursor.fetchall()
-            stats = {
-                str(row[0]): {
-                    "file_count": row[1],
-                    "total_size": row[2] or 0,
-                    "last_download": row[3]
+            try:
+                # Liest die per Trigger gepflegten Statistiktabellen (ohne sie anzulegen)
+                return {
+                    str(group["group_id"]): {
+                        "file_count": group["file_count"],
+                        "total_size": group["total_bytes"],
+                        "total_duration": group["total_duration"],
+                        "last_download": group["last_download"]
+                    }
+                    for group in get_group_statistics(conn)
                 }
-                for row in rows
-            }
-            
-            conn.close()
-            return stats
+            finally:
+                conn.close()
             
         except Exception as e:
             logger.error(f"Fehler beim Abrufen der Gruppenstatistiken: {e}")
             return {}
 
 
+def benchmark_migration_throughput(sqlite_db_path: str, directory: str,
+                                   batch_sizes: Tuple[int, ...] = (100, 1000),
+                                   worker_counts: Tuple[int, ...] = (1, 4),
+                                   write_latency: float = 0.005) -> Dict[str, float]:
+    """
+    Misst den Migrationsdurchsatz in ein lokales Dateiziel.
+    
+    ``write_latency`` simuliert die Umlaufzeit eines entfernten Servers je
+    Stapel; damit wird sichtbar, wie Stapelgröße und parallele Schreiber
+    die Wartezeit verdecken.
+    
+    Args:
+        sqlite_db_path: Pfad zur Quelldatenbank
+        directory: Arbeitsverzeichnis für Zieldateien und Checkpoints
+        batch_sizes: Zu messende Stapelgrößen
+        worker_counts: Zu messende Anzahl paralleler Schreiber
+        write_latency: Künstliche Wartezeit je Stapel in Sekunden
+        
+    Returns:
+        Dictionary "<Stapelgröße>x<Schreiber>" -> migrierte AudioFiles pro Sekunde
+    """
+    results: Dict[str, float] = {}
+    for batch_size in batch_sizes:
+        for workers in worker_counts:
+            name = f"{batch_size}x{workers}"
+            run_directory = Path(directory) / name
+            manager = NoSQLMigrationManager(
+                sqlite_db_path, batch_size=batch_size, max_workers=workers,
+                checkpoint_path=str(run_directory / "checkpoint.json"),
+            )
+            sink = FileMigrationSink(str(run_directory), write_latency=write_latency)
+            table = next(t for t in manager._document_tables() if t.collection == "audio_files")
+            manager._migrate_table("benchmark", sink, table)
+            results[name] = manager.migration_metrics["benchmark"]["audio_files"]["rows_per_second"]
+            logger.info(f"Migrations-Benchmark: Stapel {batch_size}, {workers} Schreiber, "
+                        f"{results[name]:.0f} Zeilen/s")
+    return results
+
+
 # Globale Instanz des MigrationManagers
 _migration_manager: Optional[NoSQLMigrationManager] = None
 
@@ -14,6 +14,7 @@ from typing import Deque, Dict, Optional, Tuple, Any
 import psutil
 from telethon.errors import FloodWaitError
 
+from .database_statistics import get_library_statistics
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -403,8 +404,17 @@ class PerformanceMonitor:
                 "current_rate": self.rate_limiter.max_requests_per_second,
                 "tokens_available": self.rate_limiter.tokens,
             },
+            "library": self._get_library_statistics(),
         }
 
+    def _get_library_statistics(self) -> Dict:
+        """Liest die Bibliotheksstatistik aus den materialisierten Statistiktabellen."""
+        try:
+            return get_library_statistics()
+        except Exception as e:
+            logger.debug(f"Bibliotheksstatistik nicht verfügbar: {e}")
+            return {}
+
     async def periodic_maintenance(self) -> None:
         """Führt periodische Wartungsaufgaben durch."""
         # Alle 5 Minuten
@@ -7,8 +7,12 @@ from typing import List, Optional
 from datetime import datetime
 
 from telethon import TelegramClient
-from telethon.tl.types import Document, DocumentAttributeAudio, Message, MessageMediaDocument
+from telethon.tl.types import Document, DocumentAttributeAudio, Message
+from telethon.utils import get_peer_id
 
+from .channel_manifest import search_channel_manifest, sync_channel_manifest
+from .message_scan import SCAN_MODE_FILTERED, iter_audio_messages
+from .database_scaling import get_shard_databases
 from .models import AudioFile, TelegramGroup
 from .error_handling import handle_error, SearchError
 from .logging_config import get_logger
@@ -21,34 +25,41 @@ async def search_audio_files(
     client: TelegramClient, 
     group_entity, 
     query: Optional[str] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    use_manifest: bool = True,
+    scan_mode: str = SCAN_MODE_FILTERED
 ) -> List[dict]:
     """
     Sucht nach Audiodateien in einer Telegram-Gruppe.
     
+    Standardmäßig wird das lokale Manifest der Gruppe abgeglichen (nur neue
+    Nachrichten) und anschließend lokal durchsucht.
+    
     Args:
         client: TelegramClient-Instanz
         group_entity: Telegram-Gruppe
         query: Optionale Suchanfrage (Titel, Künstler, etc.)
         limit: Maximale Anzahl an Ergebnissen
+        use_manifest: Lokales Manifest verwenden statt den Kanal vollständig zu durchlaufen
+        scan_mode: Scan-Modus für Telegram (siehe message_scan)
         
     Returns:
         Liste von Audiodatei-Informationen
     """
+    group_id = _manifest_group_id(group_entity) if use_manifest else None
     try:
+        if group_id is not None:
+            await sync_channel_manifest(client, group_entity, group_id, scan_mode=scan_mode)
+            audio_files = search_channel_manifest(group_id, query, limit)
+            logger.info(f"{len(audio_files)} Audiodateien gefunden")
+            return audio_files
+
         audio_files = []
         count = 0
         
-        async for message in client.iter_messages(group_entity, limit=limit):
-            if not hasattr(message, "media") or not isinstance(
-                message.media, MessageMediaDocument
-            ):
-                continue
-
-            document = message.media.document
-            if not document or not _is_audio_file(document):
-                continue
-
+        async for message, document in iter_audio_messages(
+            client, group_entity, _is_audio_file, mode=scan_mode, limit=limit
+        ):
             # Extrahiere Audio-Informationen
             audio_info = _extract_audio_info(document, message)
             
@@ -71,6 +82,14 @@ async def search_audio_files(
         raise error
 
 
+def _manifest_group_id(group_entity) -> Optional[int]:
+    """Ermittelt die Gruppen-ID für das Manifest (None, wenn nicht bestimmbar)."""
+    try:
+        return get_peer_id(group_entity, add_mark=False)
+    except (TypeError, ValueError):
+        return None
+
+
 def _is_audio_file(document: Document) -> bool:
     """Überprüft, ob es sich bei dem Dokument um eine Audiodatei handelt."""
     try:
@@ -223,7 +242,11 @@ def search_downloaded_files(query: Optional[str] = None) -> List[AudioFile]:
                 AudioFile.status == "completed"
             )
             
-        return list(results)
+        # Bei aktivem Sharding liegen Dateien auch in den Shards
+        files = list(results)
+        for shard_database in get_shard_databases():
+            files.extend(results.clone().bind(shard_database))
+        return files
     except Exception as e:
         error = SearchError(f"Fehler bei der Suche in heruntergeladenen Dateien: {e}")
         handle_error(error, "search_downloaded_files")
@@ -0,0 +1,291 @@
+"""
+Trigramm-Index für Suchvorschläge und Fuzzy-Suche im Telegram Audio Downloader.
+
+Statt jede Anfrage paarweise gegen alle Titel und Interpreten zu bewerten,
+werden Kandidaten zuerst über die Überlappung ihrer Trigramme vorausgewählt.
+Nur die überlebenden Kandidaten werden anschließend mit fuzzywuzzy bewertet.
+"""
+
+import base64
+import heapq
+import json
+import re
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from fuzzywuzzy import fuzz
+
+from .logging_config import get_logger
+
+try:
+    # Optional (Extra "search"): bewertet Kandidaten im Batch, sonst wird fuzzywuzzy verwendet
+    from rapidfuzz import fuzz as rapid_fuzz, process as rapid_process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# Version des persistierten Formats
+INDEX_FORMAT_VERSION = 1
+
+_NON_WORD_RE = re.compile(r"\W+", re.UNICODE)
+
+
+def normalize_term(text: str) -> str:
+    """
+    Normalisiert einen Begriff für die Indizierung.
+
+    Args:
+        text: Zu normalisierender Text
+
+    Returns:
+        Kleingeschriebener Text ohne Sonderzeichen
+    """
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+def extract_trigrams(text: str) -> List[str]:
+    """
+    Zerlegt einen Text in seine (eindeutigen) Trigramme.
+
+    Der Text wird normalisiert und mit Leerzeichen aufgefüllt, damit auch
+    Wortanfänge und -enden als eigene Trigramme erfasst werden.
+
+    Args:
+        text: Zu zerlegender Text
+
+    Returns:
+        Liste eindeutiger Trigramme
+    """
+    normalized = normalize_term(text)
+    if not normalized:
+        return []
+    padded = f" {normalized} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class TrigramIndex:
+    """Invertierter Trigramm-Index über Suchbegriffe."""
+
+    def __init__(self, max_candidates: int = 200, posting_budget: int = 50000):
+        """
+        Initialisiert den TrigramIndex.
+
+        Args:
+            max_candidates: Maximale Anzahl von Kandidaten, die bewertet werden
+            posting_budget: Maximale Anzahl von Posting-Einträgen pro Anfrage
+        """
+        self.max_candidates = max_candidates
+        self.posting_budget = posting_budget
+        self.terms: List[str] = []
+        self.postings: Dict[str, array] = {}
+        self.built_at = time.time()
+        self._term_ids: Dict[str, int] = {}
+        self._prefix_list: Optional[List[Tuple[str, int]]] = None
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def add(self, term: str) -> bool:
+        """
+        Fügt einen Begriff zum Index hinzu.
+
+        Args:
+            term: Hinzuzufügender Begriff
+
+        Returns:
+            True, wenn der Begriff neu war
+        """
+        if not term:
+            return False
+        with self._lock:
+            if term in self._term_ids:
+                return False
+            trigrams = extract_trigrams(term)
+            if not trigrams:
+                return False
+            term_id = len(self.terms)
+            self.terms.append(term)
+            self._term_ids[term] = term_id
+            for trigram in trigrams:
+                posting = self.postings.get(trigram)
+                if posting is None:
+                    posting = self.postings[trigram] = array("I")
+                posting.append(term_id)
+            self._prefix_list = None
+            return True
+
+    def add_many(self, terms: Iterable[str]) -> int:
+        """
+        Fügt mehrere Begriffe zum Index hinzu.
+
+        Args:
+            terms: Hinzuzufügende Begriffe
+
+        Returns:
+            Anzahl neu hinzugefügter Begriffe
+        """
+        with self._lock:
+            return sum(1 for term in terms if self.add(term))
+
+    def _prefix_candidates(self, normalized: str) -> List[int]:
+        """
+        Sucht Begriffe, deren normalisierte Form mit dem Präfix beginnt.
+
+        Args:
+            normalized: Normalisiertes Präfix
+
+        Returns:
+            Liste von Begriffs-IDs
+        """
+        if self._prefix_list is None:
+            self._prefix_list = sorted(
+                (normalize_term(term), term_id) for term_id, term in enumerate(self.terms)
+            )
+        prefix_list = self._prefix_list
+        candidates = []
+        position = bisect_left(prefix_list, (normalized, -1))
+        while position < len(prefix_list) and len(candidates) < self.max_candidates:
+            key, term_id = prefix_list[position]
+            if not key.startswith(normalized):
+                break
+            candidates.append(term_id)
+            position += 1
+        return candidates
+
+    def _trigram_candidates(self, trigrams: List[str]) -> List[int]:
+        """
+        Wählt Kandidaten über die Anzahl gemeinsamer Trigramme aus.
+
+        Seltene Trigramme werden zuerst ausgewertet; sehr häufige Trigramme
+        werden übersprungen, sobald das Posting-Budget erschöpft ist.
+
+        Args:
+            trigrams: Trigramme der Anfrage
+
+        Returns:
+            Liste von Begriffs-IDs, absteigend nach Überlappung
+        """
+        postings = sorted(
+            (self.postings[trigram] for trigram in trigrams if trigram in self.postings),
+            key=len,
+        )
+        overlap: Counter = Counter()
+        used = 0
+        for posting in postings:
+            if used and used + len(posting) > self.posting_budget:
+                break
+            overlap.update(posting)
+            used += len(posting)
+        return [term_id for term_id, _ in overlap.most_common(self.max_candidates)]
+
+    def search(self, query: str, limit: int = 10, min_score: int = 60) -> List[Tuple[str, int]]:
+        """
+        Sucht die ähnlichsten Begriffe zu einer Anfrage.
+
+        Args:
+            query: Suchanfrage
+            limit: Maximale Anzahl von Ergebnissen
+            min_score: Mindestpunktzahl (0-100) für Treffer
+
+        Returns:
+            Liste von (Begriff, Punktzahl)-Tupeln, absteigend sortiert
+        """
+        normalized = normalize_term(query)
+        if not normalized or limit <= 0:
+            return []
+
+        with self._lock:
+            if len(normalized) < 3:
+                candidate_ids = self._prefix_candidates(normalized)
+            else:
+                candidate_ids = self._trigram_candidates(extract_trigrams(normalized))
+            candidates = [self.terms[term_id] for term_id in candidate_ids]
+
+        if RAPIDFUZZ_AVAILABLE:
+            scored = [
+                (round(score), candidate)
+                for candidate, score, _ in rapid_process.extract(
+                    query, candidates, scorer=rapid_fuzz.WRatio,
+                    processor=normalize_term, limit=None, score_cutoff=min_score,
+                )
+            ]
+        else:
+            scored = []
+            for candidate in candidates:
+                score = fuzz.WRatio(query, candidate)
+                if score >= min_score:
+                    scored.append((score, candidate))
+
+        return [
+            (candidate, score)
+            for score, candidate in heapq.nlargest(limit, scored, key=lambda item: item[0])
+        ]
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Speichert den Index als JSON-Datei.
+
+        Args:
+            path: Zielpfad
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                "version": INDEX_FORMAT_VERSION,
+                "built_at": self.built_at,
+                "terms": self.terms,
+                "postings": {
+                    trigram: base64.b64encode(posting.tobytes()).decode("ascii")
+                    for trigram, posting in self.postings.items()
+                },
+            }
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        temp_path.replace(path)
+        logger.debug(f"Trigramm-Index gespeichert: {len(self.terms)} Begriffe in {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path], **kwargs) -> Optional["TrigramIndex"]:
+        """
+        Lädt einen zuvor gespeicherten Index.
+
+        Args:
+            path: Pfad zur Indexdatei
+            **kwargs: Weitere Argumente für den Konstruktor
+
+        Returns:
+            TrigramIndex-Instanz oder None, wenn die Datei fehlt oder ungültig ist
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_FORMAT_VERSION:
+                logger.warning(f"Veraltetes Trigramm-Index-Format in {path}")
+                return None
+
+            index = cls(**kwargs)
+            index.built_at = data["built_at"]
+            index.terms = data["terms"]
+            index._term_ids = {term: term_id for term_id, term in enumerate(index.terms)}
+            for trigram, encoded in data["postings"].items():
+                posting = array("I")
+                posting.frombytes(base64.b64decode(encoded))
+                index.postings[trigram] = posting
+            logger.debug(f"Trigramm-Index geladen: {len(index.terms)} Begriffe aus {path}")
+            return index
+        except Exception as e:
+            logger.warning(f"Fehler beim Laden des Trigramm-Index: {e}")
+            return None
@@ -0,0 +1,390 @@
+"""
+Pool mehrerer Telegram-Sitzungen für den Telegram Audio Downloader.
+
+FloodWait und die Bandbreite einer Verbindung gelten pro Konto. Der Pool
+verteilt Downloads deshalb auf mehrere autorisierte Sitzungen:
+
+- Jede Sitzung hat eigenen Zustand (Rate-Limiter, FloodWait-Sperre,
+  abklingende Strafpunkte, laufende Downloads)
+- Ein Download geht an die Sitzung mit der geringsten Strafe
+- FloodWait sperrt nur die betroffene Sitzung; der Download wechselt sofort
+- Kann ein Konto eine Gruppe nicht sehen, wird die Gruppe für diese Sitzung
+  gesperrt und eine andere Sitzung verwendet
+- Durchsatz und Fehler werden pro Sitzung gezählt
+
+Nachrichten und Dokumente sind an das Konto gebunden, das sie abgerufen hat
+(access_hash, file_reference). Andere Sitzungen laden die Nachricht daher
+über ihre eigene Auflösung der Gruppe neu. Das geht nur in Kanälen und
+Supergruppen: In einfachen Gruppen und privaten Chats zählt jedes Konto die
+Nachrichten-IDs selbst, deshalb bleiben solche Downloads bei der primären Sitzung.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+
+from telethon.errors import (
+    ChannelBannedError,
+    ChannelInvalidError,
+    ChannelPrivateError,
+    ChatAdminRequiredError,
+    ChatForbiddenError,
+    FloodWaitError,
+    UserBannedInChannelError,
+    UsernameInvalidError,
+    UsernameNotOccupiedError,
+)
+from telethon.tl.types import PeerChannel
+from telethon.utils import get_peer_id
+
+from .logging_config import get_logger
+from .models import TelegramGroup
+from .performance import RateLimiter
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Fehler, die bedeuten, dass ein Konto eine Gruppe nicht lesen darf
+ACCESS_ERRORS = (
+    ChannelBannedError,
+    ChannelInvalidError,
+    ChannelPrivateError,
+    ChatAdminRequiredError,
+    ChatForbiddenError,
+    UserBannedInChannelError,
+    UsernameInvalidError,
+    UsernameNotOccupiedError,
+)
+
+# Halbwertszeit der Strafpunkte aus FloodWait-Fehlern in Sekunden
+PENALTY_HALF_LIFE = 300.0
+DEFAULT_MAX_ATTEMPTS = 6
+
+
+class SessionAccessError(Exception):
+    """Eine Sitzung kann auf eine Gruppe oder Nachricht nicht zugreifen."""
+
+
+class NoSessionAvailableError(Exception):
+    """Keine Sitzung des Pools kann die Gruppe lesen."""
+
+
+@dataclass
+class SessionMetrics:
+    """Zähler einer Sitzung."""
+    downloads: int = 0
+    failures: int = 0
+    bytes_downloaded: int = 0
+    busy_seconds: float = 0.0
+    flood_waits: int = 0
+    flood_wait_seconds: int = 0
+    access_errors: int = 0
+
+    @property
+    def throughput_bps(self) -> float:
+        """Durchsatz in Bytes pro Sekunde Downloadzeit."""
+        return self.bytes_downloaded / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+
+class PooledSession:
+    """Eine Sitzung mit eigenem Drosselungszustand."""
+
+    def __init__(self, name: str, client: Any, is_primary: bool = False,
+                 max_requests_per_second: float = 2.0, burst_size: int = 5):
+        """
+        Initialisiert die Sitzung.
+
+        Args:
+            name: Name der Sitzung (z. B. Name der Session-Datei)
+            client: TelegramClient der Sitzung
+            is_primary: Sitzung, mit der die Gruppen durchsucht werden
+            max_requests_per_second: Anfragen pro Sekunde des Rate-Limiters
+            burst_size: Burst-Größe des Rate-Limiters
+        """
+        self.name = name
+        self.client = client
+        self.is_primary = is_primary
+        self.rate_limiter = RateLimiter(max_requests_per_second=max_requests_per_second, burst_size=burst_size)
+        self.metrics = SessionMetrics()
+        self.active = 0
+        self.flood_until = 0.0
+        self.denied_groups: Set[int] = set()
+        self.entities: Dict[int, Any] = {}
+        self._flood_penalty = 0.0
+        self._penalty_updated = time.monotonic()
+
+    def flood_remaining(self, now: Optional[float] = None) -> float:
+        """Verbleibende FloodWait-Sperre in Sekunden."""
+        return max(0.0, self.flood_until - (now if now is not None else time.monotonic()))
+
+    def penalty(self, now: Optional[float] = None) -> float:
+        """
+        Strafe für die Auswahl: FloodWait-Sperre, laufende Downloads und
+        abklingende Strafpunkte früherer FloodWait-Fehler.
+        """
+        now = now if now is not None else time.monotonic()
+        decay = 0.5 ** ((now - self._penalty_updated) / PENALTY_HALF_LIFE)
+        return self.flood_remaining(now) + self.active + self._flood_penalty * decay
+
+    def record_flood_wait(self, seconds: int) -> None:
+        """Sperrt die Sitzung für die angegebene Wartezeit."""
+        now = time.monotonic()
+        decay = 0.5 ** ((now - self._penalty_updated) / PENALTY_HALF_LIFE)
+        self._flood_penalty = self._flood_penalty * decay + seconds / 10.0
+        self._penalty_updated = now
+        self.flood_until = max(self.flood_until, now + seconds)
+        self.metrics.flood_waits += 1
+        self.metrics.flood_wait_seconds += seconds
+        self.rate_limiter.adjust_rate(max(1, seconds))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Zustand und Zähler der Sitzung zurück."""
+        return dict(
+            asdict(self.metrics),
+            throughput_bps=self.metrics.throughput_bps,
+            active=self.active,
+            flood_remaining=round(self.flood_remaining(), 1),
+            penalty=round(self.penalty(), 2),
+            denied_groups=sorted(self.denied_groups),
+            primary=self.is_primary,
+        )
+
+
+class SessionPool:
+    """Verteilt Telegram-Operationen auf mehrere Sitzungen."""
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        """
+        Initialisiert einen leeren Pool.
+
+        Args:
+            max_attempts: Maximale Anzahl Sitzungswechsel pro Operation
+        """
+        self.sessions: List[PooledSession] = []
+        self.max_attempts = max_attempts
+
+    def add(self, name: str, client: Any, is_primary: bool = False) -> PooledSession:
+        """
+        Fügt eine Sitzung hinzu.
+
+        Args:
+            name: Name der Sitzung
+            client: TelegramClient der Sitzung
+            is_primary: Sitzung, mit der die Gruppen durchsucht werden
+
+        Returns:
+            Die neue Sitzung
+        """
+        session = PooledSession(name, client, is_primary=is_primary or not self.sessions)
+        self.sessions.append(session)
+        return session
+
+    async def start(self) -> None:
+        """Verbindet alle Sitzungen und entfernt nicht autorisierte."""
+        for session in list(self.sessions):
+            try:
+                if not session.client.is_connected():
+                    await session.client.connect()
+                if not await session.client.is_user_authorized():
+                    raise SessionAccessError("Sitzung ist nicht autorisiert")
+            except Exception as e:
+                logger.warning(f"Sitzung {session.name} wird nicht verwendet: {e}")
+                if not session.is_primary:
+                    self.sessions.remove(session)
+        logger.info(f"Sitzungs-Pool mit {len(self.sessions)} Sitzungen bereit")
+
+    def _candidates(self, group_id: Optional[int], exclude: Set[str]) -> List[PooledSession]:
+        """Gibt die für eine Gruppe nutzbaren Sitzungen zurück."""
+        return [
+            session for session in self.sessions
+            if session.name not in exclude and (group_id is None or group_id not in session.denied_groups)
+        ]
+
+    async def acquire(self, group_id: Optional[int] = None, exclude: Optional[Set[str]] = None) -> PooledSession:
+        """
+        Wählt die Sitzung mit der geringsten Strafe.
+
+        Sind alle Sitzungen durch FloodWait gesperrt, wird bis zum Ende der
+        kürzesten Sperre gewartet.
+
+        Args:
+            group_id: Gruppe, auf die zugegriffen wird (optional)
+            exclude: Namen von Sitzungen, die nicht verwendet werden sollen
+
+        Returns:
+            Gewählte Sitzung (active ist bereits erhöht)
+
+        Raises:
+            NoSessionAvailableError: Keine Sitzung kann die Gruppe lesen
+        """
+        candidates = self._candidates(group_id, exclude or set())
+        if not candidates:
+            raise NoSessionAvailableError(f"Keine Sitzung hat Zugriff auf Gruppe {group_id}")
+
+        now = time.monotonic()
+        session = min(candidates, key=lambda candidate: candidate.penalty(now))
+        wait = session.flood_remaining(now)
+        if wait > 0:
+            session = min(candidates, key=lambda candidate: candidate.flood_until)
+            wait = session.flood_remaining(now)
+            logger.warning(f"Alle Sitzungen im FloodWait, warte {wait:.0f} Sekunden auf {session.name}")
+            session.active += 1
+            await asyncio.sleep(wait)
+        else:
+            session.active += 1
+        return session
+
+    async def run(self, group_id: Optional[int], operation: Callable[[PooledSession], Awaitable[T]],
+                  exclude: Optional[Set[str]] = None) -> T:
+        """
+        Führt eine Operation mit der am wenigsten bestraften Sitzung aus.
+
+        Bei FloodWait oder fehlendem Zugriff wird auf eine andere Sitzung
+        gewechselt.
+
+        Args:
+            group_id: Gruppe, auf die zugegriffen wird (optional)
+            operation: Erhält die Sitzung und führt die eigentliche Anfrage aus
+            exclude: Namen von Sitzungen, die nicht verwendet werden sollen
+
+        Returns:
+            Ergebnis der Operation
+        """
+        denied: Set[str] = set(exclude or ())
+        last_error: Optional[BaseException] = None
+        for _ in range(self.max_attempts):
+            try:
+                session = await self.acquire(group_id, exclude=denied)
+            except NoSessionAvailableError:
+                if last_error is not None:
+                    raise last_error
+                raise
+            try:
+                await session.rate_limiter.acquire()
+                return await operation(session)
+            except FloodWaitError as e:
+                logger.warning(f"FloodWait von {e.seconds} Sekunden für Sitzung {session.name}")
+                session.record_flood_wait(e.seconds)
+                last_error = e
+            except ACCESS_ERRORS + (SessionAccessError,) as e:
+                logger.warning(f"Sitzung {session.name} hat keinen Zugriff auf Gruppe {group_id}: {e}")
+                session.metrics.access_errors += 1
+                if group_id is not None:
+                    session.denied_groups.add(group_id)
+                denied.add(session.name)
+                last_error = e
+            finally:
+                session.active -= 1
+        raise last_error if last_error is not None else NoSessionAvailableError("Keine Sitzung verfügbar")
+
+    async def _message_for(self, session: PooledSession, message: Any, group_id: Optional[int]) -> Any:
+        """Gibt die Nachricht so zurück, wie die Sitzung sie sieht."""
+        if session.is_primary:
+            return message
+        if group_id is None or not isinstance(getattr(message, "peer_id", None), PeerChannel):
+            # Nachrichten-IDs sind nur in Kanälen für alle Konten gleich
+            raise SessionAccessError(f"Nachricht {message.id} ist nur für die primäre Sitzung eindeutig")
+        entity = session.entities.get(group_id)
+        if entity is None:
+            group = TelegramGroup.get_or_none(TelegramGroup.group_id == group_id)
+            reference = group.username if group is not None and group.username else group_id
+            try:
+                entity = await session.client.get_entity(reference)
+            except ValueError as e:
+                raise SessionAccessError(str(e)) from e
+            session.entities[group_id] = entity
+        own_message = await session.client.get_messages(entity, ids=message.id)
+        if own_message is None or getattr(own_message, "media", None) is None:
+            raise SessionAccessError(f"Nachricht {message.id} für Sitzung {session.name} nicht sichtbar")
+        if _document_id(own_message) != _document_id(message):
+            raise SessionAccessError(
+                f"Nachricht {message.id} enthält für Sitzung {session.name} ein anderes Dokument"
+            )
+        return own_message
+
+    async def download_media(self, message: Any, **kwargs: Any) -> Any:
+        """
+        Lädt die Datei einer Nachricht über die am wenigsten bestrafte Sitzung.
+
+        Args:
+            message: Nachricht (abgerufen von der primären Sitzung)
+            kwargs: Weitere Parameter für download_media (file, progress_callback, ...)
+
+        Returns:
+            Ergebnis von download_media
+        """
+        group_id = message_group_id(message)
+        exclude: Set[str] = set()
+        if not isinstance(getattr(message, "peer_id", None), PeerChannel):
+            exclude = {session.name for session in self.sessions if not session.is_primary}
+
+        async def download(session: PooledSession) -> Any:
+            own_message = await self._message_for(session, message, group_id)
+            started = time.monotonic()
+            try:
+                result = await session.client.download_media(own_message, **kwargs)
+            except Exception:
+                session.metrics.failures += 1
+                raise
+            finally:
+                session.metrics.busy_seconds += time.monotonic() - started
+            session.metrics.downloads += 1
+            session.metrics.bytes_downloaded += _document_size(own_message)
+            return result
+
+        return await self.run(group_id, download, exclude=exclude)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Gibt die Zähler aller Sitzungen zurück.
+
+        Returns:
+            Sitzungsname -> Statistiken
+        """
+        return {session.name: session.get_stats() for session in self.sessions}
+
+    async def close(self) -> None:
+        """Trennt alle zusätzlichen Sitzungen (die primäre gehört dem Aufrufer)."""
+        for session in self.sessions:
+            if session.is_primary:
+                continue
+            try:
+                result = session.client.disconnect()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Fehler beim Trennen der Sitzung {session.name}: {e}")
+
+
+def message_group_id(message: Any) -> Optional[int]:
+    """
+    Ermittelt die Gruppen-ID einer Nachricht.
+
+    Args:
+        message: Telegram-Nachricht
+
+    Returns:
+        ID ohne Markierung oder None
+    """
+    peer = getattr(message, "peer_id", None)
+    if peer is None:
+        return None
+    try:
+        return get_peer_id(peer, add_mark=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def _document_id(message: Any) -> Optional[int]:
+    """ID des Dokuments einer Nachricht."""
+    document = getattr(getattr(message, "media", None), "document", None)
+    return getattr(document, "id", None)
+
+
+def _document_size(message: Any) -> int:
+    """Größe des Dokuments einer Nachricht in Bytes."""
+    document = getattr(getattr(message, "media", None), "document", None)
+    size = getattr(document, "size", 0)
+    return size if isinstance(size, int) else 0
@@ -7,6 +7,8 @@ from typing import Any, Callable, Optional, TypeVar, Generic, Union
 from threading import RLock
 import time
 
+from .tinylfu_cache import WTinyLFUCache, create_cache_core
+
 T = TypeVar('T')
 K = TypeVar('K')
 V = TypeVar('V')
@@ -14,15 +16,21 @@ V = TypeVar('V')
 class LRUCache(Generic[K, V]):
     """
     Least Recently Used (LRU) Cache Implementierung.
+
+    Mit policy="tinylfu" oder max_bytes übernimmt ein WTinyLFUCache die
+    Speicherung (scan-resistente Aufnahme bzw. Byte-Budget).
     """
 
-    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None, policy: str = "lru"):
         """
         Initialisiert den LRU-Cache.
 
         Args:
             maxsize: Maximale Anzahl von Einträgen im Cache
             ttl: Zeit bis zum Ablauf eines Eintrags in Sekunden (optional)
+            max_bytes: Byte-Budget statt maxsize (optional)
+            policy: "lru" oder "tinylfu"
         """
         if maxsize <= 0:
             raise ValueError("maxsize muss größer als 0 sein")
@@ -31,6 +39,7 @@ class LRUCache(Generic[K, V]):
         self.ttl = ttl
         self.cache: OrderedDict[K, tuple[V, float]] = OrderedDict()
         self.lock = RLock()
+        self.core: Optional[WTinyLFUCache] = create_cache_core(maxsize, max_bytes, policy, ttl)
 
     def get(self, key: K, default: Optional[V] = None) -> Union[V, None]:
         """
@@ -43,6 +52,8 @@ class LRUCache(Generic[K, V]):
         Returns:
             Der Wert oder der Standardwert
         """
+        if self.core is not None:
+            return self.core.get(key, default)
         with self.lock:
             if key in self.cache:
                 value, timestamp = self.cache[key]
@@ -65,6 +76,9 @@ class LRUCache(Generic[K, V]):
             key: Der Schlüssel
             value: Der Wert
         """
+        if self.core is not None:
+            self.core.put(key, value)
+            return
         with self.lock:
             if key in self.cache:
                 # Aktualisiere den Wert und markiere als zuletzt verwendet
@@ -89,6 +103,8 @@ class LRUCache(Generic[K, V]):
         Returns:
             True, wenn der Eintrag entfernt wurde, False sonst
         """
+        if self.core is not None:
+            return self.core.delete(key)
         with self.lock:
             if key in self.cache:
                 del self.cache[key]
@@ -97,6 +113,9 @@ class LRUCache(Generic[K, V]):
 
     def clear(self) -> None:
         """Leert den gesamten Cache."""
+        if self.core is not None:
+            self.core.clear()
+            return
         with self.lock:
             self.cache.clear()
 
@@ -107,6 +126,9 @@ class LRUCache(Generic[K, V]):
         Returns:
             Anzahl der Einträge
         """
+        if self.core is not None:
+            self.core.cleanup_expired()
+            return len(self.core)
         with self.lock:
             # Bereinige abgelaufene Einträge
             if self.ttl is not None:
@@ -139,6 +161,8 @@ class LRUCache(Generic[K, V]):
         Returns:
             Liste der Schlüssel
         """
+        if self.core is not None:
+            return [key for key, _ in self.core.items()]
         with self.lock:
             return list(self.cache.keys())
 
@@ -149,6 +173,8 @@ class LRUCache(Generic[K, V]):
         Returns:
             Liste der Werte
         """
+        if self.core is not None:
+            return [value for _, value in self.core.items()]
         with self.lock:
             return [value for value, _ in self.cache.values()]
 
@@ -159,9 +185,23 @@ class LRUCache(Generic[K, V]):
         Returns:
             Liste der Schlüssel-Wert-Paare
         """
+        if self.core is not None:
+            return self.core.items()
         with self.lock:
             return [(key, value) for key, (value, _) in self.cache.items()]
 
+    def get_stats(self) -> dict:
+        """
+        Gibt Statistiken über den Cache zurück.
+
+        Returns:
+            Dictionary mit Statistiken (bei W-TinyLFU auch pro Namensraum)
+        """
+        if self.core is not None:
+            return self.core.get_stats()
+        with self.lock:
+            return {"policy": "lru", "entries": len(self.cache), "maxsize": self.maxsize}
+
 
 # Globale Instanzen für verschiedene Cache-Typen
 _filename_cache: Optional[LRUCache[str, str]] = None
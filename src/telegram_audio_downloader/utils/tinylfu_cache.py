@@ -0,0 +1,675 @@
+"""
+W-TinyLFU-Cache-Kern für den Telegram Audio Downloader.
+
+Aufbau:
+- Fenster-LRU (ca. 1 % der Kapazität) für neue Einträge
+- Segmentierter LRU-Hauptbereich (Probation/Protected)
+- Häufigkeitsskizze (Count-Min-Sketch mit 4-Bit-Zählern und Alterung),
+  die entscheidet, ob ein Kandidat aus dem Fenster ein Opfer aus dem
+  Hauptbereich verdrängen darf
+
+Ein einmaliger Scan über viele Schlüssel läuft so durch das Fenster, ohne
+die häufig genutzten Einträge zu verdrängen. Die Kapazität wird wahlweise
+in Einträgen oder in (geschätzten) Bytes gemessen, und alle Zähler werden
+zusätzlich pro Namensraum (Schlüsselpräfix vor dem ersten ":") geführt.
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+DEFAULT_WINDOW_RATIO = 0.01
+DEFAULT_PROTECTED_RATIO = 0.8
+DEFAULT_NAMESPACE = "default"
+
+# Zähler werden bei jeder Alterung halbiert
+_HALVE_TABLE = bytes(value >> 1 for value in range(256))
+_SKETCH_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+_MAX_COUNTER = 15
+_HASH_MASK = (1 << 64) - 1
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Schätzt den Speicherbedarf eines Werts in Bytes.
+
+    Container werden bis zu einer Tiefe von drei Ebenen mitgezählt.
+
+    Args:
+        value: Zu schätzender Wert
+
+    Returns:
+        Geschätzte Größe in Bytes
+    """
+    size = sys.getsizeof(value)
+    if _depth >= 3 or isinstance(value, (str, bytes, bytearray)):
+        return size
+    if isinstance(value, dict):
+        return size + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, _depth + 1) for item in value)
+    if hasattr(value, "__dict__"):
+        return size + estimate_size(vars(value), _depth + 1)
+    return size
+
+
+def default_namespace(key: Hashable) -> str:
+    """
+    Ermittelt den Namensraum eines Schlüssels.
+
+    Args:
+        key: Cache-Schlüssel
+
+    Returns:
+        Präfix vor dem ersten ":" oder "default"
+    """
+    if isinstance(key, str) and ":" in key:
+        return key.split(":", 1)[0]
+    return DEFAULT_NAMESPACE
+
+
+class FrequencySketch:
+    """Count-Min-Sketch mit vier Zeilen, gesättigten 4-Bit-Zählern und periodischer Halbierung."""
+
+    def __init__(self, expected_entries: int):
+        """
+        Initialisiert die Skizze.
+
+        Args:
+            expected_entries: Erwartete Anzahl verschiedener Einträge im Cache
+        """
+        width = 16
+        while width < expected_entries and width < (1 << 22):
+            width <<= 1
+        self.width = width
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in _SKETCH_SEEDS]
+        self.sample_size = 10 * width
+        self.additions = 0
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        """
+        Berechnet die Zählerpositionen eines Schlüssels.
+
+        Args:
+            key: Schlüssel
+
+        Returns:
+            Eine Position pro Zeile
+        """
+        h = hash(key)
+        indexes = []
+        for seed in _SKETCH_SEEDS:
+            mixed = ((h + seed) * seed) & _HASH_MASK
+            indexes.append((mixed ^ (mixed >> 29)) & self._mask)
+        return indexes
+
+    def increment(self, key: Hashable) -> None:
+        """
+        Zählt einen Zugriff.
+
+        Args:
+            key: Schlüssel
+        """
+        added = False
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < _MAX_COUNTER:
+                row[index] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self.reset()
+
+    def frequency(self, key: Hashable) -> int:
+        """
+        Schätzt die Zugriffshäufigkeit eines Schlüssels.
+
+        Args:
+            key: Schlüssel
+
+        Returns:
+            Geschätzte Häufigkeit (0 bis 15)
+        """
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def reset(self) -> None:
+        """Halbiert alle Zähler, damit ältere Zugriffe an Gewicht verlieren."""
+        for row in self._rows:
+            row[:] = row.translate(_HALVE_TABLE)
+        self.additions //= 2
+
+
+class _Entry:
+    """Interner Cache-Eintrag."""
+
+    __slots__ = ("value", "weight", "expires_at", "namespace", "segment")
+
+    def __init__(self, value: Any, weight: int, expires_at: Optional[float], namespace: str, segment: str):
+        self.value = value
+        self.weight = weight
+        self.expires_at = expires_at
+        self.namespace = namespace
+        self.segment = segment
+
+
+class WTinyLFUCache:
+    """
+    Gewichteter Cache mit W-TinyLFU-Aufnahme- und Verdrängungsstrategie.
+
+    Ohne weigher zählt jeder Eintrag mit Gewicht 1, maximum_weight ist dann
+    die maximale Anzahl von Einträgen. Mit weigher=estimate_size (oder einem
+    beim Einfügen übergebenen Gewicht) ist maximum_weight ein Byte-Budget.
+    """
+
+    def __init__(self, maximum_weight: int, weigher: Optional[Callable[[Any], int]] = None,
+                 default_ttl: Optional[float] = None, window_ratio: float = DEFAULT_WINDOW_RATIO,
+                 expected_entries: Optional[int] = None,
+                 namespace_func: Callable[[Hashable], str] = default_namespace,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        """
+        Initialisiert den Cache.
+
+        Args:
+            maximum_weight: Maximales Gesamtgewicht (Einträge oder Bytes)
+            weigher: Funktion, die das Gewicht eines Werts bestimmt (None = 1 pro Eintrag)
+            default_ttl: Standard-TTL in Sekunden (None = kein Ablauf)
+            window_ratio: Anteil des Fensters an der Kapazität
+            expected_entries: Erwartete Anzahl von Einträgen für die Größe der Skizze
+            namespace_func: Funktion, die den Namensraum eines Schlüssels bestimmt
+            on_evict: Wird für jeden verdrängten Eintrag mit Schlüssel und Wert aufgerufen
+        """
+        if maximum_weight <= 0:
+            raise ValueError("maximum_weight muss größer als 0 sein")
+        self.weigher = weigher
+        self.default_ttl = default_ttl
+        self.window_ratio = window_ratio
+        self.namespace_func = namespace_func
+        self.on_evict = on_evict
+
+        if expected_entries is None:
+            expected_entries = maximum_weight if weigher is None else max(1024, maximum_weight // 1024)
+        self.sketch = FrequencySketch(expected_entries)
+
+        self._window: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._probation: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._protected: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._window_weight = 0
+        self._protected_weight = 0
+        self.weighted_size = 0
+        # Verdrängte und abgewiesene Einträge insgesamt
+        self.eviction_count = 0
+        self._namespace_stats: Dict[str, Dict[str, int]] = {}
+        self.lock = RLock()
+        self.resize(maximum_weight)
+
+    # ------------------------------------------------------------------
+    # Kapazität und Statistik
+    # ------------------------------------------------------------------
+
+    def resize(self, maximum_weight: int) -> None:
+        """
+        Ändert die Kapazität und verdrängt bei Bedarf Einträge.
+
+        Args:
+            maximum_weight: Neues maximales Gesamtgewicht
+        """
+        with self.lock:
+            self.maximum_weight = max(1, int(maximum_weight))
+            self.window_maximum = min(self.maximum_weight, max(1, int(self.maximum_weight * self.window_ratio)))
+            # window_ratio=1.0 ergibt ein reines (gewichtetes) LRU ohne Hauptbereich
+            self.main_maximum = self.maximum_weight - self.window_maximum
+            self.protected_maximum = int(self.main_maximum * DEFAULT_PROTECTED_RATIO)
+            self._evict()
+
+    def _stats_for(self, namespace: str) -> Dict[str, int]:
+        """
+        Gibt die Zähler eines Namensraums zurück.
+
+        Args:
+            namespace: Namensraum
+
+        Returns:
+            Veränderbares Dictionary mit Zählern
+        """
+        stats = self._namespace_stats.get(namespace)
+        if stats is None:
+            stats = {
+                "hits": 0, "misses": 0, "puts": 0, "evictions": 0,
+                "rejections": 0, "expirations": 0, "entries": 0, "weight": 0,
+            }
+            self._namespace_stats[namespace] = stats
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gibt Gesamt- und Namensraum-Statistiken zurück.
+
+        Returns:
+            Dictionary mit Statistiken
+        """
+        with self.lock:
+            namespaces = {}
+            totals = {"hits": 0, "misses": 0, "puts": 0, "evictions": 0, "rejections": 0, "expirations": 0}
+            for namespace, counts in self._namespace_stats.items():
+                requests = counts["hits"] + counts["misses"]
+                namespaces[namespace] = dict(
+                    counts, hit_rate_percent=round(counts["hits"] / requests * 100, 2) if requests else 0
+                )
+                for name in totals:
+                    totals[name] += counts[name]
+            requests = totals["hits"] + totals["misses"]
+            return dict(
+                totals,
+                policy="w-tinylfu",
+                entries=len(self._entries),
+                weighted_size=self.weighted_size,
+                maximum_weight=self.maximum_weight,
+                window_weight=self._window_weight,
+                protected_weight=self._protected_weight,
+                hit_rate_percent=round(totals["hits"] / requests * 100, 2) if requests else 0,
+                namespaces=namespaces,
+            )
+
+    # ------------------------------------------------------------------
+    # Zugriff
+    # ------------------------------------------------------------------
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gibt den Wert für einen Schlüssel zurück.
+
+        Args:
+            key: Schlüssel
+            default: Rückgabewert, falls der Schlüssel fehlt oder abgelaufen ist
+
+        Returns:
+            Wert oder default
+        """
+        with self.lock:
+            self.sketch.increment(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats_for(self.namespace_func(key))["misses"] += 1
+                return default
+            stats = self._stats_for(entry.namespace)
+            if entry.expires_at is not None and entry.expires_at <= time.time():
+                self._remove(key)
+                stats["expirations"] += 1
+                stats["misses"] += 1
+                return default
+
+            self._on_hit(key, entry)
+            stats["hits"] += 1
+            return entry.value
+
+    def _on_hit(self, key: Hashable, entry: _Entry) -> None:
+        """
+        Aktualisiert die Segmente nach einem Treffer.
+
+        Args:
+            key: Schlüssel
+            entry: Eintrag
+        """
+        if entry.segment == "window":
+            self._window.move_to_end(key)
+        elif entry.segment == "protected":
+            self._protected.move_to_end(key)
+        else:
+            # Zweiter Treffer im Hauptbereich: von Probation nach Protected
+            del self._probation[key]
+            entry.segment = "protected"
+            self._protected[key] = entry
+            self._protected_weight += entry.weight
+            while self._protected_weight > self.protected_maximum and len(self._protected) > 1:
+                demoted_key, demoted = self._protected.popitem(last=False)
+                self._protected_weight -= demoted.weight
+                demoted.segment = "probation"
+                self._probation[demoted_key] = demoted
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None, weight: Optional[int] = None) -> bool:
+        """
+        Fügt einen Wert ein oder aktualisiert ihn.
+
+        Args:
+            key: Schlüssel
+            value: Wert
+            ttl: Time-To-Live in Sekunden (None = Standard-TTL)
+            weight: Gewicht des Eintrags (None = über weigher bestimmen)
+
+        Returns:
+            False, wenn der Wert größer als die gesamte Kapazität ist
+        """
+        if weight is None:
+            weight = self.weigher(value) if self.weigher is not None else 1
+        effective_ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.time() + effective_ttl if effective_ttl is not None else None
+
+        with self.lock:
+            self.sketch.increment(key)
+            namespace = self.namespace_func(key)
+            stats = self._stats_for(namespace)
+            stats["puts"] += 1
+            if key in self._entries:
+                self._remove(key)
+            if weight > self.maximum_weight:
+                stats["rejections"] += 1
+                return False
+
+            entry = _Entry(value, weight, expires_at, namespace, "window")
+            self._entries[key] = entry
+            self._window[key] = entry
+            self._window_weight += weight
+            self.weighted_size += weight
+            stats["entries"] += 1
+            stats["weight"] += weight
+            self._evict()
+            return True
+
+    def _remove(self, key: Hashable) -> Optional[_Entry]:
+        """
+        Entfernt einen Eintrag aus allen Strukturen.
+
+        Args:
+            key: Schlüssel
+
+        Returns:
+            Entfernter Eintrag oder None
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        if entry.segment == "window":
+            del self._window[key]
+            self._window_weight -= entry.weight
+        elif entry.segment == "protected":
+            del self._protected[key]
+            self._protected_weight -= entry.weight
+        else:
+            del self._probation[key]
+        self.weighted_size -= entry.weight
+        stats = self._stats_for(entry.namespace)
+        stats["entries"] -= 1
+        stats["weight"] -= entry.weight
+        return entry
+
+    def _evict_entry(self, key: Hashable, counter: str) -> None:
+        """
+        Verdrängt einen Eintrag und benachrichtigt den Listener.
+
+        Args:
+            key: Schlüssel
+            counter: Zu erhöhender Zähler ("evictions" oder "rejections")
+        """
+        entry = self._remove(key)
+        if entry is None:
+            return
+        self._stats_for(entry.namespace)[counter] += 1
+        self.eviction_count += 1
+        if self.on_evict is not None:
+            self.on_evict(key, entry.value)
+
+    def _main_victims(self, needed: int) -> Optional[List[Hashable]]:
+        """
+        Wählt Opfer aus dem Hauptbereich in LRU-Reihenfolge (erst Probation, dann Protected).
+
+        Args:
+            needed: Freizugebendes Gewicht
+
+        Returns:
+            Liste der Opferschlüssel oder None, wenn nicht genug Gewicht vorhanden ist
+        """
+        victims = []
+        freed = 0
+        for segment in (self._probation, self._protected):
+            for key, entry in segment.items():
+                if freed >= needed:
+                    return victims
+                victims.append(key)
+                freed += entry.weight
+        return victims if freed >= needed else None
+
+    def _evict(self) -> None:
+        """Schiebt Fensterüberlauf in den Hauptbereich und entscheidet dort über die Aufnahme."""
+        while self._window and self._window_weight > self.window_maximum:
+            key, entry = self._window.popitem(last=False)
+            self._window_weight -= entry.weight
+            entry.segment = "probation"
+            self._probation[key] = entry
+
+            main_weight = self.weighted_size - self._window_weight
+            overflow = main_weight - self.main_maximum
+            if overflow <= 0:
+                continue
+
+            # Der Kandidat steht bereits in Probation und darf nicht sein eigenes Opfer sein
+            del self._probation[key]
+            victims = self._main_victims(overflow)
+            self._probation[key] = entry
+            if victims is None:
+                self._evict_entry(key, "rejections")
+                continue
+
+            candidate_frequency = self.sketch.frequency(key)
+            if victims and candidate_frequency <= max(self.sketch.frequency(victim) for victim in victims):
+                self._evict_entry(key, "rejections")
+            else:
+                for victim in victims:
+                    self._evict_entry(victim, "evictions")
+
+        # Fenster allein kann nach resize() noch zu groß sein
+        while self.weighted_size > self.maximum_weight and self._entries:
+            for segment in (self._probation, self._protected, self._window):
+                if segment:
+                    self._evict_entry(next(iter(segment)), "evictions")
+                    break
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        Löscht einen Eintrag.
+
+        Args:
+            key: Schlüssel
+
+        Returns:
+            True, wenn der Eintrag vorhanden war
+        """
+        with self.lock:
+            return self._remove(key) is not None
+
+    def clear(self) -> None:
+        """Leert den Cache; Häufigkeiten und Statistiken bleiben erhalten."""
+        with self.lock:
+            self._window.clear()
+            self._probation.clear()
+            self._protected.clear()
+            self._entries.clear()
+            self._window_weight = 0
+            self._protected_weight = 0
+            self.weighted_size = 0
+            for stats in self._namespace_stats.values():
+                stats["entries"] = 0
+                stats["weight"] = 0
+
+    def reset_stats(self) -> None:
+        """Setzt die Treffer- und Verdrängungszähler zurück."""
+        with self.lock:
+            for stats in self._namespace_stats.values():
+                for name in ("hits", "misses", "puts", "evictions", "rejections", "expirations"):
+                    stats[name] = 0
+
+    def cleanup_expired(self) -> int:
+        """
+        Entfernt abgelaufene Einträge.
+
+        Returns:
+            Anzahl der entfernten Einträge
+        """
+        with self.lock:
+            now = time.time()
+            expired = [key for key, entry in self._entries.items()
+                       if entry.expires_at is not None and entry.expires_at <= now]
+            for key in expired:
+                entry = self._remove(key)
+                self._stats_for(entry.namespace)["expirations"] += 1
+            return len(expired)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Prüft, ob ein nicht abgelaufener Eintrag vorhanden ist (ohne Zugriff zu zählen)."""
+        with self.lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry.expires_at is None or entry.expires_at > time.time())
+
+    def __len__(self) -> int:
+        """Gibt die Anzahl der Einträge zurück."""
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """
+        Gibt alle Schlüssel-Wert-Paare zurück.
+
+        Returns:
+            Liste der Paare
+        """
+        with self.lock:
+            return [(key, entry.value) for key, entry in self._entries.items()]
+
+
+def replay_trace(cache: Any, trace: Iterable[Union[Hashable, Tuple[Hashable, int]]],
+                 put: Optional[Callable[[Any, Hashable, int], None]] = None) -> float:
+    """
+    Spielt eine Zugriffsfolge gegen einen Cache ab (Cache-Aside) und misst die Trefferquote.
+
+    Args:
+        cache: Cache mit get(key) und put(key, value)
+        trace: Schlüssel oder (Schlüssel, Größe in Bytes)
+        put: Funktion zum Einfügen (Standard: cache.put(key, value) bzw. mit weight)
+
+    Returns:
+        Trefferquote zwischen 0 und 1
+    """
+    hits = 0
+    requests = 0
+    weighted = isinstance(cache, WTinyLFUCache)
+    for item in trace:
+        key, size = item if isinstance(item, tuple) else (item, 1)
+        requests += 1
+        if cache.get(key) is not None:
+            hits += 1
+        elif put is not None:
+            put(cache, key, size)
+        elif weighted:
+            cache.put(key, True, weight=size)
+        else:
+            cache.put(key, True)
+    return hits / requests if requests else 0.0
+
+
+def load_access_trace(path: str) -> List[Union[str, Tuple[str, int]]]:
+    """
+    Lädt eine aufgezeichnete Zugriffsfolge (ein Schlüssel pro Zeile, optional mit Größe).
+
+    Args:
+        path: Pfad zur Trace-Datei
+
+    Returns:
+        Liste der Zugriffe
+    """
+    trace: List[Union[str, Tuple[str, int]]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            trace.append((parts[0], int(parts[1])) if len(parts) > 1 else parts[0])
+    return trace
+
+
+def generate_scan_trace(hot_keys: int = 500, length: int = 200_000, scan_every: int = 20_000,
+                        scan_length: int = 5_000, zipf_exponent: float = 0.9,
+                        seed: int = 42) -> List[str]:
+    """
+    Erzeugt eine Zugriffsfolge aus Zipf-verteilten Zugriffen mit eingestreuten Kanal-Scans.
+
+    Args:
+        hot_keys: Anzahl der wiederkehrenden Schlüssel
+        length: Gesamtzahl der Zugriffe
+        scan_every: Abstand zwischen zwei Scans
+        scan_length: Anzahl einmaliger Schlüssel pro Scan
+        zipf_exponent: Exponent der Zipf-Verteilung
+        seed: Startwert des Zufallsgenerators
+
+    Returns:
+        Liste der Schlüssel
+    """
+    import random
+
+    rng = random.Random(seed)
+    weights = [1.0 / (rank ** zipf_exponent) for rank in range(1, hot_keys + 1)]
+    population = [f"hot:{rank}" for rank in range(hot_keys)]
+    trace: List[str] = []
+    scan_number = 0
+    while len(trace) < length:
+        trace.extend(rng.choices(population, weights, k=min(scan_every, length - len(trace))))
+        if len(trace) < length:
+            trace.extend(f"scan:{scan_number}:{i}" for i in range(scan_length))
+            scan_number += 1
+    return trace[:length]
+
+
+def benchmark_hit_ratios(capacity: int, trace: Optional[List[Any]] = None) -> Dict[str, float]:
+    """
+    Vergleicht die Trefferquoten von LRU und W-TinyLFU auf einer Zugriffsfolge.
+
+    Args:
+        capacity: Kapazität beider Caches (Einträge bzw. Bytes bei gewichteten Traces)
+        trace: Zugriffsfolge (Standard: generate_scan_trace())
+
+    Returns:
+        Dictionary mit den Trefferquoten "lru" und "w-tinylfu"
+    """
+    from .lru_cache import LRUCache
+
+    if trace is None:
+        trace = generate_scan_trace()
+    weighted = any(isinstance(item, tuple) for item in trace[:100])
+
+    results = {"w-tinylfu": replay_trace(WTinyLFUCache(capacity, expected_entries=capacity), trace)}
+    if weighted:
+        # Byte-gewichtetes LRU als Vergleich
+        results["lru"] = replay_trace(WTinyLFUCache(capacity, window_ratio=1.0), trace)
+    else:
+        results["lru"] = replay_trace(LRUCache(maxsize=capacity), trace)
+    return results
+
+
+def create_cache_core(max_entries: int, max_bytes: Optional[int] = None, policy: str = "lru",
+                      default_ttl: Optional[float] = None) -> Optional[WTinyLFUCache]:
+    """
+    Erstellt den Kern für einen der bestehenden Caches.
+
+    Args:
+        max_entries: Maximale Anzahl von Einträgen (ohne Byte-Budget)
+        max_bytes: Byte-Budget (None = Kapazität in Einträgen)
+        policy: "lru" oder "tinylfu"
+        default_ttl: Standard-TTL in Sekunden
+
+    Returns:
+        WTinyLFUCache oder None, wenn das bisherige ungewichtete LRU genügt
+    """
+    if policy not in ("lru", "tinylfu"):
+        raise ValueError(f"Unbekannte Cache-Strategie: {policy}")
+    if policy == "lru" and max_bytes is None:
+        return None
+    return WTinyLFUCache(
+        max_bytes if max_bytes is not None else max_entries,
+        weigher=estimate_size if max_bytes is not None else None,
+        default_ttl=default_ttl,
+        window_ratio=1.0 if policy == "lru" else DEFAULT_WINDOW_RATIO,
+        expected_entries=max_entries,
+    )
@@ -90,6 +90,28 @@ async def test_database(tmp_path):
     
     await db.close()
 
+@pytest.fixture
+def model_db(tmp_path):
+    """Open the peewee model database on a temporary file.
+
+    Yields ``open_db(models, name="test.db", **init_kwargs)``, which
+    initializes the shared ``db`` at ``tmp_path / name``, connects and
+    creates the given model tables. The database is closed and detached
+    again after the test.
+    """
+    from src.telegram_audio_downloader.models import db
+
+    def open_db(models, name="test.db", **init_kwargs):
+        db.init(str(tmp_path / name), **init_kwargs)
+        db.connect(reuse_if_open=True)
+        db.create_tables(models)
+        return db
+
+    yield open_db
+
+    db.close()
+    db.init(None)
+
 @pytest.fixture
 def performance_benchmark():
     """Performance benchmark fixture."""
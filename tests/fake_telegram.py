@@ -0,0 +1,163 @@
+"""
+Offline-Ersatz für einen Telegram-Kanal zum Testen und Benchmarken der Scanner.
+
+Der Kanal besteht überwiegend aus Text, Fotos und Videos; dazwischen liegen
+Musikdateien, als Datei gesendete Audiodateien ohne Audio-Attribut,
+Sprachnachrichten und andere Dateien (PDF, ZIP, APK, als Datei gesendete Videos),
+die Telegram ebenfalls über den Dokument-Filter liefert. `iter_messages` bildet die serverseitigen Filter nach und
+zählt, wie viele Nachrichten übertragen wurden.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+from telethon.errors import RPCError
+from telethon.tl.types import (
+    Document,
+    DocumentAttributeAudio,
+    DocumentAttributeFilename,
+    DocumentAttributeVideo,
+    InputMessagesFilterDocument,
+    InputMessagesFilterMusic,
+    InputMessagesFilterVoice,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+)
+
+MUSIC = "music"
+AUDIO_FILE = "audio_file"
+VOICE = "voice"
+VIDEO = "video"
+PHOTO = "photo"
+TEXT = "text"
+PDF = "pdf"
+ZIP = "zip"
+APK = "apk"
+VIDEO_FILE = "video_file"
+
+# Als Datei gesendete Nicht-Audio-Dokumente: Art -> (MIME-Typ, Dateiendung)
+_FILE_DOCUMENTS = {
+    PDF: ("application/pdf", "pdf"),
+    ZIP: ("application/zip", "zip"),
+    APK: ("application/vnd.android.package-archive", "apk"),
+    VIDEO_FILE: ("video/mp4", "mp4"),
+}
+
+
+def _document(message_id, mime_type, attributes, dc_id=2):
+    """Erstellt ein Telegram-Dokument."""
+    return Document(
+        id=10_000 + message_id,
+        access_hash=message_id,
+        file_reference=b"",
+        date=datetime.now(),
+        mime_type=mime_type,
+        size=4_000_000,
+        dc_id=dc_id,
+        attributes=attributes,
+    )
+
+
+def make_message(message_id, kind, dc_id=2):
+    """
+    Erstellt eine Nachricht der angegebenen Art.
+
+    Args:
+        message_id: ID der Nachricht
+        kind: MUSIC, AUDIO_FILE, VOICE, VIDEO, PHOTO, TEXT oder eine Art aus _FILE_DOCUMENTS
+        dc_id: Rechenzentrum des Dokuments
+    """
+    media = None
+    if kind == MUSIC:
+        media = MessageMediaDocument(document=_document(message_id, "audio/mpeg", [
+            DocumentAttributeAudio(duration=180, title=f"Lied {message_id}", performer="Band"),
+        ], dc_id))
+    elif kind == AUDIO_FILE:
+        media = MessageMediaDocument(document=_document(message_id, "audio/flac", [
+            DocumentAttributeFilename(file_name=f"aufnahme_{message_id}.flac"),
+        ], dc_id))
+    elif kind == VOICE:
+        media = MessageMediaDocument(document=_document(message_id, "audio/ogg", [
+            DocumentAttributeAudio(duration=5, voice=True),
+        ], dc_id))
+    elif kind == VIDEO:
+        media = MessageMediaDocument(document=_document(message_id, "video/mp4", [
+            DocumentAttributeVideo(duration=30, w=640, h=480),
+        ], dc_id))
+    elif kind in _FILE_DOCUMENTS:
+        mime_type, extension = _FILE_DOCUMENTS[kind]
+        media = MessageMediaDocument(document=_document(message_id, mime_type, [
+            DocumentAttributeFilename(file_name=f"datei_{message_id}.{extension}"),
+        ], dc_id))
+    elif kind == PHOTO:
+        media = MessageMediaPhoto()
+    return SimpleNamespace(id=message_id, media=media, message="", date=datetime.now(), kind=kind)
+
+
+def chat_heavy_pattern(message_id):
+    """Verteilung einer lebhaften Gruppe: etwa 3,5 % Audio und 3 % andere Dateien."""
+    if message_id % 100 in (0, 50):
+        return MUSIC
+    if message_id % 100 == 25:
+        return AUDIO_FILE
+    if message_id % 200 == 75:
+        return VOICE
+    if message_id % 100 == 60:
+        return PDF
+    if message_id % 100 == 80:
+        return ZIP
+    if message_id % 200 == 130:
+        return APK
+    if message_id % 200 == 30:
+        return VIDEO_FILE
+    if message_id % 10 == 3:
+        return PHOTO
+    if message_id % 20 == 7:
+        return VIDEO
+    return TEXT
+
+
+def _matches_filter(message, message_filter):
+    """Bildet die serverseitigen Filter von Telegram nach."""
+    if message_filter is None:
+        return True
+    if isinstance(message_filter, type):
+        message_filter = message_filter()
+    if isinstance(message_filter, InputMessagesFilterMusic):
+        return message.kind == MUSIC
+    if isinstance(message_filter, InputMessagesFilterVoice):
+        return message.kind == VOICE
+    if isinstance(message_filter, InputMessagesFilterDocument):
+        # Alle als Datei gesendeten Dokumente, nicht nur Audiodateien
+        return message.kind == AUDIO_FILE or message.kind in _FILE_DOCUMENTS
+    raise ValueError(f"Filter nicht unterstützt: {message_filter}")
+
+
+class FakeTelegramClient:
+    """Client mit einem einzelnen Kanal im Speicher."""
+
+    def __init__(self, message_count, pattern=chat_heavy_pattern):
+        self.pattern = pattern
+        self.messages = [make_message(i, pattern(i)) for i in range(1, message_count + 1)]
+        self.fetched = 0
+        self.requests = []
+        self.fail_after = None
+        self.reject_filters = False
+
+    def post(self, count):
+        """Fügt neue Nachrichten am Ende des Kanals hinzu."""
+        start = len(self.messages) + 1
+        self.messages.extend(make_message(i, self.pattern(i)) for i in range(start, start + count))
+
+    async def iter_messages(self, entity, limit=None, min_id=0, reverse=False, filter=None):
+        self.requests.append(filter)
+        if filter is not None and self.reject_filters:
+            raise RPCError(request=None, message="FILTER_NOT_SUPPORTED")
+        messages = [m for m in self.messages if m.id > min_id and _matches_filter(m, filter)]
+        if not reverse:
+            messages.reverse()
+        for message in messages[:limit]:
+            if self.fail_after is not None and self.fetched >= self.fail_after:
+                raise ConnectionError("Verbindung verloren")
+            self.fetched += 1
+            yield message
@@ -2,6 +2,8 @@
 Tests für die erweiterte Suche im Telegram Audio Downloader.
 """
 
+import threading
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
@@ -18,7 +20,27 @@ from src.telegram_audio_downloader.advanced_search import (
     perform_search,
     get_search_suggestions
 )
-from src.telegram_audio_downloader.models import AudioFile, TelegramGroup
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+from src.telegram_audio_downloader.search_index import TrigramIndex
+
+
+@pytest.fixture
+def search_db(model_db):
+    """Stellt eine temporäre Datenbank mit Beispieldaten bereit."""
+    model_db([TelegramGroup, AudioFile], "search.db")
+    
+    group = TelegramGroup.create(group_id=1, title="Rock Group")
+    AudioFile.create(
+        file_id="f1", file_name="test1.mp3", file_size=5000000, mime_type="audio/mp3",
+        genre="rock", duration=240, status="completed", downloaded_at=datetime.now(), group=group
+    )
+    AudioFile.create(
+        file_id="f2", file_name="test2.flac", file_size=15000000, mime_type="audio/flac",
+        status="pending"
+    )
+    AudioFile.create(file_id="f9", file_name="other.mp3", file_size=1, status="completed")
+    
+    return db
 
 
 class TestSearchType:
@@ -165,7 +187,7 @@ class TestAdvancedSearchEngine:
         # Mock die Datenbankabfrage
         mock_select = Mock()
         mock_select.where.return_value = mock_select
-        mock_select.__iter__ = Mock(return_value=iter([Mock(), Mock()]))
+        mock_select.dicts.return_value = [{"id": 1}, {"id": 2}]
         mock_audio_file.select.return_value = mock_select
         
         # Führe die Suche durch
@@ -260,6 +282,65 @@ class TestAdvancedSearchEngine:
             assert isinstance(suggestions, list)
             # Die genauen Vorschläge hängen von der fuzzy matching Implementierung ab
     
+    def test_search_suggestions_use_cached_index(self, tmp_path):
+        """Testet, dass der Trigramm-Index wiederverwendet und persistiert wird."""
+        index_path = tmp_path / "suggestions.json"
+        engine = AdvancedSearchEngine(suggestion_index_path=index_path)
+        
+        index = TrigramIndex()
+        index.add_many(["Bohemian Rhapsody", "Queen", "Miles Davis"])
+        
+        with patch.object(engine, '_build_suggestion_index', return_value=index) as mock_build:
+            assert engine.get_search_suggestions("Bohemain") == ["Bohemian Rhapsody"]
+            assert engine.get_search_suggestions("Quen") == ["Queen"]
+            mock_build.assert_called_once()
+        
+        assert index_path.exists()
+        
+        # Neue Instanz lädt den persistierten Index ohne Datenbankzugriff
+        other_engine = AdvancedSearchEngine(suggestion_index_path=index_path)
+        with patch.object(other_engine, '_build_suggestion_index') as mock_build:
+            assert other_engine.get_search_suggestions("Mils Davis") == ["Miles Davis"]
+            mock_build.assert_not_called()
+        
+        # Neue Begriffe und Invalidierung
+        other_engine.add_suggestion_terms("Kind of Blue", None)
+        assert other_engine.get_search_suggestions("Kind of Blu") == ["Kind of Blue"]
+        other_engine.invalidate_suggestion_index()
+        assert not index_path.exists()
+    
+    def test_expired_index_is_rebuilt_in_background(self):
+        """Testet, dass ein abgelaufener Index bis zum Ende des Neuaufbaus weiter verwendet wird."""
+        engine = AdvancedSearchEngine(suggestion_index_ttl=0)
+        old_index = TrigramIndex()
+        old_index.add_many(["Queen"])
+        new_index = TrigramIndex()
+        new_index.add_many(["Queen", "Miles Davis"])
+        started = threading.Event()
+        release = threading.Event()
+        
+        def slow_build():
+            started.set()
+            assert release.wait(5)
+            return new_index
+        
+        with patch.object(engine, '_build_suggestion_index', return_value=old_index):
+            assert engine.get_search_suggestions("Quen") == ["Queen"]
+        
+        with patch.object(engine, '_build_suggestion_index', side_effect=slow_build) as mock_build:
+            # Der abgelaufene Index antwortet sofort, der Neuaufbau läuft nebenher
+            assert engine.get_search_suggestions("Mils Davis") == []
+            assert started.wait(5)
+            assert engine.get_search_suggestions("Quen") == ["Queen"]
+            engine.add_suggestion_terms("Kind of Blue")
+            release.set()
+            engine.wait_for_suggestion_rebuild(5)
+            mock_build.assert_called_once()
+        
+        assert engine._suggestion_index is new_index
+        engine.suggestion_index_ttl = 300
+        assert engine.get_search_suggestions("Kind of Blu") == ["Kind of Blue"]
+    
     def test_get_search_history(self):
         """Testet das Abrufen der Suchhistorie."""
         engine = AdvancedSearchEngine()
@@ -288,29 +369,94 @@ class TestAdvancedSearchEngine:
         engine.clear_search_history()
         assert len(engine.search_history) == 0
     
-    def test_get_faceted_search_results(self):
+    def test_get_faceted_search_results(self, search_db):
         """Testet das Abrufen von facettierten Suchergebnissen."""
         engine = AdvancedSearchEngine()
         
         # Erstelle eine Suchanfrage
         query = SearchQuery(terms=["test"])
         
-        # Mock die search Methode
-        mock_result = SearchResult(
-            items=[
-                Mock(category="rock", mime_type="audio/mp3", file_size=5000000),
-                Mock(category="jazz", mime_type="audio/flac", file_size=15000000)
-            ]
-        )
-        
-        with patch.object(engine, 'search', return_value=mock_result):
+        with patch.object(engine, 'search') as mock_search:
             # Hole die facettierten Ergebnisse
             facets = engine.get_faceted_search_results(query)
             
-            assert isinstance(facets, dict)
-            assert "categories" in facets
-            assert "file_types" in facets
-            assert "size_ranges" in facets
+            # Facetten werden per SQL berechnet, ohne die Suche auszuführen
+            mock_search.assert_not_called()
+        
+        assert isinstance(facets, dict)
+        assert "categories" in facets
+        assert "file_types" in facets
+        assert "size_ranges" in facets
+        assert facets["categories"] == {"rock": 1, "unclassified": 1}
+        assert facets["file_types"] == {"audio/mp3": 1, "audio/flac": 1}
+        assert facets["size_ranges"] == {"1-10MB": 1, "> 10MB": 1}
+        assert facets["duration_ranges"] == {"3-10min": 1, "unknown": 1}
+        assert facets["status"] == {"completed": 1, "pending": 1}
+        assert facets["groups"] == {"Rock Group": 1, "Ohne Gruppe": 1}
+        assert facets["date_ranges"] == {"last_24h": 1, "never": 1}
+    
+    def test_downloaded_results_are_cached_as_rows(self, search_db):
+        """Testet, dass gecachte Treffer als neue Objekte geliefert und bei Schreibzugriffen verworfen werden."""
+        engine = AdvancedSearchEngine()
+        query = SearchQuery(terms=["test"], search_type=SearchType.DOWNLOADED_FILES)
+        
+        first = engine._query_downloaded_files(query)
+        assert sorted(af.file_id for af in first) == ["f1", "f2"]
+        first[0].title = "Verändert"
+        
+        # Gleiche normalisierte Abfrage: Treffer aus dem Cache, aber als frische Objekte
+        with patch('src.telegram_audio_downloader.advanced_search.read_from_replica') as mock_read:
+            second = engine._query_downloaded_files(SearchQuery(terms=["test"]))
+            mock_read.assert_not_called()
+        assert [af.title for af in second] == [None, None]
+        assert second[0] is not first[0]
+        
+        AudioFile.create(file_id="f3", file_name="test3.mp3", file_size=100)
+        assert len(engine._query_downloaded_files(query)) == 3
+    
+    def test_generation_token_checked_once_per_search(self, search_db):
+        """Testet, dass eine Suche den Generations-Token nur einmal ermittelt."""
+        engine = AdvancedSearchEngine()
+        query = SearchQuery(terms=["test"], search_type=SearchType.DOWNLOADED_FILES)
+        engine.search(query)
+        
+        with patch('src.telegram_audio_downloader.advanced_search.get_generation_token',
+                   return_value="fest") as mock_token:
+            engine._query_downloaded_files(query)
+            with patch.object(engine, '_search_downloaded_files',
+                              side_effect=lambda q: engine._query_downloaded_files(q)
+                              + engine._query_downloaded_files(q)):
+                result = engine.search(query)
+        
+        assert result.total_count == 4
+        assert mock_token.call_count == 2
+    
+    def test_faceted_search_results_cache_invalidation(self, search_db):
+        """Testet, dass Facetten bis zum nächsten Schreibzugriff zwischengespeichert werden."""
+        engine = AdvancedSearchEngine()
+        query = SearchQuery(terms=["test"])
+        
+        first = engine.get_faceted_search_results(query)
+        with patch.object(engine, '_count_facet') as mock_count:
+            assert engine.get_faceted_search_results(query) == first
+            mock_count.assert_not_called()
+        
+        AudioFile.create(file_id="f3", file_name="test3.mp3", file_size=100, status="failed")
+        
+        facets = engine.get_faceted_search_results(query)
+        assert facets["status"] == {"completed": 1, "pending": 1, "failed": 1}
+        assert facets["size_ranges"]["< 1MB"] == 1
+        
+        # Die Gruppen-Facette liest die Gruppentitel mit
+        TelegramGroup.update(title="Jazz Group").where(TelegramGroup.title == "Rock Group").execute()
+        assert engine.get_faceted_search_results(query)["groups"]["Jazz Group"] == 1
+        
+        # Facetten teilen das Suchprädikat einschließlich Filtern
+        filtered = engine.get_faceted_search_results(SearchQuery(
+            terms=["test"],
+            filters=[SearchFilter(field="status", operator="=", value="failed")]
+        ))
+        assert filtered["status"] == {"failed": 1}
 
 
 class TestGlobalFunctions:
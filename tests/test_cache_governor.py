@@ -0,0 +1,183 @@
+"""
+Tests für den prozessweiten Cache-Governor.
+"""
+
+import asyncio
+import gc
+
+from src.telegram_audio_downloader.advanced_memory_management import AdvancedMemoryManager, LazyLoader
+from src.telegram_audio_downloader.cache_governor import (
+    CacheGovernor,
+    LazyLoaderAdapter,
+    MemoryEfficientSetAdapter,
+    OrderedCacheAdapter,
+    get_cache_governor,
+)
+from src.telegram_audio_downloader.database_caching import InMemoryCache
+from src.telegram_audio_downloader.downloader import LRUCache
+from src.telegram_audio_downloader.memory_utils import MemoryEfficientSet
+
+
+def _filled_cache(entries=1000, max_size=1000, **kwargs):
+    """Erstellt einen gefüllten InMemoryCache."""
+    cache = InMemoryCache(max_size=max_size, default_ttl_seconds=0, **kwargs)
+    for i in range(entries):
+        cache.set(f"key:{i}", "x" * 200)
+    return cache
+
+
+class FakeMemoryManager:
+    """Speicher-Manager mit fest eingestelltem Drucklevel."""
+
+    def __init__(self, level="normal"):
+        self.level = level
+
+    def check_memory_pressure(self):
+        return self.level
+
+
+class TestAllocation:
+    """Testfälle für die Verteilung des Budgets."""
+
+    def test_hot_cache_gets_larger_share(self):
+        """Testet, dass Treffer pro Byte die Zuteilung bestimmen."""
+        hot, cold = _filled_cache(), _filled_cache()
+        governor = CacheGovernor(max_bytes=300_000)
+        governor.register("hot", OrderedCacheAdapter(hot, min_bytes=10_000))
+        governor.register("cold", OrderedCacheAdapter(cold, min_bytes=10_000))
+
+        for _ in range(5):
+            for i in range(900, 1000):
+                hot.get(f"key:{i}")
+        cold.get("key:999")
+        shares = governor.rebalance()
+
+        assert shares["hot"].allocated_bytes > 3 * shares["cold"].allocated_bytes
+        assert shares["hot"].allocated_bytes + shares["cold"].allocated_bytes <= 300_000
+        # Beide Caches wurden auf ihre Zuteilung verkleinert
+        entry_bytes = governor._adapters["hot"].entry_bytes
+        assert len(hot.cache) * entry_bytes <= shares["hot"].allocated_bytes
+        assert len(cold.cache) < 1000
+        # Die zuletzt genutzten Einträge bleiben erhalten
+        assert hot.get("key:999") is not None
+
+    def test_ceiling_limits_growth(self):
+        """Testet, dass kein Cache mehr als max_growth seiner Größe erhält."""
+        small = _filled_cache(entries=10, max_size=10)
+        governor = CacheGovernor(max_bytes=10_000_000, max_growth=2.0)
+        governor.register("small", OrderedCacheAdapter(small, min_bytes=0))
+        small.get("key:1")
+
+        share = governor.rebalance()["small"]
+
+        assert share.allocated_bytes == share.ceiling_bytes
+        assert small.max_size == 20
+
+    def test_byte_weighted_core_is_resized_directly(self):
+        """Testet Caches mit Byte-Budget (W-TinyLFU-Kern)."""
+        cache = _filled_cache(entries=500, max_bytes=200_000, policy="tinylfu")
+        governor = CacheGovernor(max_bytes=50_000)
+        governor.register("bytes", OrderedCacheAdapter(cache, min_bytes=0))
+
+        governor.rebalance()
+
+        assert cache.core.maximum_weight == 50_000
+        assert cache.core.weighted_size <= 50_000
+
+    def test_names_are_unique_and_dead_caches_pruned(self):
+        """Testet Namenskonflikte und das Entfernen freigegebener Caches."""
+        governor = CacheGovernor(max_bytes=100_000)
+        first = LRUCache(max_size=100)
+        second = LRUCache(max_size=100)
+        assert governor.register("files", OrderedCacheAdapter(first)) == "files"
+        assert governor.register("files", OrderedCacheAdapter(second)) == "files#2"
+
+        del first
+        gc.collect()
+        governor.rebalance()
+
+        assert list(governor.get_stats()["caches"]) == ["files#2"]
+
+
+class TestMemoryPressure:
+    """Testfälle für die Reaktion auf Speicherdruck."""
+
+    def test_pressure_shrinks_all_caches(self):
+        """Testet, dass kritischer Druck das verteilte Budget halbiert."""
+        caches = [_filled_cache(entries=300, max_size=300) for _ in range(3)]
+        governor = CacheGovernor(max_bytes=150_000)
+        for i, cache in enumerate(caches):
+            governor.register(f"cache{i}", OrderedCacheAdapter(cache, min_bytes=0))
+        governor.rebalance()
+        before = [len(cache.cache) for cache in caches]
+
+        governor.on_memory_pressure("critical")
+        stats = governor.get_stats()
+
+        assert stats["effective_budget"] == 75_000
+        assert stats["allocated_bytes"] <= 75_000
+        assert all(len(cache.cache) < count for cache, count in zip(caches, before))
+
+    def test_pressure_is_polled_from_memory_manager(self):
+        """Testet das Abfragen des Drucklevels beim Neuverteilen."""
+        governor = CacheGovernor(max_bytes=100_000)
+        manager = FakeMemoryManager("warning")
+        governor.attach_memory_manager(manager)
+
+        governor.rebalance()
+        assert governor.pressure_level == "warning"
+        assert governor.effective_budget == 75_000
+
+        manager.level = "normal"
+        governor.rebalance()
+        assert governor.effective_budget == 100_000
+
+    def test_maintenance_forwards_pressure(self, tmp_path, monkeypatch):
+        """Testet, dass die Speicherwartung den globalen Governor auslöst."""
+        manager = AdvancedMemoryManager(tmp_path)
+        monkeypatch.setattr(manager, "check_memory_pressure", lambda: "critical")
+
+        asyncio.run(manager.perform_memory_maintenance())
+
+        assert get_cache_governor().pressure_level == "critical"
+        get_cache_governor().on_memory_pressure("normal")
+
+
+class TestAdapters:
+    """Testfälle für die einzelnen Cache-Arten."""
+
+    def test_lazy_loader_unloads_least_used(self):
+        """Testet, dass über dem Budget selten genutzte Objekte entladen werden."""
+        loader = LazyLoader()
+        for name in ("a", "b", "c"):
+            loader.register_loader(name, lambda: "x" * 10_000)
+        for name, count in (("a", 5), ("b", 1), ("c", 3)):
+            for _ in range(count):
+                loader.get(name)
+        assert loader.hits == 6 and loader.misses == 3
+
+        adapter = LazyLoaderAdapter(loader)
+        adapter.resize(loader, 25_000)
+
+        assert sorted(loader._loaded_objects) == ["a", "c"]
+
+    def test_memory_efficient_set_and_file_cache(self):
+        """Testet das Verkleinern von MemoryEfficientSet und dem Datei-Cache."""
+        items = MemoryEfficientSet(max_size=1000)
+        files = LRUCache(max_size=1000)
+        for i in range(1000):
+            items.add(f"file_{i}")
+            files.put(f"file_{i}", True)
+        assert "file_999" in items and files.get("file_999")
+        assert items.hits == 1 and files.hits == 1
+
+        set_adapter = MemoryEfficientSetAdapter(items)
+        set_adapter.used_bytes(items)
+        set_adapter.resize(items, 100 * set_adapter.entry_bytes)
+        file_adapter = OrderedCacheAdapter(files)
+        file_adapter.used_bytes(files)
+        file_adapter.resize(files, 100 * file_adapter.entry_bytes)
+
+        assert len(items) == 100 and "file_999" in items
+        assert len(files) == 100 and files.get("file_999")
+        assert files.get("file_0") is None
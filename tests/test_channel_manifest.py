@@ -0,0 +1,128 @@
+"""
+Tests für das lokale Audio-Manifest von Telegram-Gruppen.
+"""
+
+import asyncio
+import time
+
+import pytest
+from telethon.tl.types import InputPeerChannel
+
+from src.telegram_audio_downloader import channel_manifest
+from src.telegram_audio_downloader.channel_manifest import (
+    reset_channel_manifest,
+    search_channel_manifest,
+    sync_channel_manifest,
+)
+from src.telegram_audio_downloader.message_scan import SCAN_MODE_FULL
+from src.telegram_audio_downloader.models import ChannelManifest, ManifestEntry, db
+from src.telegram_audio_downloader.search import search_audio_files
+
+from .fake_telegram import MUSIC, PHOTO, FakeTelegramClient
+
+CHANNEL = InputPeerChannel(channel_id=555, access_hash=1)
+
+
+def _every_tenth_is_music(message_id):
+    """Jede zehnte Nachricht enthält eine Musikdatei."""
+    return MUSIC if message_id % 10 == 0 else PHOTO
+
+
+def _channel_client(message_count):
+    """Erstellt einen Offline-Kanal mit jeder zehnten Nachricht als Musik."""
+    return FakeTelegramClient(message_count, pattern=_every_tenth_is_music)
+
+
+@pytest.fixture
+def manifest_db(model_db):
+    """Stellt eine frische Datenbank bereit."""
+    model_db([ChannelManifest, ManifestEntry], "manifest.db")
+
+
+def test_repeated_search_only_fetches_delta(manifest_db):
+    """Testet, dass nach dem ersten Abgleich nur neue Nachrichten abgerufen werden."""
+    client = _channel_client(2000)
+
+    results = asyncio.run(search_audio_files(client, CHANNEL, "lied 1990"))
+    # Serverseitig gefiltert: nur die 200 Musiknachrichten werden übertragen
+    assert client.fetched == 200
+    assert [item["message_id"] for item in results] == [1990]
+    assert results[0]["performer"] == "Band"
+
+    # Innerhalb des Mindestabstands bleibt das Netzwerk unberührt
+    client.fetched = 0
+    assert len(asyncio.run(search_audio_files(client, CHANNEL, limit=5))) == 5
+    assert client.fetched == 0
+
+    client.post(30)
+    assert asyncio.run(sync_channel_manifest(client, CHANNEL, 555, min_sync_interval=0)) == 3
+    assert client.fetched == 3
+    latest = search_channel_manifest(555, limit=2)
+    assert [item["message_id"] for item in latest] == [2030, 2020]
+    assert ChannelManifest.get(ChannelManifest.group_id == 555).entry_count == 203
+
+
+def test_interrupted_sync_resumes(manifest_db, monkeypatch):
+    """Testet, dass ein abgebrochener Abgleich am gespeicherten Stand fortsetzt."""
+    monkeypatch.setattr(channel_manifest, "SYNC_BATCH_SIZE", 50)
+    client = _channel_client(1200)
+    client.fail_after = 70
+    with pytest.raises(ConnectionError):
+        asyncio.run(sync_channel_manifest(client, CHANNEL, 555))
+    assert ChannelManifest.get(ChannelManifest.group_id == 555).last_message_id == 500
+
+    client.fail_after = None
+    client.fetched = 0
+    asyncio.run(sync_channel_manifest(client, CHANNEL, 555))
+
+    assert client.fetched == 70
+    assert len(search_channel_manifest(555)) == 120
+
+    reset_channel_manifest(555)
+    assert search_channel_manifest(555) == []
+
+
+def test_search_ignores_case_beyond_ascii(manifest_db):
+    """Testet, dass die Manifest-Suche auch nicht-ASCII-Text ohne Groß-/Kleinschreibung vergleicht."""
+    titles = ["Die Ärzte - Schrei nach Liebe", "ГРУППА КРОВИ", "Straße", "Lied"]
+    ManifestEntry.insert_many([
+        {"group_id": 555, "message_id": i, "file_id": f"f{i}", "file_name": f"{i}.mp3", "title": title}
+        for i, title in enumerate(titles)
+    ]).execute()
+
+    def titles_for(query):
+        return [item["title"] for item in search_channel_manifest(555, query)]
+
+    assert titles_for("ärzte") == titles_for("ÄRZTE") == [titles[0]]
+    assert titles_for("группа") == [titles[1]]
+    assert titles_for("STRASSE") == [titles[2]]
+    assert titles_for("LIED") == [titles[3]]
+
+
+def test_live_scan_without_manifest(manifest_db):
+    """Testet die direkte Suche ohne Manifest."""
+    client = _channel_client(100)
+
+    results = asyncio.run(search_audio_files(
+        client, CHANNEL, "Lied 50", use_manifest=False, scan_mode=SCAN_MODE_FULL
+    ))
+
+    assert [item["message_id"] for item in results] == [50]
+    assert client.fetched == 100
+    assert ManifestEntry.select().count() == 0
+
+
+def test_manifest_search_benchmark(manifest_db):
+    """Benchmark: zweite Suche über einen Kanal mit 50.000 Nachrichten (nur mit --run-slow)."""
+    client = _channel_client(50_000)
+    asyncio.run(search_audio_files(client, CHANNEL, "Lied"))
+    client.fetched = 0
+
+    started = time.perf_counter()
+    results = asyncio.run(search_audio_files(client, CHANNEL, "lied 4999"))
+    elapsed = time.perf_counter() - started
+
+    print(f"\nZweite Suche über 50.000 Nachrichten: {elapsed * 1000:.1f} ms")
+    assert client.fetched == 0
+    assert {item["message_id"] for item in results} == {49990}
+    assert elapsed < 0.1
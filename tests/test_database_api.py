@@ -0,0 +1,288 @@
+"""
+Tests für die Datenbank-API im Telegram Audio Downloader.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+# Die Datenbank-API benötigt die optionalen Pakete flask, flask-graphql und graphene
+flask = pytest.importorskip("flask")
+pytest.importorskip("flask_graphql")
+pytest.importorskip("graphene")
+
+from src.telegram_audio_downloader import database_api
+from src.telegram_audio_downloader.database_api import (
+    DatabaseAPI,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    schema,
+)
+from src.telegram_audio_downloader.database_validation import get_database_validator
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+
+
+@pytest.fixture
+def api_db(model_db):
+    """Stellt eine temporäre Datenbank mit Beispieldaten bereit."""
+    model_db([TelegramGroup, AudioFile], "api.db")
+
+    groups = [TelegramGroup.create(group_id=100 + i, title=f"Gruppe {i}") for i in range(3)]
+    base_time = datetime(2024, 1, 1)
+    for i in range(25):
+        audio = AudioFile.create(
+            file_id=f"file_{i}",
+            file_name=f"song_{i}.mp3",
+            file_size=1000 + i,
+            status="completed" if i % 2 else "pending",
+            group=groups[i % 3],
+        )
+        # Einige Dateien teilen sich denselben Zeitstempel
+        AudioFile.update(updated_at=base_time + timedelta(minutes=i // 2)).where(
+            AudioFile.id == audio.id
+        ).execute()
+
+    return db
+
+
+@pytest.fixture
+def client(api_db):
+    """Erstellt einen Flask-Testclient mit registrierter API."""
+    app = flask.Flask(__name__)
+    DatabaseAPI(app)
+    return app.test_client()
+
+
+class TestCursor:
+    """Testfälle für die Kodierung von Cursorn."""
+
+    def test_roundtrip(self):
+        """Testet das Kodieren und Dekodieren eines Cursors."""
+        assert decode_cursor(encode_cursor(42)) == 42
+
+    def test_invalid_cursor(self):
+        """Testet ungültige Cursor."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("kein-cursor")
+
+
+class TestKeysetPagination:
+    """Testfälle für die Keyset-Paginierung der REST-API."""
+
+    def test_pages_cover_all_rows_once(self, client):
+        """Testet, dass alle Seiten zusammen jede Datei genau einmal enthalten."""
+        seen = []
+        cursor = ""
+        while cursor is not None:
+            response = client.get(f"/api/v1/audio-files?limit=4&cursor={cursor}")
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data["count"] <= 4
+            seen.extend(item["file_id"] for item in data["audio_files"])
+            cursor = data["next_cursor"]
+
+        assert sorted(seen) == sorted(f"file_{i}" for i in range(25))
+        assert len(seen) == len(set(seen))
+
+    def test_updates_while_paging_keep_rows_in_place(self, client):
+        """Testet, dass save() während des Blätterns keine Zeilen verschiebt."""
+        seen = []
+        cursor = ""
+        while cursor is not None:
+            data = client.get(f"/api/v1/audio-files?limit=4&cursor={cursor}").get_json()
+            seen.extend(item["file_id"] for item in data["audio_files"])
+            cursor = data["next_cursor"]
+            # Eine bereits gelieferte Datei ändert sich und erhält ein neues updated_at
+            audio = AudioFile.get(AudioFile.file_id == seen[0])
+            audio.download_attempts += 1
+            audio.save()
+
+        assert sorted(seen) == sorted(f"file_{i}" for i in range(25))
+        assert len(seen) == len(set(seen))
+
+    def test_status_filter(self, client):
+        """Testet die Paginierung mit Statusfilter."""
+        response = client.get("/api/v1/audio-files?status=completed&limit=100&cursor=")
+        data = response.get_json()
+        assert data["count"] == 12
+        assert data["next_cursor"] is None
+        assert {item["status"] for item in data["audio_files"]} == {"completed"}
+
+    def test_invalid_cursor_returns_400(self, client):
+        """Testet die Fehlerantwort bei ungültigem Cursor."""
+        response = client.get("/api/v1/audio-files?cursor=ungueltig")
+        assert response.status_code == 400
+
+    def test_offset_pagination_still_supported(self, client):
+        """Testet die bisherige Paginierung mit limit und offset."""
+        response = client.get("/api/v1/audio-files?limit=5&offset=20")
+        data = response.get_json()
+        assert data["count"] == 5
+        assert "next_cursor" not in data
+
+
+class TestNdjsonExport:
+    """Testfälle für den NDJSON-Export."""
+
+    def test_export_streams_all_rows(self, client):
+        """Testet, dass der Export jede Datei als eigene Zeile liefert."""
+        response = client.get("/api/v1/audio-files/export")
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+
+        *rows, status = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert len(rows) == 25
+        assert rows[0]["file_name"] == "song_0.mp3"
+        assert isinstance(rows[0]["updated_at"], str)
+        assert status == {"complete": True, "count": 25}
+
+    def test_export_resumes_from_cursor(self, client):
+        """Testet den Export ab einem Cursor."""
+        first_page = client.get("/api/v1/audio-files?limit=10&cursor=").get_json()
+        response = client.get(f"/api/v1/audio-files/export?cursor={first_page['next_cursor']}")
+        assert len(response.get_data(as_text=True).splitlines()) == 15 + 1
+
+    def test_export_reports_errors(self, client, monkeypatch):
+        """Testet, dass ein Abbruch im Export als letzte Zeile gemeldet wird."""
+        serialize = database_api._serialize_audio_file_row
+
+        def failing(row):
+            if row["file_id"] == "file_3":
+                raise RuntimeError("Datenbank weg")
+            return serialize(row)
+
+        monkeypatch.setattr(database_api, "_serialize_audio_file_row", failing)
+        response = client.get("/api/v1/audio-files/export")
+
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert len(lines) == 4
+        assert lines[-1] == {"error": "Interner Serverfehler", "complete": False, "count": 3}
+
+
+class TestValidationEndpoint:
+    """Testfälle für den Validierungs-Endpunkt."""
+
+    def test_streamed_incremental_validation(self, client):
+        """Testet gestreamte Verstöße und die inkrementelle Prüfung."""
+        AudioFile.update(status="kaputt").where(AudioFile.file_id == "file_4").execute()
+
+        response = client.post("/api/v1/validate?mode=incremental&stream=1")
+        assert response.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines[0]["rule"] == "audio_files.status"
+        assert lines[0]["value"] == "kaputt"
+        assert lines[-1]["summary"]["mode"] == "full"
+        assert lines[-1]["complete"] is True
+
+        AudioFile.update(status="auch_kaputt").where(AudioFile.file_id == "file_5").execute()
+        results = client.post("/api/v1/validate?mode=incremental").get_json()
+        assert results["mode"] == "incremental"
+        assert results["violation_counts"] == {"audio_files.status": 1}
+
+    def test_streamed_validation_reports_errors(self, client, monkeypatch):
+        """Testet, dass ein Abbruch im Strom als letzte Zeile gemeldet wird."""
+        validator = get_database_validator()
+        stream = validator.iter_violations
+
+        def failing(incremental=False):
+            yield from stream(incremental)
+            raise RuntimeError("Datenbank weg")
+
+        AudioFile.update(status="kaputt").where(AudioFile.file_id == "file_4").execute()
+        monkeypatch.setattr(validator, "iter_violations", failing)
+
+        response = client.post("/api/v1/validate?stream=1")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines[0]["rule"] == "audio_files.status"
+        assert lines[-1] == {"error": "Interner Serverfehler", "complete": False}
+
+
+class TestGraphQLPagination:
+    """Testfälle für die Keyset-Paginierung über GraphQL."""
+
+    def test_after_cursor(self, api_db):
+        """Testet die Paginierung mit dem after-Argument."""
+        query = '{ audioFiles(limit: 10, after: "%s") { fileId cursor } }'
+        first = schema.execute(query % "")
+        assert first.errors is None
+        assert len(first.data["audioFiles"]) == 10
+
+        second = schema.execute(query % first.data["audioFiles"][-1]["cursor"])
+        assert second.errors is None
+        first_ids = {item["fileId"] for item in first.data["audioFiles"]}
+        second_ids = {item["fileId"] for item in second.data["audioFiles"]}
+        assert len(second_ids) == 10
+        assert not first_ids & second_ids
+
+    def test_invalid_after_cursor_is_an_error(self, api_db):
+        """Testet, dass ein ungültiger Cursor als GraphQL-Fehler gemeldet wird."""
+        result = schema.execute('{ audioFiles(after: "ungueltig") { fileId } }')
+        assert result.data["audioFiles"] is None
+        assert "Ungültiger Cursor" in result.errors[0].message
+
+
+class TestGraphQLBatching:
+    """Regressionstests für die Anzahl der SQL-Abfragen pro GraphQL-Anfrage."""
+
+    @pytest.fixture
+    def statements(self, api_db):
+        """Zeichnet alle ausgeführten SQL-Anweisungen auf."""
+        executed = []
+        connection = api_db.connection()
+        connection.set_trace_callback(executed.append)
+        yield executed
+        connection.set_trace_callback(None)
+
+    def test_nested_groups_use_single_query(self, statements):
+        """Testet, dass die Gruppen aller Dateien mit einer Abfrage geladen werden."""
+        result = schema.execute(
+            "{ audioFiles(limit: 500) { fileId group { title } } }", context_value={}
+        )
+
+        assert result.errors is None
+        assert len(result.data["audioFiles"]) == 25
+        assert result.data["audioFiles"][0]["group"]["title"] == "Gruppe 0"
+        assert len(statements) == 2
+
+    def test_nested_audio_files_use_single_query(self, statements):
+        """Testet, dass die Dateien aller Gruppen mit einer Abfrage geladen werden."""
+        result = schema.execute(
+            "{ telegramGroups { title audioFiles { fileId group { groupId } } } }",
+            context_value={},
+        )
+
+        assert result.errors is None
+        assert [len(group["audioFiles"]) for group in result.data["telegramGroups"]] == [9, 8, 8]
+        # Gruppen, Dateien und die (bereits bekannten) Gruppen der Dateien
+        assert len(statements) == 3
+
+    def test_root_fields_are_batched(self, statements):
+        """Testet, dass mehrere Wurzelfelder ihre Schlüssel gemeinsam laden."""
+        result = schema.execute(
+            """{
+                a: telegramGroup(groupId: 100) { title }
+                b: telegramGroup(groupId: 101) { title }
+                c: telegramGroup(groupId: 999) { title }
+                x: audioFilesByGroup(groupId: 1) { fileId }
+                y: audioFilesByGroup(groupId: 2) { fileId }
+            }""",
+            context_value={},
+        )
+
+        assert result.errors is None
+        assert result.data["a"]["title"] == "Gruppe 0"
+        assert result.data["c"] is None
+        assert len(result.data["x"]) == 9
+        assert len(statements) == 2
+
+    def test_graphql_view_batches_per_request(self, client, statements):
+        """Testet das Batching über den GraphQL-Endpunkt."""
+        response = client.post(
+            "/graphql", json={"query": "{ audioFiles(limit: 500) { group { title } } }"}
+        )
+
+        assert response.status_code == 200
+        assert len(response.get_json()["data"]["audioFiles"]) == 25
+        assert len(statements) == 2
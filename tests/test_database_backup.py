@@ -0,0 +1,338 @@
+"""
+Tests für die Streaming-Backups im Telegram Audio Downloader.
+"""
+
+import io
+import threading
+
+import pytest
+
+from src.telegram_audio_downloader.database_backup import (
+    ChunkedBackupReader,
+    ChunkedBackupWriter,
+    DatabaseBackupManager,
+    derive_backup_key,
+    is_stream_backup,
+)
+from src.telegram_audio_downloader.database_change_tracking import (
+    CHANGE_LOG_TABLE,
+    _triggers_sql,
+    ensure_change_tracking,
+)
+from src.telegram_audio_downloader.error_handling import DatabaseError
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+
+KEY = derive_backup_key(b"geheimnis")
+
+
+@pytest.fixture
+def backup_db(model_db, tmp_path):
+    """Stellt eine Datenbank im WAL-Modus mit Beispieldaten bereit."""
+    model_db([TelegramGroup, AudioFile], "library.db", pragmas={"journal_mode": "wal"})
+    for i in range(500):
+        AudioFile.create(file_id=f"file_{i}", file_name=f"song_{i}.mp3", file_size=i)
+
+    return tmp_path
+
+
+@pytest.fixture
+def manager(backup_db):
+    """Erstellt einen BackupManager mit kleinen Blöcken."""
+    return DatabaseBackupManager(
+        backup_dir=backup_db / "backups", encryption_key=b"geheimnis",
+        chunk_size=4096, pages_per_step=4,
+    )
+
+
+class TestChunkedStream:
+    """Testfälle für das Blockformat."""
+
+    def _write(self, data, key=KEY, chunk_size=1024):
+        buffer = io.BytesIO()
+        writer = ChunkedBackupWriter(buffer, key, chunk_size=chunk_size)
+        for offset in range(0, len(data), 777):
+            writer.write(data[offset:offset + 777])
+        writer.close()
+        return buffer.getvalue(), writer.metrics
+
+    def _read(self, raw, key=KEY, max_output=1024):
+        return b"".join(ChunkedBackupReader(io.BytesIO(raw), key, max_output))
+
+    def test_roundtrip(self):
+        """Testet Schreiben und Lesen mit und ohne Verschlüsselung."""
+        data = bytes(range(256)) * 200
+        for key in (KEY, None):
+            raw, metrics = self._write(data, key)
+            assert self._read(raw, key) == data
+            assert metrics.bytes_in == len(data)
+            assert metrics.bytes_out == len(raw)
+        assert data[:1024] not in raw
+
+    def test_output_is_bounded(self):
+        """Testet, dass stark komprimierte Daten nur in kleinen Stücken ausgegeben werden."""
+        raw, _ = self._write(bytes(5 * 1024 * 1024), chunk_size=64 * 1024)
+        blocks = list(ChunkedBackupReader(io.BytesIO(raw), KEY, max_output=4096))
+        assert sum(len(block) for block in blocks) == 5 * 1024 * 1024
+        assert max(len(block) for block in blocks) <= 4096
+
+    def test_tampering_is_detected(self):
+        """Testet, dass veränderte, abgeschnittene und falsch entschlüsselte Streams scheitern."""
+        data = bytes(range(256)) * 200
+        raw, _ = self._write(data)
+
+        tampered = bytearray(raw)
+        tampered[len(raw) // 2] ^= 0x01
+        with pytest.raises(DatabaseError):
+            self._read(bytes(tampered))
+        with pytest.raises(DatabaseError):
+            self._read(raw[:len(raw) - 40])
+        with pytest.raises(DatabaseError):
+            self._read(raw, derive_backup_key(b"falsch"))
+        with pytest.raises(DatabaseError):
+            self._read(raw, None)
+
+
+class TestBackupManager:
+    """Testfälle für Sicherung und Wiederherstellung."""
+
+    def test_backup_and_restore(self, manager):
+        """Testet ein verschlüsseltes Backup und dessen Wiederherstellung."""
+        events = []
+        backup_path = manager.create_full_backup(progress=lambda m: events.append(m.phase))
+
+        assert backup_path is not None and is_stream_backup(backup_path)
+        assert not db.is_closed()
+        assert {"snapshot", "stream", "done"} <= set(events)
+        metrics = manager.last_metrics
+        assert metrics.pages_copied == metrics.pages_total > 0
+        assert metrics.throughput_bytes_per_second > 0
+        assert metrics.compression_ratio > 1
+        assert [b["name"] for b in manager.list_backups()] == [backup_path.name]
+
+        AudioFile.delete().where(AudioFile.file_size < 100).execute()
+        AudioFile.create(file_id="neu", file_name="neu.mp3", file_size=1)
+
+        assert manager.restore_backup(backup_path, progress=lambda m: events.append(m.phase))
+        assert "apply" in events
+        assert AudioFile.select().count() == 500
+        assert AudioFile.get_or_none(AudioFile.file_id == "neu") is None
+        assert manager.get_backup_stats()["last_operation"]["operation"] == "restore"
+
+    def test_failed_restore_keeps_database(self, manager):
+        """Testet, dass ein beschädigtes Backup die Datenbank nicht verändert."""
+        backup_path = manager.create_full_backup()
+        raw = bytearray(backup_path.read_bytes())
+        raw[-10] ^= 0xFF
+        backup_path.write_bytes(bytes(raw))
+        AudioFile.create(file_id="neu", file_name="neu.mp3", file_size=1)
+
+        assert not manager.restore_backup(backup_path)
+        assert not manager.restore_backup(manager.create_full_backup(), decrypt=False)
+        assert AudioFile.select().count() == 501
+        assert not list(manager.backup_dir.parent.glob(".*.restore"))
+
+    def test_unencrypted_backup(self, manager):
+        """Testet ein unverschlüsseltes Backup."""
+        backup_path = manager.create_full_backup(encrypt=False)
+        AudioFile.delete().execute()
+        assert manager.restore_backup(backup_path, decrypt=False)
+        assert AudioFile.select().count() == 500
+
+    def test_writers_continue_during_backup(self, manager):
+        """Testet, dass Downloads während des Backups weiterschreiben können."""
+        manager.pages_per_step = 1
+        db.execute_sql("PRAGMA busy_timeout=0")
+        result = {}
+
+        thread = threading.Thread(target=lambda: result.update(path=manager.create_full_backup()))
+        thread.start()
+        writes = 0
+        while thread.is_alive():
+            AudioFile.create(file_id=f"live_{writes}", file_name="x.mp3", file_size=1)
+            writes += 1
+        thread.join()
+
+        assert writes > 0
+        assert result["path"] is not None
+        # Das Backup enthält den Stand zu Beginn des Snapshots
+        assert manager.restore_backup(result["path"])
+        assert 500 <= AudioFile.select().count() <= 500 + writes
+
+
+def _library_state():
+    """Liest alle Audiodateien und Gruppen der Modell-Datenbank."""
+    connection = db.connection()
+    return {
+        table: connection.execute(f"SELECT rowid, * FROM {table} ORDER BY rowid").fetchall()
+        for table in ("audio_files", "telegram_groups")
+    }
+
+
+def _assert_statistics_match_files():
+    """Prüft, dass die Statistiktabellen zum Inhalt von audio_files passen."""
+    connection = db.connection()
+    stored = connection.execute(
+        "SELECT status, file_count, total_bytes FROM status_statistics WHERE file_count > 0 ORDER BY status"
+    ).fetchall()
+    expected = connection.execute(
+        "SELECT COALESCE(status, ''), COUNT(*), COALESCE(SUM(file_size), 0) FROM audio_files "
+        "GROUP BY COALESCE(status, '') ORDER BY 1"
+    ).fetchall()
+    assert stored == expected
+
+
+@pytest.fixture
+def chain_db(manager):
+    """Stellt eine Datenbank mit Statistiktabellen für inkrementelle Backups bereit."""
+    from src.telegram_audio_downloader.database_statistics import ensure_statistics_tables
+
+    assert ensure_statistics_tables()
+    return manager
+
+
+class TestIncrementalBackups:
+    """Testfälle für inkrementelle Backups und Backup-Ketten."""
+
+    def test_first_backup_is_base(self, chain_db):
+        """Testet, dass der erste Aufruf eine Basis anlegt und danach nur Deltas folgen."""
+        base = chain_db.create_incremental_backup()
+        assert base.name.startswith("backup_full_")
+
+        AudioFile.update(file_size=AudioFile.file_size + 1).where(AudioFile.id <= 3).execute()
+        delta = chain_db.create_incremental_backup()
+        assert delta.name.startswith("backup_incremental_")
+
+        chain = chain_db.get_backup_chain()
+        assert chain["base"] == base.name
+        # Nur die drei Audiodateien; die Statistiktabellen werden nicht verfolgt
+        assert chain["deltas"][0]["changes"] == 3
+        assert delta.stat().st_size < base.stat().st_size / 10
+
+        # Ohne Änderungen entsteht kein neues Delta
+        assert chain_db.create_incremental_backup() == delta
+        assert chain_db.get_backup_stats()["chain_length"] == 1
+
+    def test_chain_restore_matches_live_state(self, chain_db):
+        """Testet, dass Basis plus Deltas exakt den gesicherten Stand ergeben."""
+        import random
+
+        rng = random.Random(3)
+        chain_db.create_incremental_backup()
+        groups = [TelegramGroup.create(group_id=i, title=f"Gruppe {i}") for i in range(3)]
+        states = []
+        for round_number in range(3):
+            for i in range(40):
+                action = rng.random()
+                if action < 0.4:
+                    AudioFile.update(status="completed", group=rng.choice(groups)).where(
+                        AudioFile.id == rng.randint(1, 500)
+                    ).execute()
+                elif action < 0.6:
+                    AudioFile.delete().where(AudioFile.id == rng.randint(1, 500)).execute()
+                else:
+                    AudioFile.create(
+                        file_id=f"r{round_number}_{i}", file_name="neu.mp3",
+                        file_size=rng.randint(1, 100), group=rng.choice(groups + [None]),
+                    )
+            states.append((chain_db.create_incremental_backup(), _library_state()))
+
+        AudioFile.delete().execute()
+        TelegramGroup.delete().execute()
+
+        assert chain_db.restore_incremental_backup()
+        assert _library_state() == states[-1][1]
+        _assert_statistics_match_files()
+
+        # Wiederherstellung eines älteren Stands der Kette
+        assert chain_db.restore_backup(states[0][0])
+        assert _library_state() == states[0][1]
+        _assert_statistics_match_files()
+
+    def test_compaction(self, chain_db):
+        """Testet das Verdichten einer Kette zu einer neuen Basis."""
+        old_base = chain_db.create_incremental_backup()
+        deltas = []
+        for i in range(3):
+            AudioFile.create(file_id=f"neu_{i}", file_name="neu.mp3", file_size=i)
+            deltas.append(chain_db.create_incremental_backup())
+
+        new_base = chain_db.compact_backup_chain()
+
+        chain = chain_db.get_backup_chain()
+        assert chain["base"] == new_base.name and chain["deltas"] == []
+        assert not old_base.exists() and not any(path.exists() for path in deltas)
+
+        AudioFile.create(file_id="danach", file_name="danach.mp3", file_size=1)
+        delta = chain_db.create_incremental_backup()
+        assert delta.name.startswith("backup_incremental_")
+        expected = _library_state()
+        AudioFile.delete().execute()
+        assert chain_db.restore_incremental_backup()
+        assert _library_state() == expected
+
+    def test_long_chain_is_compacted_automatically(self, chain_db):
+        """Testet die automatische Verdichtung bei Erreichen der maximalen Kettenlänge."""
+        chain_db.max_chain_length = 2
+        chain_db.create_incremental_backup()
+        for i in range(3):
+            AudioFile.create(file_id=f"neu_{i}", file_name="neu.mp3", file_size=i)
+            chain_db.create_incremental_backup()
+        assert len(chain_db.get_backup_chain()["deltas"]) == 1
+
+    def test_schema_change_and_restore_start_new_base(self, chain_db):
+        """Testet, dass Schemaänderungen und Wiederherstellungen eine neue Kette beginnen."""
+        first = chain_db.create_incremental_backup()
+        db.execute_sql("CREATE TABLE notizen (id INTEGER PRIMARY KEY, text TEXT)")
+        second = chain_db.create_incremental_backup()
+        assert second.name.startswith("backup_full_") and second != first
+
+        db.execute_sql("INSERT INTO notizen (text) VALUES ('a')")
+        delta = chain_db.create_incremental_backup()
+        assert delta.name.startswith("backup_incremental_")
+
+        assert chain_db.restore_backup(first)
+        assert chain_db.get_backup_chain()["sealed"]
+        assert chain_db.create_incremental_backup().name.startswith("backup_full_")
+
+    def test_statistics_tables_are_not_tracked(self, chain_db):
+        """Testet, dass Trigger früherer Versionen auf den Statistiktabellen entfernt werden."""
+        chain_db.create_incremental_backup()
+        connection = db.connection()
+        for _, sql in _triggers_sql("group_statistics"):
+            connection.execute(sql)
+        AudioFile.create(file_id="neu", file_name="neu.mp3", file_size=1)
+        assert connection.execute(
+            f"SELECT COUNT(*) FROM {CHANGE_LOG_TABLE} WHERE table_name = 'group_statistics'"
+        ).fetchone()[0] == 1
+
+        ensure_change_tracking(connection)
+
+        triggers = {name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        assert not {name for name in triggers if "statistics" in name and name.startswith("backup_changes_")}
+        assert connection.execute(
+            f"SELECT COUNT(*) FROM {CHANGE_LOG_TABLE} WHERE table_name LIKE '%statistics'"
+        ).fetchone()[0] == 0
+
+    def test_cleanup_keeps_current_chain(self, chain_db):
+        """Testet, dass die Bereinigung keine Dateien der aktuellen Kette löscht."""
+        chain_db.create_incremental_backup()
+        AudioFile.create(file_id="neu", file_name="neu.mp3", file_size=1)
+        chain_db.create_incremental_backup()
+        standalone = chain_db.create_full_backup()
+        chain_db.retention_days = -1
+
+        assert chain_db.cleanup_old_backups() == 1
+        assert not standalone.exists()
+        assert chain_db.restore_incremental_backup()
+
+
+class TestIncrementalBenchmark:
+    """Größen- und Zeitvergleich gegen vollständige Backups (nur mit --run-slow)."""
+
+    def test_incremental_benchmark(self, tmp_path):
+        """Vergleicht inkrementelle und vollständige Backups."""
+        from src.telegram_audio_downloader.database_backup import benchmark_incremental_backups
+
+        results = benchmark_incremental_backups(str(tmp_path), rows=20000, changed_rows=200)
+        assert results["incremental"]["bytes"] < results["full"]["bytes"] / 10
+        assert results["incremental"]["seconds"] < results["full"]["seconds"]
@@ -0,0 +1,145 @@
+"""
+Tests für das Datenbank-Caching im Telegram Audio Downloader.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.telegram_audio_downloader.database_caching import (
+    InMemoryCache,
+    ObjectCache,
+    QueryResultCache,
+    cache_database_query,
+    extract_query_tables,
+    get_cache_manager,
+)
+from src.telegram_audio_downloader.models import (
+    AudioFile,
+    TelegramGroup,
+    TrackedSqliteDatabase,
+    db,
+    write_generations,
+)
+
+
+@pytest.fixture
+def cache_db(model_db):
+    """Stellt eine temporäre Datenbank und einen leeren Cache bereit."""
+    model_db([TelegramGroup, AudioFile], "cache.db")
+    get_cache_manager().clear_all_caches()
+    return db.database
+
+
+class TestWriteGenerations:
+    """Testfälle für die Schreib-Generationen."""
+
+    def test_db_is_tracked(self):
+        """Testet, dass die Modelle die zählende Datenbank verwenden."""
+        assert isinstance(db, TrackedSqliteDatabase)
+
+    def test_orm_writes_bump_table_generation(self, cache_db):
+        """Testet, dass Einfügen, Ändern und Löschen die Generation erhöhen."""
+        before = write_generations.get("audio_files")
+        group_before = write_generations.get("telegram_groups")
+
+        audio = AudioFile.create(file_id="a", file_name="a.mp3", file_size=1)
+        audio.title = "Neu"
+        audio.save()
+        AudioFile.delete().where(AudioFile.id == audio.id).execute()
+
+        assert write_generations.get("audio_files") == before + 3
+        assert write_generations.get("telegram_groups") == group_before
+
+    def test_reads_do_not_bump(self, cache_db):
+        """Testet, dass Lesezugriffe die Generation nicht verändern."""
+        snapshot = write_generations.snapshot()
+        list(AudioFile.select())
+        assert write_generations.snapshot() == snapshot
+
+
+class TestCacheDatabaseQuery:
+    """Testfälle für den Dekorator cache_database_query."""
+
+    def test_cached_until_write(self, cache_db):
+        """Testet, dass Ergebnisse bis zum nächsten Schreibzugriff gecacht werden."""
+        calls = []
+
+        @cache_database_query(tables=("audio_files",))
+        def count_files():
+            calls.append(1)
+            return AudioFile.select().count()
+
+        assert count_files() == 0
+        assert count_files() == 0
+        assert len(calls) == 1
+
+        # Schreibzugriffe auf andere Tabellen lassen den Eintrag gültig
+        TelegramGroup.create(group_id=1, title="Gruppe")
+        assert count_files() == 0
+        assert len(calls) == 1
+
+        AudioFile.create(file_id="a", file_name="a.mp3", file_size=1)
+        assert count_files() == 1
+        assert len(calls) == 2
+
+        stats = get_cache_manager().get_cache_stats()["query_cache"]["functions"]
+        name = count_files.__qualname__
+        assert stats[name]["hits"] == 2
+        assert stats[name]["misses"] == 2
+        assert stats[name]["hit_rate_percent"] == 50.0
+
+    def test_external_commit_invalidates(self, cache_db):
+        """Testet, dass Commits anderer Verbindungen erkannt werden."""
+        calls = []
+
+        @cache_database_query(tables=("audio_files",))
+        def count_files():
+            calls.append(1)
+            return AudioFile.select().count()
+
+        assert count_files() == 0
+
+        other = sqlite3.connect(str(cache_db))
+        other.execute(
+            "INSERT INTO audio_files (file_id, file_name, file_size, status, downloaded_bytes, "
+            "checksum_verified, download_attempts, resume_offset, created_at, updated_at) "
+            "VALUES ('x', 'x.mp3', 1, 'pending', 0, 0, 0, 0, '2024-01-01', '2024-01-01')"
+        )
+        other.commit()
+        other.close()
+
+        assert count_files() == 1
+        assert len(calls) == 2
+
+
+class TestQueryAndObjectCache:
+    """Testfälle für QueryResultCache und ObjectCache."""
+
+    def test_extract_query_tables(self):
+        """Testet die Erkennung der gelesenen Tabellen."""
+        sql = 'SELECT * FROM "audio_files" AS t1 LEFT JOIN "telegram_groups" ON 1'
+        assert extract_query_tables(sql) == ["audio_files", "telegram_groups"]
+
+    def test_query_result_invalidated_by_write(self, cache_db):
+        """Testet, dass Abfrageergebnisse nach Schreibzugriffen nicht mehr getroffen werden."""
+        cache = QueryResultCache(InMemoryCache(default_ttl_seconds=0))
+        sql = 'SELECT COUNT(*) FROM "audio_files"'
+
+        cache.set_query_result(sql, (), 0)
+        assert cache.get_query_result(sql) == 0
+
+        AudioFile.create(file_id="a", file_name="a.mp3", file_size=1)
+        assert cache.get_query_result(sql) is None
+
+    def test_object_invalidated_by_write(self, cache_db):
+        """Testet, dass Objekte nach Schreibzugriffen auf ihre Tabelle ungültig werden."""
+        cache = ObjectCache(InMemoryCache(default_ttl_seconds=0))
+        cache.set_object("telegram_groups", "1", {"title": "Gruppe"})
+        assert cache.get_object("telegram_groups", "1") == {"title": "Gruppe"}
+
+        AudioFile.create(file_id="a", file_name="a.mp3", file_size=1)
+        assert cache.get_object("telegram_groups", "1") == {"title": "Gruppe"}
+
+        TelegramGroup.create(group_id=1, title="Gruppe")
+        assert cache.get_object("telegram_groups", "1") is None
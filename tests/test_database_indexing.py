@@ -0,0 +1,155 @@
+"""
+Tests für den workloadbasierten Index-Advisor im Telegram Audio Downloader.
+"""
+
+import pytest
+
+from src.telegram_audio_downloader.database_indexing import IndexAdvisor
+from src.telegram_audio_downloader.database_monitoring import (
+    DatabasePerformanceMonitor,
+    DatabaseQueryProfiler,
+)
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+
+
+@pytest.fixture
+def groups(model_db):
+    """Stellt eine Datenbank mit Gruppen und Audiodateien bereit."""
+    model_db([TelegramGroup, AudioFile], "indexing.db")
+
+    groups = [TelegramGroup.create(group_id=i, title=f"Gruppe {i}") for i in range(20)]
+    with db.atomic():
+        for i in range(3000):
+            AudioFile.create(
+                file_id=f"file_{i}",
+                file_name=f"song_{i}.mp3",
+                file_size=i,
+                status=("pending", "completed", "failed")[i % 3],
+                group=groups[i % 20],
+                message_id=i,
+            )
+
+    return groups
+
+
+def _index_names():
+    """Gibt die Namen aller Indizes der Datenbank zurück."""
+    return {row[0] for row in db.execute_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def _capture(queries, repeat=3):
+    """Führt Abfragen mit aktivem Profiling aus und gibt den Monitor zurück."""
+    profiler = DatabaseQueryProfiler(DatabasePerformanceMonitor())
+    profiler.enable_automatic_profiling()
+    try:
+        for _ in range(repeat):
+            for query in queries:
+                query()
+    finally:
+        profiler.disable_automatic_profiling()
+    return profiler.monitor
+
+
+def _recommendation(recommendations, columns):
+    """Gibt den Vorschlag mit den angegebenen Spalten zurück."""
+    return next(r for r in recommendations if r.columns == columns)
+
+
+class TestRecommendations:
+    """Testfälle für die Ableitung von Indexvorschlägen."""
+
+    def test_partial_index_becomes_composite(self, groups):
+        """Testet (status, group_id) für Zählabfragen, die nur group_id nutzen."""
+        monitor = _capture([
+            lambda: AudioFile.select().where(
+                (AudioFile.status == "pending") & (AudioFile.group == groups[0])
+            ).count(),
+        ])
+
+        recommendations = IndexAdvisor(monitor=monitor).recommend()
+
+        recommendation = _recommendation(recommendations, ["status", "group_id"])
+        assert recommendation.reasons == ["partial_index"]
+        assert recommendation.executions == 3
+        assert recommendation.cost_after < recommendation.cost_before
+        assert "COVERING INDEX idx_audio_files_status_group_id" in recommendation.plan_after[0]
+
+    def test_temp_b_tree_sort_is_removed(self, groups):
+        """Testet (group_id, message_id) für sortierte Abfragen je Gruppe."""
+        monitor = _capture([
+            lambda: list(AudioFile.select().where(AudioFile.group == groups[1])
+                         .order_by(AudioFile.message_id.desc()).limit(10)),
+        ])
+
+        recommendation = _recommendation(IndexAdvisor(monitor=monitor).recommend(), ["group_id", "message_id"])
+        assert "temp_b_tree" in recommendation.reasons
+        assert any("TEMP B-TREE" in line for line in recommendation.plan_before)
+        assert not any("TEMP B-TREE" in line for line in recommendation.plan_after)
+
+    def test_narrow_select_gets_covering_index(self, groups):
+        """Testet abdeckende Indizes für Abfragen mit wenigen Spalten."""
+        monitor = _capture([
+            lambda: list(AudioFile.select(AudioFile.file_id).where(AudioFile.status == "completed")
+                         .order_by(AudioFile.downloaded_at)),
+        ])
+
+        recommendations = IndexAdvisor(monitor=monitor).recommend()
+
+        recommendation = _recommendation(recommendations, ["status", "downloaded_at", "file_id"])
+        assert recommendation.covering
+        assert set(recommendation.reasons) == {"full_scan", "temp_b_tree"}
+        assert recommendation.improvement > 0.5
+
+    def test_unsupported_and_cold_statements_are_skipped(self, groups):
+        """Testet, dass OR-Abfragen und seltene Anweisungen ignoriert werden."""
+        monitor = _capture([
+            lambda: list(AudioFile.select().where(
+                (AudioFile.status == "failed") | (AudioFile.file_size > 10)
+            )),
+            lambda: AudioFile.get(AudioFile.file_id == "file_1"),
+        ])
+        advisor = IndexAdvisor(monitor=monitor)
+        assert advisor.recommend() == []
+
+        advisor.min_executions = 4
+        assert advisor.collect_workload() == []
+
+    def test_analyzed_database(self, groups):
+        """Testet die Bewertung mit Planer-Statistiken aus ANALYZE."""
+        db.execute_sql("ANALYZE")
+        workload = [(
+            'SELECT COUNT(*) FROM "audio_files" AS "t1" '
+            'WHERE (("t1"."status" = ?) AND ("t1"."group_id" = ?))',
+            10,
+        )]
+
+        recommendation = _recommendation(IndexAdvisor().recommend(workload), ["status", "group_id"])
+        assert recommendation.estimated_benefit > 0
+
+
+class TestApply:
+    """Testfälle für Dry-Run und Anlegen der Vorschläge."""
+
+    def test_dry_run_then_apply(self, groups):
+        """Testet, dass erst apply() Indizes anlegt und diese dann genutzt werden."""
+        queries = [
+            lambda: AudioFile.select().where(
+                (AudioFile.status == "pending") & (AudioFile.group == groups[2])
+            ).count(),
+            lambda: list(AudioFile.select().where(AudioFile.group == groups[2])
+                         .order_by(AudioFile.message_id.desc()).limit(5)),
+        ]
+        monitor = _capture(queries)
+        advisor = IndexAdvisor(monitor=monitor)
+        before = _index_names()
+
+        recommendations = advisor.recommend()
+        assert len(recommendations) == 2
+        assert _index_names() == before
+
+        applied = advisor.apply(recommendations)
+        assert all(r.applied for r in applied)
+        assert {r.index_name for r in applied} == _index_names() - before
+
+        # Mit den neuen Indizes gibt es nichts mehr vorzuschlagen
+        assert IndexAdvisor(monitor=_capture(queries)).recommend() == []
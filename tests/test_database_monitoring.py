@@ -0,0 +1,116 @@
+"""
+Tests für das automatische Abfrage-Profiling im Telegram Audio Downloader.
+"""
+
+import pytest
+
+from src.telegram_audio_downloader.database_monitoring import (
+    DatabasePerformanceMonitor,
+    DatabaseQueryProfiler,
+    LatencyHistogram,
+    normalize_query,
+)
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+
+
+@pytest.fixture
+def profiler(model_db):
+    """Stellt eine Datenbank mit aktivem automatischem Profiling bereit."""
+    model_db([TelegramGroup, AudioFile], "profiling.db")
+    for i in range(50):
+        AudioFile.create(file_id=f"file_{i}", file_name=f"song_{i}.mp3", file_size=i)
+
+    profiler = DatabaseQueryProfiler(DatabasePerformanceMonitor())
+    profiler.enable_automatic_profiling()
+
+    yield profiler
+
+    profiler.disable_automatic_profiling()
+
+
+def _stats_for(profiler, prefix):
+    """Gibt die Statistik des ersten Fingerabdrucks mit dem Präfix zurück."""
+    return next(
+        stats for fingerprint, stats in profiler.monitor.fingerprint_stats.items()
+        if fingerprint.startswith(prefix)
+    )
+
+
+class TestNormalization:
+    """Testfälle für Fingerabdrücke und Histogramme."""
+
+    def test_literals_and_lists_are_normalized(self):
+        """Testet, dass sich nur in Werten unterscheidende Anweisungen zusammenfallen."""
+        first = normalize_query("SELECT * FROM t WHERE a = 'x''y' AND b IN (?, ?, ?) LIMIT 10")
+        second = normalize_query("SELECT *  FROM t\nWHERE a = 'z' AND b IN (?) LIMIT 5")
+        assert first == second == "SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?"
+        assert normalize_query("INSERT INTO t1 (a) VALUES (?), (?), (?)") == "INSERT INTO t1 (a) VALUES (...)"
+
+    def test_histogram_percentiles(self):
+        """Testet die Perzentil-Schätzung des Latenz-Histogramms."""
+        histogram = LatencyHistogram()
+        for value in [0.05] * 90 + [7.0] * 9 + [20000.0]:
+            histogram.record(value)
+        assert histogram.percentile(50) == 0.1
+        assert histogram.percentile(95) == 10.0
+        assert histogram.percentile(100) == 5000.0
+        assert histogram.to_dict() == {"<=0.1ms": 90, "<=10ms": 9, ">5000ms": 1}
+
+
+class TestAutomaticProfiling:
+    """Testfälle für das Profiling über TrackedSqliteDatabase."""
+
+    def test_peewee_queries_are_recorded(self, profiler):
+        """Testet Fingerabdrücke und Zeilenzahlen gewöhnlicher Modellabfragen."""
+        for size in (10, 20, 30):
+            list(AudioFile.select().where(AudioFile.file_size < size))
+        AudioFile.update(status="completed").where(AudioFile.file_size < 5).execute()
+
+        select = _stats_for(profiler, 'SELECT "t1"."id"')
+        assert select.count == 3
+        assert select.rows == 10 + 20 + 30
+        update = _stats_for(profiler, "UPDATE")
+        assert update.rows == 5
+
+        analysis = profiler.monitor.get_query_analysis(top_n=2)
+        assert len(analysis["top_queries"]) == 2
+        assert analysis["top_queries"][0]["total_time_ms"] >= analysis["top_queries"][1]["total_time_ms"]
+
+    def test_slow_queries_capture_plan(self, profiler):
+        """Testet die Erfassung von EXPLAIN QUERY PLAN für langsame Anweisungen."""
+        profiler.monitor.slow_query_threshold_ms = 0.0
+        AudioFile.get(AudioFile.file_id == "file_3")
+        list(AudioFile.select().where(AudioFile.file_size > 3))
+
+        plans = {
+            stats.fingerprint: stats.query_plan
+            for stats in profiler.monitor.fingerprint_stats.values()
+            if stats.query_plan
+        }
+        assert any("USING INDEX" in line for plan in plans.values() for line in plan)
+        assert any("SCAN" in line for plan in plans.values() for line in plan)
+        assert profiler.monitor.index_usage_stats
+
+    def test_sampling(self, profiler):
+        """Testet, dass nur ein Teil der Anweisungen aufgezeichnet wird."""
+        profiler.enable_automatic_profiling(sample_rate=0.0)
+        for _ in range(20):
+            AudioFile.select().count()
+        assert profiler.monitor.total_queries == 0
+
+        profiler.monitor.slow_query_threshold_ms = 0.0
+        AudioFile.select().count()
+        assert profiler.monitor.total_queries == 1
+
+    def test_errors_are_recorded(self, profiler):
+        """Testet, dass fehlerhafte Anweisungen gezählt und weitergereicht werden."""
+        with pytest.raises(Exception):
+            db.execute_sql("SELECT * FROM gibt_es_nicht WHERE id = 7")
+        assert _stats_for(profiler, "SELECT * FROM gibt_es_nicht").errors == 1
+
+    def test_disable_restores_plain_execution(self, profiler):
+        """Testet, dass nach dem Deaktivieren nichts mehr aufgezeichnet wird."""
+        profiler.disable_automatic_profiling()
+        AudioFile.select().count()
+        assert profiler.monitor.total_queries == 0
+        assert db.query_observer is None
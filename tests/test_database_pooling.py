@@ -0,0 +1,180 @@
+"""
+Tests für den asynchronen Datenbank-Verbindungspool.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.telegram_audio_downloader.database_pooling import (
+    AsyncConnectionPool,
+    AsyncDatabasePool,
+    PoolTimeoutError,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Gibt den Pfad einer temporären Datenbank zurück."""
+    return str(tmp_path / "pool.db")
+
+
+async def _prepare(pool):
+    """Legt eine Testtabelle mit einigen Zeilen an."""
+    await pool.open()
+    await pool.execute_write("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    for i in range(5):
+        await pool.execute_write("INSERT INTO items (name) VALUES (?)", (f"item_{i}",))
+
+
+class TestAsyncDatabasePool:
+    """Testfälle für getrennte Lese- und Schreibpools."""
+
+    @pytest.mark.asyncio
+    async def test_readers_and_writer(self, db_path):
+        """Testet WAL, parallele Leser und schreibgeschützte Leseverbindungen."""
+        pool = AsyncDatabasePool(db_path, max_readers=3)
+        try:
+            await _prepare(pool)
+
+            results = await asyncio.gather(*[pool.fetch_all("SELECT COUNT(*) FROM items") for _ in range(10)])
+            assert all(rows == [(5,)] for rows in results)
+            assert await pool.fetch_all("PRAGMA journal_mode") == [("wal",)]
+
+            async with pool.read() as conn:
+                with pytest.raises(Exception, match="readonly|query_only"):
+                    await conn.execute("DELETE FROM items")
+
+            metrics = pool.get_metrics()
+            assert metrics["read"]["open_connections"] <= 3
+            assert metrics["write"]["open_connections"] == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_connection_keeps_its_thread(self, db_path):
+        """Testet, dass eine Verbindung immer auf demselben Thread ausgeführt wird."""
+        pool = AsyncDatabasePool(db_path, max_readers=1)
+        try:
+            await _prepare(pool)
+            async with pool.read() as conn:
+                first = await conn.run(lambda database: threading.get_ident())
+                second = await conn.run(lambda database: threading.get_ident())
+            assert first == second != threading.get_ident()
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_open_transaction_is_rolled_back(self, db_path):
+        """Testet, dass offene Transaktionen bei der Rückgabe verworfen werden."""
+        pool = AsyncDatabasePool(db_path)
+        try:
+            await _prepare(pool)
+            async with pool.write() as conn:
+                await conn.execute("BEGIN")
+                await conn.execute("DELETE FROM items")
+
+            assert await pool.fetch_all("SELECT COUNT(*) FROM items") == [(5,)]
+        finally:
+            await pool.close()
+
+
+class TestCheckout:
+    """Testfälle für Wartezeit, Timeout und Kennzahlen."""
+
+    @pytest.mark.asyncio
+    async def test_timeout_does_not_block_event_loop(self, db_path):
+        """Testet das Warten auf eine Verbindung ohne Blockieren der Schleife."""
+        pool = AsyncConnectionPool(db_path, max_connections=1, checkout_timeout=0.2)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        try:
+            async with pool.acquire():
+                with pytest.raises(PoolTimeoutError):
+                    async with pool.acquire():
+                        pass
+            assert ticks >= 10
+        finally:
+            task.cancel()
+            await pool.close()
+
+        metrics = pool.get_metrics()
+        assert metrics["timeouts"] == 1
+        assert metrics["checkouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_get_released_connections(self, db_path):
+        """Testet Wartezeiten und Auslastung bei mehr Aufrufern als Verbindungen."""
+        pool = AsyncConnectionPool(db_path, max_connections=2, checkout_timeout=5.0)
+
+        async def work():
+            async with pool.acquire() as conn:
+                await conn.run(lambda database: threading.Event().wait(0.05))
+
+        try:
+            await asyncio.gather(*[work() for _ in range(6)])
+            metrics = pool.get_metrics()
+        finally:
+            await pool.close()
+
+        assert metrics["checkouts"] == 6
+        assert metrics["connections_opened"] == 2
+        assert metrics["max_wait_time"] >= 0.05
+        assert metrics["utilization"] > 0.5
+
+    @pytest.mark.asyncio
+    async def test_expired_connections_are_replaced(self, db_path):
+        """Testet das Ersetzen alter Verbindungen und die Wechselrate."""
+        pool = AsyncConnectionPool(db_path, max_connections=1, max_connection_age=0.0)
+        try:
+            for _ in range(3):
+                async with pool.acquire() as conn:
+                    assert await conn.execute("SELECT 1") == [(1,)]
+            metrics = pool.get_metrics()
+        finally:
+            await pool.close()
+
+        assert metrics["connections_opened"] == 4
+        assert metrics["connections_closed"] == 3
+        assert metrics["open_connections"] == 1
+        assert metrics["churn_per_minute"] > 0
+
+    @pytest.mark.asyncio
+    async def test_replacement_keeps_connection_limit(self, db_path):
+        """Testet, dass ein Aufrufer während des Ersetzens keine zusätzliche Verbindung öffnet."""
+        pool = AsyncConnectionPool(db_path, max_connections=1, max_connection_age=0.0)
+        replacing = asyncio.Event()
+        discard = pool._discard
+
+        async def discard_and_signal(conn):
+            replacing.set()
+            await discard(conn)
+
+        pool._discard = discard_and_signal
+
+        async def expiring():
+            async with pool.acquire() as conn:
+                await conn.execute("SELECT 1")
+
+        async def arriving_during_replacement():
+            await replacing.wait()
+            async with pool.acquire() as conn:
+                return len(pool._connections)
+
+        try:
+            _, open_connections = await asyncio.gather(expiring(), arriving_during_replacement())
+            metrics = pool.get_metrics()
+        finally:
+            await pool.close()
+
+        assert open_connections == 1
+        assert metrics["open_connections"] == 1
+        assert metrics["waiting"] == 0
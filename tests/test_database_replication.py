@@ -0,0 +1,192 @@
+"""
+Tests für die Datenbank-Replikation im Telegram Audio Downloader.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.telegram_audio_downloader import database_replication
+from src.telegram_audio_downloader.advanced_search import AdvancedSearchEngine, SearchQuery
+from src.telegram_audio_downloader.database_caching import clear_all_database_caches
+from src.telegram_audio_downloader.database_replication import (
+    DatabaseReplicator,
+    ReadReplicaRouter,
+    read_from_replica,
+)
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db, write_generations
+
+
+@pytest.fixture
+def master_db(model_db):
+    """Stellt eine Master-Datenbank im WAL-Modus mit Beispieldaten bereit."""
+    model_db([TelegramGroup, AudioFile], "master.db", pragmas={"journal_mode": "wal"})
+    for i in range(20):
+        AudioFile.create(file_id=f"file_{i}", file_name=f"song_{i}.mp3", file_size=i)
+
+    return db.database
+
+
+@pytest.fixture
+def replicator(master_db, tmp_path):
+    """Erstellt einen Replikator mit zwei Replikas."""
+    replicator = DatabaseReplicator(str(master_db))
+    replicator.add_replica("replica_a", "localhost", 0, str(tmp_path / "replicas" / "a.db"))
+    replicator.add_replica("replica_b", "localhost", 0, str(tmp_path / "replicas" / "b.db"))
+    yield replicator
+    replicator.stop_replication()
+
+
+def _count(database):
+    """Zählt die Audiodateien in einer Datenbank."""
+    return AudioFile.select().bind(database).count()
+
+
+class TestReplication:
+    """Testfälle für das Auffrischen der Replikas."""
+
+    def test_replicas_receive_consistent_copy(self, replicator):
+        """Testet, dass die Replikas per Backup-API befüllt werden."""
+        replicator._perform_replication()
+
+        for replica in replicator.replicas.values():
+            assert replica.sync_count == 1
+            assert replica.pages_copied > 0
+            assert replica.sync_lag_seconds == 0.0
+
+        router = ReadReplicaRouter(replicator)
+        assert router.read(_count) == 20
+        # Die globale Verbindung bleibt während der Replikation geöffnet
+        assert not db.is_closed()
+
+    def test_unchanged_master_is_not_copied(self, replicator):
+        """Testet, dass unveränderte Daten nicht erneut kopiert werden."""
+        replicator._perform_replication()
+        replicator._perform_replication()
+        assert {r.sync_count for r in replicator.replicas.values()} == {1}
+
+        AudioFile.create(file_id="neu", file_name="neu.mp3", file_size=1)
+        replicator._perform_replication()
+        assert {r.sync_count for r in replicator.replicas.values()} == {2}
+
+    def test_lag_tracks_unreplicated_commits(self, replicator):
+        """Testet, dass der Lag ab dem ersten nicht replizierten Commit wächst."""
+        replicator._perform_replication()
+
+        AudioFile.create(file_id="neu", file_name="neu.mp3", file_size=1)
+        replicator.observe_master()
+        time.sleep(0.05)
+        replicator.observe_master()
+        lag = replicator.replicas["replica_a"].sync_lag_seconds
+        assert lag >= 0.05
+
+        replicator._perform_replication()
+        assert replicator.replicas["replica_a"].sync_lag_seconds == 0.0
+        status = replicator.get_replication_status()
+        assert status["replicas"][0]["replicated_version"] == status["master_version"]
+
+    def test_writers_are_not_blocked(self, replicator):
+        """Testet, dass Schreibzugriffe während eines schrittweisen Backups nicht warten."""
+        for i in range(2000):
+            AudioFile.create(file_id=f"bulk_{i}", file_name="x" * 200, file_size=i)
+        replicator.backup_pages_per_step = 1
+        replicator.backup_step_pause = 0.001
+        db.execute_sql("PRAGMA busy_timeout=0")
+
+        errors = []
+        thread = threading.Thread(target=replicator._perform_replication)
+        thread.start()
+        writes = 0
+        while thread.is_alive():
+            try:
+                AudioFile.update(file_size=AudioFile.file_size + 1).where(
+                    AudioFile.file_id == "file_0"
+                ).execute()
+                writes += 1
+            except Exception as e:
+                errors.append(e)
+        thread.join()
+
+        assert writes > 0
+        assert not errors
+        assert all(r.sync_count == 1 for r in replicator.replicas.values())
+
+
+class TestReadReplicaRouter:
+    """Testfälle für die Auswahl der Lese-Replika."""
+
+    def test_least_lag_selection(self, replicator):
+        """Testet, dass die Replika mit dem geringsten Lag gewählt wird."""
+        replicator._perform_replication()
+        AudioFile.create(file_id="neu", file_name="neu.mp3", file_size=1)
+        replicator.observe_master()
+        time.sleep(0.01)
+
+        # Nur Replika B wird aufgefrischt
+        replicator.disable_replica("replica_a")
+        replicator._perform_replication()
+        replicator.enable_replica("replica_a")
+
+        router = ReadReplicaRouter(replicator)
+        assert {router.get_read_replica().replica_id for _ in range(4)} == {"replica_b"}
+        assert router.read(_count) == 21
+
+    def test_max_lag_falls_back_to_master(self, replicator):
+        """Testet den Fallback auf den Master bei zu großem Lag."""
+        replicator._perform_replication()
+        AudioFile.create(file_id="neu", file_name="neu.mp3", file_size=1)
+        replicator.observe_master()
+        time.sleep(0.02)
+
+        router = ReadReplicaRouter(replicator, max_lag_seconds=0.01)
+        assert router.get_read_replica() is None
+        assert router.read(_count) == 21
+        assert router.read_stats["master"] == 1
+
+        # Ohne Lag-Grenze liefert die Replika den replizierten Stand
+        assert ReadReplicaRouter(replicator).read(_count) == 20
+
+    def test_without_replicas_reads_master(self, master_db):
+        """Testet, dass ohne Replikas direkt der Master gelesen wird."""
+        router = ReadReplicaRouter(DatabaseReplicator(str(master_db)))
+        assert router.read(_count) == 20
+
+    def test_replica_error_falls_back_to_master(self, replicator, tmp_path):
+        """Testet den Fallback auf den Master, wenn die Replika nicht lesbar ist."""
+        replicator._perform_replication()
+        (tmp_path / "replicas" / "a.db").write_bytes(b"kaputt")
+        (tmp_path / "replicas" / "b.db").write_bytes(b"kaputt")
+
+        router = ReadReplicaRouter(replicator)
+        assert router.read(_count) == 20
+        assert router.read_stats["master"] == 1
+
+    def test_search_falls_back_to_master_on_replica_error(self, replicator, tmp_path, monkeypatch):
+        """Testet, dass die Suche nach einem Replika-Fehler vom Master beantwortet wird."""
+        replicator._perform_replication()
+        (tmp_path / "replicas" / "a.db").write_bytes(b"kaputt")
+        (tmp_path / "replicas" / "b.db").write_bytes(b"kaputt")
+        router = ReadReplicaRouter(replicator)
+        monkeypatch.setattr(database_replication, "_read_router", router)
+        clear_all_database_caches()
+
+        results = AdvancedSearchEngine()._query_downloaded_files(SearchQuery(terms=["song_7"]))
+
+        assert [audio.file_id for audio in results] == ["file_7"]
+        assert router.read_stats["master"] == 1
+
+    def test_read_from_replica_uses_global_router(self, replicator, monkeypatch):
+        """Testet, dass Lesezugriffe der Anwendung über den globalen Router laufen."""
+        replicator._perform_replication()
+        router = ReadReplicaRouter(replicator)
+        monkeypatch.setattr(database_replication, "_read_router", router)
+
+        generation = write_generations.snapshot()
+        replicator.replicas["replica_a"].replicated_version = -1
+        replicator._perform_replication()
+        # Das Auffrischen einer Replika verwirft zwischengespeicherte Leseergebnisse
+        assert write_generations.snapshot() != generation
+
+        assert read_from_replica(_count) == 20
+        assert sum(count for name, count in router.read_stats.items() if name != "master") == 1
@@ -0,0 +1,333 @@
+"""
+Tests für das Datenbank-Sharding im Telegram Audio Downloader.
+"""
+
+import threading
+
+import pytest
+
+from src.telegram_audio_downloader import database as database_module
+from src.telegram_audio_downloader import database_scaling
+from src.telegram_audio_downloader.advanced_search import AdvancedSearchEngine, SearchQuery, SearchType
+from src.telegram_audio_downloader.config import Config
+from src.telegram_audio_downloader.database_scaling import (
+    SHARD_BY_FILE_ID,
+    SHARD_ID_OFFSET_BITS,
+    DatabaseSharder,
+    benchmark_shard_write_throughput,
+    enable_configured_sharding,
+    find_audio_file,
+    shard_id_base,
+)
+from src.telegram_audio_downloader.database_statistics import get_group_statistics, get_library_statistics
+from src.telegram_audio_downloader.downloader import AudioDownloader
+from src.telegram_audio_downloader.error_handling import DatabaseError
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+from src.telegram_audio_downloader.search import search_downloaded_files
+
+
+@pytest.fixture
+def main_db(model_db):
+    """Stellt eine temporäre Hauptdatenbank mit Beispieldaten bereit."""
+    model_db([TelegramGroup, AudioFile], "main.db")
+
+    groups = [TelegramGroup.create(group_id=100 + i, title=f"Gruppe {i}") for i in range(6)]
+    for i in range(60):
+        AudioFile.create(
+            file_id=f"file_{i}",
+            file_name=f"song_{i}.mp3",
+            title=f"Song {i}",
+            file_size=1000 + i,
+            status="completed" if i % 3 == 0 else "pending",
+            group=groups[i % 6],
+        )
+
+    return groups
+
+
+@pytest.fixture
+def sharder(tmp_path):
+    """Erstellt einen Sharder mit drei Shards."""
+    sharder = DatabaseSharder(batch_size=7)
+    sharder.create_uniform_shards(str(tmp_path / "shards"), 3)
+    yield sharder
+    sharder.close()
+
+
+def _read_all(sharder):
+    """Gibt alle Zeilen aller Shards zurück."""
+    rows = []
+    for shard in sharder.shards.values():
+        rows.extend(sharder.get_connection(shard).audio_model.select().dicts())
+    return rows
+
+
+def _shard_contents(sharder):
+    """Gibt die file_ids pro Shard zurück."""
+    contents = {}
+    for shard in sharder.shards.values():
+        model = sharder.get_connection(shard).audio_model
+        contents[shard.shard_id] = {row.file_id for row in model.select(model.file_id)}
+    return contents
+
+
+class TestRouting:
+    """Testfälle für das Routing von Audiodateien."""
+
+    def test_uniform_shards_cover_key_space(self, sharder):
+        """Testet, dass die Shards den gesamten Schlüsselraum abdecken."""
+        ranges = sorted(shard.shard_key_range for shard in sharder.shards.values())
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == 0xFFFF
+        for (_, upper), (lower, _) in zip(ranges, ranges[1:]):
+            assert lower == upper + 1
+
+    def test_group_files_share_a_shard(self, sharder):
+        """Testet, dass alle Dateien einer Gruppe im selben Shard landen."""
+        group = TelegramGroup(group_id=4711, title="Gruppe")
+        shards = {sharder.get_shard_for_audio_file(f"f{i}", group.group_id).shard_id for i in range(20)}
+        assert len(shards) == 1
+
+    def test_route_writes_to_shard(self, sharder, main_db):
+        """Testet, dass gespeicherte Instanzen in der Shard-Datei landen."""
+        group = main_db[0]
+        model, shard_group = sharder.route_audio_file("neu", group)
+
+        audio_file = model.create(file_id="neu", file_name="neu.mp3", file_size=1, group=shard_group)
+        audio_file.status = "completed"
+        audio_file.save()
+
+        assert isinstance(audio_file, AudioFile)
+        assert AudioFile.get_or_none(AudioFile.file_id == "neu") is None
+        found = sharder.find_audio_file("neu")
+        assert found.status == "completed"
+        assert found.group.group_id == group.group_id
+        assert list(sharder.iter_completed_file_ids()) == ["neu"]
+
+    def test_downloader_enables_configured_shards(self, main_db, tmp_path, monkeypatch):
+        """Testet, dass der Downloader die konfigurierten Shards einrichtet und verwendet."""
+        monkeypatch.setattr(database_scaling, "_scaling_manager", None)
+        # Der Downloader soll die Testdatenbank verwenden
+        monkeypatch.setattr(database_module, "init_db", lambda db_path=None: db)
+        config = Config()
+        config.config.set("performance", "shard_count", "2")
+        config.config.set("performance", "shard_dir", str(tmp_path / "shards"))
+
+        downloader = AudioDownloader(download_dir=str(tmp_path / "downloads"), config=config)
+        try:
+            model, shard_group = downloader._route_audio_file("neu", main_db[0])
+            assert downloader._is_sharding_active()
+            assert model is not AudioFile and model._meta.database is not db
+            assert shard_group.group_id == main_db[0].group_id
+
+            # Vorhandene Zeilen liegen jetzt in den Shards und gelten weiter als heruntergeladen
+            assert AudioFile.select().count() == 0
+            assert len(set(downloader.shard_router.iter_completed_file_ids())) == 20
+            assert downloader._downloaded_files_cache.get("file_0")
+            assert not downloader._downloaded_files_cache.get("file_1")
+        finally:
+            downloader.shard_router.close()
+
+    def test_route_without_shards_raises(self):
+        """Testet den Fehler bei fehlender Shard-Konfiguration."""
+        sharder = DatabaseSharder(shard_by=SHARD_BY_FILE_ID)
+        with pytest.raises(DatabaseError):
+            sharder.route_audio_file("x")
+        with pytest.raises(DatabaseError):
+            sharder.enable_sharding()
+
+    def test_concurrent_writers(self, sharder):
+        """Testet parallele Schreibzugriffe aus mehreren Threads."""
+        groups = [TelegramGroup(group_id=i, title=f"Gruppe {i}") for i in range(8)]
+
+        def write(writer):
+            for i in range(25):
+                group = groups[(writer + i) % len(groups)]
+                model, shard_group = sharder.route_audio_file(f"{writer}_{i}", group)
+                model.create(file_id=f"{writer}_{i}", file_name="x.mp3", file_size=i, group=shard_group)
+            sharder.close()
+
+        threads = [threading.Thread(target=write, args=(writer,)) for writer in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(len(file_ids) for file_ids in _shard_contents(sharder).values()) == 100
+
+
+class TestDistributionAndRebalancing:
+    """Testfälle für das Verteilen und Umverteilen von Daten."""
+
+    def test_distribute_moves_rows(self, sharder, main_db):
+        """Testet, dass vorhandene Daten tatsächlich in die Shards geschrieben werden."""
+        stats = sharder.distribute_existing_data(delete_source=True)
+
+        assert sum(stats.values()) == 60
+        assert AudioFile.select().count() == 0
+        contents = _shard_contents(sharder)
+        assert sum(len(file_ids) for file_ids in contents.values()) == 60
+        assert sum(shard["record_count"] for shard in sharder.get_shard_statistics()) == 60
+
+        # Jede Datei liegt in dem Shard, den das Routing bestimmt
+        for shard_id, file_ids in contents.items():
+            for file_id in file_ids:
+                group_id = 100 + int(file_id.split("_")[1]) % 6
+                assert sharder.get_shard_for_audio_file(file_id, group_id).shard_id == shard_id
+
+    def test_distribute_keeps_rows_without_shard(self, main_db, tmp_path):
+        """Testet, dass Zeilen ohne zuständigen Shard nicht gelöscht werden."""
+        sharder = DatabaseSharder(batch_size=7)
+        sharder.add_shard("shard_000", (0, 0x7FFF), str(tmp_path / "half.db"))
+        try:
+            stats = sharder.distribute_existing_data(delete_source=True)
+            remaining = {audio.file_id for audio in AudioFile.select(AudioFile.file_id)}
+            moved = set().union(*_shard_contents(sharder).values())
+        finally:
+            sharder.close()
+
+        assert 0 < sum(stats.values()) < 60
+        assert remaining and not remaining & moved
+        assert len(remaining) + len(moved) == 60
+
+    def test_distribute_is_idempotent(self, sharder, main_db):
+        """Testet, dass wiederholtes Verteilen keine Duplikate erzeugt."""
+        sharder.distribute_existing_data()
+        sharder.distribute_existing_data()
+        assert sum(len(ids) for ids in _shard_contents(sharder).values()) == 60
+        assert AudioFile.select().count() == 60
+
+    def test_rebalance_after_resharding(self, sharder, main_db, tmp_path):
+        """Testet das Umverteilen nach einer Änderung der Shard-Anzahl."""
+        sharder.distribute_existing_data()
+        sharder.create_uniform_shards(str(tmp_path / "shards"), 5)
+
+        moved = sharder.rebalance(batch_size=4)
+
+        contents = _shard_contents(sharder)
+        assert sum(len(ids) for ids in contents.values()) == 60
+        assert sum(moved.values()) > 0
+        for shard_id, file_ids in contents.items():
+            for file_id in file_ids:
+                group_id = 100 + int(file_id.split("_")[1]) % 6
+                assert sharder.get_shard_for_audio_file(file_id, group_id).shard_id == shard_id
+
+    def test_shrinking_drains_inactive_shards(self, sharder, main_db, tmp_path):
+        """Testet, dass nicht mehr benötigte Shards geleert werden."""
+        sharder.distribute_existing_data()
+        sharder.create_uniform_shards(str(tmp_path / "shards"), 1)
+        sharder.rebalance()
+
+        contents = _shard_contents(sharder)
+        assert len(contents["shard_000"]) == 60
+        assert not contents["shard_001"] and not contents["shard_002"]
+
+
+@pytest.fixture
+def active_sharder(tmp_path, monkeypatch):
+    """Aktiviert das Sharding des globalen Scaling-Managers mit drei Shards."""
+    monkeypatch.setattr(database_scaling, "_scaling_manager", None)
+    sharder = database_scaling.get_scaling_manager().sharder
+    yield sharder
+    sharder.close()
+
+
+class TestShardedReads:
+    """Testfälle für Lesezugriffe, die bei aktivem Sharding die Shards einbeziehen."""
+
+    def test_ids_are_unique_across_databases(self, active_sharder, main_db, tmp_path):
+        """Testet, dass Shard-Zeilen eindeutige ids und die Gruppen-Primärschlüssel der Hauptdatenbank tragen."""
+        assert enable_configured_sharding(3, str(tmp_path / "shards"), distribute_existing=True)
+        group_keys = {group.group_id: group.id for group in TelegramGroup.select()}
+
+        # Neue Zeilen der Hauptdatenbank dürfen keine id eines Shards wiederverwenden
+        AudioFile.create(file_id="main", file_name="main.mp3", file_size=1, group=main_db[0])
+
+        ids = [AudioFile.select().get().id]
+        for shard in active_sharder.shards.values():
+            connection = active_sharder.get_connection(shard)
+            base = shard_id_base(shard.shard_id)
+            for row in connection.audio_model.select().join(connection.group_model).dicts():
+                assert base <= row["id"] < base + (1 << SHARD_ID_OFFSET_BITS)
+                ids.append(row["id"])
+            for group in connection.group_model.select():
+                assert group.id == group_keys[group.group_id]
+        assert len(ids) == len(set(ids)) == 61
+
+        # Beim Umverteilen zwischen Shards bleibt die id erhalten
+        before = {row["file_id"]: row["id"] for row in _read_all(active_sharder)}
+        active_sharder.create_uniform_shards(str(tmp_path / "shards"), 5)
+        assert sum(active_sharder.rebalance().values()) > 0
+        assert {row["file_id"]: row["id"] for row in _read_all(active_sharder)} == before
+
+    def test_search_reads_shards(self, active_sharder, main_db, tmp_path):
+        """Testet, dass Suche und Facetten die Dateien in den Shards finden."""
+        enable_configured_sharding(3, str(tmp_path / "shards"), distribute_existing=True)
+        assert AudioFile.select().count() == 0
+
+        engine = AdvancedSearchEngine(suggestion_index_path=tmp_path / "suggestions.json")
+        query = SearchQuery(terms=["Song 1"], search_type=SearchType.DOWNLOADED_FILES)
+        titles = sorted(item.title for item in engine.search(query).items)
+        assert titles == ["Song 1"] + [f"Song {i}" for i in range(10, 20)]
+
+        facets = engine.get_faceted_search_results(SearchQuery(search_type=SearchType.DOWNLOADED_FILES))
+        assert facets["status"] == {"completed": 20, "pending": 40}
+        assert sum(facets["groups"].values()) == 60
+
+        assert len(search_downloaded_files("Song 1")) == 11
+        assert len(search_downloaded_files()) == 20
+
+    def test_statistics_include_shards(self, active_sharder, main_db, tmp_path):
+        """Testet, dass die Statistik die Shards einbezieht und nichts doppelt zählt."""
+        enable_configured_sharding(3, str(tmp_path / "shards"), distribute_existing=True)
+        enable_configured_sharding(3, str(tmp_path / "shards"), distribute_existing=True)
+        AudioFile.create(file_id="main", file_name="main.mp3", file_size=1, group=main_db[0])
+
+        library = get_library_statistics()
+        assert library["total_files"] == 61
+        assert library["status_distribution"] == {"completed": 20, "pending": 41}
+        assert library["total_bytes"] == sum(1000 + i for i in range(60)) + 1
+
+        groups = get_group_statistics()
+        assert [group["group_id"] for group in groups] == [100 + i for i in range(6)]
+        assert [group["file_count"] for group in groups] == [11, 10, 10, 10, 10, 10]
+
+        assert get_library_statistics(include_shards=False)["total_files"] == 1
+
+    def test_api_reads_shards(self, active_sharder, main_db, tmp_path):
+        """Testet, dass die Datenbank-API Hauptdatenbank und Shards zusammenführt."""
+        database_api = pytest.importorskip("src.telegram_audio_downloader.database_api")
+        enable_configured_sharding(3, str(tmp_path / "shards"), distribute_existing=True)
+        AudioFile.create(file_id="main", file_name="main.mp3", file_size=1, group=main_db[0])
+
+        rows = database_api.list_audio_file_rows()
+        assert len(rows) == 61
+        assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+        assert database_api.list_audio_file_rows(limit=5, offset=3) == rows[3:8]
+        assert len(database_api.list_audio_file_rows(status="completed")) == 20
+
+        paged, cursor = [], None
+        while True:
+            page = database_api.list_audio_file_page(cursor=cursor, page_size=7)
+            paged.extend(page["audio_files"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert [row["file_id"] for row in paged] == [row["file_id"] for row in rows]
+
+        assert database_api.collect_statistics()["total_files"] == 61
+        audio_file = find_audio_file("file_7")
+        assert audio_file is not None and audio_file.title == "Song 7"
+        assert audio_file._meta.database is not db
+
+
+class TestShardBenchmark:
+    """Durchsatz-Benchmark paralleler Schreiber (nur mit --run-slow)."""
+
+    def test_write_throughput_benchmark(self, tmp_path):
+        """Misst den Schreibdurchsatz paralleler Prozesse für 1 und 4 Shards."""
+        results = benchmark_shard_write_throughput(
+            str(tmp_path), shard_counts=(1, 4), writers=4, rows_per_writer=300
+        )
+        assert set(results) == {1, 4}
+        assert all(rate > 0 for rate in results.values())
@@ -0,0 +1,200 @@
+"""
+Tests für die materialisierten Statistiktabellen im Telegram Audio Downloader.
+"""
+
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.telegram_audio_downloader.database_statistics import (
+    ensure_statistics_tables,
+    get_group_statistics,
+    get_library_statistics,
+    get_status_statistics,
+    rebuild_statistics,
+)
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+from src.telegram_audio_downloader.nosql_migration import NoSQLMigrationManager
+
+
+@pytest.fixture
+def stats_db(model_db):
+    """Stellt eine temporäre Datenbank mit Statistiktabellen bereit."""
+    model_db([TelegramGroup, AudioFile], "stats.db")
+    assert ensure_statistics_tables()
+    return db.database
+
+
+def _snapshot():
+    """Liest den aktuellen Stand der Statistiktabellen."""
+    return get_status_statistics(), get_group_statistics()
+
+
+def _recomputed():
+    """Berechnet die Statistiken vollständig neu und gibt sie zurück."""
+    rebuild_statistics()
+    return _snapshot()
+
+
+class TestStatisticsTriggers:
+    """Testfälle für die Pflege der Statistiken durch Trigger."""
+
+    def test_insert_update_delete(self, stats_db):
+        """Testet Zählung, Bytes, Dauer und letzten Download."""
+        group = TelegramGroup.create(group_id=1, title="Gruppe")
+        first = AudioFile.create(
+            file_id="a", file_name="a.mp3", file_size=100, duration=60, group=group
+        )
+        AudioFile.create(file_id="b", file_name="b.mp3", file_size=50, duration=30, group=group)
+
+        status = get_status_statistics()
+        assert status["pending"]["file_count"] == 2
+        assert status["pending"]["total_bytes"] == 150
+        assert status["pending"]["total_duration"] == 90
+
+        downloaded_at = datetime(2024, 3, 1, 12, 0)
+        first.status = "completed"
+        first.downloaded_bytes = 100
+        first.downloaded_at = downloaded_at
+        first.save()
+
+        status = get_status_statistics()
+        assert status["pending"]["file_count"] == 1
+        assert status["completed"]["file_count"] == 1
+        assert status["completed"]["downloaded_bytes"] == 100
+        assert status["completed"]["last_download"].startswith("2024-03-01 12:00")
+
+        group_stats = get_group_statistics()[0]
+        assert group_stats["file_count"] == 2
+        assert group_stats["completed_count"] == 1
+        assert group_stats["last_download"].startswith("2024-03-01 12:00")
+
+        first.delete_instance()
+        status = get_status_statistics()
+        assert "completed" not in status
+        group_stats = get_group_statistics()[0]
+        assert group_stats["file_count"] == 1
+        assert group_stats["completed_count"] == 0
+        assert group_stats["last_download"] is None
+
+    def test_random_operations_match_rebuild(self, stats_db):
+        """Testet, dass die Trigger dasselbe Ergebnis wie eine Neuberechnung liefern."""
+        rng = random.Random(7)
+        groups = [TelegramGroup.create(group_id=i, title=f"Gruppe {i}") for i in range(5)]
+        base_time = datetime(2024, 1, 1)
+        files = []
+
+        for i in range(300):
+            action = rng.random()
+            if action < 0.5 or not files:
+                files.append(AudioFile.create(
+                    file_id=f"file_{i}",
+                    file_name=f"file_{i}.mp3",
+                    file_size=rng.randint(1, 10_000),
+                    duration=rng.choice([None, rng.randint(1, 600)]),
+                    group=rng.choice(groups + [None]),
+                ))
+            elif action < 0.85:
+                audio = rng.choice(files)
+                audio.status = rng.choice(["pending", "completed", "failed"])
+                audio.group = rng.choice(groups + [None])
+                audio.file_size = rng.randint(1, 10_000)
+                audio.downloaded_at = base_time + timedelta(minutes=rng.randint(0, 1000))
+                audio.save()
+            else:
+                files.pop(rng.randrange(len(files))).delete_instance()
+
+        assert _snapshot() == _recomputed()
+
+    def test_external_writes_are_tracked(self, stats_db):
+        """Testet, dass auch Schreibzugriffe anderer Verbindungen erfasst werden."""
+        other = sqlite3.connect(str(stats_db))
+        other.execute(
+            "INSERT INTO audio_files (file_id, file_name, file_size, status, downloaded_bytes, "
+            "checksum_verified, download_attempts, resume_offset, created_at, updated_at) "
+            "VALUES ('x', 'x.mp3', 42, 'pending', 0, 0, 0, 0, '2024-01-01', '2024-01-01')"
+        )
+        other.commit()
+        other.close()
+
+        library = get_library_statistics()
+        assert library["total_files"] == 1
+        assert library["total_bytes"] == 42
+
+    def test_existing_data_is_backfilled(self, model_db):
+        """Testet die Leser ohne Statistiktabellen und die einmalige Neuberechnung."""
+        model_db([TelegramGroup, AudioFile], "legacy.db")
+        AudioFile.create(file_id="a", file_name="a.mp3", file_size=10)
+        AudioFile.create(file_id="b", file_name="b.mp3", file_size=20, status="completed")
+
+        # Ohne Tabellen wird direkt aggregiert; das Schema bleibt unverändert
+        library = get_library_statistics()
+        assert library["total_files"] == 2
+        assert library["status_distribution"] == {"completed": 1, "pending": 1}
+        assert "status_statistics" not in db.get_tables()
+
+        assert ensure_statistics_tables()
+        assert get_library_statistics() == library
+
+
+class TestStatisticsReaders:
+    """Testfälle für die Leser der Statistiktabellen."""
+
+    def test_collect_statistics_query_count(self, stats_db):
+        """Testet, dass der Statistik-Endpunkt unabhängig von der Gruppenzahl wenige Abfragen braucht."""
+        pytest.importorskip("flask")
+        pytest.importorskip("flask_graphql")
+        pytest.importorskip("graphene")
+        from src.telegram_audio_downloader.database_api import collect_statistics
+
+        groups = [TelegramGroup.create(group_id=i, title=f"Gruppe {i}") for i in range(200)]
+        for i, group in enumerate(groups):
+            AudioFile.create(file_id=f"f{i}", file_name=f"f{i}.mp3", file_size=i, group=group)
+
+        executed = []
+        connection = db.connection()
+        connection.set_trace_callback(executed.append)
+        try:
+            stats = collect_statistics()
+        finally:
+            connection.set_trace_callback(None)
+
+        assert stats["total_files"] == 200
+        assert stats["total_groups"] == 200
+        assert stats["status_distribution"] == {"pending": 200}
+        assert stats["group_statistics"][5]["file_count"] == 1
+        assert len(executed) <= 6
+
+    def test_nosql_group_statistics(self, stats_db):
+        """Testet die Gruppenstatistiken der NoSQL-Migration."""
+        group = TelegramGroup.create(group_id=77, title="Gruppe")
+        AudioFile.create(file_id="a", file_name="a.mp3", file_size=5, group=group)
+        TelegramGroup.create(group_id=78, title="Leer")
+
+        manager = NoSQLMigrationManager(str(stats_db))
+        stats = manager._get_group_statistics()
+
+        assert stats["77"]["file_count"] == 1
+        assert stats["77"]["total_size"] == 5
+        assert stats["78"]["file_count"] == 0
+
+    def test_nosql_export_leaves_source_schema_unchanged(self, model_db):
+        """Testet, dass der Export ohne Statistiktabellen aggregiert statt sie anzulegen."""
+        model_db([TelegramGroup, AudioFile], "source.db")
+        source = db.database
+        group = TelegramGroup.create(group_id=77, title="Gruppe")
+        AudioFile.create(file_id="a", file_name="a.mp3", file_size=5, duration=3, group=group)
+        AudioFile.create(file_id="b", file_name="b.mp3", file_size=7, group=group)
+        db.close()
+
+        stats = NoSQLMigrationManager(str(source))._get_group_statistics()
+
+        assert stats["77"]["file_count"] == 2
+        assert stats["77"]["total_size"] == 12
+        assert stats["77"]["total_duration"] == 3
+        connection = sqlite3.connect(str(source))
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master")}
+        connection.close()
+        assert "group_statistics" not in tables
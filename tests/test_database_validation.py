@@ -0,0 +1,160 @@
+"""
+Tests für die mengenbasierte und inkrementelle Datenbank-Validierung.
+"""
+
+import pytest
+
+from src.telegram_audio_downloader.database_change_tracking import (
+    CHANGE_CONSUMER_TABLE,
+    CHANGE_LOG_TABLE,
+    get_consumer_watermark,
+    prune_changes,
+)
+from src.telegram_audio_downloader.database_validation import (
+    INTEGRITY_VALIDATION,
+    RECORD_VALIDATION,
+    VALIDATION_CONSUMER,
+    DatabaseValidator,
+)
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+
+
+@pytest.fixture
+def validator(model_db):
+    """Stellt eine Datenbank mit einigen ungültigen Datensätzen bereit."""
+    model_db([TelegramGroup, AudioFile], "validation.db")
+
+    groups = [TelegramGroup.create(group_id=100 + i, title=f"Gruppe {i}") for i in range(3)]
+    for i in range(40):
+        AudioFile.create(
+            file_id=f"file_{i}",
+            file_name=f"song_{i}.mp3",
+            file_size=i,
+            status="completed",
+            group=groups[i % 3],
+        )
+    AudioFile.update(status="kaputt").where(AudioFile.file_id.in_(["file_1", "file_2"])).execute()
+    AudioFile.update(file_size=-5).where(AudioFile.file_id == "file_3").execute()
+
+    return DatabaseValidator()
+
+
+def _rules(violations):
+    """Gibt die Regelnamen der Verstöße als sortierte Liste zurück."""
+    return sorted(violation.rule for violation in violations)
+
+
+class TestFullValidation:
+    """Testfälle für die vollständige Validierung."""
+
+    def test_rules_run_as_sql(self, validator):
+        """Testet, dass Spaltenregeln die verletzenden Zeilen finden."""
+        results = validator.run_full_validation()
+
+        assert results["mode"] == "full"
+        assert results["violation_counts"] == {"audio_files.status": 2, "audio_files.file_size": 1}
+        assert results["summary"]["total_errors"] == 3
+        assert results[RECORD_VALIDATION]["audio_files.status"][0] == "Ungültiger Wert: kaputt (Zeile 2)"
+        assert not results[INTEGRITY_VALIDATION]
+
+    def test_chunked_scan_and_samples(self, validator):
+        """Testet rowid-Abschnitte und die Begrenzung der Meldungen je Regel."""
+        AudioFile.update(status="kaputt").execute()
+        validator.chunk_size = 7
+
+        results = validator.run_validation(max_samples=5)
+
+        assert results["violation_counts"]["audio_files.status"] == 40
+        assert len(results[RECORD_VALIDATION]["audio_files.status"]) == 5
+
+    def test_integrity_checks(self, validator):
+        """Testet die Prüfung verwaister Gruppenreferenzen."""
+        TelegramGroup.delete().where(TelegramGroup.group_id == 100).execute()
+
+        errors = validator.validate_integrity()
+
+        assert len(errors["audio_files.group_reference"]) == 14
+
+    def test_python_rules_and_callables(self, validator):
+        """Testet Regeln ohne SQL-Bedingung sowie Geschäftsregeln als Funktion."""
+        validator.add_validation_rule("audio_files", "file_name", lambda value: not value.startswith("song_3"))
+        validator.add_business_rule("immer_falsch", lambda: False)
+        validator.add_sql_business_rule("kleine_dateien", "audio_files", "t.file_size BETWEEN 0 AND 1")
+
+        counts = validator.run_full_validation()["violation_counts"]
+
+        # song_3 und song_30 bis song_39
+        assert counts["audio_files.file_name"] == 11
+        assert counts["immer_falsch"] == 1
+        assert counts["kleine_dateien"] == 2
+
+
+class TestIncrementalValidation:
+    """Testfälle für die Validierung ab einem Wasserstand."""
+
+    def test_only_changed_rows_are_checked(self, validator):
+        """Testet, dass nach dem ersten Lauf nur geänderte Zeilen geprüft werden."""
+        first = validator.run_incremental_validation()
+        assert first["mode"] == "full"
+        assert first["summary"]["total_errors"] == 3
+
+        unchanged = validator.run_incremental_validation()
+        assert unchanged["mode"] == "incremental"
+        assert unchanged["summary"]["total_errors"] == 0
+
+        AudioFile.update(status="ungültig").where(AudioFile.file_id == "file_10").execute()
+        AudioFile.update(status="completed").where(AudioFile.file_id == "file_1").execute()
+        AudioFile.create(file_id="neu-1", file_name="neu.mp3", file_size=1)
+
+        violations = list(validator.iter_violations(incremental=True))
+        assert _rules(violations) == ["audio_files.file_id", "audio_files.status"]
+        assert {v.value for v in violations} == {"ungültig", "neu-1"}
+        assert validator.last_run["mode"] == "incremental"
+
+    def test_deleted_group_checks_referencing_rows(self, validator):
+        """Testet, dass gelöschte Gruppen die verweisenden Dateien erneut prüfen."""
+        validator.run_incremental_validation()
+        TelegramGroup.delete().where(TelegramGroup.group_id == 101).execute()
+
+        violations = list(validator.iter_violations(incremental=True, categories=[INTEGRITY_VALIDATION]))
+
+        assert len(violations) == 13
+        assert {v.rule for v in violations} == {"audio_files.group_reference"}
+
+    def test_watermark_advances_only_after_complete_stream(self, validator):
+        """Testet, dass ein abgebrochener Strom den Wasserstand nicht verschiebt."""
+        validator.run_incremental_validation()
+        AudioFile.update(status="x").where(AudioFile.file_id.in_(["file_5", "file_6"])).execute()
+
+        stream = validator.iter_violations(incremental=True)
+        next(stream)
+        stream.close()
+
+        assert validator.run_incremental_validation()["summary"]["total_errors"] == 2
+
+    def test_abandoned_full_run_restores_watermark(self, validator):
+        """Testet, dass ein abgebrochener vollständiger Lauf das Bereinigen nicht blockiert."""
+        validator.run_incremental_validation()
+        connection = db.connection()
+        connection.execute(f"DELETE FROM {CHANGE_CONSUMER_TABLE} WHERE name = ?", (VALIDATION_CONSUMER,))
+
+        stream = validator.iter_violations(incremental=True)
+        next(stream)
+        assert get_consumer_watermark(connection, VALIDATION_CONSUMER) == -1
+        stream.close()
+
+        assert get_consumer_watermark(connection, VALIDATION_CONSUMER) is None
+        AudioFile.update(status="x").where(AudioFile.file_id == "file_8").execute()
+        prune_changes(connection, 10 ** 9)
+        assert connection.execute(f"SELECT COUNT(*) FROM {CHANGE_LOG_TABLE}").fetchone()[0] == 0
+
+    def test_backup_pruning_keeps_unvalidated_changes(self, validator):
+        """Testet, dass das Bereinigen des Protokolls den Wasserstand respektiert."""
+        validator.run_incremental_validation()
+        AudioFile.update(status="x").where(AudioFile.file_id == "file_7").execute()
+
+        connection = db.connection()
+        prune_changes(connection, 10 ** 9)
+        assert connection.execute(f"SELECT COUNT(*) FROM {CHANGE_LOG_TABLE}").fetchone()[0] == 1
+
+        assert validator.run_incremental_validation()["violation_counts"] == {"audio_files.status": 1}
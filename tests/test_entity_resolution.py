@@ -0,0 +1,245 @@
+"""
+Tests für die persistente Auflösung von Gruppen und Kanälen.
+"""
+
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from telethon.errors import ChannelInvalidError, ChannelPrivateError
+from telethon.tl.types import Channel, InputPeerChannel, PeerChannel
+from telethon.utils import get_peer_id
+
+from src.telegram_audio_downloader import database as database_module
+from src.telegram_audio_downloader.database import Database
+from src.telegram_audio_downloader.downloader import AudioDownloader
+from src.telegram_audio_downloader.entity_resolution import (
+    EntityResolver,
+    input_peer_for,
+    normalize_group_reference,
+)
+from src.telegram_audio_downloader.message_scan import ScanStats
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+
+from .fake_telegram import MUSIC, make_message
+
+
+def _channel(channel_id, username=None, title=None, access_hash=None):
+    """Erstellt einen Telethon-Kanal."""
+    return Channel(
+        id=channel_id,
+        title=title or f"Kanal {channel_id}",
+        photo=None,
+        date=datetime.now(),
+        username=username,
+        access_hash=access_hash if access_hash is not None else channel_id * 7919,
+    )
+
+
+class FakeClient:
+    """Client, der Benutzernamen und InputPeers aus einem Verzeichnis auflöst."""
+
+    def __init__(self, channels):
+        self.channels = {channel.id: channel for channel in channels}
+        self.by_username = {channel.username.lower(): channel for channel in channels if channel.username}
+        self.private = set()
+        self.rejected = set()
+        self.calls = []
+        self.scanned = []
+
+    def _check_access(self, peer):
+        """Lehnt InputPeers ab, deren access_hash nicht zum Konto passt."""
+        if peer.channel_id in self.private:
+            raise ChannelPrivateError(request=None)
+        if peer.channel_id in self.rejected and peer.access_hash != self.channels[peer.channel_id].access_hash:
+            raise ChannelInvalidError(request=None)
+
+    async def get_entity(self, reference):
+        self.calls.append(reference)
+        await asyncio.sleep(0)
+        if isinstance(reference, InputPeerChannel):
+            self._check_access(reference)
+            return self.channels[reference.channel_id]
+        return self.by_username[reference.lstrip("@").lower()]
+
+    async def iter_messages(self, entity, limit=None, **kwargs):
+        if isinstance(entity, InputPeerChannel):
+            self._check_access(entity)
+        self.scanned.append(entity)
+        yield make_message(1, MUSIC)
+
+
+@pytest.fixture
+def resolver_db(model_db):
+    """Stellt eine frische Datenbank bereit."""
+    model_db([TelegramGroup], "entities.db")
+
+
+def test_normalize_group_reference():
+    """Testet die Normalisierung von IDs, Namen und Links."""
+    marked_id = get_peer_id(PeerChannel(1234))
+    assert normalize_group_reference(marked_id) == (1234, None)
+    assert normalize_group_reference(str(marked_id)) == (1234, None)
+    assert normalize_group_reference("@MeinKanal") == (None, "meinkanal")
+    assert normalize_group_reference("https://t.me/MeinKanal/42") == (None, "meinkanal")
+    assert normalize_group_reference("https://t.me/+AbCdEf") == (None, None)
+    assert normalize_group_reference("t.me/joinchat/AbCdEf") == (None, None)
+
+
+def test_sweep_needs_no_resolution_calls_after_first_run(resolver_db):
+    """Testet, dass ein zweiter Lauf über 500 Kanäle ohne Netzwerkauflösung auskommt."""
+    channels = [_channel(1000 + i, username=f"Kanal_{i}") for i in range(500)]
+    client = FakeClient(channels)
+
+    async def sweep(resolver):
+        return [await resolver.resolve(f"@kanal_{i}") for i in range(500)]
+
+    first = EntityResolver(client)
+    asyncio.run(sweep(first))
+    assert len(client.calls) == 500
+    assert first.stats["network_resolutions"] == 500
+
+    client.calls.clear()
+    second = EntityResolver(client)
+    results = asyncio.run(sweep(second))
+
+    assert client.calls == []
+    assert second.stats["db_hits"] == 500
+    peer, group = results[42]
+    assert peer == InputPeerChannel(channel_id=1042, access_hash=1042 * 7919)
+    assert group.title == "Kanal 1042"
+    # Numerische Angaben werden ebenfalls aus der Datenbank aufgelöst
+    assert asyncio.run(second.resolve(get_peer_id(PeerChannel(1042))))[0] == peer
+
+
+def test_stale_entries_are_refreshed_in_background(resolver_db):
+    """Testet die Hintergrund-Aktualisierung veralteter Einträge."""
+    client = FakeClient([_channel(7, username="alt", title="Neuer Titel", access_hash=99)])
+    TelegramGroup.create(
+        group_id=7, title="Alter Titel", username="alt", access_hash=11,
+        entity_type="channel", resolved_at=datetime.now() - timedelta(days=3),
+    )
+
+    async def scenario():
+        resolver = EntityResolver(client)
+        peer, group = await resolver.resolve("alt")
+        # Die alte Auflösung wird sofort verwendet
+        assert peer.access_hash == 11
+        await resolver.close()
+        return resolver
+
+    resolver = asyncio.run(scenario())
+
+    assert client.calls == [InputPeerChannel(channel_id=7, access_hash=11)]
+    assert resolver.stats["refreshes"] == 1
+    refreshed = TelegramGroup.get(TelegramGroup.group_id == 7)
+    assert refreshed.title == "Neuer Titel"
+    assert refreshed.access_hash == 99
+
+
+def test_channel_private_error_invalidates_entry(resolver_db):
+    """Testet, dass ein privat gewordener Kanal wieder über das Netzwerk aufgelöst wird."""
+    channel = _channel(8, username="privat")
+    client = FakeClient([channel])
+    client.private.add(8)
+    group = TelegramGroup.create(
+        group_id=8, title="Privat", username="privat", access_hash=5,
+        entity_type="channel", resolved_at=datetime.now() - timedelta(days=3),
+    )
+    assert isinstance(input_peer_for(group), InputPeerChannel)
+
+    async def scenario():
+        resolver = EntityResolver(client)
+        await resolver.resolve("privat")
+        await resolver.close()
+        assert resolver.stats["invalidations"] == 1
+        assert resolver.lookup("privat") is None
+        client.calls.clear()
+        await resolver.resolve("privat")
+        assert client.calls == ["privat"]
+
+    asyncio.run(scenario())
+
+
+def test_rejected_access_hash_is_resolved_again(model_db, monkeypatch):
+    """Testet die Neuauflösung, wenn ein Kontowechsel den access_hash ungültig macht."""
+    model_db([TelegramGroup, AudioFile], "entities.db")
+    # Der Downloader soll die Testdatenbank verwenden
+    monkeypatch.setattr(database_module, "init_db", lambda db_path=None: db)
+    # Nach dem Kontowechsel gilt für Kanal 9 ein anderer access_hash
+    channel = _channel(9, username="wechsel", access_hash=222)
+    client = FakeClient([channel])
+    client.rejected.add(9)
+    TelegramGroup.create(
+        group_id=9, title="Wechsel", username="wechsel", access_hash=111,
+        entity_type="channel", resolved_at=datetime.now(),
+    )
+    downloader = AudioDownloader()
+    downloader.client = client
+
+    async def scenario():
+        peer, group = await downloader.resolve_group("wechsel")
+        return [item async for item in downloader._iter_group_audio(peer, group, ScanStats())]
+
+    items = asyncio.run(scenario())
+
+    assert len(items) == 1
+    assert client.calls == ["wechsel"]
+    assert client.scanned and all(entity is channel for entity in client.scanned)
+    assert TelegramGroup.get(TelegramGroup.group_id == 9).access_hash == 222
+
+    # Ohne Benutzernamen bleibt es beim Fehler, der Eintrag ist aber verworfen
+    TelegramGroup.update(access_hash=111, entity_type="channel", username=None).execute()
+
+    async def without_username():
+        peer, group = await downloader.resolve_group(get_peer_id(PeerChannel(9)))
+        return [item async for item in downloader._iter_group_audio(peer, group, ScanStats())]
+
+    with pytest.raises(ChannelInvalidError):
+        asyncio.run(without_username())
+    assert TelegramGroup.get(TelegramGroup.group_id == 9).access_hash is None
+
+
+def test_background_refresh_resolves_rejected_entries_again(resolver_db):
+    """Testet, dass die Hintergrund-Aktualisierung einen abgelehnten Eintrag neu auflöst."""
+    client = FakeClient([_channel(10, username="hinten", access_hash=333)])
+    client.rejected.add(10)
+    TelegramGroup.create(
+        group_id=10, title="Hinten", username="hinten", access_hash=1,
+        entity_type="channel", resolved_at=datetime.now() - timedelta(days=3),
+    )
+
+    async def scenario():
+        resolver = EntityResolver(client)
+        await resolver.resolve("hinten")
+        await resolver.close()
+        return resolver
+
+    resolver = asyncio.run(scenario())
+
+    assert client.calls == [InputPeerChannel(channel_id=10, access_hash=1), "hinten"]
+    assert resolver.stats["invalidations"] == 1 and resolver.stats["refreshes"] == 1
+    assert TelegramGroup.get(TelegramGroup.group_id == 10).access_hash == 333
+
+
+def test_existing_database_is_migrated(tmp_path, monkeypatch):
+    """Testet das Nachrüsten der neuen Spalten in bestehenden Datenbanken."""
+    path = tmp_path / "alt.db"
+    connection = sqlite3.connect(str(path))
+    connection.execute(
+        "CREATE TABLE telegram_groups (id INTEGER PRIMARY KEY, created_at DATETIME, updated_at DATETIME, "
+        "group_id INTEGER UNIQUE, title VARCHAR(255), username VARCHAR(255), last_checked DATETIME)"
+    )
+    connection.execute("INSERT INTO telegram_groups (group_id, title) VALUES (1, 'Alt')")
+    connection.commit()
+    connection.close()
+
+    database = Database()
+    monkeypatch.setattr(database, "db_path", str(path))
+    database.init()
+    try:
+        group = TelegramGroup.get(TelegramGroup.group_id == 1)
+        assert group.access_hash is None and group.entity_type is None
+    finally:
+        db.close()
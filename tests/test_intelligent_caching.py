@@ -13,8 +13,11 @@ from src.telegram_audio_downloader.intelligent_caching import (
     BaseCache,
     MemoryCache,
     DiskCache,
+    LogStructuredDiskCache,
     CDNCache,
     IntelligentCachingSystem,
+    benchmark_cdn_cache_puts,
+    benchmark_disk_cache,
     get_intelligent_cache
 )
 
@@ -322,7 +325,7 @@ class TestIntelligentCachingSystem(unittest.TestCase):
     async def test_cache_system_creation(self):
         """Test der Cache-System-Erstellung."""
         self.assertIsInstance(self.cache_system.memory_cache, MemoryCache)
-        self.assertIsInstance(self.cache_system.disk_cache, DiskCache)
+        self.assertIsInstance(self.cache_system.disk_cache, LogStructuredDiskCache)
         self.assertIsInstance(self.cache_system.cdn_cache, CDNCache)
         
     async def test_cache_system_put_and_get(self):
@@ -405,6 +408,127 @@ class TestIntelligentCachingSystem(unittest.TestCase):
         self.assertGreaterEqual(stats["cdn_size"], 0)
 
 
+class TestLogStructuredDiskCache(unittest.TestCase):
+    """Tests für den log-strukturierten Disk-Cache."""
+    
+    def setUp(self):
+        """Test-Setup."""
+        self.test_dir = Path(tempfile.mkdtemp())
+        
+    def tearDown(self):
+        """Test-Cleanup."""
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        
+    def test_drop_in_disk_tier(self):
+        """Test des Disk-Tiers im Caching-System und des Neustarts."""
+        async def scenario():
+            system = IntelligentCachingSystem(self.test_dir)
+            await system.put("key1", {"titel": "Lied", "dauer": 180}, cache_levels=["disk"])
+            await system.put("key2", "value2", cache_levels=["disk"])
+            await system.disk_cache.delete("key2")
+            self.assertEqual(await system.get("key1"), {"titel": "Lied", "dauer": 180})
+            self.assertEqual(system.disk_cache.get_stats()["hits"], 1)
+            await system.disk_cache.close()
+            
+            reopened = LogStructuredDiskCache(self.test_dir / "disk")
+            self.assertEqual(await reopened.get("key1"), {"titel": "Lied", "dauer": 180})
+            self.assertIsNone(await reopened.get("key2"))
+            self.assertEqual(reopened.get_stats()["store"]["startup_mode"], "hint")
+            await reopened.close()
+            
+        asyncio.run(scenario())
+        
+    def test_max_size_and_ttl(self):
+        """Test der Größenbegrenzung und der TTL."""
+        async def scenario():
+            cache = LogStructuredDiskCache(self.test_dir, max_size=2, default_ttl=100)
+            await cache.put("a", 1)
+            await cache.put("b", 2)
+            await cache.put("c", 3)
+            await cache.put("alt", 4, ttl=-1)
+            self.assertEqual(await cache.size(), 2)
+            self.assertEqual(cache.get_stats()["evictions"], 2)
+            self.assertIsNone(await cache.get("alt"))
+            self.assertEqual(await cache.get("c"), 3)
+            await cache.close()
+            
+        asyncio.run(scenario())
+        
+    def test_disk_cache_benchmark(self):
+        """Benchmark mit 1 Mio. Schlüsseln gegen den DiskCache (nur mit --run-slow)."""
+        results = benchmark_disk_cache(self.test_dir, legacy_keys=1000)
+        
+        self.assertGreater(results["log_puts_per_second"], 100 * results["legacy_puts_per_second"])
+        self.assertLess(results["hint_startup_seconds"], results["replay_startup_seconds"])
+
+
+class TestJournaledCDNCache(unittest.TestCase):
+    """Tests für die CDN-Metadaten als Journal mit Snapshots."""
+    
+    def setUp(self):
+        """Test-Setup."""
+        self.test_dir = Path(tempfile.mkdtemp())
+        
+    def tearDown(self):
+        """Test-Cleanup."""
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        
+    def test_put_appends_and_recovers_after_crash(self):
+        """Test, dass Puts nur das Journal erweitern und ein Absturz nichts verliert."""
+        async def scenario():
+            cache = CDNCache(self.test_dir, max_size=100)
+            await cache.put("key1", "value1")
+            await cache.put("key2", "value2")
+            self.assertEqual(await cache.get("key1"), "value1")
+            await cache.delete("key2")
+            self.assertFalse(cache.metadata_file.exists())
+            self.assertEqual(len(cache.journal_file.read_bytes().splitlines()), 4)
+            
+            # Absturz ohne close() mitten im Schreiben eines weiteren Eintrags
+            cache._journal.write(b'{"op":"put","key":"halb')
+            cache._journal.flush()
+            
+            recovered = CDNCache(self.test_dir, max_size=100)
+            self.assertEqual(list(recovered.metadata), ["key1"])
+            self.assertEqual(recovered.metadata["key1"]["access_count"], 1)
+            self.assertEqual(recovered.get_stats()["recovered_records"], 4)
+            self.assertTrue(recovered.journal_file.read_bytes().endswith(b"\n"))
+            self.assertEqual(await recovered.get("key1"), "value1")
+            await recovered.close()
+            
+        asyncio.run(scenario())
+        
+    def test_snapshots_and_lru_eviction(self):
+        """Test der periodischen Snapshots und der Verdrängung nach letztem Zugriff."""
+        async def scenario():
+            cache = CDNCache(self.test_dir, max_size=3, snapshot_interval=4)
+            for key in ("a", "b", "c"):
+                await cache.put(key, key.upper())
+            await cache.get("a")
+            self.assertEqual(cache.get_stats()["snapshots"], 1)
+            self.assertEqual(cache.journal_file.stat().st_size, 0)
+            
+            await cache.put("d", "D")
+            self.assertEqual(list(cache.metadata), ["c", "a", "d"])
+            self.assertEqual(cache.get_stats()["evictions"], 1)
+            await cache.close()
+            
+            reopened = CDNCache(self.test_dir, max_size=3, snapshot_interval=4)
+            self.assertEqual(list(reopened.metadata), ["c", "a", "d"])
+            self.assertIsNone(await reopened.get("b"))
+            await reopened.close()
+            
+        asyncio.run(scenario())
+        
+    def test_cdn_put_latency_benchmark(self):
+        """Benchmark der Put-Latenz bei 100.000 Einträgen (nur mit --run-slow)."""
+        results = benchmark_cdn_cache_puts(self.test_dir, existing_entries=100_000, puts=50)
+        
+        self.assertLess(results["journal_mean_ms"] * 100, results["rewrite_mean_ms"])
+
+
 class TestGlobalCacheFunction(unittest.TestCase):
     """Tests für die globale Cache-Funktion."""
     
@@ -0,0 +1,183 @@
+"""
+Tests für den log-strukturierten Festplattenspeicher.
+"""
+
+import time
+
+import pytest
+
+from src.telegram_audio_downloader.log_structured_cache import HINT_FILE, LogStructuredStore
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    """Gibt das Verzeichnis für den Speicher zurück."""
+    return tmp_path / "store"
+
+
+def _crash(store):
+    """Simuliert einen Absturz: Dateien schließen, ohne die Hinweisdatei zu schreiben."""
+    store.wait_for_compaction()
+    store._close_files()
+    store._closed = True
+
+
+class TestBasicOperations:
+    """Testfälle für Lesen, Schreiben und Löschen."""
+
+    def test_put_get_delete(self, store_dir):
+        """Testet Überschreiben, Löschen und Ablauf von Einträgen."""
+        store = LogStructuredStore(store_dir)
+        store.put("a", b"1")
+        store.put("a", b"2")
+        store.put("b", b"3")
+        store.put("kurz", b"4", ttl=-1)
+
+        assert store.get("a") == b"2"
+        assert store.delete("b")
+        assert not store.delete("b")
+        assert store.get("b") is None
+        assert store.get("kurz") is None
+        assert store.stats["expired"] == 1
+        assert len(store) == 1
+        store.close()
+
+    def test_put_is_a_single_append(self, store_dir):
+        """Testet, dass Einfügen nur an das aktive Segment anhängt."""
+        store = LogStructuredStore(store_dir)
+        for i in range(100):
+            store.put(f"key-{i}", b"x" * 10)
+        stats = store.get_stats()
+        assert stats["segments"] == 1
+        assert stats["total_bytes"] == stats["live_bytes"]
+
+        store.put("key-0", b"y" * 10)
+        assert store.get_stats()["garbage_ratio"] > 0
+        store.close()
+
+    def test_lru_eviction_uses_batched_accesses(self, store_dir):
+        """Testet, dass gesammelte Zugriffe vor dem Verdrängen verbucht werden."""
+        store = LogStructuredStore(store_dir, max_entries=3, access_batch_size=100)
+        for key in ("a", "b", "c"):
+            store.put(key, b"v")
+        store.get("a")
+        assert store.get_stats()["pending_accesses"] == 1
+
+        store.put("d", b"v")
+
+        assert "a" in store
+        assert "b" not in store
+        assert store.stats["evictions"] == 1
+        store.close()
+
+
+class TestRecovery:
+    """Testfälle für Neustart und Absturzsicherheit."""
+
+    def test_restart_from_hint_and_tail(self, store_dir):
+        """Testet den Start aus der Hinweisdatei und das Einlesen neuerer Datensätze."""
+        store = LogStructuredStore(store_dir)
+        for i in range(20):
+            store.put(f"key-{i}", f"wert-{i}".encode())
+        store.flush()
+        store.put("neu", b"nach dem Hint")
+        store.delete("key-3")
+        _crash(store)
+
+        reopened = LogStructuredStore(store_dir)
+        assert reopened.stats["startup_mode"] == "hint"
+        assert reopened.get("key-7") == b"wert-7"
+        assert reopened.get("neu") == b"nach dem Hint"
+        assert reopened.get("key-3") is None
+        assert len(reopened) == 20
+        reopened.close()
+
+    def test_lru_order_survives_restart(self, store_dir):
+        """Testet, dass die Zugriffsreihenfolge mit dem Hint gespeichert wird."""
+        store = LogStructuredStore(store_dir, max_entries=3)
+        for key in ("a", "b", "c"):
+            store.put(key, b"v")
+        store.get("a")
+        store.close()
+
+        reopened = LogStructuredStore(store_dir, max_entries=3)
+        reopened.put("d", b"v")
+        assert "a" in reopened
+        assert "b" not in reopened
+        reopened.close()
+
+    def test_replay_truncates_torn_write(self, store_dir):
+        """Testet das vollständige Einlesen ohne Hint und einen abgeschnittenen Datensatz."""
+        store = LogStructuredStore(store_dir)
+        store.put("a", b"1")
+        store.put("b", b"2")
+        segment = store._segment_path(store._active_id)
+        _crash(store)
+        with open(segment, "ab") as f:
+            f.write(b"\x01\x02\x03 halber Datensatz")
+
+        reopened = LogStructuredStore(store_dir)
+        assert reopened.stats["startup_mode"] == "replay"
+        assert reopened.stats["corrupt_records"] == 1
+        assert reopened.get("b") == b"2"
+        reopened.put("c", b"3")
+        reopened.close()
+
+        assert LogStructuredStore(store_dir).get("c") == b"3"
+
+
+class TestCompaction:
+    """Testfälle für die Kompaktierung."""
+
+    def test_compaction_reclaims_space(self, store_dir):
+        """Testet das Umkopieren lebender Datensätze und das Löschen alter Segmente."""
+        store = LogStructuredStore(store_dir, max_segment_bytes=2048, background_compaction=False)
+        for round_number in range(5):
+            for i in range(30):
+                store.put(f"key-{i}", f"{round_number}-{i}".encode() * 4)
+        before = store.get_stats()
+
+        assert store.compact() > 0
+
+        after = store.get_stats()
+        assert after["segments"] < before["segments"]
+        assert after["reclaimed_bytes"] > 0
+        assert all(store.get(f"key-{i}") == f"4-{i}".encode() * 4 for i in range(30))
+        store.close()
+
+        reopened = LogStructuredStore(store_dir)
+        assert reopened.get("key-12") == b"4-12" * 4
+        reopened.close()
+
+    def test_tombstones_survive_compaction(self, store_dir):
+        """Testet, dass gelöschte Schlüssel nach Kompaktierung und Neustart gelöscht bleiben."""
+        store = LogStructuredStore(store_dir, max_segment_bytes=256, background_compaction=False)
+        store.put("weg", b"alter Wert" * 5)
+        for i in range(10):
+            store.put(f"key-{i}", b"x" * 40)
+        store.delete("weg")
+        for i in range(10):
+            store.put(f"key-{i}", b"y" * 40)
+
+        store.compact(force=True)
+        _crash(store)
+        (store_dir / HINT_FILE).unlink(missing_ok=True)
+
+        reopened = LogStructuredStore(store_dir)
+        assert reopened.get("weg") is None
+        assert reopened.get("key-3") == b"y" * 40
+        reopened.close()
+
+    def test_background_compaction_after_rotation(self, store_dir):
+        """Testet, dass ein Segmentwechsel die Kompaktierung im Hintergrund anstößt."""
+        store = LogStructuredStore(store_dir, max_segment_bytes=1024)
+        for _ in range(20):
+            store.put("heiß", b"z" * 100)
+        store.wait_for_compaction(timeout=5)
+
+        deadline = time.time() + 5
+        while store.stats["compactions"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert store.stats["compactions"] > 0
+        assert store.get("heiß") == b"z" * 100
+        store.close()
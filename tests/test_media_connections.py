@@ -0,0 +1,137 @@
+"""
+Tests für das Vorwärmen der Verbindungen zu den Medien-Rechenzentren.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src.telegram_audio_downloader.downloader import AudioDownloader
+from src.telegram_audio_downloader.media_connections import (
+    MediaConnectionWarmer,
+    media_dc_ids,
+    warm_up_media_connections,
+)
+
+from .fake_telegram import MUSIC, make_message
+
+HOME_DC = 2
+
+
+def _documents(*dc_ids):
+    """Dokumente aus den angegebenen Rechenzentren."""
+    return [make_message(i, MUSIC, dc_id=dc_id).media.document for i, dc_id in enumerate(dc_ids, 1)]
+
+
+class FakeSenderClient:
+    """Client, der ausgeliehene Sender wie Telethon zählt und das Ausleihen serialisiert."""
+
+    def __init__(self, latency=0.05, failing=()):
+        self.session = SimpleNamespace(dc_id=HOME_DC)
+        self.latency = latency
+        self.failing = set(failing)
+        self.borrowed = {}
+        self.connects = []
+        self._borrow_sender_lock = asyncio.Lock()
+
+    async def _borrow_exported_sender(self, dc_id):
+        async with self._borrow_sender_lock:
+            if dc_id not in self.borrowed:
+                await asyncio.sleep(self.latency)
+                if dc_id in self.failing:
+                    raise ConnectionError("DC nicht erreichbar")
+                self.connects.append(dc_id)
+            self.borrowed[dc_id] = self.borrowed.get(dc_id, 0) + 1
+            return SimpleNamespace(dc_id=dc_id)
+
+    async def _return_exported_sender(self, sender):
+        self.borrowed[sender.dc_id] -= 1
+
+
+def test_media_dc_ids_counts_documents():
+    """Testet das Zählen der Dokumente pro Rechenzentrum."""
+    counts = media_dc_ids(_documents(4, 4, 2, 5) + [SimpleNamespace(dc_id=None)])
+
+    assert counts == {4: 2, 2: 1, 5: 1}
+
+
+def test_warm_up_opens_foreign_dcs_and_holds_them():
+    """Testet, dass nur fremde DCs geöffnet und bis zur Freigabe gehalten werden."""
+    client = FakeSenderClient()
+    warmer = MediaConnectionWarmer(client)
+
+    async def scenario():
+        first = await warmer.warm_up(media_dc_ids(_documents(1, 4, 4, HOME_DC)))
+        # Ein zweiter Lauf öffnet bereits gehaltene Verbindungen nicht erneut
+        second = await warmer.warm_up(media_dc_ids(_documents(4, 5)))
+        held = dict(client.borrowed)
+        await warmer.release()
+        return first, second, held
+
+    first, second, held = asyncio.run(scenario())
+
+    assert sorted(first) == [1, 4] and list(second) == [5]
+    assert sorted(client.connects) == [1, 4, 5]
+    assert held == {1: 1, 4: 1, 5: 1}
+    assert client.borrowed == {1: 0, 4: 0, 5: 0}
+    stats = warmer.get_stats()
+    assert stats[4]["files"] == 1 and stats[4]["connected"]
+    assert stats[1]["connect_seconds"] >= 0.04
+
+
+def test_timeout_and_measurement_cover_only_own_dc():
+    """Testet, dass Wartezeit auf die Sperre des Clients nicht in Timeout und Messung zählt."""
+    client = FakeSenderClient(latency=0.1)
+    warmer = MediaConnectionWarmer(client, connect_timeout=0.15)
+
+    results = asyncio.run(warmer.warm_up(media_dc_ids(_documents(1, 3, 4))))
+
+    assert all(stats.connected for stats in results.values())
+    assert client.connects == [1, 3, 4]
+    assert all(stats.connect_seconds < 0.15 for stats in results.values())
+
+
+def test_clients_are_warmed_concurrently_and_failures_are_reported():
+    """Testet das gleichzeitige Vorwärmen mehrerer Clients und gemeldete Fehler."""
+    clients = [FakeSenderClient(latency=0.2), FakeSenderClient(latency=0.2, failing={5})]
+    warmers = [MediaConnectionWarmer(client) for client in clients]
+
+    started = time.perf_counter()
+    results = asyncio.run(warm_up_media_connections(warmers, _documents(4, 5, 5)))
+    elapsed = time.perf_counter() - started
+
+    # Pro Client nacheinander (2 x 0.2 s), die Clients aber gleichzeitig
+    assert elapsed < 0.6
+    assert results[4].connected and results[4].files == 1
+    assert not results[5].connected and "nicht erreichbar" in results[5].error
+    assert warmers[0].senders.keys() == {4, 5} and warmers[1].senders.keys() == {4}
+
+    # Ohne Unterstützung für ausgeliehene Sender passiert nichts
+    plain = MediaConnectionWarmer(SimpleNamespace(session=None))
+    assert asyncio.run(plain.warm_up({4: 1})) == {}
+
+
+def test_downloader_warms_up_and_releases_on_close(tmp_path):
+    """Testet das Vorwärmen im Downloader und die Freigabe beim Schließen."""
+    downloader = AudioDownloader(download_dir=str(tmp_path / "downloads"))
+    client = FakeSenderClient()
+    downloader.client = client
+
+    async def scenario():
+        await downloader._warm_up_media_connections(_documents(4, 1, HOME_DC))
+        held = dict(client.borrowed)
+        await downloader.close()
+        return held
+
+    held = asyncio.run(scenario())
+
+    assert held == {1: 1, 4: 1}
+    assert client.borrowed == {1: 0, 4: 0}
+    stats = downloader.get_media_connection_stats()
+    assert sorted(stats) == [1, 4] and stats[4]["connected"]
+
+    # Abschaltbar über die Konfiguration
+    downloader.config.config.set("performance", "prewarm_media_dcs", "false")
+    downloader.client = FakeSenderClient()
+    asyncio.run(downloader._warm_up_media_connections(_documents(4)))
+    assert downloader.client.connects == []
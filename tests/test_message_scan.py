@@ -0,0 +1,122 @@
+"""
+Tests für das serverseitig gefilterte Durchsuchen von Gruppen.
+"""
+
+import asyncio
+
+import pytest
+from telethon.tl.types import InputPeerChannel
+
+from src.telegram_audio_downloader.message_scan import (
+    SCAN_MODE_FILTERED,
+    SCAN_MODE_FULL,
+    SCAN_MODE_MUSIC,
+    ScanStats,
+    benchmark_scan_modes,
+    iter_audio_messages,
+)
+from src.telegram_audio_downloader.search import _is_audio_file
+
+from .fake_telegram import APK, AUDIO_FILE, MUSIC, PDF, VIDEO_FILE, VOICE, ZIP, FakeTelegramClient
+
+CHANNEL = InputPeerChannel(channel_id=777, access_hash=1)
+
+
+def _scan(client, mode, **iter_params):
+    """Führt einen Durchlauf aus und gibt Nachrichten-IDs und Zähler zurück."""
+    stats = ScanStats()
+
+    async def run():
+        return [
+            message.id
+            async for message, _ in iter_audio_messages(
+                client, CHANNEL, _is_audio_file, mode=mode, stats=stats, **iter_params
+            )
+        ]
+
+    return asyncio.run(run()), stats
+
+
+def test_filtered_scan_finds_same_audio_as_full_scan():
+    """Testet, dass die zusammengeführten Filter dieselben Nachrichten in derselben Reihenfolge liefern."""
+    client = FakeTelegramClient(2000)
+
+    full_ids, full_stats = _scan(client, SCAN_MODE_FULL)
+    filtered_ids, filtered_stats = _scan(client, SCAN_MODE_FILTERED)
+
+    assert filtered_ids == full_ids
+    assert full_ids == sorted(full_ids, reverse=True)
+    assert {client.messages[i - 1].kind for i in full_ids} == {MUSIC, AUDIO_FILE, VOICE}
+    assert full_stats.messages_fetched == 2000
+    assert filtered_stats.audio_found == len(full_ids)
+    # Der Dokument-Filter liefert auch PDFs, Archive und als Datei gesendete Videos
+    other_documents = [m for m in client.messages if m.kind in (PDF, ZIP, APK, VIDEO_FILE)]
+    assert filtered_stats.messages_fetched == len(full_ids) + len(other_documents)
+
+
+def test_filtered_scan_respects_min_id_and_reverse():
+    """Testet aufsteigende Reihenfolge ab einer Nachrichten-ID."""
+    client = FakeTelegramClient(1000)
+
+    ids, _ = _scan(client, SCAN_MODE_FILTERED, min_id=500, reverse=True)
+
+    assert ids == sorted(ids)
+    assert ids[0] > 500
+    assert ids == _scan(client, SCAN_MODE_FULL, min_id=500, reverse=True)[0]
+
+
+def test_filtered_limit_counts_audio_messages():
+    """Testet, dass das Limit nach dem Zusammenführen der Filter gilt."""
+    client = FakeTelegramClient(2000)
+
+    limited_ids, _ = _scan(client, SCAN_MODE_FILTERED, limit=10)
+    all_ids, _ = _scan(client, SCAN_MODE_FILTERED)
+
+    assert limited_ids == all_ids[:10]
+    # Beim vollständigen Durchlauf begrenzt das Limit die abgerufenen Nachrichten
+    full_ids, full_stats = _scan(client, SCAN_MODE_FULL, limit=10)
+    assert full_stats.messages_fetched == 10 and len(full_ids) < 10
+
+
+def test_music_mode_misses_audio_sent_as_file():
+    """Testet, dass der reine Musikfilter falsch getaggte Audiodateien nicht sieht."""
+    client = FakeTelegramClient(1000)
+
+    ids, _ = _scan(client, SCAN_MODE_MUSIC)
+
+    assert {client.messages[i - 1].kind for i in ids} == {MUSIC}
+
+
+def test_rejected_filter_falls_back_to_full_scan():
+    """Testet den vollständigen Durchlauf, wenn Telegram einen Filter ablehnt."""
+    client = FakeTelegramClient(500)
+    client.reject_filters = True
+
+    ids, stats = _scan(client, SCAN_MODE_FILTERED)
+
+    assert stats.fallbacks == 1
+    assert stats.messages_fetched == 500
+    assert ids == _scan(client, SCAN_MODE_FULL)[0]
+
+
+def test_unknown_mode_is_rejected():
+    """Testet die Prüfung des Modus."""
+    with pytest.raises(ValueError):
+        _scan(FakeTelegramClient(10), "alles")
+
+
+def test_scan_mode_benchmark():
+    """Benchmark: abgerufene Nachrichten je Audiodatei in einer lebhaften Gruppe (nur mit --run-slow)."""
+    client = FakeTelegramClient(50_000)
+
+    results = asyncio.run(benchmark_scan_modes(client, CHANNEL, _is_audio_file))
+
+    for mode, result in results.items():
+        print(
+            f"\n{mode}: {result['messages_fetched']} Nachrichten, {result['audio_found']} Audiodateien, "
+            f"{result['messages_per_audio']:.1f} je Datei"
+        )
+    assert results[SCAN_MODE_FILTERED]["audio_found"] == results[SCAN_MODE_FULL]["audio_found"]
+    # 7 Audiodateien und 6 andere Dokumente je 200 Nachrichten
+    assert 1.5 < results[SCAN_MODE_FILTERED]["messages_per_audio"] < 2.5
+    assert results[SCAN_MODE_FULL]["messages_per_audio"] > 20
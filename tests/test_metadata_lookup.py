@@ -0,0 +1,189 @@
+"""
+Tests für die Abfrageschicht externer Metadaten-Dienste gegen einen lokalen Stub-Server.
+"""
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from src.telegram_audio_downloader.advanced_metadata_extraction import AdvancedMetadataExtractor
+from src.telegram_audio_downloader.metadata_lookup import MetadataLookupService, make_lookup_key
+
+
+class StubMusicBrainz:
+    """Lokaler HTTP-Server, der die MusicBrainz-Suche nachbildet."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.fail_next = 0
+        self.fail_status = 503
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        self.requests.append(request.query["query"])
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_next:
+                self.fail_next -= 1
+                return web.Response(status=self.fail_status)
+            if "Unbekannt" in request.query["query"]:
+                return web.json_response({"recordings": []})
+            return web.json_response({
+                "recordings": [{"id": "mbid-1", "title": "Lied", "artist-credit": [{"name": "Band"}]}]
+            })
+        finally:
+            self.active -= 1
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/ws/2/recording", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/ws/2/recording"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+@pytest.fixture
+def stub():
+    """Stellt einen (noch nicht gestarteten) Stub-Server bereit."""
+    return StubMusicBrainz()
+
+
+def _extractor(tmp_path, stub, **service_kwargs):
+    """Erstellt einen Extraktor, der den Stub-Server abfragt."""
+    service_kwargs.setdefault("rate_limits", {"musicbrainz": (1000.0, 1000)})
+    service = MetadataLookupService(tmp_path / "lookups.db", **service_kwargs)
+    return AdvancedMetadataExtractor(tmp_path, api_urls={"musicbrainz": stub.url}, lookup_service=service)
+
+
+class TestLookupService:
+    """Testfälle für Zusammenfassen, Cache und Drosselung."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_lookups_are_coalesced(self, tmp_path, stub):
+        """Testet, dass ein Album mit identischen Abfragen nur eine Anfrage auslöst."""
+        await stub.start()
+        extractor = _extractor(tmp_path, stub)
+        try:
+            async with extractor:
+                results = await asyncio.gather(*[
+                    extractor.query_musicbrainz("Lied", "Band" if i % 2 else "  band ") for i in range(20)
+                ])
+        finally:
+            await stub.stop()
+
+        assert len(stub.requests) == 1
+        assert all(result["mbid"] == "mbid-1" for result in results)
+        stats = extractor.lookups.get_stats()
+        assert stats["coalesced"] == 19
+        assert stats["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_negative_results_are_persisted_with_own_ttl(self, tmp_path, stub):
+        """Testet den persistenten negativen Cache und seine kürzere TTL."""
+        await stub.start()
+        try:
+            extractor = _extractor(tmp_path, stub, negative_ttl=0.3)
+            async with extractor:
+                assert await extractor.query_musicbrainz("Unbekannt", "Niemand") is None
+                assert await extractor.query_musicbrainz("Lied", "Band") is not None
+
+            # Neue Instanz: beide Ergebnisse kommen aus der Datei
+            reopened = _extractor(tmp_path, stub, negative_ttl=0.3)
+            async with reopened:
+                assert await reopened.query_musicbrainz("Unbekannt", "Niemand") is None
+                assert (await reopened.query_musicbrainz("lied", "band"))["title"] == "Lied"
+                assert reopened.lookups.get_stats()["negative_hits"] == 1
+                assert len(stub.requests) == 2
+
+                await asyncio.sleep(0.35)
+                assert await reopened.query_musicbrainz("Unbekannt", "Niemand") is None
+                assert await reopened.query_musicbrainz("Lied", "Band") is not None
+                assert len(stub.requests) == 3
+        finally:
+            await stub.stop()
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_not_cached(self, tmp_path, stub):
+        """Testet, dass HTTP 503 nicht als Fehlschlag gespeichert wird."""
+        await stub.start()
+        stub.fail_next = 1
+        try:
+            async with _extractor(tmp_path, stub) as extractor:
+                assert await extractor.query_musicbrainz("Lied", "Band") is None
+                assert await extractor.query_musicbrainz("Lied", "Band") is not None
+                assert extractor.lookups.get_stats()["errors"] == 1
+        finally:
+            await stub.stop()
+
+        assert len(stub.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_requests_are_not_cached(self, tmp_path, stub):
+        """Testet, dass abgelehnte Anfragen (HTTP 401) nicht als "nicht gefunden" gespeichert werden."""
+        await stub.start()
+        stub.fail_next = 1
+        stub.fail_status = 401
+        try:
+            async with _extractor(tmp_path, stub) as extractor:
+                assert await extractor.query_musicbrainz("Lied", "Band") is None
+                assert await extractor.query_musicbrainz("Lied", "Band") is not None
+                stats = extractor.lookups.get_stats()
+                assert stats["errors"] == 1
+                assert stats["stored_negative"] == 0
+        finally:
+            await stub.stop()
+
+        assert len(stub.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_and_rate_limit(self, tmp_path, stub):
+        """Testet den begrenzten Pool und den Rate-Limiter pro Anbieter."""
+        await stub.start()
+        try:
+            async with _extractor(tmp_path, stub, max_concurrency=2) as extractor:
+                await asyncio.gather(*[extractor.query_musicbrainz(f"Lied {i}", "Band") for i in range(8)])
+            assert stub.max_active == 2
+
+            stub.delay = 0
+            limited = _extractor(tmp_path, stub, rate_limits={"musicbrainz": (10.0, 1)})
+            async with limited:
+                started = time.monotonic()
+                await asyncio.gather(*[limited.query_musicbrainz(f"Neu {i}", "Band") for i in range(4)])
+                assert time.monotonic() - started >= 0.25
+        finally:
+            await stub.stop()
+
+    @pytest.mark.asyncio
+    async def test_enrich_metadata_uses_lookup_layer(self, tmp_path, stub):
+        """Testet die Anreicherung mehrerer Dateien eines Albums."""
+        await stub.start()
+        try:
+            async with _extractor(tmp_path, stub) as extractor:
+                enriched = await asyncio.gather(*[
+                    extractor.enrich_metadata({"title": "Lied", "artist": "Band", "track": i}, {})
+                    for i in range(10)
+                ])
+        finally:
+            await stub.stop()
+
+        assert {item["musicbrainz_mbid"] for item in enriched} == {"mbid-1"}
+        assert len(stub.requests) == 1
+
+    def test_lookup_key_normalization(self):
+        """Testet die Normalisierung der Schlüssel."""
+        assert make_lookup_key("Mein  Lied", "BAND") == make_lookup_key(" mein lied", "band ")
+        assert make_lookup_key("Lied", None) != make_lookup_key("Lied", "Band")
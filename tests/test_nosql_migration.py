@@ -0,0 +1,173 @@
+"""
+Tests für den stapelweisen, fortsetzbaren Export der NoSQL-Migration.
+"""
+
+import json
+
+import pytest
+
+from src.telegram_audio_downloader.nosql_migration import (
+    FileMigrationSink,
+    MigrationSink,
+    NoSQLMigrationManager,
+    benchmark_migration_throughput,
+)
+from src.telegram_audio_downloader.models import AudioFile, TelegramGroup, db
+
+
+@pytest.fixture
+def source_db(model_db):
+    """Stellt eine Quelldatenbank mit Gruppen und Audiodateien bereit."""
+    model_db([TelegramGroup, AudioFile], "source.db")
+
+    groups = [TelegramGroup.create(group_id=100 + i, title=f"Gruppe {i}") for i in range(3)]
+    for i in range(50):
+        AudioFile.create(file_id=f"file_{i}", file_name=f"song_{i}.mp3", file_size=i, group=groups[i % 3])
+
+    return db.database
+
+
+class FailingSink(FileMigrationSink):
+    """Dateiziel, das beim n-ten AudioFile-Stapel einen Fehler auslöst."""
+
+    def __init__(self, directory, fail_at):
+        super().__init__(directory)
+        self.fail_at = fail_at
+        self.audio_batches = 0
+
+    def write_batch(self, collection, documents, key_field):
+        if collection == "audio_files":
+            self.audio_batches += 1
+            if self.audio_batches == self.fail_at:
+                raise ConnectionError("Verbindung zum Ziel verloren")
+        return super().write_batch(collection, documents, key_field)
+
+
+class TestBatchedExport:
+    """Testfälle für das stapelweise Lesen der Quelle."""
+
+    def test_batches_follow_batch_size(self, source_db):
+        """Testet Stapelgröße und Fortsetzen nach einer id."""
+        manager = NoSQLMigrationManager(source_db, batch_size=7)
+
+        batches = list(manager._iter_audio_files())
+        assert [len(batch) for batch in batches] == [7] * 7 + [1]
+        assert batches[1][0]["file_id"] == "file_7"
+
+        resumed = list(manager._iter_audio_files(after_id=45))
+        assert [row["id"] for batch in resumed for row in batch] == [46, 47, 48, 49, 50]
+
+    def test_export_is_lazy(self, source_db):
+        """Testet, dass erst beim Weiterlesen der nächste Stapel abgefragt wird."""
+        manager = NoSQLMigrationManager(source_db, batch_size=10)
+        batches = manager._iter_audio_files()
+        first = next(batches)
+
+        AudioFile.delete().where(AudioFile.id > 10).execute()
+        assert len(first) == 10
+        assert list(batches) == []
+
+
+class TestFileMigration:
+    """Testfälle für parallele Schreibvorgänge und Checkpoints."""
+
+    def test_migration_writes_all_rows(self, source_db, tmp_path):
+        """Testet die vollständige Migration in das Dateiziel."""
+        manager = NoSQLMigrationManager(source_db, batch_size=8, max_workers=3)
+        manager.configure_file_sink(str(tmp_path / "ziel"))
+
+        results = manager.run_full_migration()
+
+        assert results["migrations"]["file"]["status"] == "completed"
+        assert results["migrations"]["mongodb"]["status"] == "skipped"
+        sink = FileMigrationSink(str(tmp_path / "ziel"))
+        assert sorted(row["file_id"] for row in sink.read_collection("audio_files")) == sorted(
+            f"file_{i}" for i in range(50)
+        )
+        assert len(sink.read_collection("telegram_groups")) == 3
+        assert manager.migration_metrics["file"]["audio_files"]["batches"] == 7
+        # Nach Erfolg beginnt die nächste Migration wieder von vorn
+        assert not manager.checkpoint_path.exists()
+
+    def test_failed_migration_resumes_mid_table(self, source_db, tmp_path):
+        """Testet das Fortsetzen nach dem letzten lückenlos geschriebenen Stapel."""
+        manager = NoSQLMigrationManager(source_db, batch_size=7, max_workers=2)
+        failing = FailingSink(str(tmp_path / "ziel"), fail_at=4)
+
+        assert not manager._run_migration("file", lambda: failing, manager._document_tables())
+        assert manager.migration_status["file"].startswith("failed")
+
+        checkpoint = json.loads(manager.checkpoint_path.read_text())
+        assert checkpoint["file"]["telegram_groups"]["completed"]
+        assert checkpoint["file"]["audio_files"]["last_key"] == 21
+
+        manager.configure_file_sink(str(tmp_path / "ziel"))
+        assert manager.migrate_to_file()
+
+        metrics = manager.migration_metrics["file"]
+        assert metrics["audio_files"]["resumed_after"] == 21
+        assert metrics["audio_files"]["rows"] == 29
+        sink = FileMigrationSink(str(tmp_path / "ziel"))
+        assert len(sink.read_collection("audio_files")) == 50
+        # Die bereits abgeschlossene Tabelle wird nicht erneut geschrieben
+        assert len(sink.read_collection("telegram_groups", key_field=None)) == 3
+
+    def test_checkpoint_is_read_once_and_survives_restart(self, source_db, tmp_path, monkeypatch):
+        """Testet, dass der Checkpoint im Speicher bleibt und ein neuer Lauf ihn aus der Datei liest."""
+        manager = NoSQLMigrationManager(source_db, batch_size=7)
+        reads = []
+        load = json.load
+        monkeypatch.setattr(json, "load", lambda f: reads.append(f.name) or load(f))
+
+        assert not manager._run_migration(
+            "file", lambda: FailingSink(str(tmp_path / "ziel"), fail_at=3), manager._document_tables()
+        )
+        assert reads == []
+        assert not list(tmp_path.glob("*.tmp"))
+
+        restarted = NoSQLMigrationManager(source_db, batch_size=7)
+        restarted.configure_file_sink(str(tmp_path / "ziel"))
+        assert restarted.migrate_to_file()
+        assert len(reads) == 1
+        assert restarted.migration_metrics["file"]["audio_files"]["resumed_after"] == 14
+        assert not restarted.checkpoint_path.exists()
+
+    def test_sink_must_implement_write_batch(self):
+        """Testet, dass ein Ziel ohne write_batch nicht erzeugt werden kann."""
+        class IncompleteSink(MigrationSink):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteSink()
+
+
+class TestMigrationBenchmark:
+    """Durchsatz-Benchmark gegen das Dateiziel (nur mit --run-slow)."""
+
+    def test_migration_throughput_benchmark(self, source_db, tmp_path):
+        """Misst den Durchsatz für verschiedene Stapelgrößen und Schreiberzahlen."""
+        with db.atomic():
+            AudioFile.insert_many([
+                {"file_id": f"bulk_{i}", "file_name": "x.mp3", "file_size": i} for i in range(20000)
+            ]).execute()
+
+        results = benchmark_migration_throughput(
+            source_db, str(tmp_path / "bench"), batch_sizes=(100,), worker_counts=(1, 4)
+        )
+        for name, rate in results.items():
+            print(f"\nStapel x Schreiber {name}: {rate:.0f} Zeilen/s")
+
+        # Die Laufzeit schwankt je nach Rechner; geprüft wird nur die Vollständigkeit
+        total = AudioFile.select().count()
+        last_id = AudioFile.select(AudioFile.id).order_by(AudioFile.id.desc()).scalar()
+        assert set(results) == {"100x1", "100x4"}
+        for name in results:
+            run_directory = tmp_path / "bench" / name
+            documents = FileMigrationSink(str(run_directory)).read_collection("audio_files")
+            assert len(documents) == total
+            assert {document["id"] for document in documents} == set(range(1, last_id + 1))
+
+            checkpoint = json.loads((run_directory / "checkpoint.json").read_text(encoding="utf-8"))
+            state = checkpoint["benchmark"]["audio_files"]
+            assert state["completed"] and state["rows"] == total
+            assert state["last_key"] == last_id
@@ -0,0 +1,124 @@
+"""
+Tests für den Trigramm-Index im Telegram Audio Downloader.
+"""
+
+import random
+import time
+
+import pytest
+
+from src.telegram_audio_downloader import search_index
+from src.telegram_audio_downloader.search_index import (
+    TrigramIndex,
+    extract_trigrams,
+    normalize_term,
+)
+
+
+class TestTrigrams:
+    """Testfälle für die Trigramm-Hilfsfunktionen."""
+
+    def test_normalize_term(self):
+        """Testet die Normalisierung von Begriffen."""
+        assert normalize_term("  Queen - Bohemian_Rhapsody!  ") == "queen bohemian_rhapsody"
+        assert normalize_term("!!!") == ""
+
+    def test_extract_trigrams(self):
+        """Testet die Zerlegung in Trigramme."""
+        assert extract_trigrams("Rock") == [" ro", "roc", "ock", "ck "]
+        assert extract_trigrams("") == []
+
+
+class TestTrigramIndex:
+    """Testfälle für die TrigramIndex-Klasse."""
+
+    @pytest.fixture
+    def index(self):
+        index = TrigramIndex()
+        index.add_many([
+            "Bohemian Rhapsody", "Queen", "Miles Davis", "Kind of Blue",
+            "Rockin' in the Free World", "Rock Lobster", "Beethoven",
+        ])
+        return index
+
+    def test_add_deduplicates(self, index):
+        """Testet, dass Begriffe nur einmal aufgenommen werden."""
+        assert len(index) == 7
+        assert index.add("Queen") is False
+        assert index.add("") is False
+        assert len(index) == 7
+
+    def test_search_typo(self, index):
+        """Testet die Suche mit Tippfehler."""
+        results = index.search("Bohemain Rapsody", limit=3)
+        assert results[0][0] == "Bohemian Rhapsody"
+        assert results[0][1] >= 60
+
+    def test_search_without_rapidfuzz(self, index, monkeypatch):
+        """Testet die Bewertung mit fuzzywuzzy, wenn rapidfuzz nicht installiert ist."""
+        monkeypatch.setattr(search_index, "RAPIDFUZZ_AVAILABLE", False)
+        results = index.search("Bohemain Rapsody", limit=3)
+        assert results[0][0] == "Bohemian Rhapsody"
+        assert index.search("zzzzzz", min_score=60) == []
+
+    def test_search_short_prefix(self, index):
+        """Testet die Präfixsuche für kurze Anfragen."""
+        results = [term for term, _ in index.search("Ro", limit=5, min_score=0)]
+        assert "Rock Lobster" in results
+        assert "Queen" not in results
+
+    def test_search_respects_limit_and_score(self, index):
+        """Testet Limit und Mindestpunktzahl."""
+        assert len(index.search("Rock", limit=1)) == 1
+        assert index.search("zzzzzz", min_score=60) == []
+
+    def test_save_and_load(self, index, tmp_path):
+        """Testet das Persistieren des Index."""
+        path = tmp_path / "index" / "suggestions.json"
+        index.save(path)
+
+        loaded = TrigramIndex.load(path)
+        assert loaded is not None
+        assert loaded.terms == index.terms
+        assert loaded.built_at == index.built_at
+        assert loaded.search("Beethovn", limit=1)[0][0] == "Beethoven"
+        assert loaded.add("Queen") is False
+
+    def test_load_missing_or_invalid(self, tmp_path):
+        """Testet das Laden fehlender oder ungültiger Dateien."""
+        assert TrigramIndex.load(tmp_path / "missing.json") is None
+        invalid = tmp_path / "invalid.json"
+        invalid.write_text("{}")
+        assert TrigramIndex.load(invalid) is None
+
+
+class TestTrigramIndexBenchmark:
+    """Latenz-Benchmark für Suchvorschläge (nur mit --run-slow)."""
+
+    def test_suggestion_latency_benchmark(self):
+        """Prüft die p99-Latenz der Vorschläge bei 1 Mio. Einträgen."""
+        rng = random.Random(42)
+        vocabulary = [
+            "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+            for _ in range(50_000)
+        ]
+
+        def word():
+            return rng.choice(vocabulary)
+
+        index = TrigramIndex()
+        index.add_many(
+            " ".join(word() for _ in range(rng.randint(1, 4))).title()
+            for _ in range(1_000_000)
+        )
+        queries = [rng.choice(index.terms)[:rng.randint(2, 12)] for _ in range(200)]
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, limit=10)
+            latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        assert p99 < 0.020, f"p99-Latenz {p99 * 1000:.1f} ms"
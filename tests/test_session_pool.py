@@ -0,0 +1,208 @@
+"""
+Tests für den Pool mehrerer Telegram-Sitzungen.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telethon.errors import ChannelPrivateError, FloodWaitError
+from telethon.tl.types import PeerChannel, PeerChat
+
+from src.telegram_audio_downloader import downloader as downloader_module
+from src.telegram_audio_downloader.downloader import AudioDownloader
+from src.telegram_audio_downloader.models import TelegramGroup, db
+from src.telegram_audio_downloader.session_pool import NoSessionAvailableError, SessionPool
+
+from .fake_telegram import MUSIC, make_message
+
+GROUP_ID = 4242
+
+
+def _message(message_id):
+    """Musiknachricht in der Testgruppe."""
+    message = make_message(message_id, MUSIC)
+    message.peer_id = PeerChannel(GROUP_ID)
+    return message
+
+
+class FakeSessionClient:
+    """Sitzung, deren Downloads, FloodWaits und Zugriffsrechte steuerbar sind."""
+
+    def __init__(self, name, delay=0.01, private=False):
+        self.name = name
+        self.delay = delay
+        self.private = private
+        self.flood_waits = []
+        self.downloads = []
+        self.lookups = []
+        self.id_shift = 0
+
+    async def get_entity(self, reference):
+        self.lookups.append(reference)
+        if self.private:
+            raise ChannelPrivateError(request=None)
+        return SimpleNamespace(id=GROUP_ID, session=self.name)
+
+    async def get_messages(self, entity, ids):
+        # Über die eigene Auflösung gesehen, ggf. mit anderem Dokument unter derselben ID
+        message = _message(ids + self.id_shift)
+        message.id = ids
+        message.session = self.name
+        return message
+
+    async def download_media(self, message, file=None, progress_callback=None):
+        if self.flood_waits:
+            raise FloodWaitError(request=None, capture=self.flood_waits.pop(0))
+        await asyncio.sleep(self.delay)
+        self.downloads.append((message.id, getattr(message, "session", "primary")))
+        # Wie vom Downloader erwartet: Anzahl der geladenen Bytes
+        return message.media.document.size
+
+    async def disconnect(self):
+        pass
+
+
+@pytest.fixture
+def pool_db(model_db):
+    """Datenbank mit der Testgruppe (für die Auflösung in weiteren Sitzungen)."""
+    model_db([TelegramGroup], "pool.db")
+    TelegramGroup.create(group_id=GROUP_ID, title="Gruppe", username="gruppe")
+
+
+def _pool(*clients):
+    """Erstellt einen Pool; der erste Client ist die primäre Sitzung."""
+    pool = SessionPool()
+    for client in clients:
+        pool.add(client.name, client)
+    return pool
+
+
+def test_downloads_are_spread_over_sessions(pool_db):
+    """Testet, dass parallele Downloads auf alle Sitzungen verteilt werden."""
+    clients = [FakeSessionClient("a"), FakeSessionClient("b"), FakeSessionClient("c")]
+    pool = _pool(*clients)
+
+    async def scenario():
+        await asyncio.gather(*[pool.download_media(_message(i), file=f"{i}.mp3") for i in range(9)])
+
+    asyncio.run(scenario())
+
+    assert [len(client.downloads) for client in clients] == [3, 3, 3]
+    # Weitere Sitzungen laden die Nachricht über ihre eigene Auflösung der Gruppe
+    assert clients[1].lookups == ["gruppe"]
+    assert {session for _, session in clients[1].downloads} == {"b"}
+    stats = pool.get_stats()
+    assert stats["a"]["primary"] and not stats["b"]["primary"]
+    assert stats["b"]["downloads"] == 3
+    assert stats["b"]["bytes_downloaded"] == 3 * 4_000_000
+    assert stats["b"]["throughput_bps"] > 0
+
+
+def test_flood_wait_moves_download_to_other_session(pool_db):
+    """Testet, dass FloodWait nur die betroffene Sitzung sperrt."""
+    primary, second = FakeSessionClient("a"), FakeSessionClient("b")
+    primary.flood_waits.append(120)
+    pool = _pool(primary, second)
+
+    async def scenario():
+        await pool.download_media(_message(1))
+        # Die gesperrte Sitzung wird gemieden, solange die andere frei ist
+        await asyncio.gather(*[pool.download_media(_message(i)) for i in range(2, 5)])
+
+    asyncio.run(scenario())
+
+    assert primary.downloads == []
+    assert len(second.downloads) == 4
+    stats = pool.get_stats()["a"]
+    assert stats["flood_waits"] == 1 and stats["flood_wait_seconds"] == 120
+    assert stats["flood_remaining"] > 100
+    assert pool.sessions[0].penalty() > pool.sessions[1].penalty()
+
+
+def test_all_sessions_in_flood_wait_wait_for_shortest(pool_db):
+    """Testet das Warten auf die kürzeste Sperre."""
+    primary, second = FakeSessionClient("a"), FakeSessionClient("b")
+    primary.flood_waits.append(1)
+    second.flood_waits.append(30)
+    pool = _pool(primary, second)
+
+    asyncio.run(pool.download_media(_message(1)))
+
+    assert primary.downloads == [(1, "primary")]
+
+
+def test_access_errors_fall_back_and_are_remembered(pool_db):
+    """Testet den Wechsel, wenn ein Konto die Gruppe nicht lesen darf."""
+    primary, private = FakeSessionClient("a", delay=0.05), FakeSessionClient("b", private=True)
+    pool = _pool(primary, private)
+
+    async def scenario():
+        await asyncio.gather(*[pool.download_media(_message(i)) for i in range(4)])
+
+    asyncio.run(scenario())
+
+    assert len(primary.downloads) == 4
+    assert private.lookups == ["gruppe"]
+    assert pool.get_stats()["b"]["denied_groups"] == [GROUP_ID]
+
+    # Ohne eine Sitzung mit Zugriff wird der Zugriffsfehler weitergegeben
+    only_private = _pool(FakeSessionClient("x", private=True), FakeSessionClient("y", private=True))
+    only_private.sessions[0].denied_groups.add(GROUP_ID)
+    with pytest.raises(ChannelPrivateError):
+        asyncio.run(only_private.download_media(_message(1)))
+    with pytest.raises(NoSessionAvailableError):
+        asyncio.run(only_private.acquire(GROUP_ID))
+
+
+def test_per_account_message_ids_stay_on_primary(pool_db):
+    """Testet, dass nur in Kanälen weitere Sitzungen dieselbe Nachricht laden."""
+    primary, second = FakeSessionClient("a", delay=0.05), FakeSessionClient("b")
+    pool = _pool(primary, second)
+
+    def chat_message(message_id):
+        message = make_message(message_id, MUSIC)
+        message.peer_id = PeerChat(GROUP_ID)
+        return message
+
+    async def scenario():
+        await asyncio.gather(*[pool.download_media(chat_message(i)) for i in range(3)])
+
+    asyncio.run(scenario())
+
+    assert len(primary.downloads) == 3
+    assert second.downloads == [] and second.lookups == []
+
+    # Liefert die weitere Sitzung unter der ID ein anderes Dokument, lädt die primäre
+    primary, shifted = FakeSessionClient("a"), FakeSessionClient("b")
+    shifted.id_shift = 1
+    primary.flood_waits.append(1)
+    pool = _pool(primary, shifted)
+    asyncio.run(pool.download_media(_message(1)))
+
+    assert shifted.downloads == []
+    assert primary.downloads == [(1, "primary")]
+    assert pool.get_stats()["b"]["access_errors"] == 1
+
+
+def test_downloader_uses_pool(model_db, tmp_path, monkeypatch):
+    """Testet, dass der Downloader Dateien über den Pool lädt."""
+    # Zugriffsregeln anderer Tests sollen hier nicht greifen
+    monkeypatch.setattr(downloader_module, "check_file_access", lambda path: True)
+    downloader = AudioDownloader(download_dir=str(tmp_path / "downloads"))
+    model_db([TelegramGroup], "pool.db")
+    TelegramGroup.create(group_id=GROUP_ID, title="Gruppe", username="gruppe")
+    primary, second = FakeSessionClient("a"), FakeSessionClient("b")
+    primary.flood_waits.append(60)
+    downloader.client = primary
+    downloader.session_pool = _pool(primary, second)
+
+    downloaded = asyncio.run(downloader._download_with_resume(
+        _message(1), downloader.download_dir / "lied.mp3.partial", 0, SimpleNamespace(file_size=0)
+    ))
+
+    assert downloaded == 4_000_000
+    assert second.downloads == [(1, "b")]
+    stats = downloader.get_session_stats()
+    assert stats["a"]["flood_waits"] == 1
+    assert stats["b"]["downloads"] == 1
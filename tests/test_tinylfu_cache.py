@@ -0,0 +1,179 @@
+"""
+Tests für den W-TinyLFU-Cache-Kern.
+"""
+
+import asyncio
+
+import pytest
+
+from src.telegram_audio_downloader.database_caching import InMemoryCache, QueryResultCache
+from src.telegram_audio_downloader.intelligent_caching import MemoryCache
+from src.telegram_audio_downloader.utils.lru_cache import LRUCache
+from src.telegram_audio_downloader.utils.tinylfu_cache import (
+    FrequencySketch,
+    WTinyLFUCache,
+    benchmark_hit_ratios,
+    generate_scan_trace,
+    load_access_trace,
+    replay_trace,
+)
+
+
+class TestFrequencySketch:
+    """Testfälle für die Häufigkeitsskizze."""
+
+    def test_counts_saturate_and_age(self):
+        """Testet Sättigung bei 15 und Halbierung bei der Alterung."""
+        sketch = FrequencySketch(64)
+        for _ in range(20):
+            sketch.increment("heiß")
+        sketch.increment("kalt")
+
+        assert sketch.frequency("heiß") == 15
+        assert sketch.frequency("kalt") >= 1
+        assert sketch.frequency("unbekannt") <= 1
+
+        sketch.reset()
+        assert sketch.frequency("heiß") == 7
+
+
+class TestWTinyLFUCache:
+    """Testfälle für Aufnahme, Verdrängung und Statistiken."""
+
+    def test_scan_does_not_flush_hot_entries(self):
+        """Testet, dass ein Scan einmaliger Schlüssel die häufigen Einträge nicht verdrängt."""
+        cache = WTinyLFUCache(100)
+        lru = LRUCache(maxsize=100)
+        hot = [f"hot:{i}" for i in range(80)]
+        for _ in range(5):
+            for key in hot:
+                for target in (cache, lru):
+                    if target.get(key) is None:
+                        target.put(key, key)
+
+        for i in range(1000):
+            cache.get(f"scan:{i}")
+            cache.put(f"scan:{i}", i)
+            lru.put(f"scan:{i}", i)
+
+        assert sum(key in cache for key in hot) >= 75
+        assert sum(lru.get(key) is not None for key in hot) == 0
+        assert cache.get_stats()["namespaces"]["scan"]["rejections"] > 800
+
+    def test_byte_budget(self):
+        """Testet die Byte-Gewichtung und die Abweisung zu großer Werte."""
+        cache = WTinyLFUCache(10_000)
+        assert not cache.put("riesig", b"", weight=20_000)
+        for i in range(20):
+            cache.put(f"cover:{i}", b"", weight=1_000)
+
+        assert cache.weighted_size <= 10_000
+        assert len(cache) <= 10
+        assert cache.get_stats()["namespaces"]["cover"]["weight"] == cache.weighted_size
+
+    def test_namespace_stats_and_ttl(self):
+        """Testet Zähler pro Namensraum und den Ablauf von Einträgen."""
+        cache = WTinyLFUCache(50)
+        cache.put("query:1", "a")
+        cache.put("object:1", "b", ttl=-1)
+        cache.get("query:1")
+        cache.get("query:2")
+        cache.get("object:1")
+
+        namespaces = cache.get_stats()["namespaces"]
+        assert namespaces["query"]["hits"] == 1
+        assert namespaces["query"]["misses"] == 1
+        assert namespaces["object"]["expirations"] == 1
+        assert namespaces["object"]["entries"] == 0
+
+    def test_resize_and_eviction_listener(self):
+        """Testet das Verkleinern und die Benachrichtigung über Verdrängungen."""
+        evicted = []
+        cache = WTinyLFUCache(100, on_evict=lambda key, value: evicted.append(key))
+        for i in range(100):
+            cache.put(i, i)
+
+        cache.resize(10)
+
+        assert len(cache) == 10
+        assert len(evicted) == 90
+        assert cache.eviction_count == 90
+
+
+class TestAdoption:
+    """Testfälle für die Verwendung in den bestehenden Caches."""
+
+    def test_lru_cache_policy(self):
+        """Testet LRUCache mit W-TinyLFU und mit Byte-Budget."""
+        cache = LRUCache(maxsize=10, policy="tinylfu")
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get_stats()["policy"] == "w-tinylfu"
+
+        weighted = LRUCache(maxsize=1000, max_bytes=2_000)
+        for i in range(10):
+            weighted.put(f"k{i}", "x" * 500)
+        assert weighted.size() < 10
+        # Byte-gewichtetes LRU behält die zuletzt eingefügten Einträge
+        assert weighted.get("k9") is not None
+        assert weighted.get("k0") is None
+
+    def test_in_memory_cache_policy(self):
+        """Testet InMemoryCache mit Namensräumen der spezialisierten Caches."""
+        memory = InMemoryCache(max_size=100, default_ttl_seconds=0, policy="tinylfu")
+        memory.set("object:x", {"id": 1})
+        memory.get("object:x")
+        memory.get("fehlt")
+
+        stats = memory.get_stats()
+        assert stats["policy"] == "w-tinylfu"
+        assert stats["hits"] == 1
+        assert stats["namespaces"]["object"]["hits"] == 1
+        assert stats["namespaces"]["default"]["misses"] == 1
+        assert memory.delete("object:x")
+
+    def test_query_cache_on_tinylfu(self, model_db):
+        """Testet, dass der Abfrage-Cache unverändert mit dem neuen Kern arbeitet."""
+        model_db([], "tinylfu.db")
+        cache = QueryResultCache(InMemoryCache(default_ttl_seconds=0, max_bytes=100_000, policy="tinylfu"))
+        cache.set_query_result("SELECT * FROM audio_files", (), [1, 2, 3])
+        assert cache.get_query_result("SELECT * FROM audio_files", ()) == [1, 2, 3]
+        assert "query" in cache.memory_cache.get_stats()["namespaces"]
+
+    def test_memory_cache_policy(self):
+        """Testet den asynchronen MemoryCache mit W-TinyLFU."""
+        async def scenario():
+            cache = MemoryCache(max_size=3, policy="tinylfu")
+            for key in ("a", "b", "c", "d", "e"):
+                await cache.put(key, key)
+            assert await cache.size() == 3
+            assert await cache.get("e") == "e"
+            stats = cache.get_stats()
+            assert stats["policy"] == "w-tinylfu"
+            assert stats["evictions"] == 2
+
+        asyncio.run(scenario())
+
+
+class TestTraceReplay:
+    """Testfälle für das Abspielen von Zugriffsfolgen."""
+
+    def test_load_and_replay_trace(self, tmp_path):
+        """Testet das Laden einer aufgezeichneten Zugriffsfolge mit Größen."""
+        trace_file = tmp_path / "trace.txt"
+        trace_file.write_text("a 100\nb 100\na 100\n\nc\n")
+
+        trace = load_access_trace(str(trace_file))
+
+        assert trace == [("a", 100), ("b", 100), ("a", 100), "c"]
+        assert replay_trace(WTinyLFUCache(1000), trace) == pytest.approx(0.25)
+
+    def test_hit_ratio_benchmark(self):
+        """Vergleicht LRU und W-TinyLFU auf Zipf-Zugriffen mit Scans (nur mit --run-slow)."""
+        trace = generate_scan_trace()
+        results = benchmark_hit_ratios(250, trace)
+        assert results["w-tinylfu"] > results["lru"]
+
+        weighted = [(key, 50_000 if key.endswith("0") and key.startswith("hot:") else 1_000) for key in trace]
+        weighted_results = benchmark_hit_ratios(300_000, weighted)
+        assert weighted_results["w-tinylfu"] > weighted_results["lru"]